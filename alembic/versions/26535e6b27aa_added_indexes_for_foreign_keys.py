@@ -0,0 +1,47 @@
+"""Added indexes for foreign keys and filter columns.
+
+Revision ID: 26535e6b27aa
+Revises: 9f9b88fef376
+Create Date: 2026-10-19 09:12:41.318000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "26535e6b27aa"
+down_revision = "9f9b88fef376"
+
+
+# PostgreSQL doesn't create indexes for foreign keys automatically, so all the
+# columns that are used in the filters of the hot queries are indexed here.
+#
+# "Tickets"."number" is not listed as it already has a unique constraint which
+# is backed by an index.
+INDEXES = [
+    ("ix_SimpleEntities_entity_type", "SimpleEntities", ["entity_type"]),
+    ("ix_Budgets_parent_id", "Budgets", ["parent_id"]),
+    ("ix_Tasks_parent_id", "Tasks", ["parent_id"]),
+    ("ix_Tasks_project_id", "Tasks", ["project_id"]),
+    ("ix_Tickets_project_id", "Tickets", ["project_id"]),
+    ("ix_TimeLogs_task_id", "TimeLogs", ["task_id"]),
+    ("ix_TimeLogs_resource_id", "TimeLogs", ["resource_id"]),
+    ("ix_Versions_parent_id", "Versions", ["parent_id"]),
+    (
+        "ix_Versions_task_id_revision_number_version_number",
+        "Versions",
+        ["task_id", "revision_number", "version_number"],
+    ),
+    ("ix_Shots_code", "Shots", ["code"]),
+]
+
+
+def upgrade():
+    """Upgrade the tables."""
+    for index_name, table_name, columns in INDEXES:
+        op.create_index(index_name, table_name, columns, unique=False)
+
+
+def downgrade():
+    """Downgrade the tables."""
+    for index_name, table_name, _ in reversed(INDEXES):
+        op.drop_index(index_name, table_name=table_name)
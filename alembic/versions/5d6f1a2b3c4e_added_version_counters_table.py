@@ -0,0 +1,39 @@
+"""Added Version_Counters table.
+
+Revision ID: 5d6f1a2b3c4e
+Revises: 26535e6b27aa
+Create Date: 2026-10-19 11:02:17.524000
+"""
+
+from alembic import op
+
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5d6f1a2b3c4e"
+down_revision = "26535e6b27aa"
+
+
+def upgrade():
+    """Upgrade the tables."""
+    op.create_table(
+        "Version_Counters",
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("revision_number", sa.Integer(), nullable=False),
+        sa.Column("version_number", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["task_id"], ["Tasks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("task_id", "revision_number"),
+    )
+    # seed the counters from the existing versions
+    op.execute(
+        """INSERT INTO "Version_Counters" (task_id, revision_number, version_number)
+        SELECT task_id, revision_number, MAX(version_number)
+        FROM "Versions"
+        GROUP BY task_id, revision_number
+        """
+    )
+
+
+def downgrade():
+    """Downgrade the tables."""
+    op.drop_table("Version_Counters")
@@ -0,0 +1,41 @@
+"""Added project_id column to Shots table.
+
+Revision ID: 8c2e4f6a1b3d
+Revises: 5d6f1a2b3c4e
+Create Date: 2026-10-19 14:21:05.193000
+"""
+
+from alembic import op
+
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "8c2e4f6a1b3d"
+down_revision = "5d6f1a2b3c4e"
+
+
+def upgrade():
+    """Upgrade the tables."""
+    op.add_column("Shots", sa.Column("project_id", sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        "Shots_project_id_fkey", "Shots", "Projects", ["project_id"], ["id"]
+    )
+    # copy the project_id values from the Tasks table
+    op.execute(
+        """UPDATE "Shots" SET project_id = (
+            SELECT "Tasks".project_id FROM "Tasks" WHERE "Tasks".id = "Shots".id
+        )
+        """
+    )
+    # this will fail if there are Shots with the same code in the same Project,
+    # which are not allowed by Shot._validate_code() anyway
+    op.create_index(
+        "ix_Shots_project_id_code", "Shots", ["project_id", "code"], unique=True
+    )
+
+
+def downgrade():
+    """Downgrade the tables."""
+    op.drop_index("ix_Shots_project_id_code", table_name="Shots")
+    op.drop_constraint("Shots_project_id_fkey", "Shots", type_="foreignkey")
+    op.drop_column("Shots", "project_id")
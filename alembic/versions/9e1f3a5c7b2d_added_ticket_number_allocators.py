@@ -0,0 +1,42 @@
+"""Added Tickets_number_seq sequence and Ticket_Counters table.
+
+Revision ID: 9e1f3a5c7b2d
+Revises: 8c2e4f6a1b3d
+Create Date: 2026-10-19 16:04:38.712000
+"""
+
+from alembic import op
+
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "9e1f3a5c7b2d"
+down_revision = "8c2e4f6a1b3d"
+
+
+def upgrade():
+    """Upgrade the tables."""
+    op.create_table(
+        "Ticket_Counters",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("number", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    if op.get_context().dialect.name == "postgresql":
+        op.execute(sa.schema.CreateSequence(sa.Sequence("Tickets_number_seq")))
+        # continue from the maximum ticket number
+        op.execute(
+            """SELECT setval(
+                '"Tickets_number_seq"',
+                COALESCE((SELECT MAX(number) FROM "Tickets"), 0) + 1,
+                false
+            )
+            """
+        )
+
+
+def downgrade():
+    """Downgrade the tables."""
+    if op.get_context().dialect.name == "postgresql":
+        op.execute(sa.schema.DropSequence(sa.Sequence("Tickets_number_seq")))
+    op.drop_table("Ticket_Counters")
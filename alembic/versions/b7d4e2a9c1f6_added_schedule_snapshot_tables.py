@@ -0,0 +1,51 @@
+"""Added Schedule_Snapshots and Schedule_Snapshot_Entries tables.
+
+Revision ID: b7d4e2a9c1f6
+Revises: 9e1f3a5c7b2d
+Create Date: 2026-10-19 17:12:40.318000
+"""
+
+from alembic import op
+
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "b7d4e2a9c1f6"
+down_revision = "9e1f3a5c7b2d"
+
+
+def upgrade():
+    """Upgrade the tables."""
+    op.create_table(
+        "Schedule_Snapshots",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("date_created", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_Schedule_Snapshots_date_created"),
+        "Schedule_Snapshots",
+        ["date_created"],
+        unique=False,
+    )
+    op.create_table(
+        "Schedule_Snapshot_Entries",
+        sa.Column("snapshot_id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=False),
+        sa.Column("start", sa.BigInteger(), nullable=False),
+        sa.Column("end", sa.BigInteger(), nullable=False),
+        sa.Column("resource_ids", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["snapshot_id"], ["Schedule_Snapshots.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("snapshot_id", "task_id"),
+    )
+
+
+def downgrade():
+    """Downgrade the tables."""
+    op.drop_table("Schedule_Snapshot_Entries")
+    op.drop_index(
+        op.f("ix_Schedule_Snapshots_date_created"), table_name="Schedule_Snapshots"
+    )
+    op.drop_table("Schedule_Snapshots")
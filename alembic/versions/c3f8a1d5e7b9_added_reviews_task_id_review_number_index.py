@@ -0,0 +1,27 @@
+"""Added index on Reviews task_id and review_number.
+
+Revision ID: c3f8a1d5e7b9
+Revises: b7d4e2a9c1f6
+Create Date: 2026-10-19 19:04:12.527000
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3f8a1d5e7b9"
+down_revision = "b7d4e2a9c1f6"
+
+
+def upgrade():
+    """Upgrade the tables."""
+    op.create_index(
+        "ix_Reviews_task_id_review_number",
+        "Reviews",
+        ["task_id", "review_number"],
+        unique=False,
+    )
+
+
+def downgrade():
+    """Downgrade the tables."""
+    op.drop_index("ix_Reviews_task_id_review_number", table_name="Reviews")
@@ -3,65 +3,159 @@
 
 See docs for more information.
 """
+import importlib
+from typing import Any, Dict, List, TYPE_CHECKING
+
 from stalker.version import __version__  # noqa: F401
 from stalker import config, log  # noqa: I100
 
 if True:
     defaults: config.Config = config.Config()
-from stalker.models.asset import Asset
-from stalker.models.auth import (
-    AuthenticationLog,
-    Group,
-    LocalSession,
-    Permission,
-    Role,
-    User,
-)
-from stalker.models.budget import Budget, BudgetEntry, Good, Invoice, Payment, PriceList
-from stalker.models.client import Client, ClientUser
-from stalker.models.department import Department, DepartmentUser
-from stalker.models.entity import Entity, EntityGroup, SimpleEntity
-from stalker.models.format import ImageFormat
-from stalker.models.file import File
-from stalker.models.message import Message
-from stalker.models.mixins import (
-    ACLMixin,
-    AmountMixin,
-    CodeMixin,
-    DAGMixin,
-    DateRangeMixin,
-    ProjectMixin,
-    ReferenceMixin,
-    ScheduleMixin,
-    StatusMixin,
-    TargetEntityTypeMixin,
-    UnitMixin,
-    WorkingHoursMixin,
-)
-from stalker.models.note import Note
-from stalker.models.project import (
-    Project,
-    ProjectClient,
-    ProjectRepository,
-    ProjectUser,
-)
-from stalker.models.repository import Repository
-from stalker.models.review import Daily, DailyFile, Review
-from stalker.models.scene import Scene
-from stalker.models.schedulers import SchedulerBase, TaskJugglerScheduler
-from stalker.models.sequence import Sequence
-from stalker.models.shot import Shot
-from stalker.models.status import Status, StatusList
-from stalker.models.structure import Structure
-from stalker.models.studio import Studio, Vacation, WorkingHours
-from stalker.models.tag import Tag
-from stalker.models.task import Task, TaskDependency, TimeLog
-from stalker.models.template import FilenameTemplate
-from stalker.models.ticket import Ticket, TicketLog
-from stalker.models.type import EntityType, Type
-from stalker.models.variant import Variant
-from stalker.models.version import Version
-from stalker.models.wiki import Page
+
+# In lazy import mode the classes are imported on first access (PEP 562), so
+# processes that only need a couple of classes don't pay for importing and
+# mapping all of them.
+if TYPE_CHECKING or not defaults.lazy_import:
+    from stalker.models.asset import Asset
+    from stalker.models.auth import (
+        AuthenticationLog,
+        Group,
+        LocalSession,
+        Permission,
+        Role,
+        User,
+    )
+    from stalker.models.budget import (
+        Budget,
+        BudgetEntry,
+        Good,
+        Invoice,
+        Payment,
+        PriceList,
+    )
+    from stalker.models.client import Client, ClientUser
+    from stalker.models.department import Department, DepartmentUser
+    from stalker.models.entity import Entity, EntityGroup, SimpleEntity
+    from stalker.models.format import ImageFormat
+    from stalker.models.file import File
+    from stalker.models.message import Message
+    from stalker.models.mixins import (
+        ACLMixin,
+        AmountMixin,
+        CodeMixin,
+        DAGMixin,
+        DateRangeMixin,
+        ProjectMixin,
+        ReferenceMixin,
+        ScheduleMixin,
+        StatusMixin,
+        TargetEntityTypeMixin,
+        UnitMixin,
+        WorkingHoursMixin,
+    )
+    from stalker.models.note import Note
+    from stalker.models.project import (
+        Project,
+        ProjectClient,
+        ProjectRepository,
+        ProjectUser,
+    )
+    from stalker.models.repository import Repository
+    from stalker.models.review import Daily, DailyFile, Review
+    from stalker.models.scene import Scene
+    from stalker.models.schedulers import (
+        ScheduleSnapshot,
+        SchedulerBase,
+        TaskJugglerScheduler,
+    )
+    from stalker.models.sequence import Sequence
+    from stalker.models.shot import Shot
+    from stalker.models.status import Status, StatusList
+    from stalker.models.structure import Structure
+    from stalker.models.studio import Studio, Vacation, WorkingHours
+    from stalker.models.tag import Tag
+    from stalker.models.task import Task, TaskDependency, TimeLog
+    from stalker.models.template import FilenameTemplate
+    from stalker.models.ticket import Ticket, TicketLog
+    from stalker.models.type import EntityType, Type
+    from stalker.models.variant import Variant
+    from stalker.models.version import Version
+    from stalker.models.wiki import Page
+
+# maps the public names to the modules they are defined in, for lazy imports
+_lazy_imports: Dict[str, str] = {
+    "ACLMixin": "stalker.models.mixins",
+    "AmountMixin": "stalker.models.mixins",
+    "Asset": "stalker.models.asset",
+    "AuthenticationLog": "stalker.models.auth",
+    "Budget": "stalker.models.budget",
+    "BudgetEntry": "stalker.models.budget",
+    "Client": "stalker.models.client",
+    "ClientUser": "stalker.models.client",
+    "CodeMixin": "stalker.models.mixins",
+    "DAGMixin": "stalker.models.mixins",
+    "Daily": "stalker.models.review",
+    "DailyFile": "stalker.models.review",
+    "DateRangeMixin": "stalker.models.mixins",
+    "Department": "stalker.models.department",
+    "DepartmentUser": "stalker.models.department",
+    "Entity": "stalker.models.entity",
+    "EntityGroup": "stalker.models.entity",
+    "EntityType": "stalker.models.type",
+    "File": "stalker.models.file",
+    "FilenameTemplate": "stalker.models.template",
+    "Good": "stalker.models.budget",
+    "Group": "stalker.models.auth",
+    "ImageFormat": "stalker.models.format",
+    "Invoice": "stalker.models.budget",
+    "LocalSession": "stalker.models.auth",
+    "Message": "stalker.models.message",
+    "Note": "stalker.models.note",
+    "Page": "stalker.models.wiki",
+    "Payment": "stalker.models.budget",
+    "Permission": "stalker.models.auth",
+    "PriceList": "stalker.models.budget",
+    "Project": "stalker.models.project",
+    "ProjectClient": "stalker.models.project",
+    "ProjectMixin": "stalker.models.mixins",
+    "ProjectRepository": "stalker.models.project",
+    "ProjectUser": "stalker.models.project",
+    "ReferenceMixin": "stalker.models.mixins",
+    "Repository": "stalker.models.repository",
+    "Review": "stalker.models.review",
+    "Role": "stalker.models.auth",
+    "Scene": "stalker.models.scene",
+    "ScheduleMixin": "stalker.models.mixins",
+    "ScheduleSnapshot": "stalker.models.schedulers",
+    "SchedulerBase": "stalker.models.schedulers",
+    "Sequence": "stalker.models.sequence",
+    "Shot": "stalker.models.shot",
+    "SimpleEntity": "stalker.models.entity",
+    "Status": "stalker.models.status",
+    "StatusList": "stalker.models.status",
+    "StatusMixin": "stalker.models.mixins",
+    "Structure": "stalker.models.structure",
+    "Studio": "stalker.models.studio",
+    "Tag": "stalker.models.tag",
+    "TargetEntityTypeMixin": "stalker.models.mixins",
+    "Task": "stalker.models.task",
+    "TaskDependency": "stalker.models.task",
+    "TaskJugglerScheduler": "stalker.models.schedulers",
+    "Ticket": "stalker.models.ticket",
+    "TicketLog": "stalker.models.ticket",
+    "TimeLog": "stalker.models.task",
+    "Type": "stalker.models.type",
+    "UnitMixin": "stalker.models.mixins",
+    "User": "stalker.models.auth",
+    "Vacation": "stalker.models.studio",
+    "Variant": "stalker.models.variant",
+    "Version": "stalker.models.version",
+    "WorkingHours": "stalker.models.studio",
+    "WorkingHoursMixin": "stalker.models.mixins",
+}
+
+# sub packages and modules that are available as attributes when imported
+_lazy_submodules: List[str] = ["db", "exceptions", "loaders", "models", "tjp", "utils"]
 
 __all__ = [
     "ACLMixin",
@@ -106,6 +200,7 @@ __all__ = [
     "Role",
     "Scene",
     "ScheduleMixin",
+    "ScheduleSnapshot",
     "SchedulerBase",
     "Sequence",
     "Shot",
@@ -135,3 +230,36 @@ __all__ = [
 
 
 logger = log.get_logger(__name__)
+
+
+def __getattr__(name: str) -> Any:
+    """Import the class with the given name on first access.
+
+    This is only used in lazy import mode, see the ``lazy_import`` config value.
+
+    Args:
+        name (str): The name of the attribute.
+
+    Raises:
+        AttributeError: If there is no such attribute.
+
+    Returns:
+        Any: The class or the sub module with the given name.
+    """
+    if name in _lazy_imports:
+        value = getattr(importlib.import_module(_lazy_imports[name]), name)
+    elif name in _lazy_submodules:
+        value = importlib.import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """Return the names in this module including the lazily imported ones.
+
+    Returns:
+        List[str]: The list of names.
+    """
+    return sorted(set(globals()) | set(_lazy_imports))
@@ -3,7 +3,7 @@
 import datetime
 import os
 import sys
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Set
 
 from stalker import log
 
@@ -19,6 +19,8 @@ class ConfigBase(object):
     default_config_values: Dict[str, Any] = {}
 
     def __init__(self) -> None:
+        self._lazy_loaders: Dict[str, Callable[[], None]] = {}
+        self._lazy_loader_skipped_names: Dict[Callable[[], None], Set[str]] = {}
         self.config_values = self.default_config_values.copy()
         self.user_config: Dict[str, Any] = {}
         self._parse_settings()
@@ -76,6 +78,53 @@ class ConfigBase(object):
                     # if key in self.config_values:
                     self.config_values[key] = self.user_config[key]
 
+    def register_lazy_loader(
+        self, names: List[str], loader: Callable[[], None]
+    ) -> None:
+        """Register a callable that updates the given config values on first use.
+
+        The loader is called only once, right before any of the given config
+        values is read for the first time. The config values that are set or
+        deleted before that are not overwritten by the loader.
+
+        Args:
+            names (List[str]): The names of the config values that the loader
+                updates.
+            loader (Callable[[], None]): The callable that updates the config
+                values.
+        """
+        self._lazy_loader_skipped_names.pop(loader, None)
+        for name in names:
+            self._lazy_loaders[name] = loader
+
+    def remove_lazy_loader(self, loader: Callable[[], None]) -> None:
+        """Remove the given lazy loader without calling it.
+
+        Args:
+            loader (Callable[[], None]): The previously registered loader.
+        """
+        names = [
+            name
+            for name, lazy_loader in self._lazy_loaders.items()
+            if lazy_loader is loader
+        ]
+        for name in names:
+            self._lazy_loaders.pop(name)
+        self._lazy_loader_skipped_names.pop(loader, None)
+
+    def _skip_lazy_loader(self, name: str) -> None:
+        """Keep the lazy loader of the given config value from overwriting it.
+
+        It is called when the config value is set or deleted before its lazy
+        loader is called.
+
+        Args:
+            name (str): The name of the config value.
+        """
+        loader = self._lazy_loaders.pop(name, None)
+        if loader is not None:
+            self._lazy_loader_skipped_names.setdefault(loader, set()).add(name)
+
     def __getattr__(self, name: str) -> Any:
         """Return the config value as if it is an attribute look up.
 
@@ -85,6 +134,24 @@ class ConfigBase(object):
         Returns:
             Any: The value related to the given config value.
         """
+        lazy_loaders = self.__dict__.get("_lazy_loaders")
+        if lazy_loaders and name in lazy_loaders:
+            loader = lazy_loaders[name]
+            skipped_names = self._lazy_loader_skipped_names.get(loader, set())
+            self.remove_lazy_loader(loader)
+            # keep the values that are set or deleted since the loader is
+            # registered
+            kept_values = {
+                skipped_name: self.config_values[skipped_name]
+                for skipped_name in skipped_names
+                if skipped_name in self.config_values
+            }
+            loader()
+            for skipped_name in skipped_names:
+                if skipped_name in kept_values:
+                    self.config_values[skipped_name] = kept_values[skipped_name]
+                else:
+                    self.config_values.pop(skipped_name, None)
         return self.config_values[name]
 
     def __getitem__(self, name: str) -> Any:
@@ -105,6 +172,7 @@ class ConfigBase(object):
             name (str): The name as the index.
             value (Any): The value to set the item to.
         """
+        self._skip_lazy_loader(name)
         self.config_values[name] = value
 
     def __delitem__(self, name: str) -> None:
@@ -113,6 +181,7 @@ class ConfigBase(object):
         Args:
             name (str): The name of the item to delete.
         """
+        self._skip_lazy_loader(name)
         self.config_values.pop(name)
 
     def __contains__(self, name: str) -> bool:
@@ -138,6 +207,12 @@ class Config(ConfigBase):
     env_key = "STALKER_PATH"
 
     default_config_values = dict(
+        #
+        # Import the classes on first access instead of importing all of them
+        # with "import stalker", set the STALKER_LAZY_IMPORT environment
+        # variable to "1" to enable it.
+        #
+        lazy_import=os.environ.get("STALKER_LAZY_IMPORT", "0") == "1",
         #
         # The default settings for the database, see sqlalchemy.create_engine
         # for possible parameters
@@ -148,9 +223,77 @@ class Config(ConfigBase):
             # "sqlalchemy.pool_pre_ping": True,
         },
         database_session_settings={},
+        #
+        # The engine profile to use, set it to one of the keys of the
+        # database_engine_profiles to tune the engine for a specific workload.
+        # The profile settings are merged on top of the
+        # database_engine_settings. None means no profile.
+        #
+        database_engine_profile=None,
+        database_engine_profiles={
+            # many short lived concurrent requests
+            "web": {
+                "sqlalchemy.pool_size": 10,
+                "sqlalchemy.max_overflow": 20,
+                "sqlalchemy.pool_timeout": 30,
+                "sqlalchemy.pool_recycle": 1800,
+                "sqlalchemy.pool_pre_ping": True,
+                "sqlalchemy.pool_use_lifo": True,
+                "sqlalchemy.query_cache_size": 1000,
+            },
+            # a single long running connection with big inserts and updates
+            "batch": {
+                "sqlalchemy.pool_size": 1,
+                "sqlalchemy.max_overflow": 2,
+                "sqlalchemy.pool_recycle": -1,
+                "sqlalchemy.pool_pre_ping": False,
+                "sqlalchemy.query_cache_size": 500,
+                "sqlalchemy.executemany_mode": "values_plus_batch",
+                "sqlalchemy.insertmanyvalues_page_size": 10000,
+                "sqlite_pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL"},
+            },
+            # long idle times between scheduling runs
+            "scheduler": {
+                "sqlalchemy.pool_size": 2,
+                "sqlalchemy.max_overflow": 0,
+                "sqlalchemy.pool_recycle": 3600,
+                "sqlalchemy.pool_pre_ping": True,
+                "sqlalchemy.executemany_mode": "values_plus_batch",
+                "sqlalchemy.insertmanyvalues_page_size": 10000,
+                "sqlite_pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL"},
+            },
+        },
         # Local storage path
         local_storage_path=os.path.expanduser("~/.strc"),
         local_session_data_file_name="local_session_data",
+        # the alembic versions that are already checked per database url, used
+        # by the fast connect mode of stalker.db.setup.setup()
+        alembic_version_cache_file_name="alembic_version_cache",
+        #
+        # Skip the DDL and load the Studio defaults and the repository
+        # environment variables lazily in stalker.db.setup.setup(), useful for
+        # short-lived processes
+        #
+        database_fast_connect=False,
+        #
+        # Compare the persisted instances by their class and primary key
+        # instead of their attribute values, the transient instances are still
+        # compared by their attribute values
+        #
+        identity_equality=False,
+        #
+        # The number of seconds that the reference data (Types, Statuses,
+        # StatusLists, ImageFormats, Structures, FilenameTemplates and
+        # Repositories) is cached for, None means it is cached until it is
+        # changed in this process
+        #
+        reference_cache_ttl=300,
+        #
+        # The number of seconds that the compiled permissions of a user are
+        # cached for, None means they are cached until they are changed in this
+        # process
+        #
+        permission_cache_ttl=60,
         # Storage for uploaded files
         server_side_storage_path=os.path.expanduser("~/Stalker_Storage"),
         repo_env_var_template="REPO{code}",
@@ -279,14 +422,7 @@ class Config(ConfigBase):
 {{studio.to_tjp}}
 
 # resources
-resource resources "Resources" {
-{%- for vacation in studio.vacations %}
-{{vacation.to_tjp}}
-{%- endfor %}
-{%- for user in studio.users %}
-{{user.to_tjp}}
-{%- endfor %}
-}
+{{ resources_buffer }}
 
 # tasks
 {{ tasks_buffer }}
@@ -298,6 +434,13 @@ taskreport breakdown "{{csv_file_name}}"{
     columns id, start, end {%- if compute_resources %}, resources{% endif %}
 }""",
         tj_command="tj3" if sys.platform == "win32" else "/usr/local/bin/tj3",
+        #
+        # Record a ScheduleSnapshot of the computed schedule after each
+        # scheduling run and keep the latest schedule_snapshot_retention
+        # snapshots, None keeps all of them
+        #
+        schedule_snapshots=True,
+        schedule_snapshot_retention=30,
         path_template="{{project.code}}/{%- for parent_task in parent_tasks -%}{{parent_task.nice_name}}/{%- endfor -%}",  # noqa: B950
         filename_template='{{version.nice_name}}_r{{"%02d"|format(version.revision_number)}}_v{{"%03d"|format(version.version_number)}}',  # noqa: B950
         # --------------------------------------------
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""The process level cache of the reference data is situated here.
+
+The reference data (the :class:`.Type`, :class:`.Status`,
+:class:`.StatusList`, :class:`.ImageFormat`, :class:`.Structure`,
+:class:`.FilenameTemplate` and :class:`.Repository` instances) rarely changes
+but is looked up over and over again while validating the other entities. The
+:data:`.reference_cache` loads all the instances of a reference data class with
+a single query and hands them out merged into the current session, without
+issuing any further queries::
+
+    from stalker import Status, StatusList
+    from stalker.db.cache import reference_cache
+
+    wip = reference_cache.find(Status, code="WIP")
+    task_status_list = reference_cache.find(
+        StatusList, target_entity_type="Task"
+    )
+"""
+
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple, Type, TypeVar
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, selectinload
+
+from stalker import defaults
+from stalker.db.session import DBSession
+from stalker.log import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# the names of the reference data classes and the relationships that are
+# loaded together with them
+REFERENCE_CLASSES: Dict[str, Tuple[str, ...]] = {
+    "FilenameTemplate": (),
+    "ImageFormat": (),
+    "Repository": (),
+    "Status": (),
+    "StatusList": ("statuses",),
+    "Structure": ("templates",),
+    "Type": (),
+}
+
+
+class _Snapshot(object):
+    """The cached instances of a reference data class.
+
+    Args:
+        engine (Any): The engine that the instances are loaded from.
+        instances (List[Any]): The detached instances ordered by their ids.
+        expires_at (Optional[float]): The monotonic time that the snapshot
+            expires at, None means it never expires.
+    """
+
+    __slots__ = ("engine", "instances", "by_id", "results", "expires_at")
+
+    def __init__(
+        self, engine: Any, instances: List[Any], expires_at: Optional[float]
+    ) -> None:
+        self.engine = engine
+        self.instances = instances
+        self.by_id = {instance.id: instance for instance in instances}
+        self.results: Dict[Tuple[Any, ...], List[Any]] = {}
+        self.expires_at = expires_at
+
+
+class ReferenceCache(object):
+    """A process level, read-only cache of the reference data.
+
+    All the instances of a reference data class are loaded with a single query
+    on first use and kept detached, together with the related instances listed
+    in :data:`.REFERENCE_CLASSES`. The instances are handed out merged into the
+    current session with ``Session.merge(load=False)``, which doesn't issue any
+    query.
+
+    The cache is cleared when any reference data instance is inserted, updated
+    or deleted, when a transaction is rolled back or when a new database is set
+    up. The cached instances also expire after :confval:`reference_cache_ttl`
+    seconds, so the changes done by other processes are picked up. Use
+    :meth:`.invalidate` to clear the cache manually.
+    """
+
+    def __init__(self) -> None:
+        self._snapshots: Dict[str, _Snapshot] = {}
+        self._listened: Set[Type[Any]] = set()
+
+    def invalidate(self) -> None:
+        """Clear the cache, the instances are loaded again on next use."""
+        self._snapshots = {}
+
+    def get(self, class_: Type[T], id_: int) -> Optional[T]:
+        """Return the instance of the given class with the given id.
+
+        Args:
+            class_ (Type[T]): The reference data class.
+            id_ (int): The id of the instance.
+
+        Raises:
+            TypeError: If the class is not a reference data class.
+
+        Returns:
+            Optional[T]: The instance merged into the current session or None if
+                there is no such instance.
+        """
+        instance = self._snapshot(class_).by_id.get(id_)
+        if instance is None:
+            return None
+        return self._merge(instance)
+
+    def find(self, class_: Type[T], **criteria: Any) -> Optional[T]:
+        """Return the first instance of the given class matching the criteria.
+
+        Args:
+            class_ (Type[T]): The reference data class.
+            criteria (Any): The attribute values to match. A list, tuple, set
+                or frozenset value matches any of its items.
+
+        Raises:
+            TypeError: If the class is not a reference data class.
+
+        Returns:
+            Optional[T]: The instance with the smallest id that matches all the
+                criteria, merged into the current session, or None if there is
+                no such instance.
+        """
+        instances = self._filter(class_, criteria)
+        if not instances:
+            return None
+        return self._merge(instances[0])
+
+    def find_all(self, class_: Type[T], **criteria: Any) -> List[T]:
+        """Return all the instances of the given class matching the criteria.
+
+        Args:
+            class_ (Type[T]): The reference data class.
+            criteria (Any): The attribute values to match. A list, tuple, set
+                or frozenset value matches any of its items.
+
+        Raises:
+            TypeError: If the class is not a reference data class.
+
+        Returns:
+            List[T]: The instances that match all the criteria, ordered by their
+                ids and merged into the current session.
+        """
+        return [self._merge(instance) for instance in self._filter(class_, criteria)]
+
+    def _filter(self, class_: Type[Any], criteria: Dict[str, Any]) -> List[Any]:
+        """Return the cached instances of the given class matching the criteria.
+
+        The results are memoized per snapshot.
+
+        Args:
+            class_ (Type[Any]): The reference data class.
+            criteria (Dict[str, Any]): The attribute values to match.
+
+        Returns:
+            List[Any]: The detached instances.
+        """
+        snapshot = self._snapshot(class_)
+        criteria_items = []
+        for name, value in sorted(criteria.items()):
+            if isinstance(value, (list, tuple, set, frozenset)):
+                value = frozenset(value)
+            criteria_items.append((name, value))
+        key = tuple(criteria_items)
+        try:
+            return snapshot.results[key]
+        except KeyError:
+            pass
+
+        result = []
+        for instance in snapshot.instances:
+            for name, value in criteria_items:
+                attribute_value = getattr(instance, name)
+                if isinstance(value, frozenset):
+                    if attribute_value not in value:
+                        break
+                elif attribute_value != value:
+                    break
+            else:
+                result.append(instance)
+        snapshot.results[key] = result
+        return result
+
+    def _snapshot(self, class_: Type[Any]) -> _Snapshot:
+        """Return the up-to-date snapshot of the given class.
+
+        Args:
+            class_ (Type[Any]): The reference data class.
+
+        Raises:
+            TypeError: If the class is not a reference data class.
+
+        Returns:
+            _Snapshot: The snapshot.
+        """
+        class_name = getattr(class_, "__name__", None)
+        if class_name not in REFERENCE_CLASSES:
+            raise TypeError(
+                "class_ should be one of the reference data classes "
+                f"({', '.join(sorted(REFERENCE_CLASSES))}), "
+                f"not {class_.__class__.__name__}: '{class_}'"
+            )
+
+        engine = DBSession.get_bind()
+        snapshot = self._snapshots.get(class_name)
+        if (
+            snapshot is None
+            or snapshot.engine is not engine
+            or (
+                snapshot.expires_at is not None
+                and snapshot.expires_at < time.monotonic()
+            )
+        ):
+            snapshot = self._load(class_, engine)
+        return snapshot
+
+    def _load(self, class_: Type[Any], engine: Any) -> _Snapshot:
+        """Load all the instances of the given class.
+
+        The instances are loaded with a separate session sharing the
+        connection of the current session, so the flushed but not committed
+        instances are also loaded while the current session is not flushed.
+
+        Args:
+            class_ (Type[Any]): The reference data class.
+            engine (Any): The engine of the current session.
+
+        Returns:
+            _Snapshot: The new snapshot.
+        """
+        logger.debug(f"Loading the {class_.__name__} reference data.")
+        self._listen(class_)
+        query_options = [
+            selectinload(getattr(class_, name))
+            for name in REFERENCE_CLASSES[class_.__name__]
+        ]
+        session = Session(bind=DBSession.connection())
+        try:
+            instances = (
+                session.query(class_).options(*query_options).order_by(class_.id).all()
+            )
+        finally:
+            # closing the session detaches the instances keeping their state
+            session.close()
+
+        ttl = defaults.reference_cache_ttl
+        snapshot = _Snapshot(
+            engine, instances, None if ttl is None else time.monotonic() + ttl
+        )
+        self._snapshots[class_.__name__] = snapshot
+        return snapshot
+
+    def _listen(self, class_: Type[Any]) -> None:
+        """Clear the cache when an instance of the given class changes.
+
+        The cache is cleared as a whole, as the cached instances of the other
+        classes can be holding the changed instance.
+
+        Args:
+            class_ (Type[Any]): The reference data class.
+        """
+        if class_ in self._listened:
+            return
+        for identifier in ["after_insert", "after_update", "after_delete"]:
+            event.listen(class_, identifier, invalidate_reference_cache)
+        self._listened.add(class_)
+
+    @staticmethod
+    def _merge(instance: T) -> T:
+        """Merge the given cached instance into the current session.
+
+        The instance in the session is returned as is if it has unflushed
+        changes.
+
+        Args:
+            instance (T): The detached instance.
+
+        Returns:
+            T: The instance in the current session.
+        """
+        session = DBSession()
+        existing = session.identity_map.get(inspect(instance).key)
+        if existing is not None:
+            state = inspect(existing)
+            if state.modified or not state.expired_attributes:
+                return existing
+        return session.merge(instance, load=False)
+
+
+reference_cache = ReferenceCache()
+
+
+def invalidate_reference_cache(*args: Any, **kwargs: Any) -> None:
+    """Clear the reference data cache.
+
+    It accepts and ignores any arguments, so it can be used as an event listener
+    directly. Call it manually if the reference data is changed by another
+    process and the changes are needed before the cached data expires.
+
+    Args:
+        args (Any): Ignored.
+        kwargs (Any): Ignored.
+    """
+    reference_cache.invalidate()
+
+
+# the cache can contain the instances inserted in a rolled back transaction
+event.listen(Session, "after_soft_rollback", invalidate_reference_cache)
@@ -3,7 +3,8 @@
 import logging
 from typing import Any, Type
 
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import event
+from sqlalchemy.orm import Mapper, declarative_base
 
 from stalker.db.session import DBSession
 from stalker.log import get_logger
@@ -28,3 +29,16 @@ class ORMClass(object):
 
 
 Base: Type[Any] = declarative_base(cls=ORMClass)
+
+
+@event.listens_for(Mapper, "before_configured")
+def import_all_models() -> None:
+    """Import all the Stalker classes before the mappers are configured.
+
+    In lazy import mode only the accessed classes are imported, but the mappers
+    can only be configured when all the related classes are present.
+    """
+    import stalker
+
+    for name in stalker.__all__:
+        getattr(stalker, name)
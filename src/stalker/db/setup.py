@@ -4,12 +4,15 @@
 Whenever stalker.db or something under it imported, the :func:`stalker.db.setup` becomes
 available to let one set up the database.
 """
+import json
 import logging
 import os
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
-from sqlalchemy import Column, Table, Text, engine_from_config, text
+from sqlalchemy import Column, Table, Text, engine_from_config, event, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+from sqlalchemy.pool import QueuePool
 
 from stalker import (
     DateRangeMixin,
@@ -29,43 +32,110 @@ from stalker import (
     defaults,
     log,
 )
-from stalker.db.declarative import Base
+from stalker.db.cache import invalidate_reference_cache
+from stalker.db.declarative import Base, import_all_models
 from stalker.db.session import DBSession
+from stalker.models.auth import invalidate_permissions
+from stalker.models.repository import defer_repo_vars, invalidate_repository_index
+from stalker.models.ticket import invalidate_ticket_workflow
 
 
 logger: logging.Logger = log.get_logger(__name__)
 
 # TODO: Try to get it from the API (it was not working inside a package before)
-alembic_version: str = "9f9b88fef376"
-
-
-def setup(settings: Optional[Dict[str, Any]] = None) -> None:
+alembic_version: str = "c3f8a1d5e7b9"
+
+# the config values that are updated by the Studio.update_defaults()
+STUDIO_DEFAULTS: List[str] = [
+    "daily_working_hours",
+    "weekly_working_days",
+    "weekly_working_hours",
+    "yearly_working_days",
+    "timing_resolution",
+]
+
+# engine settings that are only accepted by the QueuePool
+QUEUE_POOL_SETTINGS: List[str] = [
+    "pool_size",
+    "max_overflow",
+    "pool_timeout",
+    "pool_use_lifo",
+]
+
+# engine settings that are only accepted by the psycopg2 dialect
+PSYCOPG2_SETTINGS: List[str] = [
+    "executemany_mode",
+    "executemany_values_page_size",
+    "executemany_batch_page_size",
+]
+
+
+def setup(
+    settings: Optional[Dict[str, Any]] = None,
+    profile: Optional[str] = None,
+    fast_connect: Optional[bool] = None,
+) -> None:
     """Connect the system to the given database.
 
     If the database is None then it sets up using the default database in the
     settings file.
 
+    In fast connect mode the tables are not created, the alembic version check
+    is memoized per database url in a local cache file and the Studio defaults
+    and the repository environment variables are loaded on first use. Use it
+    for short-lived processes that connect to an already initialized database.
+
     Args:
         settings (Dict[str, Any]): This is a dictionary which has keys prefixed
             with "sqlalchemy" and shows the settings. The most important one is
             the engine. The default is None, and in this case it uses the
             settings from stalker.config.Config.database_engine_settings
+        profile (str): The name of the engine profile to tune the engine with.
+            It should be one of the keys of the
+            stalker.config.Config.database_engine_profiles. The default is None,
+            and in this case it uses the
+            stalker.config.Config.database_engine_profile.
+        fast_connect (bool): Skip the DDL and load the defaults lazily. The
+            default is None, and in this case it uses the
+            stalker.config.Config.database_fast_connect.
     """
-    if settings is None:
-        settings = defaults.database_engine_settings
-        logger.debug("no settings given, using the default setting")
+    if profile is None:
+        profile = defaults.database_engine_profile
 
-    # logger.debug(f"settings: {settings}")
-    # create engine
+    if fast_connect is None:
+        fast_connect = defaults.database_fast_connect
 
+    settings = get_engine_settings(settings, profile)
+
+    # all the tables should be present in the metadata, which is not the case in
+    # lazy import mode
+    import_all_models()
+
+    # create engine
     logger.debug(f"settings: {settings}")
     engine = engine_from_config(settings, "sqlalchemy.")
+    setup_connection_hooks(engine, profile)
 
     logger.debug(f"engine: {engine}")
 
     # create the Session class
     DBSession.remove()
     DBSession.configure(bind=engine)
+    invalidate_repository_index()
+    invalidate_reference_cache()
+    invalidate_permissions()
+    invalidate_ticket_workflow()
+
+    if fast_connect:
+        logger.debug("fast connect, skipping the DDL")
+        check_alembic_version_cached(engine)
+        defaults.register_lazy_loader(STUDIO_DEFAULTS, update_defaults_with_studio)
+        defer_repo_vars(create_repo_vars)
+        return
+
+    # cancel the lazy loaders of any previous fast connect
+    defaults.remove_lazy_loader(update_defaults_with_studio)
+    defer_repo_vars(None)
 
     # check alembic versions of the database
     # and raise an error if it is not matching with the system
@@ -84,6 +154,105 @@ def setup(settings: Optional[Dict[str, Any]] = None) -> None:
     create_repo_vars()
 
 
+def get_engine_settings(
+    settings: Optional[Dict[str, Any]] = None, profile: Optional[str] = None
+) -> Dict[str, Any]:
+    """Return the engine settings with the given engine profile applied.
+
+    The profile settings are merged on top of the given settings. The profile
+    settings that are not supported by the pool class or the dialect of the
+    engine (i.e. ``pool_size`` for the SQLite3 in-memory databases or
+    ``executemany_mode`` for anything other than psycopg2) are skipped.
+
+    Args:
+        settings (Dict[str, Any]): The engine settings. The default is None, and
+            in this case it uses the
+            stalker.config.Config.database_engine_settings.
+        profile (str): The name of the engine profile. The default is None which
+            returns the settings untouched.
+
+    Raises:
+        ValueError: If the profile is not one of the
+            stalker.config.Config.database_engine_profiles.
+
+    Returns:
+        Dict[str, Any]: The engine settings.
+    """
+    if settings is None:
+        settings = defaults.database_engine_settings
+        logger.debug("no settings given, using the default setting")
+
+    if not profile:
+        return settings
+
+    if profile not in defaults.database_engine_profiles:
+        raise ValueError(
+            "profile should be one of {}, not '{}'".format(
+                sorted(defaults.database_engine_profiles), profile
+            )
+        )
+
+    logger.debug(f"applying engine profile: {profile}")
+    url = make_url(settings["sqlalchemy.url"])
+    pool_class = settings.get("sqlalchemy.poolclass")
+    if pool_class is None:
+        pool_class = url.get_dialect().get_pool_class(url)
+
+    settings = dict(settings)
+    for key, value in defaults.database_engine_profiles[profile].items():
+        if not key.startswith("sqlalchemy."):
+            continue
+        name = key[len("sqlalchemy.") :]
+        if name in QUEUE_POOL_SETTINGS and not (
+            isinstance(pool_class, type) and issubclass(pool_class, QueuePool)
+        ):
+            logger.debug(f"{pool_class} doesn't support {name}, skipping")
+            continue
+        if name in PSYCOPG2_SETTINGS and url.get_driver_name() != "psycopg2":
+            logger.debug(f"{url.drivername} doesn't support {name}, skipping")
+            continue
+        settings[key] = value
+
+    return settings
+
+
+def setup_connection_hooks(engine: Engine, profile: Optional[str] = None) -> None:
+    """Set up the per connection hooks of the given engine profile.
+
+    The ``sqlite_pragmas`` of the profile are executed on every new SQLite3
+    connection and every callable in the ``connect_hooks`` of the profile is
+    called with the DBAPI connection and the connection record, on every new
+    connection.
+
+    Args:
+        engine (Engine): The engine to set the hooks up for.
+        profile (str): The name of the engine profile. The default is None which
+            doesn't set any hooks.
+    """
+    if not profile:
+        return
+
+    profile_settings = defaults.database_engine_profiles[profile]
+    hooks: List[Callable[[Any, Any], None]] = []
+
+    sqlite_pragmas = profile_settings.get("sqlite_pragmas")
+    if sqlite_pragmas and engine.dialect.name == "sqlite":
+
+        def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            for name, value in sqlite_pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+        hooks.append(set_sqlite_pragmas)
+
+    hooks.extend(profile_settings.get("connect_hooks", []))
+
+    for hook in hooks:
+        logger.debug(f"adding connection hook: {hook}")
+        event.listen(engine, "connect", hook)
+
+
 def update_defaults_with_studio() -> None:
     """Update the default values from Studio instance.
 
@@ -223,12 +392,15 @@ def get_alembic_version() -> Union[None, str]:
         return None
 
 
-def check_alembic_version() -> None:
+def check_alembic_version() -> Union[None, str]:
     """Check the alembic version of the database.
 
     Raises:
         ValueError: If the alembic version is not matching with current version of
             Stalker.
+
+    Returns:
+        str: The alembic version of the database.
     """
     current_alembic_version = get_alembic_version()
     logger.debug(f"current_alembic_version: {current_alembic_version}")
@@ -238,6 +410,56 @@ def check_alembic_version() -> None:
 
         # and raise a ValueError (which I'm not sure is the correct exception)
         raise ValueError(f"Please update the database to version: {alembic_version}")
+    return current_alembic_version
+
+
+def alembic_version_cache_file_full_path() -> str:
+    """Return the alembic version cache file full path.
+
+    Returns:
+        str: The alembic version cache file full path.
+    """
+    return os.path.normpath(
+        os.path.join(
+            defaults.local_storage_path, defaults.alembic_version_cache_file_name
+        )
+    )
+
+
+def check_alembic_version_cached(engine: Engine) -> None:
+    """Check the alembic version of the database only once per database url.
+
+    The database urls that have the correct alembic version are stored in a
+    local cache file, so the following calls don't need to query the database.
+
+    Args:
+        engine (Engine): The engine of the database to check.
+    """
+    url = engine.url.render_as_string(hide_password=True)
+    cache_file_full_path = alembic_version_cache_file_full_path()
+
+    cache: Dict[str, str] = {}
+    try:
+        with open(cache_file_full_path, "r") as f:
+            cache = json.load(f)
+    except (IOError, ValueError):
+        pass
+
+    if cache.get(url) == alembic_version:
+        logger.debug(f"alembic version of {url} is cached, skipping the check")
+        return
+
+    if check_alembic_version() != alembic_version:
+        # do not cache databases without an alembic_version table
+        return
+
+    cache[url] = alembic_version
+    try:
+        os.makedirs(os.path.dirname(cache_file_full_path), exist_ok=True)
+        with open(cache_file_full_path, "w") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        logger.debug(f"couldn't write the alembic version cache: {e}")
 
 
 def create_alembic_table() -> None:
@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""Loader presets for the frequently used relationships are situated here.
+
+None of the relationships in Stalker declares an eager loading strategy, so
+walking a task hierarchy or rendering a list of time logs or reviews loads the
+related data one row-set at a time. The presets in this module return bundles
+of loader options that load those relationships up front::
+
+    from stalker import Task, loaders
+
+    tasks = Task.query.filter(Task.project == project).options(
+        *loaders.task_tree()
+    ).all()
+
+And :func:`load_task_tree` loads the whole task hierarchy of a project, with
+the statuses, resources and dependencies of the tasks, in a fixed number of
+queries no matter how deep the hierarchy is.
+"""
+
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from sqlalchemy.orm import joinedload, selectinload, with_polymorphic
+from sqlalchemy.orm.attributes import set_committed_value
+
+from stalker.db.session import DBSession
+from stalker.models.review import Review
+from stalker.models.status import StatusList
+from stalker.models.task import Task, TaskDependency, TimeLog
+from stalker.models.version import Version
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.orm.strategy_options import _AbstractLoad
+    from stalker.models.project import Project
+
+# the default depth of the children that the task_tree preset loads
+TASK_TREE_DEPTH = 5
+
+
+def _task_options(path: Optional["_AbstractLoad"] = None) -> List["_AbstractLoad"]:
+    """Return the loader options of the relationships of a single Task.
+
+    Args:
+        path (Optional[_AbstractLoad]): The loader option leading to the tasks.
+            The options are applied to the queried tasks if skipped.
+
+    Returns:
+        List[_AbstractLoad]: The loader options.
+    """
+    if path is None:
+        return [
+            joinedload(Task.status),
+            selectinload(Task.status_list).selectinload(StatusList.statuses),
+            selectinload(Task.resources),
+            selectinload(Task.task_depends_on).selectinload(TaskDependency.depends_on),
+        ]
+    return [
+        path.joinedload(Task.status),
+        path.selectinload(Task.status_list).selectinload(StatusList.statuses),
+        path.selectinload(Task.resources),
+        path.selectinload(Task.task_depends_on).selectinload(TaskDependency.depends_on),
+    ]
+
+
+def task_tree(depth: int = TASK_TREE_DEPTH) -> List["_AbstractLoad"]:
+    """Return the loader options to load Tasks along with their children.
+
+    The status, the status list with its statuses, the resources and the
+    dependencies of the queried tasks and their children are loaded with them.
+    Use :func:`.load_task_tree` to load the whole hierarchy of a project,
+    regardless of its depth.
+
+    Args:
+        depth (int): The number of the levels of the children to load. Use 0
+            to only load the relationships of the queried tasks. The default
+            value is :attr:`.TASK_TREE_DEPTH`.
+
+    Raises:
+        TypeError: If the depth is not an int.
+        ValueError: If the depth is a negative number.
+
+    Returns:
+        List[_AbstractLoad]: The loader options to be passed to
+            ``Query.options()`` or ``Select.options()`` of Task queries.
+    """
+    if not isinstance(depth, int) or isinstance(depth, bool):
+        raise TypeError(
+            "depth should be an int, " f"not {depth.__class__.__name__}: '{depth}'"
+        )
+    if depth < 0:
+        raise ValueError(f"depth should be a non-negative number, not {depth}")
+
+    options = _task_options()
+    path = None
+    for _ in range(depth):
+        path = (
+            selectinload(Task.children)
+            if path is None
+            else path.selectinload(Task.children)
+        )
+        options.extend(_task_options(path))
+    return options
+
+
+def timesheet() -> List["_AbstractLoad"]:
+    """Return the loader options to load TimeLogs along with their tasks.
+
+    The task with its status and the resource of the queried time logs are
+    loaded with them.
+
+    Returns:
+        List[_AbstractLoad]: The loader options to be passed to
+            ``Query.options()`` or ``Select.options()`` of TimeLog queries.
+    """
+    return [
+        joinedload(TimeLog.task).joinedload(Task.status),
+        joinedload(TimeLog.resource),
+    ]
+
+
+def review_page() -> List["_AbstractLoad"]:
+    """Return the loader options to load Reviews along with their details.
+
+    The status, the task, the reviewer and the version with its files of the
+    queried reviews are loaded with them.
+
+    Returns:
+        List[_AbstractLoad]: The loader options to be passed to
+            ``Query.options()`` or ``Select.options()`` of Review queries.
+    """
+    return [
+        joinedload(Review.status),
+        joinedload(Review.task).joinedload(Task.status),
+        joinedload(Review.reviewer),
+        joinedload(Review.version).selectinload(Version.files),
+    ]
+
+
+def load_task_tree(project: "Project") -> List[Task]:
+    """Load the whole task hierarchy of the given project.
+
+    All the tasks of the project are loaded with a single query, together with
+    the columns of their derived classes (Asset, Shot etc.). Their statuses,
+    status lists, resources and dependencies are loaded with one query each.
+    The parent, children and the dependencies of the tasks are then filled in
+    from the loaded tasks, so walking the returned hierarchy doesn't issue any
+    further queries.
+
+    Args:
+        project (Project): The project to load the tasks of.
+
+    Raises:
+        TypeError: If the project is not a Project instance.
+
+    Returns:
+        List[Task]: The root tasks of the project, ordered by their ids.
+    """
+    from stalker.models.project import Project
+
+    if not isinstance(project, Project):
+        raise TypeError(
+            "project should be a stalker.models.project.Project instance, "
+            f"not {project.__class__.__name__}: '{project}'"
+        )
+
+    polymorphic_task = with_polymorphic(Task, "*")
+    tasks = (
+        DBSession.query(polymorphic_task)
+        .filter(polymorphic_task.project_id == project.id)
+        .options(
+            joinedload(polymorphic_task.status),
+            selectinload(polymorphic_task.status_list).selectinload(
+                StatusList.statuses
+            ),
+            selectinload(polymorphic_task.resources),
+            selectinload(polymorphic_task.task_depends_on),
+            selectinload(polymorphic_task.task_dependent_of),
+        )
+        .order_by(polymorphic_task.id)
+        .all()
+    )
+    tasks_by_id: Dict[int, Task] = {task.id: task for task in tasks}
+
+    # dependencies may cross project boundaries, load the other tasks at once
+    missing_ids = (
+        {
+            task.parent_id
+            for task in tasks
+            if task.parent_id is not None and task.parent_id not in tasks_by_id
+        }
+        | {
+            dependency.depends_on_id
+            for task in tasks
+            for dependency in task.task_depends_on
+            if dependency.depends_on_id not in tasks_by_id
+        }
+        | {
+            dependency.task_id
+            for task in tasks
+            for dependency in task.task_dependent_of
+            if dependency.task_id not in tasks_by_id
+        }
+    )
+    if missing_ids:
+        other_tasks = with_polymorphic(Task, "*")
+        tasks_by_id.update(
+            (task.id, task)
+            for task in DBSession.query(other_tasks).filter(
+                other_tasks.id.in_(missing_ids)
+            )
+        )
+
+    children: Dict[int, List[Task]] = {task.id: [] for task in tasks}
+    root_tasks = []
+    for task in tasks:
+        set_committed_value(task, "_project", project)
+        if task.parent_id is None:
+            set_committed_value(task, "parent", None)
+            root_tasks.append(task)
+        else:
+            set_committed_value(task, "parent", tasks_by_id[task.parent_id])
+            if task.parent_id in children:
+                children[task.parent_id].append(task)
+        for dependency in task.task_depends_on:
+            set_committed_value(dependency, "task", task)
+            set_committed_value(
+                dependency, "depends_on", tasks_by_id[dependency.depends_on_id]
+            )
+        for dependency in task.task_dependent_of:
+            set_committed_value(dependency, "depends_on", task)
+            set_committed_value(dependency, "task", tasks_by_id[dependency.task_id])
+
+    for task in tasks:
+        set_committed_value(task, "children", children[task.id])
+
+    return root_tasks
@@ -4,18 +4,25 @@ import base64
 import copy
 import json
 import os
-import re
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, TYPE_CHECKING, Union
+from typing import Any, Dict, List, Optional, TYPE_CHECKING, Tuple, Union
 
 import pytz
 
-from sqlalchemy import Column, Enum, ForeignKey, Integer, String, Table
+from sqlalchemy import Column, Enum, ForeignKey, Integer, String, Table, event, inspect
 from sqlalchemy.ext.associationproxy import association_proxy
-from sqlalchemy.orm import Mapped, mapped_column, relationship, synonym, validates
+from sqlalchemy.orm import (
+    Mapped,
+    Session,
+    mapped_column,
+    relationship,
+    synonym,
+    validates,
+)
 from sqlalchemy.schema import UniqueConstraint
 
-from stalker import defaults, log
+from stalker import defaults, log, normalizer
 from stalker.db.declarative import Base
 from stalker.db.types import GenericDateTime
 from stalker.models.entity import Entity, SimpleEntity
@@ -745,22 +752,7 @@ class User(Entity, ACLMixin):
         Returns:
             str: The formatted login value.
         """
-        # strip white spaces from start and end
-        login = login.strip()
-
-        # remove all the spaces
-        login = login.replace(" ", "")
-
-        # make it lowercase
-        login = login.lower()
-
-        # remove any illegal characters
-        login = re.sub("[^\\(a-zA-Z0-9)]+", "", login)
-
-        # remove any number at the beginning
-        login = re.sub("^[0-9]+", "", login)
-
-        return login
+        return normalizer.format_login(login)
 
     @validates("password")
     def _validate_password(self, key: str, password: str) -> str:
@@ -1016,6 +1008,20 @@ class User(Entity, ACLMixin):
             .all()
         )
 
+    @property
+    def open_ticket_count(self) -> int:
+        """Return the number of open :class:`.Ticket` s that this user has.
+
+        The Tickets are counted without loading them.
+
+        Returns:
+            int: The number of the Tickets which are not closed and this user is
+                assigned as the owner.
+        """
+        from stalker import Ticket
+
+        return Ticket.count_tickets(open_only=True, owner=self)
+
     @property
     def to_tjp(self) -> str:
         """Return a TaskJuggler compatible str representation of this User instance.
@@ -1023,15 +1029,9 @@ class User(Entity, ACLMixin):
         Returns:
             str: The TaskJuggler compatible representation of this User instance.
         """
-        tab = "    "
-        indent = tab
-        tjp = f'resource {self.tjp_id} "{self.tjp_id}" {{'
-        tjp += f"\n{indent}efficiency {self.efficiency}"
-        for vacation in self.vacations:
-            tjp += "\n"
-            tjp += "\n".join(f"{indent}{line}" for line in vacation.to_tjp.split("\n"))
-        tjp += "\n}"
-        return tjp
+        from stalker.tjp import UserEmitter
+
+        return UserEmitter(self).render()
 
 
 class LocalSession(object):
@@ -1331,3 +1331,210 @@ class AuthenticationLog(SimpleEntity):
             )
 
         return date
+
+
+class PermissionEngine(object):
+    """Evaluates the permissions of the users with precompiled bitsets.
+
+    The effective permissions of a user, which are the :class:`.Permission` s of
+    the user and all the :class:`.Group` s of the user, are compiled into a
+    single integer per class name, where each bit shows if an action is allowed
+    or not. The bits are ordered as the actions in :confval:`actions`. A
+    ``Deny`` permission for an action always takes precedence over an ``Allow``
+    permission of the same action, no matter if they are coming from the user or
+    any of the groups.
+
+    The compiled permissions are cached per user, so :meth:`.can` is a couple of
+    dictionary lookups after the first call. The cache of a user is cleared when
+    the groups or the permissions of the user are changed, the whole cache is
+    cleared when the permissions of a group are changed, a Permission, User or
+    Group is deleted, a transaction is rolled back or a new database is set up.
+    The compiled permissions also expire after :confval:`permission_cache_ttl`
+    seconds, so the changes done by the other processes are picked up. Use
+    :meth:`.invalidate` to clear the cache manually.
+    """
+
+    def __init__(self) -> None:
+        self._compiled: Dict[int, Tuple[Dict[str, int], Optional[float]]] = {}
+        self._actions: Tuple[str, ...] = ()
+        self._action_bits: Dict[str, int] = {}
+
+    @property
+    def action_bits(self) -> Dict[str, int]:
+        """Return the bits of the actions.
+
+        Returns:
+            Dict[str, int]: The bit of each action in :confval:`actions`.
+        """
+        actions = tuple(defaults.actions)
+        if actions != self._actions:
+            self._action_bits = {action: 1 << i for i, action in enumerate(actions)}
+            self._actions = actions
+            self._compiled = {}
+        return self._action_bits
+
+    def invalidate(self, user: Optional["User"] = None) -> None:
+        """Clear the compiled permissions of the given user or all the users.
+
+        Args:
+            user (Optional[User]): The user to clear the compiled permissions of.
+                The compiled permissions of all the users are cleared if skipped.
+        """
+        if user is None:
+            self._compiled = {}
+            return
+        user_id = self._user_id(user)
+        if user_id is not None:
+            self._compiled.pop(user_id, None)
+
+    def compile(self, user: "User") -> Dict[str, int]:
+        """Return the compiled effective permissions of the given user.
+
+        Args:
+            user (User): The user.
+
+        Raises:
+            TypeError: If the user is not a User instance.
+
+        Returns:
+            Dict[str, int]: The allowed action bits per class name. The classes
+                without any allowed actions are not included.
+        """
+        if not isinstance(user, User):
+            raise TypeError(
+                "user should be a stalker.models.auth.User instance, "
+                f"not {user.__class__.__name__}: '{user}'"
+            )
+
+        action_bits = self.action_bits
+        user_id = self._user_id(user)
+        cached = self._compiled.get(user_id)
+        if cached is not None:
+            compiled, expires_at = cached
+            if expires_at is None or time.monotonic() <= expires_at:
+                return compiled
+
+        allowed: Dict[str, int] = {}
+        denied: Dict[str, int] = {}
+        for holder in [user] + list(user.groups):
+            for permission in holder.permissions:
+                bit = action_bits.get(permission.action)
+                if bit is None:
+                    continue
+                bits = allowed if permission.access == "Allow" else denied
+                bits[permission.class_name] = bits.get(permission.class_name, 0) | bit
+
+        compiled = {}
+        for class_name, bits in allowed.items():
+            bits &= ~denied.get(class_name, 0)
+            if bits:
+                compiled[class_name] = bits
+
+        if user_id is not None:
+            ttl = defaults.permission_cache_ttl
+            self._compiled[user_id] = (
+                compiled,
+                None if ttl is None else time.monotonic() + ttl,
+            )
+        return compiled
+
+    def can(self, user: "User", action: str, class_name: str) -> bool:
+        """Check if the given user is allowed to do the action on the class.
+
+        Args:
+            user (User): The user.
+            action (str): One of the actions in :confval:`actions`.
+            class_name (str): The name of the class.
+
+        Raises:
+            ValueError: If the action is not one of the actions in
+                :confval:`actions`.
+
+        Returns:
+            bool: True if the action is allowed, False otherwise.
+        """
+        bit = self.action_bits.get(action)
+        if bit is None:
+            raise ValueError(
+                f"action should be one of the values of {defaults.actions} "
+                f"not '{action}'"
+            )
+        return bool(self.compile(user).get(class_name, 0) & bit)
+
+    @staticmethod
+    def _user_id(user: "User") -> Optional[int]:
+        """Return the id of the given user without loading an expired instance.
+
+        Args:
+            user (User): The user.
+
+        Returns:
+            Optional[int]: The id of the user or None if it is not persisted yet.
+        """
+        identity = inspect(user).identity
+        return None if identity is None else identity[0]
+
+
+permission_engine = PermissionEngine()
+
+
+def can(user: "User", action: str, class_name: str) -> bool:
+    """Check if the given user is allowed to do the action on the class.
+
+    See :class:`.PermissionEngine` for details.
+
+    Args:
+        user (User): The user.
+        action (str): One of the actions in :confval:`actions`.
+        class_name (str): The name of the class.
+
+    Returns:
+        bool: True if the action is allowed, False otherwise.
+    """
+    return permission_engine.can(user, action, class_name)
+
+
+def invalidate_permissions(*args: Any, **kwargs: Any) -> None:
+    """Clear the compiled permissions of all the users.
+
+    It accepts and ignores any arguments, so it can be used as an event listener
+    directly.
+
+    Args:
+        args (Any): Ignored.
+        kwargs (Any): Ignored.
+    """
+    permission_engine.invalidate()
+
+
+def _invalidate_user_permissions(user: "User", *args: Any) -> None:
+    """Clear the compiled permissions of the user whose groups are changed.
+
+    Args:
+        user (User): The user.
+        args (Any): Ignored.
+    """
+    permission_engine.invalidate(user)
+
+
+def _invalidate_group_user_permissions(
+    group: "Group", user: "User", *args: Any
+) -> None:
+    """Clear the compiled permissions of the user added to or removed from a group.
+
+    Args:
+        group (Group): The group.
+        user (User): The user.
+        args (Any): Ignored.
+    """
+    permission_engine.invalidate(user)
+
+
+for identifier in ["append", "remove"]:
+    event.listen(User.groups, identifier, _invalidate_user_permissions)
+    event.listen(User.permissions, identifier, _invalidate_user_permissions)
+    event.listen(Group.users, identifier, _invalidate_group_user_permissions)
+    event.listen(Group.permissions, identifier, invalidate_permissions)
+for class_ in [Permission, User, Group]:
+    event.listen(class_, "after_delete", invalidate_permissions)
+event.listen(Session, "after_soft_rollback", invalidate_permissions)
@@ -2,16 +2,17 @@
 """SimpleEntity, Entity, EntityGroup and other related functions are situated here."""
 
 import functools
-import re
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional, TYPE_CHECKING, Union
+from typing import Any, Callable, Dict, List, Optional, TYPE_CHECKING, Union
 
 import pytz
 
 from sqlalchemy import Column, ForeignKey, Integer, String, Table, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy.orm.attributes import instance_state
 
+from stalker import normalizer
 from stalker.db.declarative import Base
 from stalker.db.types import GenericDateTime
 from stalker.log import get_logger
@@ -26,6 +27,38 @@ if TYPE_CHECKING:  # pragma: no cover
     from stalker.models.type import Type
 
 
+def identity_equality(eq: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    """Compare the persisted instances by identity if it is enabled.
+
+    If the ``identity_equality`` config value is True and both of the compared
+    instances are persisted, they are equal if they have the same class and the
+    same primary key, without calling the decorated ``__eq__`` method. A persisted
+    instance is never equal to a transient or pending one. The transient and
+    pending instances are compared with the decorated ``__eq__`` method.
+
+    Args:
+        eq (Callable[[Any, Any], bool]): The ``__eq__`` method to decorate.
+
+    Returns:
+        Callable[[Any, Any], bool]: The decorated ``__eq__`` method.
+    """
+
+    @functools.wraps(eq)
+    def __eq__(self: Any, other: Any) -> bool:
+        from stalker import defaults
+
+        if defaults.identity_equality and isinstance(other, SimpleEntity):
+            self_key = instance_state(self).key
+            other_key = instance_state(other).key
+            if self_key is not None and other_key is not None:
+                return self.__class__ is other.__class__ and self_key[1] == other_key[1]
+            if self_key is not None or other_key is not None:
+                return False
+        return eq(self, other)
+
+    return __eq__
+
+
 class SimpleEntity(Base):
     """The base class of all the others.
 
@@ -112,7 +145,7 @@ class SimpleEntity(Base):
     __tablename__ = "SimpleEntities"
     id: Mapped[int] = mapped_column(primary_key=True)
 
-    entity_type: Mapped[str] = mapped_column(String(128), nullable=False)
+    entity_type: Mapped[str] = mapped_column(String(128), nullable=False, index=True)
     __mapper_args__ = {
         "polymorphic_on": entity_type,
         "polymorphic_identity": "SimpleEntity",
@@ -268,6 +301,17 @@ class SimpleEntity(Base):
         """
         return f"<{self.name} ({self.entity_type})>"
 
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """Decorate the ``__eq__`` methods of the subclasses.
+
+        Args:
+            kwargs (Any): The keyword arguments passed to the super.
+        """
+        super().__init_subclass__(**kwargs)
+        if "__eq__" in cls.__dict__:
+            cls.__eq__ = identity_equality(cls.__dict__["__eq__"])
+
+    @identity_equality
     def __eq__(self, other: Any) -> bool:
         """Check equality.
 
@@ -413,13 +457,7 @@ class SimpleEntity(Base):
         Returns:
             str: The formatted name value.
         """
-        # remove unnecessary characters from the string
-        name = name.strip()
-
-        # remove multiple spaces
-        name = re.sub(r"\s+", " ", name)
-
-        return name
+        return normalizer.format_name(name)
 
     @classmethod
     def _format_nice_name(cls, nice_name: str) -> str:
@@ -431,27 +469,7 @@ class SimpleEntity(Base):
         Returns:
             str: The formatted nice name.
         """
-        # remove unnecessary characters from the string
-        nice_name = nice_name.strip()
-        nice_name = re.sub(r"([^a-zA-Z0-9\s_\-@]+)", "", nice_name).strip()
-
-        # remove all the characters which are not alphabetic from the start of
-        # the string
-        nice_name = re.sub(r"(^[^a-zA-Z0-9]+)", "", nice_name)
-
-        # remove multiple spaces
-        nice_name = re.sub(r"\s+", " ", nice_name)
-
-        # # replace camel case letters
-        # nice_name = re.sub(r"(.+?[a-z]+)([A-Z])", r"\1_\2", nice_name)
-
-        # replace white spaces and dashes with underscore
-        nice_name = re.sub("([ -])+", r"_", nice_name)
-
-        # remove multiple underscores
-        nice_name = re.sub(r"(_+)", r"_", nice_name)
-
-        return nice_name
+        return normalizer.format_nice_name(nice_name)
 
     @property
     def nice_name(self) -> str:
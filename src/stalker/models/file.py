@@ -11,6 +11,7 @@ from stalker.log import get_logger
 from stalker.models.entity import Entity
 from stalker.models.enum import TraversalDirection
 from stalker.models.mixins import ReferenceMixin
+from stalker.models.repository import expandvars
 from stalker.utils import walk_hierarchy
 
 
@@ -305,7 +306,7 @@ class File(Entity, ReferenceMixin):
         Returns:
             str: The absolute full path of the file.
         """
-        return os.path.normpath(os.path.expandvars(self.full_path))
+        return os.path.normpath(expandvars(self.full_path))
 
     @property
     def absolute_path(self) -> str:
@@ -5,6 +5,7 @@ import datetime
 from typing import (
     Any,
     Dict,
+    FrozenSet,
     Generator,
     List,
     Optional,
@@ -38,6 +39,7 @@ from sqlalchemy.orm import (
 )
 
 from stalker import defaults
+from stalker.db.cache import reference_cache
 from stalker.db.declarative import Base
 from stalker.db.session import DBSession
 from stalker.db.types import GenericDateTime
@@ -302,6 +304,26 @@ class TargetEntityTypeMixin(object):
         )
 
 
+# the names of the classes in the MRO of the StatusMixin classes by class
+_status_mixin_mro_names: Dict[type, FrozenSet[str]] = {}
+
+# the ids of the default StatusLists of the StatusMixin classes by class
+_default_status_list_ids: Dict[type, int] = {}
+
+
+def invalidate_default_status_lists(*args: Any, **kwargs: Any) -> None:
+    """Clear the cached default StatusList ids of the StatusMixin classes.
+
+    It accepts and ignores any arguments, so it can be used as an event listener
+    directly.
+
+    Args:
+        args (Any): Ignored.
+        kwargs (Any): Ignored.
+    """
+    _default_status_list_ids.clear()
+
+
 class StatusMixin(object):
     """Makes the mixed in object statusable.
 
@@ -413,6 +435,54 @@ class StatusMixin(object):
             primaryjoin=f"{cls.__name__}.status_list_id==StatusList.status_list_id",
         )
 
+    @classmethod
+    def _mro_names(cls) -> FrozenSet[str]:
+        """Return the names of the classes in the MRO of this class.
+
+        The names are computed once per class.
+
+        Returns:
+            FrozenSet[str]: The class names.
+        """
+        try:
+            return _status_mixin_mro_names[cls]
+        except KeyError:
+            names = frozenset(mro.__name__ for mro in cls.__mro__)
+            _status_mixin_mro_names[cls] = names
+            return names
+
+    @classmethod
+    def _default_status_list(cls) -> Optional["StatusList"]:
+        """Return the default StatusList of this class from the database.
+
+        The default StatusList is the first StatusList with its target_entity_type
+        is set to the name of this class or any of its super classes. Its id is
+        cached per class, the cache is cleared when a StatusList is inserted or
+        deleted, when the target_entity_type of a StatusList is changed or when a
+        transaction is rolled back.
+
+        Returns:
+            Optional[StatusList]: The StatusList instance merged into the current
+                session or None if there is no suitable StatusList.
+        """
+        from stalker.models.status import StatusList
+
+        super_names = cls._mro_names()
+        status_list_id = _default_status_list_ids.get(cls)
+        if status_list_id is not None:
+            status_list = reference_cache.get(StatusList, status_list_id)
+            # the cached id can be from another database
+            if (
+                status_list is not None
+                and status_list.target_entity_type in super_names
+            ):
+                return status_list
+
+        status_list = reference_cache.find(StatusList, target_entity_type=super_names)
+        if status_list is not None:
+            _default_status_list_ids[cls] = status_list.id
+        return status_list
+
     @validates("status_list")
     def _validate_status_list(
         self, key: str, status_list: Union[None, "StatusList"]
@@ -432,7 +502,7 @@ class StatusMixin(object):
         """
         from stalker.models.status import StatusList
 
-        super_names = [mro.__name__ for mro in self.__class__.__mro__]
+        super_names = self._mro_names()
 
         if status_list is None:
             # check if there is a db setup and try to get the appropriate
@@ -441,11 +511,7 @@ class StatusMixin(object):
             # disable autoflush to prevent premature class initialization
             with DBSession.no_autoflush:
                 try:
-                    # try to get a StatusList with the target_entity_type is
-                    # matching the class name
-                    status_list = StatusList.query.filter(
-                        StatusList.target_entity_type.in_(super_names)
-                    ).first()
+                    status_list = self._default_status_list()
                 except (UnboundExecutionError, OperationalError):
                     # it is not mapped just skip it
                     pass
@@ -1840,7 +1906,10 @@ class DAGMixin(object):
             Column: The Column related to the parent_id attribute.
         """
         return mapped_column(
-            "parent_id", Integer, ForeignKey(f"{cls.__tablename__}.id")
+            "parent_id",
+            Integer,
+            ForeignKey(f"{cls.__tablename__}.id"),
+            index=True,
         )
 
     @declared_attr
@@ -8,12 +8,14 @@ from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.ext.orderinglist import ordering_list
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
+from stalker.db.cache import reference_cache
 from stalker.db.declarative import Base
 from stalker.db.session import DBSession
 from stalker.log import get_logger
 from stalker.models.entity import Entity
 from stalker.models.mixins import CodeMixin, DateRangeMixin, ReferenceMixin, StatusMixin
 from stalker.models.status import Status
+from stalker.tjp import ProjectEmitter
 
 if TYPE_CHECKING:  # pragma: no cover
     from stalker.models.asset import Asset
@@ -536,15 +538,7 @@ class Project(Entity, ReferenceMixin, StatusMixin, DateRangeMixin, CodeMixin):
         Returns:
             str: The TaskJuggler compatible representation of this project.
         """
-        tab = "    "
-        indent = tab
-        tjp = f'task {self.tjp_id} "{self.tjp_id}" {{'
-        for task in self.root_tasks:
-            tjp += "\n"
-            tjp += "\n".join(f"{indent}{line}" for line in task.to_tjp.split("\n"))
-
-        tjp += "\n}"
-        return tjp
+        return ProjectEmitter(self).render()
 
     @property
     def is_active(self) -> bool:
@@ -556,7 +550,7 @@ class Project(Entity, ReferenceMixin, StatusMixin, DateRangeMixin, CodeMixin):
             bool: True if the project is active, False otherwise.
         """
         with DBSession.no_autoflush:
-            wip = Status.query.filter_by(code="WIP").first()
+            wip = reference_cache.find(Status, code="WIP")
         return self.status == wip
 
     @property
@@ -619,6 +613,20 @@ class Project(Entity, ReferenceMixin, StatusMixin, DateRangeMixin, CodeMixin):
             .all()
         )
 
+    @property
+    def open_ticket_count(self) -> int:
+        """Return the number of open :class:`.Ticket` s in this project.
+
+        The Tickets are counted without loading them, see
+        :meth:`.Ticket.count_tickets_by` to count them by status or owner.
+
+        Returns:
+            int: The number of the Tickets which are not closed in this project.
+        """
+        from stalker import Ticket
+
+        return Ticket.count_tickets(open_only=True, project=self)
+
     @property
     def repository(self) -> "Repository":
         """Return the first repository in the `project.repositories` or None.
@@ -2,12 +2,22 @@
 """Repository related functionality is situated here."""
 import os
 import platform
-from typing import Any, Dict, Optional, TYPE_CHECKING
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+)
 
 from sqlalchemy import ForeignKey, String, event
-from sqlalchemy.orm import Mapped, mapped_column, validates
+from sqlalchemy.orm import Mapped, Session, mapped_column, validates
 
 from stalker import defaults
+from stalker.db.session import DBSession
 from stalker.log import get_logger
 from stalker.models.entity import Entity
 from stalker.models.mixins import CodeMixin
@@ -18,6 +28,44 @@ if TYPE_CHECKING:  # pragma: no cover
 
 logger = get_logger(__name__)
 
+# The callable that creates the repository environment variables on first use,
+# it is set by stalker.db.setup.setup() in fast connect mode.
+_repo_vars_loader: Optional[Callable[[], None]] = None
+
+
+def defer_repo_vars(loader: Optional[Callable[[], None]]) -> None:
+    """Defer the creation of the repository environment variables.
+
+    The loader is called once, the first time a path is expanded with
+    :func:`.expandvars`. Passing None cancels the deferred loader.
+
+    Args:
+        loader (Optional[Callable[[], None]]): The callable that creates the
+            repository environment variables.
+    """
+    global _repo_vars_loader
+    _repo_vars_loader = loader
+
+
+def expandvars(path: str) -> str:
+    """Expand the environment variables in the given path.
+
+    Creates the repository environment variables first, if their creation is
+    deferred.
+
+    Args:
+        path (str): The path to expand.
+
+    Returns:
+        str: The expanded path.
+    """
+    global _repo_vars_loader
+    if _repo_vars_loader is not None:
+        loader = _repo_vars_loader
+        _repo_vars_loader = None
+        loader()
+    return os.path.expandvars(path)
+
 
 class Repository(Entity, CodeMixin):
     r"""Manage fileserver/repository related data.
@@ -278,7 +326,7 @@ class Repository(Entity, CodeMixin):
             )
 
         # expand all variables
-        path = os.path.normpath(os.path.expandvars(os.path.expanduser(path))).replace(
+        path = os.path.normpath(expandvars(os.path.expanduser(path))).replace(
             "\\", "/"
         )
 
@@ -355,30 +403,15 @@ class Repository(Entity, CodeMixin):
             path (str): Path in a repository.
 
         Returns:
-            Repository:
+            Repository: The Repository that the given path is in or None if the
+                path is not in any of the repositories. If the path is in more
+                than one repository (nested repositories), the one with the
+                longest root path is returned.
         """
-        logger.debug(f"Looking for a repo for path: {path}")
-        # path could be using environment variables so expand them
-        path = os.path.expandvars(path)
-        logger.debug(f"path after expanding vars  : {path}")
-
-        # first find the repository
-        repos = Repository.query.all()
-        found_repo = None
-        for repo in repos:
-            if (
-                path.startswith(repo.path)
-                or path.lower().startswith(repo.windows_path.lower())
-                or path.startswith(repo.linux_path)
-                or path.startswith(repo.macos_path)
-            ):
-                found_repo = repo
-                break
-
-        if found_repo is None:
-            logger.debug(f"Couldn't find a repo for path: {path}")
-
-        return found_repo
+        repo_paths = find_repository_paths(path)
+        if repo_paths is None:
+            return None
+        return DBSession.get(Repository, repo_paths.id)
 
     @classmethod
     def to_os_independent_path(cls, path: str) -> str:
@@ -392,8 +425,9 @@ class Repository(Entity, CodeMixin):
         Returns:
             str: OS independent path.
         """
-        # find the related repo
-        repo = cls.find_repo(path)
+        # find the related repo, its paths are enough to convert the path, which
+        # doesn't need a round-trip to the database
+        repo = find_repository_paths(path)
 
         if repo:
             logger.debug("Found repo for path: {}".format(repo))
@@ -402,6 +436,104 @@ class Repository(Entity, CodeMixin):
             logger.debug("Can't find repo for path: {}".format(path))
             return path
 
+    @classmethod
+    def to_linux_paths(cls, paths: Iterable[str]) -> Generator[str, None, None]:
+        """Convert the given paths to Linux paths in bulk.
+
+        Contrary to :meth:`.to_linux_path` the paths can be in any repository,
+        the repository of each path is found with the :class:`.RepositoryIndex`.
+
+        Args:
+            paths (Iterable[str]): The paths, can be any iterable including a
+                generator or a NumPy array of strings.
+
+        Returns:
+            Generator[str, None, None]: The converted paths in the same order.
+        """
+        return translate_paths(paths, "linux_path")
+
+    @classmethod
+    def to_windows_paths(cls, paths: Iterable[str]) -> Generator[str, None, None]:
+        """Convert the given paths to Windows paths in bulk.
+
+        Contrary to :meth:`.to_windows_path` the paths can be in any repository,
+        the repository of each path is found with the :class:`.RepositoryIndex`.
+
+        Args:
+            paths (Iterable[str]): The paths, can be any iterable including a
+                generator or a NumPy array of strings.
+
+        Returns:
+            Generator[str, None, None]: The converted paths in the same order.
+        """
+        return translate_paths(paths, "windows_path")
+
+    @classmethod
+    def to_macos_paths(cls, paths: Iterable[str]) -> Generator[str, None, None]:
+        """Convert the given paths to macOS paths in bulk.
+
+        Contrary to :meth:`.to_macos_path` the paths can be in any repository,
+        the repository of each path is found with the :class:`.RepositoryIndex`.
+
+        Args:
+            paths (Iterable[str]): The paths, can be any iterable including a
+                generator or a NumPy array of strings.
+
+        Returns:
+            Generator[str, None, None]: The converted paths in the same order.
+        """
+        return translate_paths(paths, "macos_path")
+
+    @classmethod
+    def to_native_paths(cls, paths: Iterable[str]) -> Generator[str, None, None]:
+        """Convert the given paths to the paths of the current OS in bulk.
+
+        Contrary to :meth:`.to_native_path` the paths can be in any repository,
+        the repository of each path is found with the :class:`.RepositoryIndex`.
+
+        Args:
+            paths (Iterable[str]): The paths, can be any iterable including a
+                generator or a NumPy array of strings.
+
+        Returns:
+            Generator[str, None, None]: The converted paths in the same order.
+        """
+        return translate_paths(paths, "path")
+
+    @classmethod
+    def make_relative_paths(cls, paths: Iterable[str]) -> Generator[str, None, None]:
+        """Make the given paths relative to the root of their repositories in bulk.
+
+        Contrary to :meth:`.make_relative` the paths can be in any repository,
+        the repository of each path is found with the :class:`.RepositoryIndex`.
+        The paths that are not in any repository are returned as absolute paths.
+
+        Args:
+            paths (Iterable[str]): The paths, can be any iterable including a
+                generator or a NumPy array of strings.
+
+        Returns:
+            Generator[str, None, None]: The relative paths in the same order.
+        """
+        return translate_paths(paths, None)
+
+    @classmethod
+    def to_os_independent_paths(
+        cls, paths: Iterable[str]
+    ) -> Generator[str, None, None]:
+        """Replace the repository part of the given paths with the repository env var.
+
+        It is the bulk version of :meth:`.to_os_independent_path`.
+
+        Args:
+            paths (Iterable[str]): The paths, can be any iterable including a
+                generator or a NumPy array of strings.
+
+        Returns:
+            Generator[str, None, None]: The OS independent paths in the same order.
+        """
+        return translate_paths(paths, "env_var")
+
     @property
     def env_var(self) -> str:
         """Return the env var of this repo.
@@ -441,6 +573,369 @@ class Repository(Entity, CodeMixin):
         return super(Repository, self).__hash__()
 
 
+class RepositoryPaths(object):
+    """The root paths of a repository as stored in the :class:`.RepositoryIndex`.
+
+    It is a lightweight, session independent copy of a :class:`.Repository`
+    that supports the path conversion methods of it.
+
+    Args:
+        id (int): The id of the Repository.
+        code (str): The code of the Repository.
+        linux_path (str): The Linux path of the Repository.
+        macos_path (str): The macOS path of the Repository.
+        windows_path (str): The Windows path of the Repository.
+    """
+
+    __slots__ = ("id", "code", "linux_path", "macos_path", "windows_path")
+
+    def __init__(
+        self,
+        id: int,
+        code: str,
+        linux_path: str,
+        macos_path: str,
+        windows_path: str,
+    ) -> None:
+        self.id = id
+        self.code = code
+        self.linux_path = linux_path
+        self.macos_path = macos_path
+        self.windows_path = windows_path
+
+    def __repr__(self) -> str:
+        """Return the string representation of this RepositoryPaths instance.
+
+        Returns:
+            str: The string representation of this RepositoryPaths instance.
+        """
+        return f"<RepositoryPaths ({self.id}, {self.code})>"
+
+    path = Repository.path
+    env_var = Repository.env_var
+    is_in_repo = Repository.is_in_repo
+    _to_path = Repository._to_path
+    to_linux_path = Repository.to_linux_path
+    to_windows_path = Repository.to_windows_path
+    to_macos_path = Repository.to_macos_path
+    to_native_path = Repository.to_native_path
+    make_relative = Repository.make_relative
+
+
+class RepositoryIndex(object):
+    """An in-process index of the repository root paths.
+
+    The Linux and macOS root paths and the lower cased Windows root paths of
+    all the repositories are stored in a prefix trie, which finds the
+    repository of a path by walking the directories of the path once,
+    independent of the number of repositories.
+
+    The index is loaded with a single query on first use and then kept up to
+    date by the ``after_insert``, ``after_update`` and ``after_delete`` events
+    of the :class:`.Repository` class, so finding the repository of a path
+    doesn't need any round-trip to the database in steady state. It is cleared
+    when the code or any path of a repository is set before being flushed,
+    when a transaction is rolled back or when a new database is set up. Use
+    :meth:`.invalidate` to clear it when the repositories are changed by
+    another process.
+    """
+
+    def __init__(self) -> None:
+        self._repositories: Optional[Dict[int, RepositoryPaths]] = None
+        self._trie: Optional[Tuple[Dict[Any, Any], Dict[Any, Any], int]] = None
+
+    def invalidate(self) -> None:
+        """Clear the index, it is loaded again on next use."""
+        self._repositories = None
+        self._trie = None
+
+    def update(self, repo: Repository) -> None:
+        """Add or update the paths of the given repository in the index.
+
+        Args:
+            repo (Repository): The Repository to update the paths of.
+        """
+        if self._repositories is None:
+            # not loaded yet, the repo will be loaded with the others
+            return
+        self._repositories[repo.id] = RepositoryPaths(
+            repo.id, repo.code, repo.linux_path, repo.macos_path, repo.windows_path
+        )
+        self._trie = None
+
+    def remove(self, repo: Repository) -> None:
+        """Remove the paths of the given repository from the index.
+
+        Args:
+            repo (Repository): The Repository to remove the paths of.
+        """
+        if self._repositories is None:
+            return
+        self._repositories.pop(repo.id, None)
+        self._trie = None
+
+    def find(self, path: str) -> Optional[RepositoryPaths]:
+        """Return the paths of the repository that the given path is in.
+
+        Args:
+            path (str): The path, environment variables are not expanded.
+
+        Returns:
+            Optional[RepositoryPaths]: The paths of the repository with the longest
+                root path that the given path is in or None if the path is not in
+                any repository.
+        """
+        trie = self._trie
+        if trie is None:
+            trie = self._build_trie()
+
+        # only the directories are considered as the root paths always end with a
+        # slash, the file name is not a part of any root path, and only as many
+        # directories as the deepest root path has are needed
+        posix_trie, windows_trie, max_depth = trie
+        directories = path[: path.rfind("/") + 1]
+        found = None
+        found_depth = 0
+        for node, directories_to_walk in (
+            (posix_trie, directories),
+            (windows_trie, directories.lower()),
+        ):
+            for depth, directory in enumerate(
+                directories_to_walk.split("/", max_depth)[:-1]
+            ):
+                node = node.get(directory)
+                if node is None:
+                    break
+                if None in node and depth >= found_depth:
+                    found = node[None]
+                    found_depth = depth + 1
+        return found
+
+    def _build_trie(self) -> Tuple[Dict[Any, Any], Dict[Any, Any], int]:
+        """Build the prefix tries of the root paths.
+
+        Returns:
+            Tuple[Dict[Any, Any], Dict[Any, Any], int]: The case-sensitive trie of
+                the Linux and macOS root paths, the case-insensitive trie of the
+                Windows root paths and the number of directories in the deepest
+                root path.
+        """
+        repositories = self._repositories
+        if repositories is None:
+            repositories = self._load()
+
+        posix_trie = {}
+        windows_trie = {}
+        max_depth = 0
+        # the repositories with smaller ids have the priority for the same root
+        for repo_id in sorted(repositories, reverse=True):
+            repo_paths = repositories[repo_id]
+            for trie, root in (
+                (posix_trie, repo_paths.linux_path),
+                (posix_trie, repo_paths.macos_path),
+                (windows_trie, repo_paths.windows_path.lower()),
+            ):
+                node = trie
+                directories = root.split("/")[:-1]
+                for directory in directories:
+                    node = node.setdefault(directory, {})
+                node[None] = repo_paths
+                max_depth = max(max_depth, len(directories))
+
+        self._trie = (posix_trie, windows_trie, max_depth)
+        return self._trie
+
+    def _load(self) -> Dict[int, RepositoryPaths]:
+        """Load the paths of all the repositories from the database.
+
+        Returns:
+            Dict[int, RepositoryPaths]: The paths of the repositories by their ids.
+        """
+        logger.debug("Loading the repository index.")
+        # let it autoflush, so the pending changes of the repositories are loaded
+        rows = DBSession.query(
+            Repository.id,
+            Repository.code,
+            Repository.linux_path,
+            Repository.macos_path,
+            Repository.windows_path,
+        ).all()
+        self._repositories = {row[0]: RepositoryPaths(*row) for row in rows}
+        return self._repositories
+
+
+# the repository index of this process
+repository_index = RepositoryIndex()
+
+# the maximum number of directories to cache the repository roots of while
+# translating paths in bulk
+TRANSLATE_PATHS_CACHE_SIZE = 10000
+
+
+def find_repository_paths(path: str) -> Optional[RepositoryPaths]:
+    """Return the paths of the repository that the given path is in.
+
+    Args:
+        path (str): Path in a repository, it can contain environment variables.
+
+    Returns:
+        Optional[RepositoryPaths]: The paths of the repository or None if the path
+            is not in any repository.
+    """
+    logger.debug(f"Looking for a repo for path: {path}")
+    # path could be using environment variables so expand them
+    path = expandvars(path)
+    logger.debug(f"path after expanding vars  : {path}")
+    repo_paths = repository_index.find(path)
+    if repo_paths is None:
+        logger.debug(f"Couldn't find a repo for path: {path}")
+    return repo_paths
+
+
+def _find_repository_root(
+    directories: str,
+) -> Tuple[Optional[RepositoryPaths], int]:
+    """Find the repository and the length of its root in the given directories.
+
+    Args:
+        directories (str): The directories of a normalized path, ending with a
+            slash.
+
+    Returns:
+        Tuple[Optional[RepositoryPaths], int]: The paths of the repository and the
+            length of the root part of the directories, or None and 0 if the
+            directories are not in any repository.
+    """
+    repo_paths = repository_index.find(directories)
+    if repo_paths is None:
+        return None, 0
+    for root in (
+        repo_paths.windows_path,
+        repo_paths.linux_path,
+        repo_paths.macos_path,
+    ):
+        if directories.startswith(root):
+            return repo_paths, len(root)
+    # Windows paths are case-insensitive
+    return repo_paths, len(repo_paths.windows_path)
+
+
+def translate_paths(
+    paths: Iterable[str], target: Optional[str]
+) -> Generator[str, None, None]:
+    """Translate the given paths between the repository roots in bulk.
+
+    The repository of each path is found with the :class:`.RepositoryIndex`,
+    so the paths can be in different repositories and there is no round-trip
+    to the database in steady state. The results are generated one by one, so
+    very long lists of paths can be streamed.
+
+    Args:
+        paths (Iterable[str]): The paths, can be any iterable including a
+            generator or a NumPy array of strings.
+        target (Optional[str]): The name of the :class:`.Repository` attribute
+            that the repository part of the paths is replaced with, one of
+            "linux_path", "macos_path", "windows_path", "path" or "env_var".
+            None makes the paths relative to their repository root.
+
+    Raises:
+        TypeError: If the paths is a str or any of the paths is not a str.
+
+    Returns:
+        Generator[str, None, None]: The translated paths in the same order.
+    """
+    if isinstance(paths, str):
+        raise TypeError(
+            "paths should be an iterable of file paths, "
+            f"not {paths.__class__.__name__}: '{paths}'"
+        )
+    return _translate_paths(iter(paths), target)
+
+
+def _translate_paths(
+    paths: Iterable[str], target: Optional[str]
+) -> Generator[str, None, None]:
+    """Generate the translated paths, see :func:`.translate_paths`.
+
+    Args:
+        paths (Iterable[str]): The paths.
+        target (Optional[str]): The name of the :class:`.Repository` attribute
+            that the repository part of the paths is replaced with.
+
+    Raises:
+        TypeError: If any of the paths is not a str.
+
+    Yields:
+        str: The translated path.
+    """
+    normpath = os.path.normpath
+    # the files in the same directory are in the same repository, i.e. image
+    # sequences, so the repository root of each directory is cached
+    roots = {}
+    for path in paths:
+        if not isinstance(path, str):
+            raise TypeError(
+                "path should be a string containing a file path, "
+                f"not {path.__class__.__name__}: '{path}'"
+            )
+
+        original_path = path
+        # the same normalization with Repository._to_path()
+        if path.startswith("~"):
+            path = os.path.expanduser(path)
+        if "$" in path or "%" in path:
+            path = expandvars(path)
+        path = normpath(path).replace("\\", "/")
+
+        directories = path[: path.rfind("/") + 1]
+        try:
+            repo_paths, root_length = roots[directories]
+        except KeyError:
+            if len(roots) >= TRANSLATE_PATHS_CACHE_SIZE:
+                roots.clear()
+            repo_paths, root_length = roots[directories] = _find_repository_root(
+                directories
+            )
+
+        relative_path = path[root_length:]
+        if repo_paths is None:
+            yield original_path if target == "env_var" else path
+        elif target is None:
+            yield relative_path or "."
+        elif target == "env_var":
+            yield f"${repo_paths.env_var}/{relative_path or '.'}"
+        else:
+            yield getattr(repo_paths, target) + relative_path
+
+
+def invalidate_repository_index(*args: Any, **kwargs: Any) -> None:
+    """Clear the repository index.
+
+    It accepts and ignores any arguments, so it can be used as an event listener
+    directly. Call it manually if the repositories are changed by another
+    process.
+
+    Args:
+        args (Any): Ignored.
+        kwargs (Any): Ignored.
+    """
+    repository_index.invalidate()
+
+
+# the index can contain the repositories inserted in a rolled back transaction
+event.listen(Session, "after_soft_rollback", invalidate_repository_index)
+
+# the changes are not in the index until they are flushed, reloading the index
+# flushes them
+for attribute in [
+    Repository.code,
+    Repository.linux_path,
+    Repository.macos_path,
+    Repository.windows_path,
+]:
+    event.listen(attribute, "set", invalidate_repository_index)
+
+
 @event.listens_for(Repository, "after_insert")
 def receive_after_insert(
     mapper: "Mapper",
@@ -459,3 +954,36 @@ def receive_after_insert(
     """
     logger.debug("auto creating env var for Repository: {}".format(repo.name))
     os.environ[defaults.repo_env_var_template.format(code=repo.code)] = repo.path
+    repository_index.update(repo)
+
+
+@event.listens_for(Repository, "after_update")
+def receive_after_update(
+    mapper: "Mapper",
+    connection: "Connection",
+    repo: "Repository",
+) -> None:
+    """Listen for the 'after_update' event and update the repository index.
+
+    Args:
+        mapper (sqlalchemy.orm.Mapper): The mapper object.
+        connection (sqlalchemy.engine.Connection): The connection object.
+        repo (Repository): The Repository instance that is just updated in the DB.
+    """
+    repository_index.update(repo)
+
+
+@event.listens_for(Repository, "after_delete")
+def receive_after_delete(
+    mapper: "Mapper",
+    connection: "Connection",
+    repo: "Repository",
+) -> None:
+    """Listen for the 'after_delete' event and update the repository index.
+
+    Args:
+        mapper (sqlalchemy.orm.Mapper): The mapper object.
+        connection (sqlalchemy.engine.Connection): The connection object.
+        repo (Repository): The Repository instance that is just deleted from the DB.
+    """
+    repository_index.remove(repo)
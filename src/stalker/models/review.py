@@ -1,12 +1,13 @@
 # -*- coding: utf-8 -*-
 """Review related classes and functions are situated here."""
 
-from typing import Any, Dict, List, Optional, TYPE_CHECKING, Union
+from typing import Any, Dict, List, NamedTuple, Optional, TYPE_CHECKING, Union
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, case, func, inspect, select
 from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import Mapped, mapped_column, relationship, synonym, validates
 
+from stalker.db.cache import reference_cache
 from stalker.db.declarative import Base
 from stalker.db.session import DBSession
 from stalker.log import get_logger
@@ -29,6 +30,40 @@ if TYPE_CHECKING:  # pragma: no cover
 logger = get_logger(__name__)
 
 
+class ReviewSetState(NamedTuple):
+    """The aggregated statuses of the reviews in a review set.
+
+    Attributes:
+        review_count (int): The number of the reviews in the set.
+        new_count (int): The number of the reviews which are not finalized yet,
+            so which still have the ``NEW`` status.
+        revision_request_count (int): The number of the reviews which are
+            requesting a revision, so which have the ``RREV`` status.
+    """
+
+    review_count: int
+    new_count: int
+    revision_request_count: int
+
+    @property
+    def is_finalized(self) -> bool:
+        """Return True if all the reviews in the set are finalized.
+
+        Returns:
+            bool: True if none of the reviews has the ``NEW`` status.
+        """
+        return self.new_count == 0
+
+    @property
+    def requests_revision(self) -> bool:
+        """Return True if any of the reviews in the set requests a revision.
+
+        Returns:
+            bool: True if any of the reviews has the ``RREV`` status.
+        """
+        return self.revision_request_count > 0
+
+
 class Review(SimpleEntity, ScheduleMixin, StatusMixin):
     """Manages the Task Review Workflow.
 
@@ -88,7 +123,11 @@ class Review(SimpleEntity, ScheduleMixin, StatusMixin):
 
     __auto_name__ = True
     __tablename__ = "Reviews"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # the review sets are queried by these
+        Index("ix_Reviews_task_id_review_number", "task_id", "review_number"),
+        {"extend_existing": True},
+    )
 
     __mapper_args__ = {"polymorphic_identity": "Review"}
 
@@ -151,7 +190,7 @@ class Review(SimpleEntity, ScheduleMixin, StatusMixin):
 
         # set the status to NEW
         with DBSession.no_autoflush:
-            new = Status.query.filter_by(code="NEW").first()
+            new = reference_cache.find(Status, code="NEW")
         self.status = new
 
         # set the review_number
@@ -278,12 +317,20 @@ class Review(SimpleEntity, ScheduleMixin, StatusMixin):
     def review_set(self) -> List["Review"]:
         """Return all the reviews in the same review set with this one.
 
+        The reviews are queried with the ``(task_id, review_number)`` index
+        unless the reviews of the task are already loaded or there are new
+        reviews of the task which are not flushed yet (see
+        :meth:`.Review.get_review_set`).
+
         Returns:
             List[Review]: The Review instances in the same review set with this one.
         """
         logger.debug(
             f"finding revisions with the same review_number of: {self.review_number}"
         )
+        if _is_review_set_queryable(self.task):
+            return Review.get_review_set(self.task, self.review_number)
+
         with DBSession.no_autoflush:
             logger.debug("using raw Python to get review set")
             reviews = []
@@ -294,6 +341,106 @@ class Review(SimpleEntity, ScheduleMixin, StatusMixin):
 
         return reviews
 
+    @property
+    def review_set_state(self) -> ReviewSetState:
+        """Return the aggregated statuses of the review set of this review.
+
+        The state is calculated with a single aggregate query unless the reviews
+        of the task are already loaded or there are new reviews of the task
+        which are not flushed yet (see :meth:`.Review.get_review_set_state`).
+
+        Returns:
+            ReviewSetState: The aggregated statuses of the review set.
+        """
+        if _is_review_set_queryable(self.task):
+            return Review.get_review_set_state(self.task, self.review_number)
+
+        with DBSession.no_autoflush:
+            codes = [review.status.code for review in self.review_set]
+        return ReviewSetState(len(codes), codes.count("NEW"), codes.count("RREV"))
+
+    @classmethod
+    def get_review_set(cls, task: "Task", review_number: int) -> List["Review"]:
+        """Query the reviews of the given task with the given review number.
+
+        The reviews are queried with the ``(task_id, review_number)`` index
+        without loading all the reviews of the task. The session is not flushed,
+        so the new reviews that are not flushed yet are not included.
+
+        Args:
+            task (Task): The task.
+            review_number (int): The review number.
+
+        Returns:
+            List[Review]: The reviews in the review set ordered by their ids.
+        """
+        with DBSession.no_autoflush:
+            return list(
+                DBSession.scalars(
+                    select(Review)
+                    .where(Review.task_id == task.id)
+                    .where(Review._review_number == review_number)
+                    .order_by(Review.review_id)
+                )
+            )
+
+    @classmethod
+    def get_review_set_state(cls, task: "Task", review_number: int) -> ReviewSetState:
+        """Return the aggregated statuses of a review set with a single query.
+
+        The number of all, ``NEW`` and ``RREV`` reviews of the review set are
+        counted with a single aggregate query on the ``(task_id, review_number)``
+        index. The statuses of the reviews in the session that are changed but
+        not flushed yet are used instead of the ones in the database. The
+        session is not flushed, so the new reviews that are not flushed yet are
+        not included.
+
+        Args:
+            task (Task): The task.
+            review_number (int): The review number.
+
+        Returns:
+            ReviewSetState: The aggregated statuses of the review set.
+        """
+        with DBSession.no_autoflush:
+            changed_codes = {
+                review.review_id: review.status.code
+                for review in DBSession.dirty
+                if isinstance(review, Review)
+                and inspect(review).dict.get("task_id") == task.id
+                and review.review_number == review_number
+            }
+
+            reviews = Review.__table__
+            statuses = Status.__table__
+            stmt = (
+                select(
+                    func.count(reviews.c.id),
+                    func.coalesce(
+                        func.sum(case((statuses.c.code == "NEW", 1), else_=0)), 0
+                    ),
+                    func.coalesce(
+                        func.sum(case((statuses.c.code == "RREV", 1), else_=0)), 0
+                    ),
+                )
+                .select_from(reviews)
+                .join(statuses, statuses.c.id == reviews.c.status_id)
+                .where(reviews.c.task_id == task.id)
+                .where(reviews.c.review_number == review_number)
+            )
+            if changed_codes:
+                stmt = stmt.where(reviews.c.id.not_in(list(changed_codes)))
+            review_count, new_count, revision_request_count = DBSession.execute(
+                stmt
+            ).one()
+
+        codes = list(changed_codes.values())
+        return ReviewSetState(
+            review_count + len(codes),
+            new_count + codes.count("NEW"),
+            revision_request_count + codes.count("RREV"),
+        )
+
     def is_finalized(self) -> bool:
         """Check if all reviews in the same set with this one are finalized.
 
@@ -301,7 +448,7 @@ class Review(SimpleEntity, ScheduleMixin, StatusMixin):
             bool: True if all the reviews in the same review set with this one are
                 finalized, False otherwise.
         """
-        return all([review.status.code != "NEW" for review in self.review_set])
+        return self.review_set_state.is_finalized
 
     def request_revision(
         self,
@@ -325,7 +472,7 @@ class Review(SimpleEntity, ScheduleMixin, StatusMixin):
 
         # set self status to RREV
         with DBSession.no_autoflush:
-            rrev = Status.query.filter_by(code="RREV").first()
+            rrev = reference_cache.find(Status, code="RREV")
 
             # set self status to RREV
             self.status = rrev
@@ -337,7 +484,7 @@ class Review(SimpleEntity, ScheduleMixin, StatusMixin):
         """Finalize the review by approving the task."""
         # set self status to APP
         with DBSession.no_autoflush:
-            app = Status.query.filter_by(code="APP").first()
+            app = reference_cache.find(Status, code="APP")
             self.status = app
 
         # call finalize review_set
@@ -346,25 +493,26 @@ class Review(SimpleEntity, ScheduleMixin, StatusMixin):
     def finalize_review_set(self) -> None:
         """Finalize the current review set Review decisions."""
         with DBSession.no_autoflush:
-            hrev = Status.query.filter_by(code="HREV").first()
-            cmpl = Status.query.filter_by(code="CMPL").first()
+            hrev = reference_cache.find(Status, code="HREV")
+            cmpl = reference_cache.find(Status, code="CMPL")
 
         # check if all the reviews are finalized
-        if not self.is_finalized():
+        review_set_state = self.review_set_state
+        if not review_set_state.is_finalized:
             logger.debug("not all reviews are finalized yet!")
             return
 
         logger.debug("all reviews are finalized")
 
         # check if there are any RREV reviews
-        revise_task = False
+        revise_task = review_set_state.requests_revision
 
         # now we can extend the timing of the task
         total_seconds = self.task.total_logged_seconds
-        for review in self.review_set:
-            if review.status.code == "RREV":
-                total_seconds += review.schedule_seconds
-                revise_task = True
+        if revise_task:
+            for review in self.review_set:
+                if review.status.code == "RREV":
+                    total_seconds += review.schedule_seconds
 
         timing, unit = self.least_meaningful_time_unit(total_seconds)
         self.task._review_number += 1
@@ -597,3 +745,36 @@ class DailyFile(Base):
                 )
 
         return daily
+
+
+def _is_review_set_queryable(task: "Task") -> bool:
+    """Check if the review sets of the given task can be queried.
+
+    The review sets are filtered from the reviews of the task in Python if the
+    task is not persistent, its reviews are already loaded, it has unflushed
+    changes in its reviews or there are new reviews of it in the session that
+    are not flushed yet. Otherwise they are queried from the database, without
+    loading all the reviews of the task.
+
+    Args:
+        task (Task): The task.
+
+    Returns:
+        bool: True if the review sets of the task can be queried from the
+            database.
+    """
+    if task is None:
+        return False
+
+    state = inspect(task)
+    if (
+        not state.persistent
+        or "reviews" in state.dict
+        or "reviews" in state.committed_state
+    ):
+        return False
+
+    for instance in state.session.new:
+        if isinstance(instance, Review) and inspect(instance).dict.get("task") is task:
+            return False
+    return True
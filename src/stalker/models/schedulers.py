@@ -9,19 +9,48 @@ import subprocess
 import sys
 import tempfile
 import time
-from typing import List, Optional, TYPE_CHECKING, Union
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+)
 
 from jinja2 import Template
 
 import pytz
 
-from sqlalchemy import bindparam, text
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    ForeignKey,
+    Integer,
+    Table,
+    Text,
+    and_,
+    bindparam,
+    delete,
+    null,
+    or_,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.orm import Mapped, mapped_column
 
 from stalker import defaults
+from stalker.db.declarative import Base
 from stalker.db.session import DBSession
+from stalker.db.types import GenericDateTime
 from stalker.log import get_logger
 from stalker.models.project import Project
 from stalker.models.task import Task, Task_Computed_Resources
+from stalker.tjp import ResourcesEmitter, TaskRow, TaskRowsEmitter
 
 if TYPE_CHECKING:  # pragma: no cover
     from stalker.models.studio import Studio
@@ -222,22 +251,68 @@ class TaskJugglerScheduler(SchedulerBase):
         self.tjp_file_full_path = f"{self.temp_file_full_path}.tjp"
         self.csv_file_full_path = f"{self.temp_file_full_path}.csv"
 
-    def _create_tjp_file_content(self) -> None:  # noqa: C901
+    def _create_tjp_file_content(self) -> None:
         """Create the tjp file content."""
         start = time.time()
 
-        # use new way of doing it, it will just work with PostgreSQL
         template = Template(defaults.tjp_main_template2)
 
         if not self.projects:
-            project_ids = (
-                DBSession.connection()
+            project_ids = [
+                pr[0]
+                for pr in DBSession.connection()
                 .execute(text('select id, code from "Projects"'))
                 .fetchall()
-            )
+            ]
+        else:
+            project_ids = [project.id for project in self.projects]
+
+        if DBSession.connection().dialect.name == "postgresql":
+            projects = self._fetch_task_rows_postgresql(project_ids)
         else:
-            project_ids = [[project.id] for project in self.projects]
+            projects = TaskRowsEmitter.from_database(project_ids).projects
+        num_of_records = sum(len(rows) for _, rows in projects)
+
+        tasks_buffer = TaskRowsEmitter(projects).render()
+        resources_buffer = ResourcesEmitter.from_database().render()
+
+        import stalker
+
+        self.tjp_content = template.render(
+            {
+                "stalker": stalker,
+                "studio": self.studio,
+                "csv_file_name": self.temp_file_name,
+                "csv_file_full_path": self.temp_file_full_path,
+                "compute_resources": self.compute_resources,
+                "tasks_buffer": tasks_buffer,
+                "resources_buffer": resources_buffer,
+            },
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+
+        logger.debug(f"total number of records: {num_of_records}")
 
+        end = time.time()
+        logger.debug(
+            "rendering the whole tjp file took: {:0.3f} seconds".format(end - start)
+        )
+
+    def _fetch_task_rows_postgresql(
+        self, project_ids: List[int]
+    ) -> List[Tuple[int, List[TaskRow]]]:
+        """Fetch the task rows of the given projects with PostgreSQL only SQL.
+
+        The task hierarchy of each project is fetched with a recursive query.
+
+        Args:
+            project_ids (List[int]): The ids of the projects.
+
+        Returns:
+            List[Tuple[int, List[TaskRow]]]: The project ids and the task rows of
+                each project in depth-first order.
+        """
         sql_query = """select
     "Tasks".id,
     tasks.path,
@@ -315,7 +390,7 @@ left outer join (
 left outer join (
     select
         "TimeLogs".task_id,
-        array_agg(('User_' || "TimeLogs".resource_id, to_char(cast("TimeLogs".start at time zone 'utc' as timestamp), 'YYYY-MM-DD-HH24:MI:00'), to_char(cast("TimeLogs".end at time zone 'utc' as timestamp), 'YYYY-MM-DD-HH24:MI:00'))) as time_log_array
+        array_agg(("TimeLogs".resource_id, to_char(cast("TimeLogs".start at time zone 'utc' as timestamp), 'YYYY-MM-DD-HH24:MI:00'), to_char(cast("TimeLogs".end at time zone 'utc' as timestamp), 'YYYY-MM-DD-HH24:MI:00'))) as time_log_array
     from "TimeLogs"
     group by task_id
 ) as time_logs on "Tasks".id = time_logs.task_id
@@ -354,172 +429,66 @@ left outer join (
 --order by "Tasks".id
 order by path_as_text"""  # noqa: B950
 
-        result_buffer = []
-        num_of_records = 0
-
-        # run it per project
-        for pr in project_ids:
-            p_id = pr[0]
-            # p_code = pr[1]
-
+        projects = []
+        for p_id in project_ids:
             result = DBSession.connection().execute(text(sql_query), {"id": p_id})
+            projects.append(
+                (p_id, [self._parse_task_row(r) for r in result.fetchall()])
+            )
+        return projects
 
-            # start by adding the project first
-            result_buffer.append(f'task Project_{p_id} "Project_{p_id}" {{')
-
-            # now start jumping around
-            previous_level = 0
-            for r in result.fetchall():
-                # start by appending task tjp id first
-                task_id = r[0]
-                # path = r[1]
-                # parent_id = r[2]
-                # entity_type = r[3]
-                # name = r[4]
-                priority = r[5]
-                schedule_timing = r[6]
-                schedule_unit = r[7]
-                schedule_model = r[8]
-                allocation_strategy = r[9]
-                persistent_allocation = r[10]
-                depth = r[11] + 1
-                resource_ids = r[12]
-                alternative_resource_ids = r[13]
-                time_log_array = r[14]
-                dependency_info = r[15]
-                is_leaf = r[16]
-
-                tab = "  " * depth
-
-                # close the previous level if necessary
-                for i in range(previous_level - depth + 1):
-                    i_tab = "  " * (previous_level - i)
-                    result_buffer.append(f"{i_tab}}}")
-
-                result_buffer.append(
-                    f"""{tab}task Task_{task_id} "Task_{task_id}" {{"""
-                )
-
-                # append priority if it is different then 500
-                if priority != 500:
-                    result_buffer.append(f"{tab}  priority {priority}")
-
-                # append dependency information
-                if dependency_info:
-                    dep_buffer = [f"{tab}  depends "]
-
-                    json_data = json.loads(
-                        dependency_info.replace("{", "[")
-                        .replace("}", "]")
-                        .replace("(", "")
-                        .replace(")", "")
-                    )  # it is an array of string
-
-                    for i, dependency in enumerate(json_data):
-                        if i > 0:
-                            dep_buffer.append(", ")
-
-                        (
-                            dep_full_ids,
-                            dependency_target,
-                            gap_timing,
-                            gap_unit,
-                            gap_model,
-                        ) = dependency.split(",")
-
-                        dep_full_path = ".".join(
-                            map(lambda x: f"Task_{x}", dep_full_ids.split("-"))
-                        )
-                        # fix for Project id
-                        dep_full_path = f"Project_{dep_full_path[5:]}"
-
-                        dep_string = f"{dep_full_path} {{{dependency_target}}}"
-
-                        dep_buffer.append(dep_string)
-
-                    result_buffer.append("".join(dep_buffer))
-
-                # append schedule model and timing information
-                # if this is a leaf task and has resources
-                if is_leaf and resource_ids:
-                    result_buffer.append(
-                        f"{tab}  {schedule_model} {schedule_timing}{schedule_unit}"
-                    )
-
-                    resource_buffer = [f"{tab}  allocate "]
-                    for i, resource_id in enumerate(resource_ids):
-                        if i > 0:
-                            resource_buffer.append(", ")
-                        resource_buffer.append(f"User_{resource_id}")
-
-                        # now go through alternatives
-                        if alternative_resource_ids:
-                            resource_buffer.append(" { alternative ")
-                            for j, alt_resource_id in enumerate(
-                                alternative_resource_ids
-                            ):
-                                if j > 0:
-                                    resource_buffer.append(", ")
-                                resource_buffer.append(f"User_{alt_resource_id}")
-
-                            # set the allocation strategy
-                            resource_buffer.append(f" select {allocation_strategy}")
-
-                            # is is persistent
-                            if persistent_allocation:
-                                resource_buffer.append(" persistent")
-                            resource_buffer.append(" }")
-
-                    result_buffer.append("".join(resource_buffer))
-
-                    # append any time log information
-                    if time_log_array:
-                        json_data = json.loads(
-                            time_log_array.replace("{", "[")
-                            .replace("}", "]")
-                            .replace("(", "")
-                            .replace(")", "")
-                        )  # it is an array of string
-
-                        for tlog in json_data:
-                            user_id, t_start, t_end = tlog.split(",")
-                            result_buffer.append(
-                                f"{tab}  booking {user_id} {t_start} - {t_end} "
-                                "{ overtime 2 }"
-                            )
-
-                previous_level = depth
-                num_of_records += 1
-
-            # and close the brackets per project
-            depth = 0  # current depth is 0 (Project)
-            # previous_level is the last task
-            for i in range(previous_level - depth + 1):
-                i_tab = "  " * (previous_level - i)
-                result_buffer.append(f"{i_tab}}}")
-
-        tasks_buffer = "\n".join(result_buffer)
-
-        import stalker
+    @staticmethod
+    def _parse_task_row(r: Sequence[Any]) -> TaskRow:
+        """Convert a row of the PostgreSQL task query to a TaskRow.
 
-        self.tjp_content = template.render(
-            {
-                "stalker": stalker,
-                "studio": self.studio,
-                "csv_file_name": self.temp_file_name,
-                "csv_file_full_path": self.temp_file_full_path,
-                "compute_resources": self.compute_resources,
-                "tasks_buffer": tasks_buffer,
-            },
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
+        Args:
+            r (Sequence[Any]): The row.
 
-        logger.debug(f"total number of records: {num_of_records}")
+        Returns:
+            TaskRow: The task data.
+        """
+        dependencies = []
+        if r[15]:
+            json_data = json.loads(
+                r[15]
+                .replace("{", "[")
+                .replace("}", "]")
+                .replace("(", "")
+                .replace(")", "")
+            )  # it is an array of string
+            for dependency in json_data:
+                dep_full_ids, dependency_target = dependency.split(",")[:2]
+                dependencies.append(
+                    (list(map(int, dep_full_ids.split("-"))), dependency_target)
+                )
 
-        end = time.time()
-        logger.debug(
-            "rendering the whole tjp file took: {:0.3f} seconds".format(end - start)
+        bookings = []
+        if r[14]:
+            json_data = json.loads(
+                r[14]
+                .replace("{", "[")
+                .replace("}", "]")
+                .replace("(", "")
+                .replace(")", "")
+            )  # it is an array of string
+            for time_log in json_data:
+                resource_id, t_start, t_end = time_log.split(",")
+                bookings.append((int(resource_id), t_start, t_end))
+
+        return TaskRow(
+            id=r[0],
+            depth=r[11] + 1,
+            priority=r[5],
+            schedule_timing=r[6],
+            schedule_unit=r[7],
+            schedule_model=r[8],
+            allocation_strategy=r[9],
+            persistent_allocation=r[10],
+            resource_ids=r[12] or [],
+            alternative_resource_ids=r[13] or [],
+            bookings=bookings,
+            dependencies=dependencies,
+            is_leaf=r[16],
         )
 
     def _fill_tjp_file(self) -> None:
@@ -636,6 +605,9 @@ order by path_as_text"""  # noqa: B950
             DBSession.connection().execute(delete_resources_statement)
             DBSession.connection().execute(update_resources_statement, update_user_data)
 
+        if defaults.schedule_snapshots:
+            self._record_schedule_snapshot(lines, update_data, update_user_data)
+
         parsing_end = time.time()
         logger.debug(
             "completed parsing csv file in (SQL): {} seconds".format(
@@ -643,6 +615,58 @@ order by path_as_text"""  # noqa: B950
             )
         )
 
+    def _record_schedule_snapshot(
+        self,
+        lines: List[List[str]],
+        update_data: List[Dict[str, Any]],
+        update_user_data: List[Dict[str, Any]],
+    ) -> None:
+        """Record a ScheduleSnapshot of the parsed schedule and prune the old ones.
+
+        Args:
+            lines (List[List[str]]): The lines of the csv file.
+            update_data (List[Dict[str, Any]]): The computed dates of the
+                entities in the order of the lines.
+            update_user_data (List[Dict[str, Any]]): The computed resources of the
+                tasks.
+        """
+        # the lines of the projects are skipped
+        task_ids = {
+            int(line[0].split(".")[-1].split("_")[-1])
+            for line in lines
+            if line[0].split(".")[-1].startswith("Task_")
+        }
+
+        resource_ids: Dict[int, List[int]] = {}
+        if self.compute_resources:
+            resource_pairs = [
+                (data["task_id"], data["resource_id"]) for data in update_user_data
+            ]
+        else:
+            # only the computed resources of the scheduled tasks are needed
+            resource_pairs = DBSession.connection().execute(
+                select(
+                    Task_Computed_Resources.c.task_id,
+                    Task_Computed_Resources.c.resource_id,
+                ).where(Task_Computed_Resources.c.task_id.in_(task_ids))
+            )
+        for task_id, resource_id in resource_pairs:
+            resource_ids.setdefault(int(task_id), []).append(int(resource_id))
+        ScheduleSnapshot.record(
+            [
+                (
+                    data["b_id"],
+                    data["computed_start"],
+                    data["computed_end"],
+                    resource_ids.get(data["b_id"], []),
+                )
+                for data in update_data
+                if data["b_id"] in task_ids
+            ]
+        )
+        if defaults.schedule_snapshot_retention is not None:
+            ScheduleSnapshot.prune(keep=defaults.schedule_snapshot_retention)
+
     def schedule(self) -> str:
         """Schedule the project or all projects in the Studio.
 
@@ -788,3 +812,416 @@ order by path_as_text"""  # noqa: B950
             projects (List[Project]): List of Project instances.
         """
         self._projects = self._validate_projects(projects)
+
+
+class ScheduleSnapshotEntry(NamedTuple):
+    """The computed schedule of a task in a :class:`.ScheduleSnapshot`.
+
+    Attributes:
+        task_id (int): The id of the task.
+        start (datetime.datetime): The computed start of the task in UTC.
+        end (datetime.datetime): The computed end of the task in UTC.
+        resource_ids (List[int]): The sorted ids of the computed resources.
+    """
+
+    task_id: int
+    start: datetime.datetime
+    end: datetime.datetime
+    resource_ids: List[int]
+
+
+class ScheduleChange(NamedTuple):
+    """The change of the computed schedule of a task between two snapshots.
+
+    The old values are None for the tasks that are added in the new snapshot and
+    the new values are None for the tasks that are removed from it.
+
+    Attributes:
+        task_id (int): The id of the task.
+        old_start (Optional[datetime.datetime]): The old computed start.
+        old_end (Optional[datetime.datetime]): The old computed end.
+        old_resource_ids (Optional[List[int]]): The old computed resource ids.
+        new_start (Optional[datetime.datetime]): The new computed start.
+        new_end (Optional[datetime.datetime]): The new computed end.
+        new_resource_ids (Optional[List[int]]): The new computed resource ids.
+    """
+
+    task_id: int
+    old_start: Optional[datetime.datetime]
+    old_end: Optional[datetime.datetime]
+    old_resource_ids: Optional[List[int]]
+    new_start: Optional[datetime.datetime]
+    new_end: Optional[datetime.datetime]
+    new_resource_ids: Optional[List[int]]
+
+    @property
+    def kind(self) -> str:
+        """Return the kind of the change.
+
+        Returns:
+            str: One of "added", "removed" or "changed".
+        """
+        if self.old_start is None:
+            return "added"
+        if self.new_start is None:
+            return "removed"
+        return "changed"
+
+
+class ScheduleSnapshot(Base):
+    """A snapshot of the computed schedule of the tasks.
+
+    The :class:`.TaskJugglerScheduler` records a snapshot each time it stores the
+    results of a scheduling run, unless the ``schedule_snapshots`` setting is
+    False, and prunes the old snapshots by the ``schedule_snapshot_retention``
+    setting.
+
+    The computed start and end of each task are stored as integer seconds since
+    the Unix epoch together with the sorted ids of its computed resources in a
+    narrow row of the ``Schedule_Snapshot_Entries`` table, so two snapshots can
+    be compared with a single query::
+
+        yesterday = ScheduleSnapshot.latest(
+            before=datetime.datetime.now(pytz.utc) - datetime.timedelta(days=1)
+        )
+        for change in yesterday.diff(ScheduleSnapshot.latest()):
+            print(change.task_id, change.kind, change.old_end, change.new_end)
+
+    Args:
+        date_created (datetime.datetime): The date of the snapshot. The current
+            date is used if skipped.
+    """
+
+    __tablename__ = "Schedule_Snapshots"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    date_created: Mapped[datetime.datetime] = mapped_column(
+        GenericDateTime, nullable=False, index=True
+    )
+
+    def __init__(self, date_created: Optional[datetime.datetime] = None) -> None:
+        if date_created is None:
+            date_created = datetime.datetime.now(pytz.utc)
+        self.date_created = self._validate_date(date_created, "date_created")
+
+    def __repr__(self) -> str:
+        """Return the representation of this snapshot.
+
+        Returns:
+            str: The representation.
+        """
+        return f"<ScheduleSnapshot {self.id} ({self.date_created})>"
+
+    @classmethod
+    def _validate_date(cls, date: Any, name: str) -> datetime.datetime:
+        """Validate the given date.
+
+        Args:
+            date (Any): The date to validate.
+            name (str): The name of the argument for the error message.
+
+        Raises:
+            TypeError: If the date is not a datetime.datetime instance.
+
+        Returns:
+            datetime.datetime: The date.
+        """
+        if not isinstance(date, datetime.datetime):
+            raise TypeError(
+                f"{cls.__name__}.{name} should be a datetime.datetime instance, "
+                f"not {date.__class__.__name__}: '{date}'"
+            )
+        return date
+
+    @staticmethod
+    def _encode_resource_ids(resource_ids: Sequence[int]) -> str:
+        """Encode the given resource ids as a comparable string.
+
+        Args:
+            resource_ids (Sequence[int]): The resource ids.
+
+        Returns:
+            str: The sorted resource ids separated with commas.
+        """
+        return ",".join(str(resource_id) for resource_id in sorted(resource_ids))
+
+    @staticmethod
+    def _decode_resource_ids(resource_ids: Optional[str]) -> Optional[List[int]]:
+        """Decode the given encoded resource ids.
+
+        Args:
+            resource_ids (Optional[str]): The encoded resource ids.
+
+        Returns:
+            Optional[List[int]]: The resource ids, None if the value is None.
+        """
+        if resource_ids is None:
+            return None
+        return [
+            int(resource_id) for resource_id in resource_ids.split(",") if resource_id
+        ]
+
+    @staticmethod
+    def _to_datetime(seconds: Optional[int]) -> Optional[datetime.datetime]:
+        """Convert the given seconds since the Unix epoch to a datetime.
+
+        Args:
+            seconds (Optional[int]): The seconds.
+
+        Returns:
+            Optional[datetime.datetime]: The datetime in UTC, None if the value is
+                None.
+        """
+        if seconds is None:
+            return None
+        return datetime.datetime.fromtimestamp(seconds, pytz.utc)
+
+    @classmethod
+    def record(
+        cls,
+        entries: Sequence[
+            Tuple[int, datetime.datetime, datetime.datetime, Sequence[int]]
+        ],
+        date_created: Optional[datetime.datetime] = None,
+    ) -> "ScheduleSnapshot":
+        """Record a snapshot with the given entries.
+
+        The entries are inserted with a single bulk insert.
+
+        Args:
+            entries (Sequence[Tuple[int, datetime.datetime, datetime.datetime,
+                Sequence[int]]]): The task id, computed start, computed end and
+                computed resource ids of the tasks.
+            date_created (datetime.datetime): The date of the snapshot. The
+                current date is used if skipped.
+
+        Returns:
+            ScheduleSnapshot: The recorded snapshot.
+        """
+        snapshot = cls(date_created=date_created)
+        DBSession.add(snapshot)
+        DBSession.flush()
+        values = [
+            {
+                "snapshot_id": snapshot.id,
+                "task_id": task_id,
+                "start": int(start.timestamp()),
+                "end": int(end.timestamp()),
+                "resource_ids": cls._encode_resource_ids(resource_ids),
+            }
+            for task_id, start, end, resource_ids in entries
+        ]
+        if values:
+            DBSession.connection().execute(Schedule_Snapshot_Entries.insert(), values)
+        return snapshot
+
+    @classmethod
+    def latest(
+        cls, before: Optional[datetime.datetime] = None
+    ) -> Optional["ScheduleSnapshot"]:
+        """Return the latest snapshot.
+
+        Args:
+            before (Optional[datetime.datetime]): If given, the latest snapshot
+                created at or before this date is returned.
+
+        Returns:
+            Optional[ScheduleSnapshot]: The snapshot or None if there isn't any.
+        """
+        query = DBSession.query(cls)
+        if before is not None:
+            before = cls._validate_date(before, "latest() before")
+            query = query.filter(cls.date_created <= before)
+        return query.order_by(cls.date_created.desc(), cls.id.desc()).first()
+
+    def entries(self) -> List[ScheduleSnapshotEntry]:
+        """Return the entries of this snapshot.
+
+        Returns:
+            List[ScheduleSnapshotEntry]: The entries ordered by the task ids.
+        """
+        table = Schedule_Snapshot_Entries
+        rows = DBSession.connection().execute(
+            select(table.c.task_id, table.c.start, table.c.end, table.c.resource_ids)
+            .where(table.c.snapshot_id == self.id)
+            .order_by(table.c.task_id)
+        )
+        return [
+            ScheduleSnapshotEntry(
+                task_id,
+                self._to_datetime(start),
+                self._to_datetime(end),
+                self._decode_resource_ids(resource_ids),
+            )
+            for task_id, start, end, resource_ids in rows
+        ]
+
+    def diff(self, snapshot: "ScheduleSnapshot") -> List[ScheduleChange]:
+        """Return the changes from this snapshot to the given snapshot.
+
+        The changed, removed and added tasks are found with a single query.
+
+        Args:
+            snapshot (ScheduleSnapshot): The newer snapshot.
+
+        Raises:
+            TypeError: If the snapshot is not a ScheduleSnapshot instance.
+
+        Returns:
+            List[ScheduleChange]: The changes ordered by the task ids.
+        """
+        if not isinstance(snapshot, ScheduleSnapshot):
+            raise TypeError(
+                f"{self.__class__.__name__}.diff() snapshot should be a "
+                "stalker.models.schedulers.ScheduleSnapshot instance, "
+                f"not {snapshot.__class__.__name__}: '{snapshot}'"
+            )
+        old = Schedule_Snapshot_Entries.alias("old_entries")
+        new = Schedule_Snapshot_Entries.alias("new_entries")
+        changed_or_removed = (
+            select(
+                old.c.task_id.label("task_id"),
+                old.c.start.label("old_start"),
+                old.c.end.label("old_end"),
+                old.c.resource_ids.label("old_resource_ids"),
+                new.c.start.label("new_start"),
+                new.c.end.label("new_end"),
+                new.c.resource_ids.label("new_resource_ids"),
+            )
+            .select_from(
+                old.outerjoin(
+                    new,
+                    and_(
+                        new.c.task_id == old.c.task_id,
+                        new.c.snapshot_id == snapshot.id,
+                    ),
+                )
+            )
+            .where(old.c.snapshot_id == self.id)
+            .where(
+                or_(
+                    new.c.task_id.is_(None),
+                    old.c.start != new.c.start,
+                    old.c.end != new.c.end,
+                    old.c.resource_ids != new.c.resource_ids,
+                )
+            )
+        )
+        added = (
+            select(
+                new.c.task_id,
+                null(),
+                null(),
+                null(),
+                new.c.start,
+                new.c.end,
+                new.c.resource_ids,
+            )
+            .select_from(
+                new.outerjoin(
+                    old,
+                    and_(old.c.task_id == new.c.task_id, old.c.snapshot_id == self.id),
+                )
+            )
+            .where(new.c.snapshot_id == snapshot.id)
+            .where(old.c.task_id.is_(None))
+        )
+        statement = union_all(changed_or_removed, added).order_by("task_id")
+        return [
+            ScheduleChange(
+                task_id,
+                self._to_datetime(old_start),
+                self._to_datetime(old_end),
+                self._decode_resource_ids(old_resource_ids),
+                self._to_datetime(new_start),
+                self._to_datetime(new_end),
+                self._decode_resource_ids(new_resource_ids),
+            )
+            for (
+                task_id,
+                old_start,
+                old_end,
+                old_resource_ids,
+                new_start,
+                new_end,
+                new_resource_ids,
+            ) in DBSession.connection().execute(statement)
+        ]
+
+    @classmethod
+    def prune(
+        cls,
+        keep: Optional[int] = None,
+        older_than: Optional[datetime.datetime] = None,
+    ) -> int:
+        """Delete the old snapshots.
+
+        The snapshots and their entries are deleted with one statement each.
+
+        Args:
+            keep (Optional[int]): If given, all but the latest ``keep`` snapshots
+                are deleted.
+            older_than (Optional[datetime.datetime]): If given, the snapshots
+                created before this date are deleted.
+
+        Raises:
+            TypeError: If keep is not None and not an int or older_than is not
+                None and not a datetime.datetime instance.
+            ValueError: If keep is a negative number.
+
+        Returns:
+            int: The number of the deleted snapshots.
+        """
+        conditions = []
+        if keep is not None:
+            if not isinstance(keep, int) or isinstance(keep, bool):
+                raise TypeError(
+                    f"{cls.__name__}.prune() keep should be an int, "
+                    f"not {keep.__class__.__name__}: '{keep}'"
+                )
+            if keep < 0:
+                raise ValueError(
+                    f"{cls.__name__}.prune() keep should be a non-negative "
+                    f"number, not {keep}"
+                )
+            conditions.append(
+                cls.id.not_in(
+                    select(cls.id)
+                    .order_by(cls.date_created.desc(), cls.id.desc())
+                    .limit(keep)
+                )
+            )
+        if older_than is not None:
+            older_than = cls._validate_date(older_than, "prune() older_than")
+            conditions.append(cls.date_created < older_than)
+        if not conditions:
+            return 0
+
+        pruned = select(cls.id).where(or_(*conditions))
+        DBSession.connection().execute(
+            Schedule_Snapshot_Entries.delete().where(
+                Schedule_Snapshot_Entries.c.snapshot_id.in_(pruned)
+            )
+        )
+        result = DBSession.execute(
+            delete(cls).where(cls.id.in_(pruned)),
+            execution_options={"synchronize_session": False},
+        )
+        return result.rowcount
+
+
+# SCHEDULE_SNAPSHOT_ENTRIES
+Schedule_Snapshot_Entries = Table(
+    "Schedule_Snapshot_Entries",
+    Base.metadata,
+    Column(
+        "snapshot_id",
+        Integer,
+        ForeignKey("Schedule_Snapshots.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("task_id", Integer, primary_key=True),
+    Column("start", BigInteger, nullable=False),
+    Column("end", BigInteger, nullable=False),
+    Column("resource_ids", Text, nullable=False),
+)
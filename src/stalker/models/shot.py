@@ -1,9 +1,19 @@
 # -*- coding: utf-8 -*-
 """Shot related functions and classes are situated here."""
+import contextvars
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+)
 
-from typing import Any, Dict, Optional, TYPE_CHECKING, Union
-
-from sqlalchemy import Float, ForeignKey
+from sqlalchemy import Float, ForeignKey, Index, select
 from sqlalchemy.exc import OperationalError, UnboundExecutionError
 from sqlalchemy.orm import (
     Mapped,
@@ -27,6 +37,13 @@ if TYPE_CHECKING:  # pragma: no cover
 
 logger = get_logger(__name__)
 
+# the (project, codes) pair of the codes that are already checked to be
+# available by Shot.create_shots(), so the Shots created there don't query the
+# database one by one
+_checked_codes: contextvars.ContextVar[
+    Optional[Tuple["Project", FrozenSet[str]]]
+] = contextvars.ContextVar("_checked_codes", default=None)
+
 
 class Shot(Task, CodeMixin):
     """Manages Shot related data.
@@ -94,6 +111,11 @@ class Shot(Task, CodeMixin):
     Two shots with the same :attr:`.code` cannot be assigned to the same
     :class:`.Sequence`.
 
+    The code of a Shot is unique per :class:`.Project`, which is also enforced
+    by a unique index on the database. Use :meth:`.create_shots` to create many
+    Shots at once (i.e. while importing an EDL), which checks the availability
+    of all the codes with a single query.
+
     .. note::
 
        .. versionadded:: 0.2.10
@@ -168,6 +190,10 @@ class Shot(Task, CodeMixin):
     __auto_name__ = True
     __tablename__ = "Shots"
     __mapper_args__ = {"polymorphic_identity": "Shot"}
+    __table_args__ = (
+        Index("ix_Shots_code", "code"),
+        Index("ix_Shots_project_id_code", "project_id", "code", unique=True),
+    )
 
     shot_id: Mapped[int] = mapped_column(
         "id",
@@ -175,6 +201,15 @@ class Shot(Task, CodeMixin):
         primary_key=True,
     )
 
+    # a copy of the Tasks.project_id, so the code can be unique per project
+    shot_project_id: Mapped[Optional[int]] = mapped_column(
+        "project_id",
+        ForeignKey("Projects.id"),
+    )
+    _shot_project: Mapped[Optional["Project"]] = relationship(
+        primaryjoin="Shots.c.project_id==Projects.c.id",
+    )
+
     sequence_id: Mapped[Optional[int]] = mapped_column(ForeignKey("Sequences.id"))
 
     sequence: Mapped[Optional["Sequence"]] = relationship(
@@ -263,6 +298,7 @@ class Shot(Task, CodeMixin):
         StatusMixin.__init__(self, **kwargs)
         CodeMixin.__init__(self, **kwargs)
 
+        self._shot_project = self.project
         self.sequence = sequence
         self.scene = scene
         self.image_format = image_format
@@ -359,6 +395,39 @@ class Shot(Task, CodeMixin):
                 f"not {code.__class__.__name__}: '{code}'"
             )
 
+        return cls.check_codes_availability([code], project)[code]
+
+    @classmethod
+    def check_codes_availability(
+        cls, codes: Iterable[str], project: "Project"
+    ) -> Dict[str, bool]:
+        """Check if the given codes are available in the given project.
+
+        All the codes are checked with a single query, which makes it the
+        preferred way of checking the codes of many Shots, i.e. while importing
+        an EDL.
+
+        Args:
+            codes (Iterable[str]): The codes to check the availability of.
+            project (Project): The stalker.models.project.Project instance that the
+                shots are going to be a part of.
+
+        Raises:
+            TypeError: If any of the codes is not a str or the project is not a
+                Project instance.
+
+        Returns:
+            Dict[str, bool]: A dictionary with the codes as keys and True as value
+                if the code is available, False otherwise.
+        """
+        codes = list(codes)
+        for code in codes:
+            if not isinstance(code, str):
+                raise TypeError(
+                    "code should be a string containing a shot code, "
+                    f"not {code.__class__.__name__}: '{code}'"
+                )
+
         from stalker import Project
 
         if not isinstance(project, Project):
@@ -367,22 +436,99 @@ class Shot(Task, CodeMixin):
                 f"not {project.__class__.__name__}: '{project}'"
             )
 
-        try:
-            logger.debug("Try checking Shot.code with SQL expression.")
-            with DBSession.no_autoflush:
-                return (
-                    Shot.query.filter(Shot.project == project)
-                    .filter(Shot.code == code)
-                    .first()
-                    is None
-                )
-        except (UnboundExecutionError, OperationalError):
+        availability = dict.fromkeys(codes, True)
+        if not codes:
+            return availability
+
+        checked_codes = _checked_codes.get()
+        if (
+            checked_codes is not None
+            and checked_codes[0] is project
+            and checked_codes[1].issuperset(codes)
+        ):
+            return availability
+
+        taken_codes = None
+        if project.id is not None:
+            try:
+                logger.debug("Try checking Shot.code with SQL expression.")
+                with DBSession.no_autoflush:
+                    taken_codes = set(
+                        DBSession.scalars(
+                            select(Shot.code)
+                            .where(Shot.shot_project_id == project.id)
+                            .where(Shot.code.in_(set(codes)))
+                        )
+                    )
+            except (UnboundExecutionError, OperationalError):
+                logger.debug("SQL expression failed, falling back to Python!")
+
+        if taken_codes is None:
             # Fallback to Python
-            logger.debug("SQL expression failed, falling back to Python!")
-            for t in project.tasks:
-                if isinstance(t, Shot) and t.code == code:
-                    return False
-        return True
+            taken_codes = set(t.code for t in project.tasks if isinstance(t, Shot))
+
+        for code in taken_codes.intersection(availability):
+            availability[code] = False
+        return availability
+
+    @classmethod
+    def create_shots(
+        cls,
+        project: "Project",
+        shots: Iterable[Dict[str, Any]],
+        **kwargs: Dict[str, Any],
+    ) -> List["Shot"]:
+        """Create many Shots in the given project at once, i.e. from an EDL.
+
+        The availability of the codes are checked with a single query instead of
+        one query per Shot. The created Shots are not added to the session.
+
+        Args:
+            project (Project): The stalker.models.project.Project instance that the
+                shots are going to be a part of.
+            shots (Iterable[Dict[str, Any]]): The keyword arguments of each Shot,
+                each one should at least have the ``code`` key.
+            kwargs (Dict[str, Any]): The keyword arguments that are common for all
+                the Shots, like ``sequence`` or ``status_list``.
+
+        Raises:
+            ValueError: If any of the codes is used more than once or there are
+                already Shots with the same codes in the given project.
+
+        Returns:
+            List[Shot]: The created Shot instances.
+        """
+        shots = [dict(kwargs, **shot_kwargs) for shot_kwargs in shots]
+        codes = [shot_kwargs.get("code") for shot_kwargs in shots]
+
+        seen_codes = set()
+        duplicate_codes = set()
+        for code in filter(None, codes):
+            if code in seen_codes:
+                duplicate_codes.add(code)
+            seen_codes.add(code)
+        if duplicate_codes:
+            raise ValueError(
+                "The same code is used for more than one Shot: "
+                f"{', '.join(sorted(duplicate_codes))}"
+            )
+
+        availability = cls.check_codes_availability(
+            [code for code in codes if code], project
+        )
+        taken_codes = sorted(
+            code for code, available in availability.items() if not available
+        )
+        if taken_codes:
+            raise ValueError(
+                f"There are Shots with the same codes: {', '.join(taken_codes)}"
+            )
+
+        token = _checked_codes.set((project, frozenset(availability)))
+        try:
+            return [cls(project=project, **shot_kwargs) for shot_kwargs in shots]
+        finally:
+            _checked_codes.reset(token)
 
     def _fps_getter(self) -> float:
         """Return the fps value either from the Project or from the _fps attribute.
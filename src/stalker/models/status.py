@@ -2,14 +2,18 @@
 """Status and StatusList related functions and classes are situated here."""
 from typing import Any, Dict, List, Optional, Type, Union
 
-from sqlalchemy import Column, ForeignKey, Integer, Table
-from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy import Column, ForeignKey, Integer, Table, event
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, validates
 
 from stalker.db.declarative import Base
 from stalker.db.session import DBSession
 from stalker.log import get_logger
 from stalker.models.entity import Entity
-from stalker.models.mixins import CodeMixin, TargetEntityTypeMixin
+from stalker.models.mixins import (
+    CodeMixin,
+    TargetEntityTypeMixin,
+    invalidate_default_status_lists,
+)
 
 logger = get_logger(__name__)
 
@@ -300,3 +304,10 @@ StatusList_Statuses = Table(
     Column("status_list_id", Integer, ForeignKey("StatusLists.id"), primary_key=True),
     Column("status_id", Integer, ForeignKey("Statuses.id"), primary_key=True),
 )
+
+
+# a new StatusList can be the default StatusList of a StatusMixin class
+for identifier in ["after_insert", "after_delete"]:
+    event.listen(StatusList, identifier, invalidate_default_status_lists)
+event.listen(StatusList._target_entity_type, "set", invalidate_default_status_lists)
+event.listen(Session, "after_soft_rollback", invalidate_default_status_lists)
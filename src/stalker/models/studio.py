@@ -1,11 +1,12 @@
 # -*- coding: utf-8 -*-
 """Studio, WorkingHours and Vacation related functions and classes are situated here."""
 
+import bisect
 import copy
 import datetime
 import time
 from math import ceil
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import pytz
 
@@ -20,6 +21,7 @@ from sqlalchemy.orm import (
 )
 
 from stalker import defaults, log
+from stalker.db.cache import reference_cache
 from stalker.db.session import DBSession
 from stalker.db.types import GenericDateTime, GenericJSON
 from stalker.models.auth import User
@@ -29,6 +31,8 @@ from stalker.models.mixins import DateRangeMixin, WorkingHoursMixin
 from stalker.models.project import Project
 from stalker.models.schedulers import SchedulerBase
 from stalker.models.status import Status
+from stalker.models.task import Task, Task_Computed_Resources, TimeLog
+from stalker.tjp import StudioEmitter, VacationEmitter, WorkingHoursEmitter
 
 
 logger = log.get_logger(__name__)
@@ -343,37 +347,7 @@ class Studio(Entity, DateRangeMixin, WorkingHoursMixin):
         Returns:
             str: The TaskJuggler representation of this Studio.
         """
-        start = time.time()
-
-        tab = "    "
-        indent = tab
-        now = self.round_time(self.now).astimezone(pytz.utc).strftime("%Y-%m-%d-%H:%M")
-        tjp = (
-            f'project {self.tjp_id} "{self.tjp_id}" '
-            f"{self.start.date()} - {self.end.date()} {{"
-        )
-        timing_resolution = (
-            self.timing_resolution.days * 86400 + self.timing_resolution.seconds // 60
-        )
-        tjp += f"\n{indent}timingresolution {timing_resolution}min"
-        tjp += f"\n{indent}now {now}"
-        tjp += f"\n{indent}dailyworkinghours {self.daily_working_hours}"
-        tjp += f"\n{indent}weekstartsmonday"
-
-        # working hours
-        tjp += "\n"
-        tjp += "\n".join(
-            f"{indent}{line}" for line in self.working_hours.to_tjp.split("\n")
-        )
-
-        tjp += f'\n{indent}timeformat "%Y-%m-%d"'
-        tjp += f'\n{indent}scenario plan "Plan"'
-        tjp += f"\n{indent}trackingscenario plan"
-        tjp += "\n}"
-
-        end = time.time()
-        logger.debug("render studio to tjp took: {:0.3f} seconds".format(end - start))
-        return tjp
+        return StudioEmitter(self).render()
 
     @property
     def projects(self) -> List[Project]:
@@ -392,7 +366,7 @@ class Studio(Entity, DateRangeMixin, WorkingHoursMixin):
             List[Project]: List of active Project instances in this studio.
         """
         with DBSession.no_autoflush:
-            wip = Status.query.filter_by(code="WIP").first()
+            wip = reference_cache.find(Status, code="WIP")
         return Project.query.filter(Project.status == wip).all()
 
     @property
@@ -403,7 +377,7 @@ class Studio(Entity, DateRangeMixin, WorkingHoursMixin):
             List[Project]: List of inactive Project instances in this studio.
         """
         with DBSession.no_autoflush:
-            wip = Status.query.filter_by(code="WIP").first()
+            wip = reference_cache.find(Status, code="WIP")
         return Project.query.filter(Project.status != wip).all()
 
     @property
@@ -433,6 +407,289 @@ class Studio(Entity, DateRangeMixin, WorkingHoursMixin):
         """
         return Vacation.query.filter(Vacation.user == None).all()  # noqa: E711
 
+    def working_calendar(self, user: Optional[User] = None) -> "WorkingCalendar":
+        """Return the compiled working calendar of the studio or the given user.
+
+        Args:
+            user (Optional[User]): The user whose vacations are excluded from the
+                working hours together with the studio vacations.
+
+        Raises:
+            TypeError: If the user is not None and not a User instance.
+
+        Returns:
+            WorkingCalendar: The compiled calendar.
+        """
+        if user is not None and not isinstance(user, User):
+            raise TypeError(
+                f"{self.__class__.__name__}.working_calendar() user should be a "
+                "stalker.models.auth.User instance, "
+                f"not {user.__class__.__name__}: '{user}'"
+            )
+        vacations = self.vacations
+        if user is not None:
+            vacations += user.vacations
+        return self.working_hours.compile(vacations)
+
+    def resource_utilization(
+        self,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        resolution: Optional[datetime.timedelta] = None,
+        users: Optional[List[User]] = None,
+    ) -> "ResourceUtilization":
+        """Return the scheduled, booked and available seconds of the users.
+
+        The time between start and end is split in to buckets of the given
+        resolution and for each user and bucket the following is calculated:
+
+        * scheduled: The working seconds of the leaf tasks that the user is
+          computed to work on (the :attr:`.Task.computed_resources`) between
+          the :attr:`.Task.computed_start` and :attr:`.Task.computed_end`.
+        * booked: The seconds of the :class:`.TimeLog` s of the user.
+        * available: The working seconds of the user, the studio and the user
+          vacations are excluded.
+
+        The data is read with one query per table and binned with NumPy, so
+        the number of the queries doesn't depend on the number of the users,
+        tasks or time logs. NumPy is an optional dependency of Stalker, install
+        it with ``pip install stalker[numpy]``.
+
+        Args:
+            start (datetime.datetime): The start of the first bucket.
+            end (datetime.datetime): The end of the last bucket. The last
+                bucket is shorter than the resolution if the range is not a
+                multiple of the resolution.
+            resolution (Optional[datetime.timedelta]): The length of the
+                buckets. The default is one day.
+            users (Optional[List[User]]): The users to include, all the users are
+                included if skipped.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            TypeError: If start or end is not a datetime.datetime, resolution is
+                not a datetime.timedelta or users is not a list of User
+                instances.
+            ValueError: If end is not after start or resolution is not
+                positive.
+
+        Returns:
+            ResourceUtilization: The matrices with the users as rows and the
+                buckets as columns.
+        """
+        numpy = _import_numpy()
+        if resolution is None:
+            resolution = datetime.timedelta(days=1)
+        for name, value in [("start", start), ("end", end)]:
+            if not isinstance(value, datetime.datetime):
+                raise TypeError(
+                    f"{self.__class__.__name__}.resource_utilization() {name} "
+                    "should be a datetime.datetime instance, "
+                    f"not {value.__class__.__name__}: '{value}'"
+                )
+        if not isinstance(resolution, datetime.timedelta):
+            raise TypeError(
+                f"{self.__class__.__name__}.resource_utilization() resolution "
+                "should be a datetime.timedelta instance, "
+                f"not {resolution.__class__.__name__}: '{resolution}'"
+            )
+        if end <= start:
+            raise ValueError(
+                f"{self.__class__.__name__}.resource_utilization() end should be "
+                f"after start, not {end} <= {start}"
+            )
+        if resolution <= datetime.timedelta(0):
+            raise ValueError(
+                f"{self.__class__.__name__}.resource_utilization() resolution "
+                f"should be positive, not {resolution}"
+            )
+
+        if users is None:
+            user_ids = [
+                user_id for (user_id,) in DBSession.query(User.id).order_by(User.id)
+            ]
+        else:
+            if not isinstance(users, list) or not all(
+                isinstance(user, User) for user in users
+            ):
+                raise TypeError(
+                    f"{self.__class__.__name__}.resource_utilization() users "
+                    "should be a list of stalker.models.auth.User instances, "
+                    f"not {users.__class__.__name__}: '{users}'"
+                )
+            user_ids = [user.id for user in users]
+        rows = {user_id: i for i, user_id in enumerate(user_ids)}
+
+        # the bucket edges as seconds after the calendar epoch
+        start_seconds = WorkingCalendar._to_seconds(start, "start")
+        end_seconds = WorkingCalendar._to_seconds(end, "end")
+        bucket_count = -((start - end) // resolution)
+        edges = numpy.append(
+            start_seconds + resolution.total_seconds() * numpy.arange(bucket_count),
+            end_seconds,
+        )
+        studio_calendar, calendars, scheduled_rows, booked_rows = (
+            self._query_utilization(start, end, rows)
+        )
+        scheduled, booked, available = self._bin_utilization(
+            numpy,
+            edges,
+            rows,
+            studio_calendar,
+            calendars,
+            self._intervals_by_user(numpy, scheduled_rows, rows),
+            self._intervals_by_user(numpy, booked_rows, rows),
+        )
+
+        bucket_edges = numpy.datetime64(CALENDAR_EPOCH, "us") + numpy.round(
+            edges * 1e6
+        ).astype("timedelta64[us]")
+        return ResourceUtilization(user_ids, bucket_edges, scheduled, booked, available)
+
+    def _query_utilization(
+        self, start: datetime.datetime, end: datetime.datetime, rows: Dict[int, int]
+    ) -> Tuple[
+        "WorkingCalendar", Dict[int, "WorkingCalendar"], List[Tuple], List[Tuple]
+    ]:
+        """Query the vacations, the scheduled tasks and the time logs in the range.
+
+        Args:
+            start (datetime.datetime): The start of the range.
+            end (datetime.datetime): The end of the range.
+            rows (Dict[int, int]): The row index of the included users.
+
+        Returns:
+            Tuple[WorkingCalendar, Dict[int, WorkingCalendar], List[Tuple],
+                List[Tuple]]: The calendar of the studio, the calendars of the
+                users with vacations and the user id, start and end of the
+                scheduled tasks and the time logs.
+        """
+        # only the vacations in the range change the working seconds in it
+        studio_vacations = []
+        user_vacations: Dict[int, List[Vacation]] = {}
+        for vacation in Vacation.query.filter(
+            Vacation.start < end, Vacation.end > start
+        ):
+            if vacation.user_id is None:
+                studio_vacations.append(vacation)
+            elif vacation.user_id in rows:
+                user_vacations.setdefault(vacation.user_id, []).append(vacation)
+        studio_calendar = self.working_hours.compile(studio_vacations)
+        calendars = {
+            user_id: self.working_hours.compile(studio_vacations + vacations)
+            for user_id, vacations in user_vacations.items()
+        }
+
+        leaf_tasks = ~Task.id.in_(
+            DBSession.query(Task.parent_id).filter(Task.parent_id != None)  # noqa: E711
+        )
+        scheduled_rows = (
+            DBSession.query(
+                Task_Computed_Resources.c.resource_id,
+                Task.computed_start,
+                Task.computed_end,
+            )
+            .join(Task, Task.id == Task_Computed_Resources.c.task_id)
+            .filter(Task.computed_start < end)
+            .filter(Task.computed_end > start)
+            .filter(leaf_tasks)
+            .all()
+        )
+        booked_rows = (
+            DBSession.query(TimeLog.resource_id, TimeLog.start, TimeLog.end)
+            .filter(TimeLog.start < end)
+            .filter(TimeLog.end > start)
+            .all()
+        )
+        return studio_calendar, calendars, scheduled_rows, booked_rows
+
+    @staticmethod
+    def _bin_utilization(
+        numpy: Any,
+        edges: Any,
+        rows: Dict[int, int],
+        studio_calendar: "WorkingCalendar",
+        calendars: Dict[int, "WorkingCalendar"],
+        scheduled_by_user: Dict[int, Tuple[Any, Any]],
+        booked_by_user: Dict[int, Tuple[Any, Any]],
+    ) -> Tuple[Any, Any, Any]:
+        """Bin the scheduled, booked and available seconds of the users.
+
+        Args:
+            numpy (module): The numpy module.
+            edges (numpy.ndarray): The bucket edges as seconds after the
+                calendar epoch.
+            rows (Dict[int, int]): The row index of the included users.
+            studio_calendar (WorkingCalendar): The calendar of the studio.
+            calendars (Dict[int, WorkingCalendar]): The calendars of the users
+                with vacations.
+            scheduled_by_user (Dict[int, Tuple[numpy.ndarray, numpy.ndarray]]):
+                The scheduled intervals of the users.
+            booked_by_user (Dict[int, Tuple[numpy.ndarray, numpy.ndarray]]): The
+                booked intervals of the users.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]: The scheduled,
+                booked and available seconds with the users as rows and the
+                buckets as columns.
+        """
+        shape = (len(rows), len(edges) - 1)
+        scheduled = numpy.zeros(shape)
+        booked = numpy.zeros(shape)
+        available = numpy.zeros(shape)
+        studio_edges = studio_calendar._working_seconds_array(edges)
+        for user_id, row in rows.items():
+            calendar = calendars.get(user_id, studio_calendar)
+            working_edges = (
+                studio_edges
+                if calendar is studio_calendar
+                else calendar._working_seconds_array(edges)
+            )
+            available[row] = numpy.diff(working_edges)
+            if user_id in scheduled_by_user:
+                interval_starts, interval_ends = scheduled_by_user[user_id]
+                scheduled[row] = _bin_intervals(
+                    numpy,
+                    calendar._working_seconds_array(interval_starts),
+                    calendar._working_seconds_array(interval_ends),
+                    working_edges,
+                )
+            if user_id in booked_by_user:
+                interval_starts, interval_ends = booked_by_user[user_id]
+                booked[row] = _bin_intervals(
+                    numpy, interval_starts, interval_ends, edges
+                )
+        return scheduled, booked, available
+
+    @staticmethod
+    def _intervals_by_user(
+        numpy: Any, interval_rows: List[Tuple], rows: Dict[int, int]
+    ) -> Dict[int, Tuple[Any, Any]]:
+        """Group the given intervals by their users.
+
+        Args:
+            numpy (module): The numpy module.
+            interval_rows (List[Tuple]): The user id, start and end of the
+                intervals.
+            rows (Dict[int, int]): The row index of the included users.
+
+        Returns:
+            Dict[int, Tuple[numpy.ndarray, numpy.ndarray]]: The start and end
+                of the intervals of each user as seconds after the calendar
+                epoch.
+        """
+        grouped: Dict[int, Tuple[List[float], List[float]]] = {}
+        for user_id, interval_start, interval_end in interval_rows:
+            if user_id not in rows:
+                continue
+            starts, ends = grouped.setdefault(user_id, ([], []))
+            starts.append(WorkingCalendar._to_seconds(interval_start))
+            ends.append(WorkingCalendar._to_seconds(interval_end))
+        return {
+            user_id: (numpy.array(starts), numpy.array(ends))
+            for user_id, (starts, ends) in grouped.items()
+        }
+
     def schedule(self, scheduled_by: Optional[User] = None) -> str:
         """Schedule all the active projects in the studio.
 
@@ -747,6 +1004,7 @@ class WorkingHours(Entity):
             KeyError: If the given key value is not one of the day names.
         """
         self._validate_working_hours_value(value)
+        self._calendar = None
         if isinstance(key, int):
             self.working_hours[defaults.day_order[key]] = value
         elif isinstance(key, str):
@@ -810,6 +1068,9 @@ class WorkingHours(Entity):
     def is_working_hour(self, check_for_date: datetime.datetime) -> bool:
         """Check if the given datetime is in working hours.
 
+        The local wall-clock time of the given datetime is checked, so timezone
+        aware datetimes are not converted to UTC.
+
         Args:
             check_for_date (datetime.datetime): The time value to check if it
                 is a working hour.
@@ -818,24 +1079,9 @@ class WorkingHours(Entity):
             bool: True if the given datetime coincides to a working hour, False
                 otherwise.
         """
-        weekday_nr = check_for_date.weekday()
-        hour = check_for_date.hour
-        minute = check_for_date.minute
-
-        time_from_midnight = hour * 60 + minute
-
-        # check if the hour is inside the working hour ranges
-        logger.debug(f"checking for: {time_from_midnight}")
-        logger.debug(f"self[weekday_nr]: {self[weekday_nr]}")
-        for working_hour_groups in self[weekday_nr]:
-            start = working_hour_groups[0]
-            end = working_hour_groups[1]
-            logger.debug(f"start       : {start}")
-            logger.debug(f"end         : {end}")
-            if start <= time_from_midnight < end:
-                return True
-
-        return False
+        if isinstance(check_for_date, datetime.datetime):
+            check_for_date = check_for_date.replace(tzinfo=None)
+        return self.compile().is_working_hour(check_for_date)
 
     def _validate_working_hours_value(self, value: List) -> List:
         """Validate the working hour value.
@@ -905,23 +1151,7 @@ class WorkingHours(Entity):
         Returns:
             str: The TaskJuggler representation.
         """
-        tjp = ""
-        for i, day in enumerate(["mon", "tue", "wed", "thu", "fri", "sat", "sun"]):
-            if i != 0:
-                tjp += "\n"
-            tjp += f"workinghours {day} "
-            if self[day]:
-                for i, part in enumerate(self[day]):
-                    start_hour, end_hour = part
-                    if i != 0:
-                        tjp += ", "
-                    tjp += (
-                        f"{start_hour // 60:02d}:{start_hour % 60:02d} - "
-                        f"{end_hour // 60:02d}:{end_hour % 60:02d}"
-                    )
-            else:
-                tjp += "off"
-        return tjp
+        return WorkingHoursEmitter(self).render()
 
     @property
     def weekly_working_hours(self) -> int:
@@ -993,19 +1223,78 @@ class WorkingHours(Entity):
             )
         return daily_working_hours
 
+    def compile(
+        self, vacations: Optional[List["Vacation"]] = None
+    ) -> "WorkingCalendar":
+        """Compile the working hours into a :class:`.WorkingCalendar`.
+
+        The calendar without any vacations is cached until the working hours
+        are set or changed with ``__setitem__``.
+
+        Args:
+            vacations (Optional[List[Vacation]]): The vacations to exclude from
+                the working hours.
+
+        Returns:
+            WorkingCalendar: The compiled calendar.
+        """
+        if vacations:
+            return WorkingCalendar(self, vacations)
+        working_hours = self.working_hours
+        cached = getattr(self, "_calendar", None)
+        if cached is None or cached[0] is not working_hours:
+            cached = (working_hours, WorkingCalendar(self))
+            self._calendar = cached
+        return cached[1]
+
+    def working_seconds_between(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> float:
+        """Return the working seconds between the given datetimes.
+
+        See :meth:`.WorkingCalendar.working_seconds_between` for details.
+
+        Args:
+            start (datetime.datetime): The start.
+            end (datetime.datetime): The end.
+
+        Returns:
+            float: The working seconds between start and end.
+        """
+        return self.compile().working_seconds_between(start, end)
+
+    def add_working_seconds(
+        self, start: datetime.datetime, seconds: Union[int, float]
+    ) -> datetime.datetime:
+        """Return the moment that is the given working seconds after the start.
+
+        See :meth:`.WorkingCalendar.add_working_seconds` for details.
+
+        Args:
+            start (datetime.datetime): The start.
+            seconds (Union[int, float]): The working seconds to add.
+
+        Returns:
+            datetime.datetime: The moment.
+        """
+        return self.compile().add_working_seconds(start, seconds)
+
     def split_in_to_working_hours(
         self, start: datetime.datetime, end: datetime.datetime
-    ) -> List[datetime.datetime]:
+    ) -> List[Tuple[datetime.datetime, datetime.datetime]]:
         """Split the given start and end datetime objects in to working hours.
 
+        See :meth:`.WorkingCalendar.split_in_to_working_hours` for details.
+
         Args:
             start (datetime.datetime): The start date and time.
             end (datetime.datetime): The end date and time.
 
-        Raises:
-            NotImplementedError: Unless this is implemented.
+        Returns:
+            List[Tuple[datetime.datetime, datetime.datetime]]: The start and end of
+                the working hour ranges between start and end.
         """
-        raise NotImplementedError()
+        return self.compile().split_in_to_working_hours(start, end)
 
 
 class Vacation(SimpleEntity, DateRangeMixin):
@@ -1089,7 +1378,636 @@ class Vacation(SimpleEntity, DateRangeMixin):
         Returns:
             str: The rendered tjp template.
         """
-        tjp = "vacation "
-        tjp += f"{self.start.astimezone(pytz.utc).strftime('%Y-%m-%d-%H:%M:%S')} - "
-        tjp += f"{self.end.astimezone(pytz.utc).strftime('%Y-%m-%d-%H:%M:%S')}"
-        return tjp
+        return VacationEmitter(self).render()
+
+
+# the calendar seconds are counted from the midnight of this Monday
+CALENDAR_EPOCH = datetime.datetime(1970, 1, 5)
+WEEK_SECONDS = 7 * 86400
+
+
+def _import_numpy() -> Any:
+    """Import NumPy which is needed by the vectorized calendar methods.
+
+    NumPy is an optional dependency, it is installed with the ``numpy`` extra
+    of Stalker.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+
+    Returns:
+        module: The numpy module.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            "NumPy is needed for the vectorized WorkingCalendar methods and "
+            "Studio.resource_utilization(), please install it with: "
+            "pip install stalker[numpy]"
+        )
+    return numpy
+
+
+class WorkingCalendar(object):
+    """The compiled form of the working hours and vacations.
+
+    The working hours of a week are compiled into a sorted list of working
+    intervals, as seconds after the midnight of Monday, together with the
+    cumulative working seconds before each interval. The vacations are merged
+    into a sorted list of intervals together with the cumulative working
+    seconds that they cover. So the working seconds from any moment to any
+    other moment and the moment that is a certain number of working seconds
+    after any moment are calculated with a couple of binary searches,
+    regardless of how far apart the moments are.
+
+    The naive datetimes are used as they are and the timezone aware datetimes
+    are converted to UTC, so the working hours are in UTC for the timezone aware
+    datetimes, as they are for TaskJuggler. The calendars are created with
+    :meth:`.WorkingHours.compile` or :meth:`.Studio.working_calendar`::
+
+      calendar = studio.working_calendar(user)
+      calendar.working_seconds_between(start, end)
+      calendar.add_working_seconds(start, 8 * 3600)
+
+    The ``*_many`` methods are vectorized variants which need NumPy, which is
+    an optional dependency installed with ``pip install stalker[numpy]``.
+
+    Args:
+        working_hours (WorkingHours): The working hours.
+        vacations (Optional[List[Vacation]]): The vacations to exclude from the
+            working hours.
+    """
+
+    def __init__(
+        self,
+        working_hours: "WorkingHours",
+        vacations: Optional[List["Vacation"]] = None,
+    ) -> None:
+        if not isinstance(working_hours, WorkingHours):
+            raise TypeError(
+                f"{self.__class__.__name__}.working_hours should be a "
+                "stalker.models.studio.WorkingHours instance, not "
+                f"{working_hours.__class__.__name__}: '{working_hours}'"
+            )
+        if vacations is None:
+            vacations = []
+
+        # the working intervals of the week, as seconds after Monday 00:00
+        intervals = sorted(
+            (day * 86400 + start * 60, day * 86400 + end * 60)
+            for day in range(7)
+            for start, end in working_hours[day]
+            if end > start
+        )
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for start, end in self._merge(intervals):
+            self.starts.append(start)
+            self.ends.append(end)
+        self.cumulative: List[int] = []
+        self.cumulative_ends: List[int] = []
+        total = 0
+        for start, end in zip(self.starts, self.ends):
+            self.cumulative.append(total)
+            total += end - start
+            self.cumulative_ends.append(total)
+        self.weekly_working_seconds = total
+
+        # the vacations and the working seconds they cover
+        vacation_intervals = []
+        for vacation in vacations:
+            if not isinstance(vacation, Vacation):
+                raise TypeError(
+                    f"{self.__class__.__name__}.vacations should be a list of "
+                    "stalker.models.studio.Vacation instances, not "
+                    f"{vacation.__class__.__name__}: '{vacation}'"
+                )
+            vacation_intervals.append(
+                (self._to_seconds(vacation.start), self._to_seconds(vacation.end))
+            )
+        self.vacation_starts: List[float] = []
+        self.vacation_ends: List[float] = []
+        # the working seconds covered by the vacations before each vacation
+        self.vacation_cumulative: List[float] = [0]
+        # the working seconds before each vacation, excluding the vacations
+        self.vacation_offsets: List[float] = []
+        for start, end in self._merge(sorted(vacation_intervals)):
+            self.vacation_starts.append(start)
+            self.vacation_ends.append(end)
+            self.vacation_offsets.append(
+                self._weekly_seconds(start) - self.vacation_cumulative[-1]
+            )
+            self.vacation_cumulative.append(
+                self.vacation_cumulative[-1]
+                + self._weekly_seconds(end)
+                - self._weekly_seconds(start)
+            )
+
+    @staticmethod
+    def _merge(intervals: List[Tuple[Any, Any]]) -> List[Tuple[Any, Any]]:
+        """Merge the overlapping and touching intervals.
+
+        Args:
+            intervals (List[Tuple[Any, Any]]): The intervals sorted by their start.
+
+        Returns:
+            List[Tuple[Any, Any]]: The merged intervals.
+        """
+        merged: List[Tuple[Any, Any]] = []
+        for start, end in intervals:
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    @classmethod
+    def _to_seconds(cls, date: datetime.datetime, name: str = "date") -> float:
+        """Convert the given datetime to the seconds after the calendar epoch.
+
+        Args:
+            date (datetime.datetime): The datetime.
+            name (str): The name of the argument for the error message.
+
+        Raises:
+            TypeError: If the date is not a datetime.datetime instance.
+
+        Returns:
+            float: The seconds after :data:`.CALENDAR_EPOCH`.
+        """
+        if not isinstance(date, datetime.datetime):
+            raise TypeError(
+                f"{cls.__name__}: {name} should be a datetime.datetime instance, "
+                f"not {date.__class__.__name__}: '{date}'"
+            )
+        if date.tzinfo is not None:
+            date = date.astimezone(pytz.utc).replace(tzinfo=None)
+        return (date - CALENDAR_EPOCH).total_seconds()
+
+    @staticmethod
+    def _to_datetime(
+        seconds: float, tzinfo: Optional[datetime.tzinfo]
+    ) -> datetime.datetime:
+        """Convert the given seconds after the calendar epoch to a datetime.
+
+        Args:
+            seconds (float): The seconds after :data:`.CALENDAR_EPOCH`.
+            tzinfo (Optional[datetime.tzinfo]): The timezone of the returned
+                datetime, a naive datetime is returned if None.
+
+        Returns:
+            datetime.datetime: The datetime.
+        """
+        date = CALENDAR_EPOCH + datetime.timedelta(seconds=seconds)
+        if tzinfo is None:
+            return date
+        return date.replace(tzinfo=pytz.utc).astimezone(tzinfo)
+
+    def _weekly_seconds(self, seconds: float) -> float:
+        """Return the working seconds from the epoch to the given moment.
+
+        The vacations are not taken into account.
+
+        Args:
+            seconds (float): The seconds after :data:`.CALENDAR_EPOCH`.
+
+        Returns:
+            float: The working seconds.
+        """
+        weeks, seconds = divmod(seconds, WEEK_SECONDS)
+        i = bisect.bisect_right(self.starts, seconds) - 1
+        if i < 0:
+            return weeks * self.weekly_working_seconds
+        return (
+            weeks * self.weekly_working_seconds
+            + self.cumulative[i]
+            + min(seconds - self.starts[i], self.ends[i] - self.starts[i])
+        )
+
+    def _weekly_moment(self, working_seconds: float) -> float:
+        """Return the earliest moment with the given working seconds.
+
+        It is the inverse of :meth:`._weekly_seconds`.
+
+        Args:
+            working_seconds (float): The working seconds from the epoch.
+
+        Returns:
+            float: The seconds after :data:`.CALENDAR_EPOCH`.
+        """
+        weeks, remainder = divmod(working_seconds, self.weekly_working_seconds)
+        if remainder == 0:
+            # the end of the last interval of the previous week
+            weeks -= 1
+            remainder = self.weekly_working_seconds
+        i = bisect.bisect_left(self.cumulative_ends, remainder)
+        return weeks * WEEK_SECONDS + self.starts[i] + remainder - self.cumulative[i]
+
+    def _working_seconds(self, seconds: float) -> float:
+        """Return the working seconds from the epoch to the given moment.
+
+        Args:
+            seconds (float): The seconds after :data:`.CALENDAR_EPOCH`.
+
+        Returns:
+            float: The working seconds excluding the vacations.
+        """
+        k = bisect.bisect_right(self.vacation_starts, seconds) - 1
+        if k >= 0 and seconds < self.vacation_ends[k]:
+            return self.vacation_offsets[k]
+        return self._weekly_seconds(seconds) - self.vacation_cumulative[k + 1]
+
+    def _moment(self, working_seconds: float) -> float:
+        """Return the earliest moment with the given working seconds.
+
+        It is the inverse of :meth:`._working_seconds`.
+
+        Args:
+            working_seconds (float): The working seconds from the epoch,
+                excluding the vacations.
+
+        Returns:
+            float: The seconds after :data:`.CALENDAR_EPOCH`.
+        """
+        k = bisect.bisect_left(self.vacation_offsets, working_seconds)
+        return self._weekly_moment(working_seconds + self.vacation_cumulative[k])
+
+    def is_working_hour(self, date: datetime.datetime) -> bool:
+        """Check if the given datetime is in the working hours.
+
+        Args:
+            date (datetime.datetime): The datetime to check.
+
+        Returns:
+            bool: True if the given datetime is in the working hours and not in a
+                vacation, False otherwise.
+        """
+        seconds = self._to_seconds(date)
+        k = bisect.bisect_right(self.vacation_starts, seconds) - 1
+        if k >= 0 and seconds < self.vacation_ends[k]:
+            return False
+        seconds %= WEEK_SECONDS
+        i = bisect.bisect_right(self.starts, seconds) - 1
+        return i >= 0 and seconds < self.ends[i]
+
+    def working_seconds_between(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> float:
+        """Return the working seconds between the given datetimes.
+
+        Args:
+            start (datetime.datetime): The start.
+            end (datetime.datetime): The end.
+
+        Returns:
+            float: The working seconds between start and end excluding the
+                vacations. It is negative if the end is before the start.
+        """
+        return self._working_seconds(
+            self._to_seconds(end, "end")
+        ) - self._working_seconds(self._to_seconds(start, "start"))
+
+    def add_working_seconds(
+        self, start: datetime.datetime, seconds: Union[int, float]
+    ) -> datetime.datetime:
+        """Return the moment that is the given working seconds after the start.
+
+        Args:
+            start (datetime.datetime): The start.
+            seconds (Union[int, float]): The working seconds to add.
+
+        Raises:
+            TypeError: If the seconds is not an int or float.
+            ValueError: If the seconds is negative or it is positive and there
+                are no working hours.
+
+        Returns:
+            datetime.datetime: The earliest moment after the start that has the
+                given working seconds in between, in the timezone of the start.
+        """
+        start_seconds = self._to_seconds(start, "start")
+        self._validate_seconds(seconds)
+        if seconds == 0:
+            return start
+        return self._to_datetime(
+            self._moment(self._working_seconds(start_seconds) + seconds),
+            start.tzinfo,
+        )
+
+    def _validate_seconds(self, seconds: Union[int, float]) -> None:
+        """Validate the seconds argument of add_working_seconds().
+
+        Args:
+            seconds (Union[int, float]): The working seconds to add.
+
+        Raises:
+            TypeError: If the seconds is not an int or float.
+            ValueError: If the seconds is negative or it is positive and there
+                are no working hours.
+        """
+        if not isinstance(seconds, (int, float)) or isinstance(seconds, bool):
+            raise TypeError(
+                f"{self.__class__.__name__}: seconds should be an int or float, "
+                f"not {seconds.__class__.__name__}: '{seconds}'"
+            )
+        if seconds < 0:
+            raise ValueError(
+                f"{self.__class__.__name__}: seconds should be a non-negative "
+                f"number, not {seconds}"
+            )
+        if seconds > 0 and not self.weekly_working_seconds:
+            raise ValueError(
+                f"{self.__class__.__name__}: there are no working hours to add "
+                f"{seconds} working seconds to"
+            )
+
+    def split_in_to_working_hours(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+        """Split the given range in to the working hours in it.
+
+        Args:
+            start (datetime.datetime): The start.
+            end (datetime.datetime): The end.
+
+        Returns:
+            List[Tuple[datetime.datetime, datetime.datetime]]: The start and end of
+                the working hour ranges between start and end excluding the
+                vacations, in the timezone of the start.
+        """
+        start_seconds = self._to_seconds(start, "start")
+        end_seconds = self._to_seconds(end, "end")
+        ranges: List[Tuple[datetime.datetime, datetime.datetime]] = []
+        if not self.starts or end_seconds <= start_seconds:
+            return ranges
+
+        weeks, seconds = divmod(start_seconds, WEEK_SECONDS)
+        week_start = weeks * WEEK_SECONDS
+        i = bisect.bisect_right(self.ends, seconds)
+        k = bisect.bisect_right(self.vacation_ends, start_seconds)
+        while True:
+            if i == len(self.starts):
+                i = 0
+                week_start += WEEK_SECONDS
+            range_start = max(start_seconds, week_start + self.starts[i])
+            if range_start >= end_seconds:
+                break
+            range_end = min(end_seconds, week_start + self.ends[i])
+            i += 1
+
+            # cut out the vacations
+            while k < len(self.vacation_starts) and (
+                self.vacation_starts[k] < range_end
+            ):
+                if self.vacation_starts[k] > range_start:
+                    ranges.append((range_start, self.vacation_starts[k]))
+                range_start = max(range_start, self.vacation_ends[k])
+                if self.vacation_ends[k] > range_end:
+                    break
+                k += 1
+            if range_start < range_end:
+                ranges.append((range_start, range_end))
+
+        return [
+            (
+                self._to_datetime(range_start, start.tzinfo),
+                self._to_datetime(range_end, start.tzinfo),
+            )
+            for range_start, range_end in ranges
+        ]
+
+    def _to_seconds_array(self, dates: Any, name: str) -> Any:
+        """Convert the given datetimes to an array of seconds after the epoch.
+
+        Args:
+            dates (Any): A sequence of datetime.datetime instances or a NumPy
+                datetime64 array in UTC.
+            name (str): The name of the argument for the error message.
+
+        Returns:
+            numpy.ndarray: The seconds after :data:`.CALENDAR_EPOCH`.
+        """
+        numpy = _import_numpy()
+        if isinstance(dates, numpy.ndarray) and dates.dtype.kind == "M":
+            return (dates - numpy.datetime64(CALENDAR_EPOCH)) / numpy.timedelta64(
+                1, "s"
+            )
+        return numpy.array(
+            [self._to_seconds(date, name) for date in dates], dtype=numpy.float64
+        )
+
+    def _working_seconds_array(self, seconds: Any) -> Any:
+        """Return the working seconds from the epoch to the given moments.
+
+        It is the vectorized variant of :meth:`._working_seconds`.
+
+        Args:
+            seconds (numpy.ndarray): The seconds after :data:`.CALENDAR_EPOCH`.
+
+        Returns:
+            numpy.ndarray: The working seconds excluding the vacations.
+        """
+        numpy = _import_numpy()
+        if not self.starts:
+            return numpy.zeros_like(seconds)
+        starts = numpy.array(self.starts)
+        lengths = numpy.array(self.ends) - starts
+        cumulative = numpy.array(self.cumulative)
+
+        weeks = numpy.floor(seconds / WEEK_SECONDS)
+        week_seconds = seconds - weeks * WEEK_SECONDS
+        i = numpy.searchsorted(starts, week_seconds, side="right") - 1
+        clipped = numpy.maximum(i, 0)
+        within = numpy.where(
+            i < 0,
+            0,
+            cumulative[clipped]
+            + numpy.minimum(week_seconds - starts[clipped], lengths[clipped]),
+        )
+        working_seconds = weeks * self.weekly_working_seconds + within
+        if not self.vacation_starts:
+            return working_seconds
+
+        vacation_starts = numpy.array(self.vacation_starts)
+        k = numpy.searchsorted(vacation_starts, seconds, side="right") - 1
+        clipped = numpy.maximum(k, 0)
+        in_vacation = (k >= 0) & (seconds < numpy.array(self.vacation_ends)[clipped])
+        return numpy.where(
+            in_vacation,
+            numpy.array(self.vacation_offsets)[clipped],
+            working_seconds - numpy.array(self.vacation_cumulative)[k + 1],
+        )
+
+    def working_seconds_between_many(self, starts: Any, ends: Any) -> Any:
+        """Return the working seconds between many pairs of datetimes at once.
+
+        It is the vectorized variant of :meth:`.working_seconds_between` and
+        needs NumPy (``pip install stalker[numpy]``).
+
+        Args:
+            starts (Any): A sequence of datetime.datetime instances or a NumPy
+                datetime64 array in UTC.
+            ends (Any): A sequence of datetime.datetime instances or a NumPy
+                datetime64 array in UTC, with the same length of the starts.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+
+        Returns:
+            numpy.ndarray: The working seconds between each start and end.
+        """
+        return self._working_seconds_array(
+            self._to_seconds_array(ends, "end")
+        ) - self._working_seconds_array(self._to_seconds_array(starts, "start"))
+
+    def add_working_seconds_many(self, starts: Any, seconds: Any) -> Any:
+        """Add the working seconds to many datetimes at once.
+
+        It is the vectorized variant of :meth:`.add_working_seconds` and needs
+        NumPy (``pip install stalker[numpy]``).
+
+        Args:
+            starts (Any): A sequence of datetime.datetime instances or a NumPy
+                datetime64 array in UTC.
+            seconds (Any): A sequence or NumPy array of the non-negative working
+                seconds to add to each start.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            ValueError: If any of the seconds is negative or it is positive and
+                there are no working hours.
+
+        Returns:
+            numpy.ndarray: The datetime64[us] array of the moments in UTC.
+        """
+        numpy = _import_numpy()
+        start_seconds = self._to_seconds_array(starts, "start")
+        seconds = numpy.asarray(seconds, dtype=numpy.float64)
+        if (seconds < 0).any():
+            raise ValueError(
+                f"{self.__class__.__name__}: seconds should be non-negative numbers"
+            )
+        if (seconds > 0).any() and not self.weekly_working_seconds:
+            raise ValueError(
+                f"{self.__class__.__name__}: there are no working hours to add "
+                "working seconds to"
+            )
+
+        result = start_seconds
+        if self.weekly_working_seconds:
+            target = self._working_seconds_array(start_seconds) + seconds
+            k = numpy.searchsorted(
+                numpy.array(self.vacation_offsets), target, side="left"
+            )
+            target = target + numpy.array(self.vacation_cumulative)[k]
+
+            weeks = numpy.floor(target / self.weekly_working_seconds)
+            remainder = target - weeks * self.weekly_working_seconds
+            # the end of the last interval of the previous week
+            at_week_start = remainder == 0
+            weeks = numpy.where(at_week_start, weeks - 1, weeks)
+            remainder = numpy.where(
+                at_week_start, self.weekly_working_seconds, remainder
+            )
+            i = numpy.searchsorted(
+                numpy.array(self.cumulative_ends), remainder, side="left"
+            )
+            moments = (
+                weeks * WEEK_SECONDS
+                + numpy.array(self.starts)[i]
+                + remainder
+                - numpy.array(self.cumulative)[i]
+            )
+            result = numpy.where(seconds == 0, start_seconds, moments)
+
+        return numpy.datetime64(CALENDAR_EPOCH, "us") + numpy.round(
+            result * 1e6
+        ).astype("timedelta64[us]")
+
+
+def _bin_intervals(numpy: Any, starts: Any, ends: Any, edges: Any) -> Any:
+    """Return how much of the given intervals fall in to each bucket.
+
+    The total length of the intervals before a point is the sum of the
+    distances of the point to the interval starts before it minus the sum of
+    the distances to the interval ends before it, which are calculated for all
+    the edges at once with the sorted starts and ends and their cumulative
+    sums.
+
+    Args:
+        numpy (module): The numpy module.
+        starts (numpy.ndarray): The starts of the intervals.
+        ends (numpy.ndarray): The ends of the intervals.
+        edges (numpy.ndarray): The sorted edges of the buckets.
+
+    Returns:
+        numpy.ndarray: The total length of the intervals in each bucket.
+    """
+    # shift the values closer to zero to keep the precision of the sums
+    origin = edges[0]
+    edges = edges - origin
+    starts = starts - origin
+    ends = numpy.sort(numpy.maximum(ends - origin, starts))
+    starts = numpy.sort(starts)
+
+    def covered(points: Any) -> Any:
+        start_count = numpy.searchsorted(starts, points, side="right")
+        end_count = numpy.searchsorted(ends, points, side="right")
+        start_sums = numpy.concatenate(([0.0], numpy.cumsum(starts)))
+        end_sums = numpy.concatenate(([0.0], numpy.cumsum(ends)))
+        return (
+            start_count * points
+            - start_sums[start_count]
+            - end_count * points
+            + end_sums[end_count]
+        )
+
+    return numpy.diff(covered(edges))
+
+
+class ResourceUtilization(object):
+    """The scheduled, booked and available seconds of the users over time.
+
+    It is created by :meth:`.Studio.resource_utilization`. The rows of the
+    matrices are the users in the order of :attr:`.user_ids` and the columns are
+    the buckets between the consecutive :attr:`.bucket_edges`.
+
+    Args:
+        user_ids (List[int]): The ids of the users of the rows.
+        bucket_edges (numpy.ndarray): The datetime64[us] edges of the buckets in
+            UTC, it is one item longer than the number of the buckets.
+        scheduled (numpy.ndarray): The scheduled working seconds.
+        booked (numpy.ndarray): The seconds of the time logs.
+        available (numpy.ndarray): The working seconds excluding the vacations.
+    """
+
+    def __init__(
+        self,
+        user_ids: List[int],
+        bucket_edges: Any,
+        scheduled: Any,
+        booked: Any,
+        available: Any,
+    ) -> None:
+        self.user_ids = user_ids
+        self.bucket_edges = bucket_edges
+        self.scheduled = scheduled
+        self.booked = booked
+        self.available = available
+
+    def row(self, user: User) -> int:
+        """Return the row index of the given user.
+
+        Args:
+            user (User): The user.
+
+        Raises:
+            ValueError: If the user is not in the report.
+
+        Returns:
+            int: The row index.
+        """
+        return self.user_ids.index(user.id)
@@ -5,8 +5,6 @@ import datetime
 import os
 from typing import Any, Dict, Generator, List, Optional, TYPE_CHECKING, Union
 
-from jinja2 import Template
-
 import pytz
 
 import sqlalchemy
@@ -39,6 +37,7 @@ from sqlalchemy.orm import (
 )
 from sqlalchemy.orm.attributes import AttributeEvent
 
+from stalker.db.cache import reference_cache
 from stalker.db.declarative import Base
 from stalker.db.session import DBSession
 from stalker.exceptions import (
@@ -67,9 +66,12 @@ from stalker.models.mixins import (
     ScheduleMixin,
     StatusMixin,
 )
-from stalker.models.review import Review
+from stalker.models.repository import expandvars
+from stalker.models.review import Review, _is_review_set_queryable
 from stalker.models.status import Status
+from stalker.models.template import FilenameTemplate
 from stalker.models.ticket import Ticket
+from stalker.tjp import TaskEmitter
 from stalker.utils import check_circular_dependency, walk_hierarchy
 
 if TYPE_CHECKING:  # pragma: no cover
@@ -181,6 +183,7 @@ class TimeLog(Entity, DateRangeMixin):
     task_id: Mapped[int] = mapped_column(
         ForeignKey("Tasks.id"),
         nullable=False,
+        index=True,
         doc="""The id of the related task.""",
     )
     task: Mapped["Task"] = relationship(
@@ -193,6 +196,7 @@ class TimeLog(Entity, DateRangeMixin):
     resource_id: Mapped[int] = mapped_column(
         ForeignKey("Users.id"),
         nullable=False,
+        index=True,
     )
     resource: Mapped[User] = relationship(
         primaryjoin="TimeLogs.c.resource_id==Users.c.id",
@@ -960,6 +964,7 @@ class Task(
 
     project_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("Projects.id"),
+        index=True,
         doc="""The id of the owner :class:`.Project` of this Task. This
         attribute is mainly used by **SQLAlchemy** to map a :class:`.Project`
         instance to a Task.
@@ -2157,63 +2162,7 @@ class Task(
         Returns:
             str: The TaskJuggler representation of this task.
         """
-        tab = "    "
-        indent = tab * len(self.parents)
-        has_inner_data = False
-        tjp = f'{indent}task {self.tjp_id} "{self.tjp_id}" {{'
-        if self.priority != 500:
-            has_inner_data = True
-            tjp += f"\n{indent}{tab}priority {self.priority}"
-        if self.task_depends_on:
-            has_inner_data = True
-            tjp += f"\n{indent}{tab}depends "
-            for i, depends_on in enumerate(self.task_depends_on):
-                if i != 0:
-                    tjp += ", "
-                tjp += depends_on.to_tjp
-        if self.is_container:
-            has_inner_data = True
-            for child_task in self.children:
-                tjp += "\n"
-                tjp += child_task.to_tjp
-        if self.resources:
-            has_inner_data = True
-            if self.schedule_constraint:
-                if self.schedule_constraint in [1, 3]:
-                    tjp += f"\n{indent}{tab}start {self.start.astimezone(pytz.utc).strftime('%Y-%m-%d-%H:%M')}"  # noqa: B950
-                if self.schedule_constraint in [2, 3]:
-                    tjp += f"\n{indent}{tab}end {self.end.astimezone(pytz.utc).strftime('%Y-%m-%d-%H:%M')}"  # noqa: B950
-            tjp += f"\n{indent}{tab}{self.schedule_model} {self.schedule_timing}{self.schedule_unit}"  # noqa: B950
-            tjp += f"\n{indent}{tab}allocate "
-            for i, resource in enumerate(sorted(self.resources, key=lambda x: x.id)):
-                if i != 0:
-                    tjp += ", "
-                tjp += resource.tjp_id
-                if not self.alternative_resources:
-                    continue
-                tjp += f" {{\n{indent}{tab}{tab}alternative\n{indent}{tab}{tab}"
-                for i, alt_res in enumerate(
-                    sorted(self.alternative_resources, key=lambda x: x.id)
-                ):
-                    if i != 0:
-                        tjp += ", "
-                    tjp += alt_res.tjp_id
-                tjp += f" select {self.allocation_strategy}"
-                if self.persistent_allocation:
-                    tjp += f"\n{indent}{tab}{tab}persistent"
-                tjp += f"\n{indent}{tab}}}"
-        for time_log in self.time_logs:
-            has_inner_data = True
-            tjp += (
-                f"\n{indent}{tab}booking "
-                f"{time_log.resource.tjp_id} "
-                f"{time_log.start.astimezone(pytz.utc).strftime('%Y-%m-%d-%H:%M:%S')} "
-                f"- "
-                f"{time_log.end.astimezone(pytz.utc).strftime('%Y-%m-%d-%H:%M:%S')} "
-                "{ overtime 2 }"
-            )
-        tjp += f"\n{indent}}}" if has_inner_data else "}"
-        return tjp
+        return TaskEmitter(self).render()
 
     @property
     def level(self) -> int:
@@ -2530,13 +2479,37 @@ class Task(
             List[Ticket]: List of open :class:`stalker.models.ticket.Ticket` instances
                 that are referencing this Task in their links attribute.
         """
-        status_closed = Status.query.filter(Status.name == "Closed").first()
+        status_closed = reference_cache.find(Status, name="Closed")
         return (
             Ticket.query.filter(Ticket.links.contains(self))
             .filter(Ticket.status != status_closed)
             .all()
         )
 
+    @property
+    def ticket_count(self) -> int:
+        """Return the number of tickets referencing this Task in their links.
+
+        The Tickets are counted without loading them.
+
+        Returns:
+            int: The number of the Tickets referencing this Task.
+        """
+        return Ticket.count_tickets(tasks=[self])
+
+    @property
+    def open_ticket_count(self) -> int:
+        """Return the number of open tickets referencing this Task in their links.
+
+        The Tickets are counted without loading them. Use
+        :meth:`.Ticket.count_tickets_by` to count the open tickets of many Tasks
+        with a single query.
+
+        Returns:
+            int: The number of the open Tickets referencing this Task.
+        """
+        return Ticket.count_tickets(open_only=True, tasks=[self])
+
     def walk_dependencies(
         self,
         method: Union[int, str, TraversalDirection] = TraversalDirection.BreadthFirst,
@@ -2862,7 +2835,9 @@ class Task(
         Returns:
             List[Review]: The reviews with the given review number or the
                 latest set of :class:`stalker.models.review.Review` instances
-                if the review number is is skipped or None.
+                if the review number is is skipped or None. They are queried
+                with the ``(task_id, review_number)`` index when the reviews of
+                this task are not loaded yet (see :meth:`.Review.get_review_set`).
         """
         review_set = []
         if review_number is None:
@@ -2887,6 +2862,9 @@ class Task(
                 "integer, not {}".format(self.__class__.__name__, review_number)
             )
 
+        if _is_review_set_queryable(self):
+            return Review.get_review_set(self, review_number)
+
         for review in self.reviews:
             if review.review_number == review_number:
                 review_set.append(review)
@@ -3157,6 +3135,14 @@ class Task(
         Returns:
             str: The rendered file path of this Task.
         """
+        # use the memoized path if nothing naming related has changed since
+        generated_path = getattr(self, "_generated_path", None)
+        if (
+            generated_path is not None
+            and generated_path[0] == FilenameTemplate.render_generation
+        ):
+            return generated_path[1]
+
         # get a suitable FilenameTemplate
         structure = self.project.structure
 
@@ -3178,13 +3164,11 @@ class Task(
                 "of the project".format(entity_type=self.entity_type)
             )
 
-        return os.path.normpath(
-            Template(task_template.path).render(
-                **self._template_variables(),
-                trim_blocks=True,
-                lstrip_blocks=True,
-            )
+        path = os.path.normpath(
+            task_template.render_path(**self._template_variables())
         ).replace("\\", "/")
+        self._generated_path = (FilenameTemplate.render_generation, path)
+        return path
 
     @property
     def absolute_path(self) -> str:
@@ -3198,7 +3182,7 @@ class Task(
         Returns:
             str: The rendered absolute file path of this task.
         """
-        return os.path.normpath(os.path.expandvars(self.path)).replace("\\", "/")
+        return os.path.normpath(expandvars(self.path)).replace("\\", "/")
 
 
 class TaskDependency(Base, ScheduleMixin):
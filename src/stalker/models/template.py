@@ -1,16 +1,43 @@
 # -*- coding: utf-8 -*-
 """FilenameTemplate related functions and classes are situated here."""
+import functools
 from typing import Any, Dict, Optional, Union
 
-from sqlalchemy import ForeignKey, Text
-from sqlalchemy.orm import Mapped, mapped_column, validates
+import jinja2
 
+from sqlalchemy import ForeignKey, Text, event
+from sqlalchemy.orm import Mapped, Mapper, Session, mapped_column, validates
+
+from stalker.db.declarative import Base
 from stalker.log import get_logger
 from stalker.models.entity import Entity
 from stalker.models.mixins import TargetEntityTypeMixin
 
 logger = get_logger(__name__)
 
+# the maximum number of compiled templates to keep in the template cache
+TEMPLATE_CACHE_SIZE = 1024
+
+# the names of the attributes that are used in rendering the paths, setting
+# any of them on any instance invalidates the memoized paths
+NAMING_ATTRIBUTE_NAMES = [
+    "code",
+    "filename",
+    "name",
+    "parent",
+    "path",
+    "project",
+    "revision_number",
+    "scene",
+    "sequence",
+    "structure",
+    "target_entity_type",
+    "task",
+    "templates",
+    "type",
+    "version_number",
+]
+
 
 class FilenameTemplate(Entity, TargetEntityTypeMixin):
     """Holds templates for filename and path conventions.
@@ -78,6 +105,14 @@ class FilenameTemplate(Entity, TargetEntityTypeMixin):
     __auto_name__ = False
     __strictly_typed__ = False
     __tablename__ = "FilenameTemplates"
+
+    # the environment that is used to compile all the templates
+    jinja_environment = jinja2.Environment()
+
+    # incremented every time a naming related attribute changes, so the
+    # memoized paths rendered in an older generation are known to be stale
+    render_generation = 0
+
     __mapper_args__ = {"polymorphic_identity": "FilenameTemplate"}
     filenameTemplate_id: Mapped[int] = mapped_column(
         "id", ForeignKey("Entities.id"), primary_key=True
@@ -157,6 +192,44 @@ class FilenameTemplate(Entity, TargetEntityTypeMixin):
 
         return filename
 
+    @staticmethod
+    @functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+    def compile_template(source: str) -> jinja2.Template:
+        """Return the compiled Jinja2 template of the given template source.
+
+        The compiled templates are cached by their source, so the same template code
+        is only compiled once.
+
+        Args:
+            source (str): The Jinja2 template code.
+
+        Returns:
+            jinja2.Template: The compiled template.
+        """
+        return FilenameTemplate.jinja_environment.from_string(source)
+
+    def render_path(self, **kwargs: Any) -> str:
+        """Render the path template with the given template variables.
+
+        Args:
+            kwargs (Any): The template variables.
+
+        Returns:
+            str: The rendered path.
+        """
+        return self.compile_template(self.path).render(**kwargs)
+
+    def render_filename(self, **kwargs: Any) -> str:
+        """Render the filename template with the given template variables.
+
+        Args:
+            kwargs (Any): The template variables.
+
+        Returns:
+            str: The rendered filename.
+        """
+        return self.compile_template(self.filename).render(**kwargs)
+
     def __eq__(self, other: Any) -> bool:
         """Check the equality.
 
@@ -184,3 +257,49 @@ class FilenameTemplate(Entity, TargetEntityTypeMixin):
             int: The hash value.
         """
         return super(FilenameTemplate, self).__hash__()
+
+
+def invalidate_rendered_paths(*args: Any, **kwargs: Any) -> None:
+    """Invalidate the memoized rendered paths of all the instances.
+
+    It accepts and ignores any arguments, so it can be used as an attribute event
+    listener directly. Call it manually if the templates use attributes that are
+    not listed in :data:`.NAMING_ATTRIBUTE_NAMES`.
+
+    Args:
+        args (Any): Ignored.
+        kwargs (Any): Ignored.
+    """
+    FilenameTemplate.render_generation += 1
+
+
+# a rollback reverts the attributes without triggering any attribute events
+event.listen(Session, "after_soft_rollback", invalidate_rendered_paths)
+
+_watched_mappers = set()
+
+
+@event.listens_for(Mapper, "after_configured")
+def watch_naming_attributes() -> None:
+    """Invalidate the memoized paths when a naming related attribute changes."""
+    for mapper in Base.registry.mappers:
+        if mapper in _watched_mappers:
+            continue
+        _watched_mappers.add(mapper)
+
+        for name in NAMING_ATTRIBUTE_NAMES:
+            if name in mapper.synonyms:
+                name = mapper.synonyms[name].name
+
+            if name in mapper.column_attrs:
+                identifiers = ["set"]
+            elif name in mapper.relationships:
+                identifiers = ["set"]
+                if mapper.relationships[name].uselist:
+                    identifiers += ["append", "remove"]
+            else:
+                continue
+
+            attribute = getattr(mapper.class_, name)
+            for identifier in identifiers:
+                event.listen(attribute, identifier, invalidate_rendered_paths)
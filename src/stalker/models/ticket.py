@@ -1,13 +1,38 @@
 # -*- coding: utf-8 -*-
 """Ticket related functions and classes are situated here."""
+import contextvars
 import uuid
-from typing import Any, Dict, List, Optional, Union
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+)
 
-from sqlalchemy import Column, Integer, String, Text
+import pytz
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    distinct,
+    event,
+    func,
+    insert,
+    select,
+)
 from sqlalchemy.exc import OperationalError, UnboundExecutionError
-from sqlalchemy.orm import Mapped, mapped_column, relationship, synonym
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship, synonym
 from sqlalchemy.orm.mapper import validates
-from sqlalchemy.schema import ForeignKey, Table
+from sqlalchemy.schema import ForeignKey, Sequence, Table
 from sqlalchemy.types import Enum
 
 from stalker.db.declarative import Base
@@ -19,10 +44,22 @@ from stalker.models.entity import Entity, SimpleEntity
 from stalker.models.mixins import StatusMixin
 from stalker.models.note import Note
 from stalker.models.project import Project
-from stalker.models.status import Status
+from stalker.models.status import Status, StatusList
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.sql import Select
+
+    from stalker.models.task import Task
 
 logger = get_logger(__name__)
 
+# the numbers reserved by Ticket.create_tickets(), so the Tickets created there
+# don't allocate their numbers one by one
+_reserved_numbers: contextvars.ContextVar[Optional[Iterator[int]]] = (
+    contextvars.ContextVar("_reserved_numbers", default=None)
+)
+
 # RESOLUTIONS
 FIXED = "fixed"
 INVALID = "invalid"
@@ -114,6 +151,12 @@ class Ticket(Entity, StatusMixin):
     name will be "Ticket#1" and the second "Ticket#2" and so on. For every
     project the number will restart from 1.
 
+    The :attr:`.Ticket.number` is allocated atomically from a database sequence
+    with PostgreSQL and from a counter row with SQLite3 (see
+    :func:`.allocate_ticket_numbers`), so concurrently created Tickets never get
+    the same number. Use :meth:`.Ticket.create_tickets` to create many Tickets
+    at once, which reserves all the numbers in a single round-trip.
+
     Use the :meth:`.Ticket.resolve`, :meth:`.Ticket.reassign`,
     :meth:`.Ticket.accept`, :meth:`.Ticket.reopen` methods to change the status
     of the current Ticket.
@@ -135,7 +178,9 @@ class Ticket(Entity, StatusMixin):
     )
 
     # TODO: use ProjectMixin
-    project_id: Mapped[int] = mapped_column("project_id", ForeignKey("Projects.id"))
+    project_id: Mapped[int] = mapped_column(
+        "project_id", ForeignKey("Projects.id"), index=True
+    )
 
     _project: Mapped[Project] = relationship(
         primaryjoin="Tickets.c.project_id==Projects.c.id",
@@ -262,6 +307,44 @@ class Ticket(Entity, StatusMixin):
 
     project = synonym("_project", descriptor=property(_project_getter))
 
+    @classmethod
+    def create_tickets(
+        cls,
+        tickets: Iterable[Dict[str, Any]],
+        **kwargs: Dict[str, Any],
+    ) -> List["Ticket"]:
+        """Create many Tickets at once, i.e. from a QC bot.
+
+        The numbers of all the Tickets are reserved in a single round-trip
+        instead of one round-trip per Ticket. The created Tickets are not added
+        to the session.
+
+        Args:
+            tickets (Iterable[Dict[str, Any]]): The keyword arguments of each
+                Ticket.
+            kwargs (Dict[str, Any]): The keyword arguments that are common for all
+                the Tickets, like ``project`` or ``reported_by``.
+
+        Returns:
+            List[Ticket]: The created Ticket instances.
+        """
+        tickets = [dict(kwargs, **ticket_kwargs) for ticket_kwargs in tickets]
+        if not tickets:
+            return []
+
+        try:
+            with DBSession.no_autoflush:
+                numbers = allocate_ticket_numbers(DBSession.connection(), len(tickets))
+        except (UnboundExecutionError, OperationalError):
+            start = cls._maximum_number() + 1
+            numbers = list(range(start, start + len(tickets)))
+
+        token = _reserved_numbers.set(iter(numbers))
+        try:
+            return [cls(**ticket_kwargs) for ticket_kwargs in tickets]
+        finally:
+            _reserved_numbers.reset(token)
+
     @classmethod
     def _maximum_number(cls) -> int:
         """Return the maximum available number from the database.
@@ -284,8 +367,15 @@ class Ticket(Entity, StatusMixin):
         Returns:
             int: The auto generated ticket number.
         """
-        # TODO: try to make it atomic
-        return self._maximum_number() + 1
+        reserved_numbers = _reserved_numbers.get()
+        if reserved_numbers is not None:
+            return next(reserved_numbers)
+
+        try:
+            with DBSession.no_autoflush:
+                return allocate_ticket_numbers(DBSession.connection())[0]
+        except (UnboundExecutionError, OperationalError):
+            return self._maximum_number() + 1
 
     @validates("related_tickets")
     def _validate_related_tickets(self, key: str, related_ticket: "Ticket") -> "Ticket":
@@ -378,7 +468,10 @@ class Ticket(Entity, StatusMixin):
     ) -> "TicketLog":
         """Update the ticket status and create a ticket log.
 
-        The log is created according to the Ticket.__available_actions__ dictionary.
+        The transition is looked up from the compiled :confval:`ticket_workflow`
+        (see :class:`.TicketWorkflow`). If the statuses are not flushed yet, the
+        transition is looked up by the status names from the
+        :confval:`ticket_workflow` directly.
 
         Args:
             action (str): The name of the action.
@@ -386,36 +479,309 @@ class Ticket(Entity, StatusMixin):
             action_arg (Any): The argument to pass to the action.
 
         Returns:
-            TicketLog: The TicketLog instance created.
+            TicketLog: The TicketLog instance created or None if the action is not
+                available for the current status.
         """
         from stalker import defaults
 
-        statuses = defaults.ticket_workflow[action].keys()
-        status = self.status.name
-        return_value = None
-        if status in statuses:
-            action_data = defaults.ticket_workflow[action][status]
-            new_status_code = action_data["new_status"]
-            action_name = action_data["action"]
-
-            # there is an action defined for this status
-            # get the to_status
-            from_status = self.status
-            to_status = self.status_list[new_status_code]
-            self.status = to_status
-
-            # call the action with action_arg
-            func = getattr(self, action_name)
-            func(action_arg)
-
-            ticket_log = TicketLog(
-                self, from_status, to_status, action, created_by=created_by
+        transitions = ticket_workflow.transitions(self.status_list)
+        if transitions is not None:
+            transition = transitions.get((self.status.id, action))
+            if transition is None:
+                return None
+            to_status_id, handler_name = transition
+            with DBSession.no_autoflush:
+                to_status = DBSession.get(Status, to_status_id)
+        else:
+            # the statuses have no ids yet, match them by name
+            transition = defaults.ticket_workflow.get(action, {}).get(
+                self.status.name
+            )
+            if transition is None:
+                return None
+            to_status = self.status_list[transition["new_status"]]
+            if to_status is None:
+                return None
+            handler_name = transition["action"]
+
+        from_status = self.status
+        self.status = to_status
+
+        # call the action with action_arg
+        getattr(self, handler_name)(action_arg)
+
+        ticket_log = TicketLog(
+            self, from_status, to_status, action, created_by=created_by
+        )
+
+        # create log entry
+        self.logs.append(ticket_log)
+        return ticket_log
+
+    @classmethod
+    def apply_action(
+        cls,
+        tickets: Iterable["Ticket"],
+        action: str,
+        created_by: Optional[User] = None,
+        action_arg: Any = None,
+    ) -> List["Ticket"]:
+        """Apply the given action to many Tickets at once, i.e. from a QC bot.
+
+        It is the bulk form of the :meth:`.Ticket.resolve`,
+        :meth:`.Ticket.accept`, :meth:`.Ticket.reassign` and
+        :meth:`.Ticket.reopen` methods. The Tickets are grouped by their
+        transitions in the compiled :confval:`ticket_workflow`, and the statuses
+        and the columns set by the handler of each transition are updated with a
+        single ``UPDATE`` statement per transition. The :class:`.TicketLog` s are
+        inserted with a single bulk ``INSERT``. The Tickets that the action is
+        not available for their current status are skipped.
+
+        The Tickets are flushed before the update. The updated attributes of the
+        Tickets are expired, so they are loaded again on next access. Tickets
+        with custom handlers, including the handlers overridden in the Ticket
+        subclasses, which are not known to update the columns
+        directly, are updated one by one.
+
+        Args:
+            tickets (Iterable[Ticket]): The Tickets to apply the action to.
+            action (str): The name of the action, one of the keys of the
+                :confval:`ticket_workflow`.
+            created_by (Optional[User]): The User who is doing the action.
+            action_arg (Any): The argument to pass to the handler, i.e. the
+                resolution for the ``resolve`` action and the new owner for the
+                ``accept`` and ``reassign`` actions.
+
+        Raises:
+            TypeError: If the tickets are not all Ticket instances.
+            ValueError: If the action is not in the :confval:`ticket_workflow`.
+
+        Returns:
+            List[Ticket]: The Tickets that the action is applied to.
+        """
+        from stalker import defaults
+
+        tickets = list(tickets)
+        for ticket in tickets:
+            if not isinstance(ticket, Ticket):
+                raise TypeError(
+                    "Ticket.apply_action() tickets should be a list of "
+                    "stalker.models.ticket.Ticket instances, not "
+                    f"{ticket.__class__.__name__}: '{ticket}'"
+                )
+
+        if action not in defaults.ticket_workflow:
+            raise ValueError(
+                "Ticket.apply_action() action should be one of "
+                f"{sorted(defaults.ticket_workflow)}, not '{action}'"
+            )
+
+        if not tickets:
+            return []
+
+        DBSession.flush()
+
+        # group the tickets by the target status and the handler
+        groups: Dict[Tuple[int, Callable], List[Ticket]] = {}
+        applied_tickets = []
+        with DBSession.no_autoflush:
+            for ticket in tickets:
+                # the statuses are flushed, so the transition table is compiled
+                transition = (
+                    ticket_workflow.transitions(ticket.status_list) or {}
+                ).get((ticket.status_id, action))
+                if transition is not None:
+                    to_status_id, handler_name = transition
+                    handler = getattr(type(ticket), handler_name)
+                    groups.setdefault((to_status_id, handler), []).append(ticket)
+                    applied_tickets.append(ticket)
+
+        now = datetime.now(pytz.utc)
+        created_by_id = created_by.id if created_by is not None else None
+        import stalker
+
+        logs = []
+        for (to_status_id, handler), group in groups.items():
+            values = _handler_column_values.get(handler)
+            if values is None:
+                # a custom handler, apply it on the instances
+                for ticket in group:
+                    ticket.__action__(action, created_by, action_arg)
+                DBSession.flush()
+                continue
+
+            logs.extend(
+                {
+                    "name": "TicketLog_" + uuid.uuid4().hex,
+                    "description": "",
+                    "generic_text": "",
+                    "ticket_id": ticket.id,
+                    "from_status_id": ticket.status_id,
+                    "to_status_id": to_status_id,
+                    "action": action,
+                    "created_by_id": created_by_id,
+                    "updated_by_id": created_by_id,
+                    "date_created": now,
+                    "date_updated": now,
+                    "stalker_version": stalker.__version__,
+                }
+                for ticket in group
+            )
+            DBSession.execute(
+                Ticket.__table__.update()
+                .where(Ticket.__table__.c.id.in_([ticket.id for ticket in group]))
+                .values(status_id=to_status_id, **values(action_arg))
+            )
+            for ticket in group:
+                DBSession.expire(
+                    ticket,
+                    ["status", "status_id", "owner", "owner_id", "resolution", "logs"],
+                )
+
+        if logs:
+            DBSession.execute(insert(TicketLog), logs)
+
+        return applied_tickets
+
+    @classmethod
+    def count_tickets(
+        cls,
+        open_only: bool = False,
+        project: Optional[Project] = None,
+        owner: Optional[User] = None,
+        tasks: Optional[Iterable["Task"]] = None,
+    ) -> int:
+        """Return the number of Tickets without loading them.
+
+        Args:
+            open_only (bool): Count only the Tickets that are not closed. The
+                default is False.
+            project (Optional[Project]): Count only the Tickets of this Project.
+            owner (Optional[User]): Count only the Tickets of this owner.
+            tasks (Optional[Iterable[Task]]): Count only the Tickets referencing
+                any of these Tasks in their links.
+
+        Returns:
+            int: The number of the Tickets.
+        """
+        stmt = cls._count_statement([], open_only, project, owner, tasks)
+        return DBSession.scalar(stmt)
+
+    @classmethod
+    def count_tickets_by(
+        cls,
+        group_by: Union[str, List[str]] = "status",
+        open_only: bool = False,
+        project: Optional[Project] = None,
+        owner: Optional[User] = None,
+        tasks: Optional[Iterable["Task"]] = None,
+    ) -> Dict[Any, int]:
+        """Return the number of Tickets grouped by the given keys.
+
+        The Tickets are counted with a single ``GROUP BY`` query without loading
+        them, i.e. to show the ticket count badges of many Tasks::
+
+          counts = Ticket.count_tickets_by("task", open_only=True, tasks=tasks)
+          badges = [counts.get(task.id, 0) for task in tasks]
+
+        A Ticket is counted once for each Task that it references in its
+        :attr:`.Ticket.links` when grouped by ``task``.
+
+        Args:
+            group_by (Union[str, List[str]]): One or more of ``project``,
+                ``task``, ``owner`` and ``status``. The default is ``status``.
+            open_only (bool): Count only the Tickets that are not closed. The
+                default is False.
+            project (Optional[Project]): Count only the Tickets of this Project.
+            owner (Optional[User]): Count only the Tickets of this owner.
+            tasks (Optional[Iterable[Task]]): Count only the Tickets referencing
+                any of these Tasks in their links.
+
+        Raises:
+            TypeError: If the group_by is not a str or a list of str.
+            ValueError: If the group_by is not one of the available keys.
+
+        Returns:
+            Dict[Any, int]: The number of the Tickets by the id of the group, or
+                by the tuple of ids if a list is given as the group_by. The
+                groups without any Tickets are not included.
+        """
+        keys = [group_by] if isinstance(group_by, str) else group_by
+        if not isinstance(keys, (list, tuple)) or not keys:
+            raise TypeError(
+                "Ticket.count_tickets_by() group_by should be a str or a list of "
+                f"str, not {group_by.__class__.__name__}: '{group_by}'"
+            )
+        for key in keys:
+            if key not in _count_group_by_keys:
+                raise ValueError(
+                    "Ticket.count_tickets_by() group_by should be one of "
+                    f"{sorted(_count_group_by_keys)}, not '{key}'"
+                )
+
+        stmt = cls._count_statement(keys, open_only, project, owner, tasks)
+        counts = {}
+        for row in DBSession.execute(stmt):
+            key = row[0] if isinstance(group_by, str) else tuple(row[:-1])
+            counts[key] = row[-1]
+        return counts
+
+    @staticmethod
+    def _count_statement(
+        group_by: List[str],
+        open_only: bool,
+        project: Optional[Project],
+        owner: Optional[User],
+        tasks: Optional[Iterable["Task"]],
+    ) -> "Select":
+        """Return the statement counting the Tickets.
+
+        Args:
+            group_by (List[str]): The keys to group the Tickets by.
+            open_only (bool): Count only the Tickets that are not closed.
+            project (Optional[Project]): Count only the Tickets of this Project.
+            owner (Optional[User]): Count only the Tickets of this owner.
+            tasks (Optional[Iterable[Task]]): Count only the Tickets referencing
+                any of these Tasks in their links.
+
+        Returns:
+            Select: The statement.
+        """
+        tickets = Ticket.__table__
+        links = Ticket_SimpleEntities
+        columns = {
+            "project": tickets.c.project_id,
+            "task": links.c.simple_entity_id,
+            "owner": tickets.c.owner_id,
+            "status": tickets.c.status_id,
+        }
+        group_by_columns = [columns[key] for key in group_by]
+        stmt = select(*group_by_columns, func.count(distinct(tickets.c.id)))
+        stmt = stmt.select_from(tickets)
+
+        if tasks is not None or "task" in group_by:
+            stmt = stmt.join(links, links.c.ticket_id == tickets.c.id)
+            if tasks is not None:
+                task_ids = [task.id for task in tasks]
+                stmt = stmt.where(links.c.simple_entity_id.in_(task_ids))
+            else:
+                from stalker.models.task import Task
+
+                stmt = stmt.join(
+                    Task.__table__, Task.__table__.c.id == links.c.simple_entity_id
+                )
+
+        if open_only:
+            statuses = Status.__table__
+            stmt = stmt.join(statuses, statuses.c.id == tickets.c.status_id).where(
+                statuses.c.code != "CLS"
             )
+        if project is not None:
+            stmt = stmt.where(tickets.c.project_id == project.id)
+        if owner is not None:
+            stmt = stmt.where(tickets.c.owner_id == owner.id)
 
-            # create log entry
-            self.logs.append(ticket_log)
-            return_value = ticket_log
-        return return_value
+        return stmt.group_by(*group_by_columns)
 
     def resolve(
         self, created_by: Union[None, User] = None, resolution: str = ""
@@ -597,6 +963,67 @@ class TicketLog(SimpleEntity):
         self.action = action
 
 
+# The sequence of the Ticket numbers, only used with PostgreSQL
+Ticket_Number_Sequence = Sequence("Tickets_number_seq", metadata=Base.metadata)
+
+# The counter of the Ticket numbers, only used with SQLite3
+Ticket_Counters = Table(
+    "Ticket_Counters",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("number", Integer, nullable=False),
+)
+
+
+def allocate_ticket_numbers(connection: "Connection", count: int = 1) -> List[int]:
+    """Allocate the given number of unique Ticket numbers atomically.
+
+    All the numbers are allocated in a single round-trip. With PostgreSQL the
+    numbers are drawn from the ``Tickets_number_seq`` sequence, which never
+    blocks concurrent transactions. With SQLite3 the single row of the
+    ``Ticket_Counters`` table is upserted, which is initialized from the
+    maximum Ticket number on first use.
+
+    For other databases the numbers following the maximum Ticket number are
+    returned, which is not atomic.
+
+    Args:
+        connection (Connection): The connection to use.
+        count (int): The number of Ticket numbers to allocate.
+
+    Returns:
+        List[int]: The allocated Ticket numbers in ascending order.
+    """
+    dialect_name = connection.dialect.name
+    if dialect_name == "postgresql":
+        return sorted(
+            connection.scalars(
+                select(Ticket_Number_Sequence.next_value()).select_from(
+                    func.generate_series(1, count)
+                )
+            )
+        )
+
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        maximum_number = select(
+            func.coalesce(func.max(Ticket.__table__.c.number), 0)
+        ).scalar_subquery()
+        stmt = insert(Ticket_Counters).values(id=1, number=maximum_number + count)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Ticket_Counters.c.id],
+            set_={"number": Ticket_Counters.c.number + count},
+        ).returning(Ticket_Counters.c.number)
+        last_number = connection.execute(stmt).scalar_one()
+    else:
+        last_number = (
+            connection.scalar(select(func.max(Ticket.__table__.c.number))) or 0
+        ) + count
+
+    return list(range(last_number - count + 1, last_number + 1))
+
+
 # A secondary Table for Ticket to Ticket relations
 Ticket_Related_Tickets = Table(
     "Ticket_Related_Tickets",
@@ -615,3 +1042,148 @@ Ticket_SimpleEntities = Table(
         "simple_entity_id", Integer, ForeignKey("SimpleEntities.id"), primary_key=True
     ),
 )
+
+
+class TicketWorkflow(object):
+    """The compiled :confval:`ticket_workflow`.
+
+    The :confval:`ticket_workflow` is keyed by the action and the status names.
+    It is compiled once per :class:`.StatusList` into a transition table, which
+    maps the (status id, action) pairs to the (target status id, handler name)
+    pairs, where the handler is the method of the Ticket that is called with
+    the action argument, i.e. :meth:`.Ticket.set_owner`. So looking up the
+    transition of a Ticket is a single dictionary lookup, without comparing the
+    status names or scanning the statuses of the StatusList. The handlers are
+    looked up by name on each Ticket, so the handlers overridden in the Ticket
+    subclasses are respected.
+
+    The StatusLists with statuses that are not flushed yet have no transition
+    table, as their statuses have no ids to key it by.
+
+    The transition tables are compiled again when the
+    :confval:`ticket_workflow` is replaced. They are cleared when the statuses
+    of a StatusList or the name or code of a Status are changed, a transaction
+    is rolled back or a new database is set up. Use :meth:`.invalidate` to
+    clear them after changing the :confval:`ticket_workflow` in place.
+    """
+
+    def __init__(self) -> None:
+        self._workflow: Optional[Dict[str, Dict[str, Dict[str, str]]]] = None
+        self._transitions: Dict[int, Dict[Tuple[int, str], Tuple[int, str]]] = {}
+
+    def invalidate(self) -> None:
+        """Clear the compiled transition tables."""
+        self._transitions = {}
+
+    def transitions(
+        self, status_list: StatusList
+    ) -> Optional[Dict[Tuple[int, str], Tuple[int, str]]]:
+        """Return the transition table of the given StatusList.
+
+        Args:
+            status_list (StatusList): The StatusList of the Tickets.
+
+        Returns:
+            Optional[Dict[Tuple[int, str], Tuple[int, str]]]: The (target status
+                id, handler name) pairs by the (status id, action) pairs, or
+                None if the StatusList or any of its statuses is not flushed
+                yet.
+        """
+        from stalker import defaults
+
+        workflow = defaults.ticket_workflow
+        if workflow is not self._workflow:
+            self._workflow = workflow
+            self._transitions = {}
+
+        if status_list.id is None:
+            return None
+
+        transitions = self._transitions.get(status_list.id)
+        if transitions is None:
+            with DBSession.no_autoflush:
+                if any(status.id is None for status in status_list.statuses):
+                    return None
+            transitions = self.compile(status_list, workflow)
+            self._transitions[status_list.id] = transitions
+        return transitions
+
+    @staticmethod
+    def compile(
+        status_list: StatusList, workflow: Dict[str, Dict[str, Dict[str, str]]]
+    ) -> Dict[Tuple[int, str], Tuple[int, str]]:
+        """Compile the given workflow for the given StatusList.
+
+        The transitions from or to the statuses that are not in the StatusList
+        are skipped.
+
+        Args:
+            status_list (StatusList): The StatusList of the Tickets.
+            workflow (Dict[str, Dict[str, Dict[str, str]]]): The workflow in the
+                format of the :confval:`ticket_workflow`.
+
+        Returns:
+            Dict[Tuple[int, str], Tuple[int, str]]: The (target status id,
+                handler name) pairs by the (status id, action) pairs.
+        """
+        with DBSession.no_autoflush:
+            statuses = list(status_list.statuses)
+
+        status_ids = {status.name: status.id for status in statuses}
+        transitions = {}
+        for action, action_transitions in workflow.items():
+            for status_name, transition in action_transitions.items():
+                if status_name not in status_ids:
+                    continue
+                to_status = next(
+                    (
+                        status
+                        for status in statuses
+                        if status == transition["new_status"]
+                    ),
+                    None,
+                )
+                if to_status is None:
+                    continue
+                transitions[(status_ids[status_name], action)] = (
+                    to_status.id,
+                    transition["action"],
+                )
+        return transitions
+
+
+ticket_workflow = TicketWorkflow()
+
+
+def invalidate_ticket_workflow(*args: Any, **kwargs: Any) -> None:
+    """Clear the compiled transition tables of the ticket workflow.
+
+    It accepts and ignores any arguments, so it can be used as an event listener
+    directly.
+
+    Args:
+        args (Any): Ignored.
+        kwargs (Any): Ignored.
+    """
+    ticket_workflow.invalidate()
+
+
+for identifier in ["append", "remove"]:
+    event.listen(StatusList.statuses, identifier, invalidate_ticket_workflow)
+# the new statuses are matched by name or code
+event.listen(Status.name, "set", invalidate_ticket_workflow)
+event.listen(Status.code, "set", invalidate_ticket_workflow)
+event.listen(Session, "after_soft_rollback", invalidate_ticket_workflow)
+
+# the keys that the Tickets can be grouped by in Ticket.count_tickets_by()
+_count_group_by_keys = ("project", "task", "owner", "status")
+
+# the values of the Tickets table columns set by the handlers of the workflow,
+# so Ticket.apply_action() can update the Tickets set-wise
+_handler_column_values: Dict[Callable, Callable[[Any], Dict[str, Any]]] = {
+    Ticket.set_owner: lambda owner: {
+        "owner_id": owner.id if owner is not None else None
+    },
+    Ticket.set_resolution: lambda resolution: {"resolution": resolution},
+    Ticket.del_resolution: lambda *args: {"resolution": ""},
+}
@@ -3,13 +3,29 @@
 
 import os
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-import jinja2
-
-from sqlalchemy import Column, ForeignKey, Integer, Table
+from typing import Any, Dict, Iterable, List, Optional, Set, TYPE_CHECKING
+
+from sqlalchemy import (
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    Table,
+    case,
+    event,
+    inspect,
+)
 from sqlalchemy.exc import OperationalError, UnboundExecutionError
-from sqlalchemy.orm import Mapped, mapped_column, relationship, synonym, validates
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+    relationship,
+    selectinload,
+    synonym,
+    validates,
+    with_polymorphic,
+)
+from sqlalchemy.orm.attributes import set_committed_value
 
 from stalker.db.declarative import Base
 from stalker.db.session import DBSession
@@ -17,8 +33,14 @@ from stalker.log import get_logger
 from stalker.models.entity import Entity
 from stalker.models.file import File
 from stalker.models.mixins import DAGMixin
+from stalker.models.repository import expandvars
 from stalker.models.review import Review
 from stalker.models.task import Task
+from stalker.models.template import FilenameTemplate, invalidate_rendered_paths
+
+if TYPE_CHECKING:  # pragma: no cover
+    from sqlalchemy.engine import Connection
+    from sqlalchemy.orm import Mapper
 
 
 logger = get_logger(__name__)
@@ -111,6 +133,15 @@ class Version(Entity, DAGMixin):
     __auto_name__ = True
     __tablename__ = "Versions"
     __mapper_args__ = {"polymorphic_identity": "Version"}
+    __table_args__ = (
+        # latest_version and max_version_number queries filter on all of these
+        Index(
+            "ix_Versions_task_id_revision_number_version_number",
+            "task_id",
+            "revision_number",
+            "version_number",
+        ),
+    )
 
     __dag_cascade__ = "save-update, merge"
 
@@ -330,6 +361,15 @@ class Version(Entity, DAGMixin):
     def _validate_version_number(self, key: str, version_number: int) -> int:
         """Validate the given version_number value.
 
+        The version number is checked against the latest Version in the
+        database, so a new Version has its number before it is flushed, which
+        the rendered paths and the existing code depending on it expect. That
+        is one query, and the final number is allocated by the
+        ``Version_Counters`` upsert in :func:`.receive_before_insert`, so a new
+        Version takes two round-trips, not one. The number given here is only
+        a best guess under concurrency. If another Version has taken it
+        meanwhile, the upsert allocates the next free number.
+
         Args:
             key (str): The name of the validated column.
             version_number (int): The version number to be validated.
@@ -337,7 +377,9 @@ class Version(Entity, DAGMixin):
         Returns:
             int: The validated version number.
         """
-        max_version_number = self.max_version_number
+        # query the latest version only once
+        latest_version = self.latest_version
+        max_version_number = latest_version.version_number if latest_version else 0
 
         logger.debug(f"max_version_number: {max_version_number}")
         logger.debug(f"given version_number: {version_number}")
@@ -345,7 +387,7 @@ class Version(Entity, DAGMixin):
         if version_number is not None and version_number > max_version_number:
             return version_number
 
-        if self.latest_version == self:
+        if latest_version == self:
             if self.version_number is not None:
                 version_number = self.version_number
             else:
@@ -452,9 +494,115 @@ class Version(Entity, DAGMixin):
                 "extension should be a str, "
                 f"not {extension.__class__.__name__}: '{extension}'"
             )
-        kwargs = self._template_variables()
 
-        # get a suitable FilenameTemplate
+        path = self._memoized_path()
+        if extension is not None:
+            path = path.with_suffix(extension)
+
+        return path
+
+    @classmethod
+    def generate_paths(
+        cls,
+        versions: Iterable["Version"],
+        extension: Optional[str] = None,
+        absolute: bool = False,
+    ) -> List[Path]:
+        """Generate the paths of the given versions in a batch.
+
+        This is the batch form of :meth:`.generate_path`. The related tasks, their
+        parents, projects, structures and templates are loaded with a handful of
+        queries, instead of being lazy loaded one by one for each version, and the
+        template of each project and entity type is only looked up once.
+
+        Args:
+            versions (Iterable[Version]): The Version instances.
+            extension (Optional[str]): An optional string containing the
+                extension for the resulting paths.
+            absolute (bool): If True, the repository environment variables are
+                expanded as in :attr:`.absolute_full_path`. The default is False.
+
+        Raises:
+            TypeError: If the extension is not None and not a str.
+            RuntimeError: If no Version related FilenameTemplate is found in
+                the related `Project.structure` of any of the versions.
+
+        Returns:
+            List[Path]: The paths of the versions in the given order.
+        """
+        if extension is not None and not isinstance(extension, str):
+            raise TypeError(
+                "extension should be a str, "
+                f"not {extension.__class__.__name__}: '{extension}'"
+            )
+
+        versions = list(versions)
+        # keep a reference to the prefetched instances, the identity map of the
+        # session only holds weak references
+        prefetched = _prefetch_path_data(versions)
+        logger.debug(f"prefetched {len(prefetched)} instances")
+
+        templates = {}
+        task_variables = {}
+        paths = []
+        for version in versions:
+            task = version.task
+            key = (id(task.project), task.entity_type)
+            if key not in templates:
+                templates[key] = version._find_template()
+            if id(task) not in task_variables:
+                task_variables[id(task)] = task._template_variables()
+
+            path = version._memoized_path(templates[key], task_variables[id(task)])
+            if extension is not None:
+                path = path.with_suffix(extension)
+            if absolute:
+                path = Path(
+                    os.path.normpath(expandvars(str(path))).replace("\\", "/")
+                )
+            paths.append(path)
+
+        return paths
+
+    def _memoized_path(
+        self,
+        vers_template: Optional[FilenameTemplate] = None,
+        task_variables: Optional[dict] = None,
+    ) -> Path:
+        """Return the memoized path or render it if anything naming related changed.
+
+        Args:
+            vers_template (Optional[FilenameTemplate]): The FilenameTemplate to use, if
+                skipped it is looked up from the related `Project.structure`.
+            task_variables (Optional[dict]): The template variables of the related
+                Task, if skipped they are generated from the task.
+
+        Returns:
+            Path: A `pathlib.Path` object.
+        """
+        generated_path = getattr(self, "_generated_path", None)
+        if (
+            generated_path is None
+            or generated_path[0] != FilenameTemplate.render_generation
+        ):
+            generated_path = (
+                FilenameTemplate.render_generation,
+                self._render_path(vers_template, task_variables),
+            )
+            self._generated_path = generated_path
+        return generated_path[1]
+
+    def _find_template(self) -> FilenameTemplate:
+        """Return the FilenameTemplate for this Version.
+
+        Raises:
+            RuntimeError: If no Version related FilenameTemplate is found in
+                the related `Project.structure`.
+
+        Returns:
+            FilenameTemplate: The FilenameTemplate with the target_entity_type
+                matching the entity_type of the related Task.
+        """
         structure = self.task.project.structure
 
         vers_template = None
@@ -475,19 +623,34 @@ class Version(Entity, DAGMixin):
                 "project".format(entity_type=self.task.entity_type)
             )
 
-        path = Path(
-            jinja2.Template(vers_template.path).render(
-                **kwargs, trim_blocks=True, lstrip_blocks=True
-            )
-        ) / Path(
-            jinja2.Template(vers_template.filename).render(
-                **kwargs, trim_blocks=True, lstrip_blocks=True
-            )
-        )
-        if extension is not None:
-            path = path.with_suffix(extension)
+        return vers_template
 
-        return path
+    def _render_path(
+        self,
+        vers_template: Optional[FilenameTemplate] = None,
+        task_variables: Optional[dict] = None,
+    ) -> Path:
+        """Render the path of this Version with the related FilenameTemplate.
+
+        Args:
+            vers_template (Optional[FilenameTemplate]): The FilenameTemplate to use, if
+                skipped it is looked up from the related `Project.structure`.
+            task_variables (Optional[dict]): The template variables of the related
+                Task, if skipped they are generated from the task.
+
+        Returns:
+            Path: A `pathlib.Path` object.
+        """
+        if vers_template is None:
+            vers_template = self._find_template()
+
+        if task_variables is None:
+            kwargs = self._template_variables()
+        else:
+            kwargs = dict(task_variables, version=self)
+        return Path(vers_template.render_path(**kwargs)) / Path(
+            vers_template.render_filename(**kwargs)
+        )
 
     @property
     def absolute_full_path(self) -> str:
@@ -499,9 +662,7 @@ class Version(Entity, DAGMixin):
             str: The absolute full path of this Version instance.
         """
         return Path(
-            os.path.normpath(os.path.expandvars(str(self.generate_path()))).replace(
-                "\\", "/"
-            )
+            os.path.normpath(expandvars(str(self.generate_path()))).replace("\\", "/")
         )
 
     @property
@@ -512,9 +673,9 @@ class Version(Entity, DAGMixin):
             str: The absolute path.
         """
         return Path(
-            os.path.normpath(
-                os.path.expandvars(str(self.generate_path().parent))
-            ).replace("\\", "/")
+            os.path.normpath(expandvars(str(self.generate_path().parent))).replace(
+                "\\", "/"
+            )
         )
 
     @property
@@ -537,11 +698,11 @@ class Version(Entity, DAGMixin):
             Path: The path.
         """
         return self.full_path.parent
-    
+
     @property
     def filename(self) -> str:
         """Return the filename bit of the path.
-        
+
         Returns:
             str: The filename.
         """
@@ -645,6 +806,124 @@ class Version(Entity, DAGMixin):
         return self.task.request_review(version=self)
 
 
+# the maximum number of ids used in a single IN clause while prefetching
+PREFETCH_CHUNK_SIZE = 1000
+
+
+def _query_in_chunks(query: Any, column: Any, ids: Set[int]) -> List[Any]:
+    """Query the instances with the given ids in chunks.
+
+    Args:
+        query (Any): The query to filter.
+        column (Any): The id column to filter the query with.
+        ids (Set[int]): The ids of the instances.
+
+    Returns:
+        List[Any]: The instances.
+    """
+    ids = sorted(ids)
+    result = []
+    for i in range(0, len(ids), PREFETCH_CHUNK_SIZE):
+        result.extend(query.filter(column.in_(ids[i : i + PREFETCH_CHUNK_SIZE])).all())
+    return result
+
+
+def _set_if_unloaded(instance: Any, key: str, value: Any) -> None:
+    """Set the given relationship value if it is not loaded yet.
+
+    The relationships of the tasks are joined on the table of the class (like
+    ``Tasks.id``) and not on the primary key of the mapper, so the lazy loader can
+    not use the identity map and always issues a query. Populating them directly
+    avoids that.
+
+    Args:
+        instance (Any): The instance.
+        key (str): The name of the relationship.
+        value (Any): The related instance.
+    """
+    if key in inspect(instance).unloaded:
+        set_committed_value(instance, key, value)
+
+
+def _prefetch_path_data(versions: List[Version]) -> List[Any]:
+    """Load the data needed to render the paths of the given versions.
+
+    The tasks of the versions are loaded level by level with their parents,
+    sequences and scenes, then the projects with their repositories, structures and
+    templates and the types of the tasks are loaded, so rendering the paths doesn't
+    trigger any lazy loads.
+
+    Args:
+        versions (List[Version]): The Version instances.
+
+    Returns:
+        List[Any]: The loaded instances. The caller should keep a reference to
+            them as long as the paths are rendered.
+    """
+    from stalker.models.project import Project, ProjectRepository
+    from stalker.models.shot import Shot
+    from stalker.models.structure import Structure
+    from stalker.models.type import Type
+
+    persistent_versions = [v for v in versions if inspect(v).persistent]
+    if not persistent_versions:
+        return []
+
+    with DBSession.no_autoflush:
+        tasks = {}
+        polymorphic_task = with_polymorphic(Task, "*")
+        pending = {v.task_id for v in persistent_versions}
+        while pending:
+            new_tasks = _query_in_chunks(
+                DBSession.query(polymorphic_task), polymorphic_task.id, pending
+            )
+            tasks.update((task.id, task) for task in new_tasks)
+            pending = set()
+            for task in new_tasks:
+                related_ids = [task.parent_id]
+                if isinstance(task, Shot):
+                    related_ids += [task.sequence_id, task.scene_id]
+                pending.update(
+                    i for i in related_ids if i is not None and i not in tasks
+                )
+
+        projects = {
+            project.id: project
+            for project in _query_in_chunks(
+                Project.query.options(
+                    selectinload(Project.repositories_proxy).selectinload(
+                        ProjectRepository.repository
+                    ),
+                    selectinload(Project.structure).selectinload(Structure.templates),
+                ),
+                Project.id,
+                {task.project_id for task in tasks.values()},
+            )
+        }
+
+        types = {
+            type_.id: type_
+            for type_ in _query_in_chunks(
+                Type.query,
+                Type.id,
+                {task.type_id for task in tasks.values() if task.type_id is not None},
+            )
+        }
+
+    for version in persistent_versions:
+        _set_if_unloaded(version, "task", tasks.get(version.task_id))
+
+    for task in tasks.values():
+        _set_if_unloaded(task, "parent", tasks.get(task.parent_id))
+        _set_if_unloaded(task, "_project", projects.get(task.project_id))
+        _set_if_unloaded(task, "type", types.get(task.type_id))
+        if isinstance(task, Shot):
+            _set_if_unloaded(task, "sequence", tasks.get(task.sequence_id))
+            _set_if_unloaded(task, "scene", tasks.get(task.scene_id))
+
+    return list(tasks.values()) + list(projects.values()) + list(types.values())
+
+
 # VERSION FILES
 Version_Files = Table(
     "Version_Files",
@@ -657,3 +936,104 @@ Version_Files = Table(
         primary_key=True,
     ),
 )
+
+
+# VERSION COUNTERS
+# holds the last allocated version number per task and revision number
+Version_Counters = Table(
+    "Version_Counters",
+    Base.metadata,
+    Column(
+        "task_id",
+        Integer,
+        ForeignKey("Tasks.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("revision_number", Integer, primary_key=True),
+    Column("version_number", Integer, nullable=False),
+)
+
+
+def allocate_version_number(
+    connection: "Connection", task_id: int, revision_number: int, version_number: int
+) -> int:
+    """Allocate a version number atomically for the given task and revision number.
+
+    The counter row of the given task and revision number is upserted and the
+    allocated number is returned in a single round-trip. The allocated number
+    is the given version number, unless it is already allocated by another
+    Version, in which case the next free number is returned. Concurrent
+    transactions are serialized by the row lock of the counter row.
+
+    Only PostgreSQL and SQLite3 are supported, for other databases the given
+    version number is returned as is.
+
+    Args:
+        connection (Connection): The connection to use.
+        task_id (int): The id of the task.
+        revision_number (int): The revision number.
+        version_number (int): The desired version number.
+
+    Returns:
+        int: The allocated version number.
+    """
+    dialect_name = connection.dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return version_number
+
+    stmt = insert(Version_Counters).values(
+        task_id=task_id,
+        revision_number=revision_number,
+        version_number=version_number,
+    )
+    last_version_number = Version_Counters.c.version_number
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Version_Counters.c.task_id, Version_Counters.c.revision_number],
+        set_={
+            "version_number": case(
+                (
+                    last_version_number >= stmt.excluded.version_number,
+                    last_version_number + 1,
+                ),
+                else_=stmt.excluded.version_number,
+            )
+        },
+    ).returning(Version_Counters.c.version_number)
+    return connection.execute(stmt).scalar_one()
+
+
+@event.listens_for(Version, "before_insert")
+def receive_before_insert(
+    mapper: "Mapper",
+    connection: "Connection",
+    version: Version,
+) -> None:
+    """Listen for the 'before_insert' event and allocate the version number.
+
+    The version number calculated by the validator is only a best guess in
+    concurrent environments, this allocates the final one atomically. It is the
+    second round-trip of a new Version, after the query of the validator.
+
+    Args:
+        mapper (sqlalchemy.orm.Mapper): The mapper object.
+        connection (sqlalchemy.engine.Connection): The connection object.
+        version (Version): The Version instance that is about to be inserted.
+    """
+    version_number = allocate_version_number(
+        connection,
+        version.task_id,
+        version.revision_number,
+        version.version_number or 1,
+    )
+    if version_number != version.version_number:
+        logger.debug(
+            f"version_number {version.version_number} is already allocated, "
+            f"using {version_number} instead"
+        )
+        # bypass the validator, the number is already validated by the database
+        set_committed_value(version, "version_number", version_number)
+        invalidate_rendered_paths()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Name, nice name and login normalization functions are situated here.
+
+All the patterns are compiled once at import time and the results of the
+recent calls are cached, so creating many entities with the same or similar
+names (e.g. in bulk imports) doesn't pay the formatting cost over and over
+again.
+"""
+import functools
+import re
+
+# the maximum number of normalized values to keep in each of the caches
+NORMALIZER_CACHE_SIZE = 4096
+
+# any character that is not allowed in a nice name
+NICE_NAME_ILLEGAL_CHARS = re.compile(r"[^a-zA-Z0-9\s_\-@]+")
+
+# any non-alphanumeric character at the start of a nice name
+NICE_NAME_LEADING_CHARS = re.compile(r"^[^a-zA-Z0-9]+")
+
+# any run of white spaces, dashes and underscores in a nice name
+NICE_NAME_SEPARATORS = re.compile(r"[\s_\-]+")
+
+# any run of illegal characters in a lower cased login
+LOGIN_ILLEGAL_CHARS = re.compile(r"[^()a-z0-9]+")
+
+
+@functools.lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def format_name(name: str) -> str:
+    """Format the given name value.
+
+    Strips the white spaces from both ends and replaces any run of white
+    spaces with a single space.
+
+    Args:
+        name (str): The name value.
+
+    Returns:
+        str: The formatted name value.
+    """
+    return " ".join(name.split())
+
+
+@functools.lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def format_nice_name(nice_name: str) -> str:
+    """Format the given nice name value.
+
+    Removes all the characters other than alphanumeric ones, white spaces,
+    underscores, dashes and "@" signs, removes the non-alphanumeric characters
+    from the start and replaces any run of white spaces, dashes and underscores
+    with a single underscore.
+
+    Args:
+        nice_name (str): The nice_name value to be formatted.
+
+    Returns:
+        str: The formatted nice name.
+    """
+    nice_name = NICE_NAME_ILLEGAL_CHARS.sub("", nice_name).strip()
+    nice_name = NICE_NAME_LEADING_CHARS.sub("", nice_name)
+    return NICE_NAME_SEPARATORS.sub("_", nice_name)
+
+
+@functools.lru_cache(maxsize=NORMALIZER_CACHE_SIZE)
+def format_login(login: str) -> str:
+    """Format the given login value.
+
+    Lower cases the login, removes all the characters other than alphanumeric
+    ones and parentheses and removes the numbers from the start.
+
+    Args:
+        login (str): The login value.
+
+    Returns:
+        str: The formatted login value.
+    """
+    login = LOGIN_ILLEGAL_CHARS.sub("", login.replace(" ", "").lower())
+    return login.lstrip("0123456789")
+
+
+def clear_cache() -> None:
+    """Clear the caches of all the normalizer functions."""
+    format_name.cache_clear()
+    format_nice_name.cache_clear()
+    format_login.cache_clear()
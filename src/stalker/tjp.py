@@ -0,0 +1,873 @@
+# -*- coding: utf-8 -*-
+"""The TaskJuggler project file (tjp) writer and emitters are situated here.
+
+The TaskJuggler representations of the Stalker data are written to a
+:class:`.TJPWriter`, which buffers the written text and passes it to an
+``io.TextIOBase`` stream in large chunks. Each part of a tjp file is written by
+an emitter, which implements the :class:`.TJPEmitter` interface::
+
+    import io
+    from stalker.tjp import ResourcesEmitter, TJPWriter
+
+    stream = io.StringIO()
+    with TJPWriter(stream) as writer:
+        ResourcesEmitter.from_database().emit(writer)
+    print(stream.getvalue())
+
+The emitters either walk the given objects, as the ``to_tjp`` properties of
+the models do, or are driven by rows prefetched with a fixed number of queries
+(:class:`.ResourcesEmitter` and :class:`.TaskRowsEmitter`), which is what the
+:class:`.TaskJugglerScheduler` uses.
+"""
+
+import io
+from typing import (
+    Any,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TYPE_CHECKING,
+    Tuple,
+)
+
+import pytz
+
+from stalker.db.session import DBSession
+
+if TYPE_CHECKING:  # pragma: no cover
+    import datetime
+
+    from stalker.models.auth import User
+    from stalker.models.project import Project
+    from stalker.models.studio import Studio, Vacation, WorkingHours
+    from stalker.models.task import Task
+
+# the number of characters that the writer buffers before writing to the stream
+BUFFER_SIZE = 65536
+
+# the indentation of the object representations
+TAB = "    "
+
+
+def _utc(date: "datetime.datetime", time_format: str) -> str:
+    """Format the given datetime in UTC.
+
+    Args:
+        date (datetime.datetime): The datetime.
+        time_format (str): The strftime format.
+
+    Returns:
+        str: The formatted datetime.
+    """
+    return date.astimezone(pytz.utc).strftime(time_format)
+
+
+class TJPWriter(object):
+    """Buffered writer of TaskJuggler project files.
+
+    The written text is collected in a list and written to the stream when the
+    buffered text is longer than the buffer size, when :meth:`.flush` is called
+    or when the writer is used as a context manager and the context exits.
+
+    Args:
+        stream (io.TextIOBase): The stream to write to, like an open text file
+            or an ``io.StringIO``.
+        buffer_size (int): The number of characters to buffer before writing to
+            the stream. The default is :data:`.BUFFER_SIZE`.
+
+    Raises:
+        TypeError: If the stream is not an io.TextIOBase instance.
+    """
+
+    def __init__(self, stream: io.TextIOBase, buffer_size: int = BUFFER_SIZE) -> None:
+        if not isinstance(stream, io.TextIOBase):
+            raise TypeError(
+                f"{self.__class__.__name__}.stream should be an io.TextIOBase "
+                f"instance, not {stream.__class__.__name__}: '{stream}'"
+            )
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._buffer: List[str] = []
+        self._buffered = 0
+
+    def __enter__(self) -> "TJPWriter":
+        """Return the writer itself.
+
+        Returns:
+            TJPWriter: This writer.
+        """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Flush the buffered text.
+
+        Args:
+            args (Any): The exception information, ignored.
+        """
+        self.flush()
+
+    def write(self, text: str) -> None:
+        """Write the given text.
+
+        Args:
+            text (str): The text.
+        """
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.buffer_size:
+            self.flush()
+
+    def line(self, text: str = "") -> None:
+        """Write the given text as a line.
+
+        Args:
+            text (str): The text without the line ending.
+        """
+        self.write(f"{text}\n")
+
+    def flush(self) -> None:
+        """Write the buffered text to the stream."""
+        if self._buffer:
+            self.stream.write("".join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+
+
+class TJPEmitter(object):
+    """The interface of the emitters writing a part of a tjp file.
+
+    The emitters write complete lines, so the output of each emitter ends with a
+    line ending.
+    """
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+
+        Raises:
+            NotImplementedError: Unless it is implemented in the derived class.
+        """
+        raise NotImplementedError()
+
+    def render(self) -> str:
+        """Return the TaskJuggler representation as a string.
+
+        Returns:
+            str: The TaskJuggler representation without the last line ending.
+        """
+        stream = io.StringIO()
+        with TJPWriter(stream) as writer:
+            self.emit(writer)
+        value = stream.getvalue()
+        return value[:-1] if value.endswith("\n") else value
+
+
+class WorkingHoursEmitter(TJPEmitter):
+    """Emits the ``workinghours`` lines of a :class:`.WorkingHours`.
+
+    Args:
+        working_hours (WorkingHours): The working hours.
+        indent (str): The indentation of the lines.
+    """
+
+    def __init__(self, working_hours: "WorkingHours", indent: str = "") -> None:
+        self.working_hours = working_hours
+        self.indent = indent
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+        """
+        for day in ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]:
+            ranges = self.working_hours[day]
+            if not ranges:
+                writer.line(f"{self.indent}workinghours {day} off")
+                continue
+            writer.line(
+                f"{self.indent}workinghours {day} "
+                + ", ".join(
+                    f"{start // 60:02d}:{start % 60:02d} - "
+                    f"{end // 60:02d}:{end % 60:02d}"
+                    for start, end in ranges
+                )
+            )
+
+
+class StudioEmitter(TJPEmitter):
+    """Emits the ``project`` header of a :class:`.Studio`.
+
+    Args:
+        studio (Studio): The studio.
+    """
+
+    def __init__(self, studio: "Studio") -> None:
+        self.studio = studio
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+        """
+        studio = self.studio
+        now = _utc(studio.round_time(studio.now), "%Y-%m-%d-%H:%M")
+        timing_resolution = (
+            studio.timing_resolution.days * 86400
+            + studio.timing_resolution.seconds // 60
+        )
+        writer.line(
+            f'project {studio.tjp_id} "{studio.tjp_id}" '
+            f"{studio.start.date()} - {studio.end.date()} {{"
+        )
+        writer.line(f"{TAB}timingresolution {timing_resolution}min")
+        writer.line(f"{TAB}now {now}")
+        writer.line(f"{TAB}dailyworkinghours {studio.daily_working_hours}")
+        writer.line(f"{TAB}weekstartsmonday")
+        WorkingHoursEmitter(studio.working_hours, TAB).emit(writer)
+        writer.line(f'{TAB}timeformat "%Y-%m-%d"')
+        writer.line(f'{TAB}scenario plan "Plan"')
+        writer.line(f"{TAB}trackingscenario plan")
+        writer.line("}")
+
+
+class ResourcesEmitter(TJPEmitter):
+    """Emits the ``resource`` blocks of the users from prefetched rows.
+
+    The studio vacations and the users with their vacations are emitted in a
+    ``resources`` group.
+
+    Args:
+        users (Sequence[Tuple[int, float]]): The id and efficiency of the users.
+        vacations (Sequence[Tuple[Optional[int], datetime.datetime,
+            datetime.datetime]]): The user id, start and end of the vacations, the
+            user id of the studio vacations is None.
+    """
+
+    def __init__(
+        self,
+        users: Sequence[Tuple[int, float]],
+        vacations: Sequence[
+            Tuple[Optional[int], "datetime.datetime", "datetime.datetime"]
+        ],
+    ) -> None:
+        self.users = users
+        self.vacations = vacations
+
+    @classmethod
+    def from_database(cls) -> "ResourcesEmitter":
+        """Create an emitter for all the users and vacations in the database.
+
+        The users and the vacations are fetched with one query each.
+
+        Returns:
+            ResourcesEmitter: The emitter.
+        """
+        from stalker.models.auth import User
+        from stalker.models.studio import Vacation
+
+        users = (
+            DBSession.query(User.user_id, User.efficiency).order_by(User.user_id).all()
+        )
+        vacations = (
+            DBSession.query(Vacation.user_id, Vacation.start, Vacation.end)
+            .order_by(Vacation.vacation_id)
+            .all()
+        )
+        return cls(users, vacations)
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+        """
+        user_vacations: Dict[
+            int, List[Tuple["datetime.datetime", "datetime.datetime"]]
+        ] = {}
+        writer.line('resource resources "Resources" {')
+        for user_id, start, end in self.vacations:
+            if user_id is None:
+                VacationEmitter.emit_range(writer, start, end)
+            else:
+                user_vacations.setdefault(user_id, []).append((start, end))
+        for user_id, efficiency in self.users:
+            UserEmitter.emit_resource(
+                writer, f"User_{user_id}", efficiency, user_vacations.get(user_id, [])
+            )
+        writer.line("}")
+
+
+class VacationEmitter(TJPEmitter):
+    """Emits the ``vacation`` line of a :class:`.Vacation`.
+
+    Args:
+        vacation (Vacation): The vacation.
+        indent (str): The indentation of the line.
+    """
+
+    def __init__(self, vacation: "Vacation", indent: str = "") -> None:
+        self.vacation = vacation
+        self.indent = indent
+
+    @staticmethod
+    def emit_range(
+        writer: TJPWriter,
+        start: "datetime.datetime",
+        end: "datetime.datetime",
+        indent: str = "",
+    ) -> None:
+        """Write a vacation with the given start and end.
+
+        Args:
+            writer (TJPWriter): The writer.
+            start (datetime.datetime): The start of the vacation.
+            end (datetime.datetime): The end of the vacation.
+            indent (str): The indentation of the line.
+        """
+        writer.line(
+            f"{indent}vacation {_utc(start, '%Y-%m-%d-%H:%M:%S')} - "
+            f"{_utc(end, '%Y-%m-%d-%H:%M:%S')}"
+        )
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+        """
+        self.emit_range(writer, self.vacation.start, self.vacation.end, self.indent)
+
+
+class UserEmitter(TJPEmitter):
+    """Emits the ``resource`` block of a :class:`.User`.
+
+    Args:
+        user (User): The user.
+    """
+
+    def __init__(self, user: "User") -> None:
+        self.user = user
+
+    @staticmethod
+    def emit_resource(
+        writer: TJPWriter,
+        tjp_id: str,
+        efficiency: float,
+        vacations: Sequence[Tuple["datetime.datetime", "datetime.datetime"]],
+    ) -> None:
+        """Write a resource with the given data.
+
+        Args:
+            writer (TJPWriter): The writer.
+            tjp_id (str): The TaskJuggler id of the resource.
+            efficiency (float): The efficiency of the resource.
+            vacations (Sequence[Tuple[datetime.datetime, datetime.datetime]]):
+                The start and end of the vacations of the resource.
+        """
+        writer.line(f'resource {tjp_id} "{tjp_id}" {{')
+        writer.line(f"{TAB}efficiency {efficiency}")
+        for start, end in vacations:
+            VacationEmitter.emit_range(writer, start, end, TAB)
+        writer.line("}")
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+        """
+        self.emit_resource(
+            writer,
+            self.user.tjp_id,
+            self.user.efficiency,
+            [(vacation.start, vacation.end) for vacation in self.user.vacations],
+        )
+
+
+class TaskEmitter(TJPEmitter):
+    """Emits the ``task`` block of a :class:`.Task` and its children.
+
+    The depth of the children is passed down instead of being calculated from
+    the parents of each task.
+
+    Args:
+        task (Task): The task.
+        depth (Optional[int]): The indentation level of the task. The number of
+            the parents of the task is used if skipped.
+    """
+
+    def __init__(self, task: "Task", depth: Optional[int] = None) -> None:
+        self.task = task
+        self.depth = len(task.parents) if depth is None else depth
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+        """
+        self._emit(writer, self.task, self.depth)
+        writer.write("\n")
+
+    def _emit(self, writer: TJPWriter, task: "Task", depth: int) -> None:
+        """Write the given task without the last line ending.
+
+        Args:
+            writer (TJPWriter): The writer.
+            task (Task): The task.
+            depth (int): The indentation level of the task.
+        """
+        indent = TAB * depth
+        has_inner_data = False
+        writer.write(f'{indent}task {task.tjp_id} "{task.tjp_id}" {{')
+        if task.priority != 500:
+            has_inner_data = True
+            writer.write(f"\n{indent}{TAB}priority {task.priority}")
+        if task.task_depends_on:
+            has_inner_data = True
+            writer.write(
+                f"\n{indent}{TAB}depends "
+                + ", ".join(dependency.to_tjp for dependency in task.task_depends_on)
+            )
+        if task.is_container:
+            has_inner_data = True
+            for child in task.children:
+                writer.write("\n")
+                self._emit(writer, child, depth + 1)
+        if task.resources:
+            has_inner_data = True
+            if task.schedule_constraint:
+                if task.schedule_constraint in [1, 3]:
+                    writer.write(
+                        f"\n{indent}{TAB}start {_utc(task.start, '%Y-%m-%d-%H:%M')}"
+                    )
+                if task.schedule_constraint in [2, 3]:
+                    writer.write(
+                        f"\n{indent}{TAB}end {_utc(task.end, '%Y-%m-%d-%H:%M')}"
+                    )
+            writer.write(
+                f"\n{indent}{TAB}{task.schedule_model} "
+                f"{task.schedule_timing}{task.schedule_unit}"
+            )
+            alternatives = ""
+            if task.alternative_resources:
+                alternatives = (
+                    f" {{\n{indent}{TAB}{TAB}alternative\n{indent}{TAB}{TAB}"
+                    + ", ".join(
+                        resource.tjp_id
+                        for resource in sorted(
+                            task.alternative_resources, key=lambda x: x.id
+                        )
+                    )
+                    + f" select {task.allocation_strategy}"
+                    + (
+                        f"\n{indent}{TAB}{TAB}persistent"
+                        if task.persistent_allocation
+                        else ""
+                    )
+                    + f"\n{indent}{TAB}}}"
+                )
+            writer.write(
+                f"\n{indent}{TAB}allocate "
+                + ", ".join(
+                    f"{resource.tjp_id}{alternatives}"
+                    for resource in sorted(task.resources, key=lambda x: x.id)
+                )
+            )
+        for time_log in task.time_logs:
+            has_inner_data = True
+            writer.write(
+                f"\n{indent}{TAB}booking {time_log.resource.tjp_id} "
+                f"{_utc(time_log.start, '%Y-%m-%d-%H:%M:%S')} - "
+                f"{_utc(time_log.end, '%Y-%m-%d-%H:%M:%S')} "
+                "{ overtime 2 }"
+            )
+        writer.write(f"\n{indent}}}" if has_inner_data else "}")
+
+
+class ProjectEmitter(TJPEmitter):
+    """Emits the ``task`` block of a :class:`.Project` with all of its tasks.
+
+    The task hierarchy of a persisted project is loaded up front with
+    :func:`stalker.loaders.load_task_tree` and the time logs and alternative
+    resources of the tasks are loaded with one query each, so walking the
+    hierarchy doesn't issue a query per task.
+
+    Args:
+        project (Project): The project.
+    """
+
+    def __init__(self, project: "Project") -> None:
+        self.project = project
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+        """
+        project = self.project
+        if project.id is not None and project in DBSession:
+            root_tasks = self._load_tasks()
+        else:
+            root_tasks = project.root_tasks
+        writer.line(f'task {project.tjp_id} "{project.tjp_id}" {{')
+        for task in root_tasks:
+            TaskEmitter(task, 1).emit(writer)
+        writer.line("}")
+
+    def _load_tasks(self) -> List["Task"]:
+        """Load the task hierarchy of the project with the data to emit.
+
+        Returns:
+            List[Task]: The root tasks of the project.
+        """
+        from sqlalchemy.orm import selectinload
+        from sqlalchemy.orm.attributes import set_committed_value
+
+        from stalker.loaders import load_task_tree
+        from stalker.models.task import Task, TimeLog
+
+        with DBSession.no_autoflush:
+            DBSession.flush()
+            root_tasks = load_task_tree(self.project)
+            tasks = {}
+            stack = list(root_tasks)
+            while stack:
+                task = stack.pop()
+                tasks[task.id] = task
+                stack.extend(task.children)
+            if not tasks:
+                return root_tasks
+
+            time_logs = {task_id: [] for task_id in tasks}
+            for time_log in (
+                DBSession.query(TimeLog)
+                .filter(TimeLog.task_id.in_(list(tasks)))
+                .options(selectinload(TimeLog.resource))
+                .order_by(TimeLog.id)
+            ):
+                time_logs[time_log.task_id].append(time_log)
+            for task_id, task_time_logs in time_logs.items():
+                set_committed_value(tasks[task_id], "time_logs", task_time_logs)
+
+            # populate the alternative resources of the loaded tasks
+            DBSession.query(Task).filter(Task.id.in_(list(tasks))).options(
+                selectinload(Task.alternative_resources)
+            ).all()
+        return root_tasks
+
+
+class TaskRow(NamedTuple):
+    """The data of a task to be emitted by :class:`.TaskRowsEmitter`.
+
+    Attributes:
+        id (int): The id of the task.
+        depth (int): The depth of the task in the project, the root tasks are at
+            depth 1.
+        priority (int): The priority.
+        schedule_timing (float): The schedule timing.
+        schedule_unit (str): The schedule unit.
+        schedule_model (str): The schedule model.
+        allocation_strategy (str): The allocation strategy.
+        persistent_allocation (bool): The persistent allocation.
+        resource_ids (List[int]): The sorted ids of the resources.
+        alternative_resource_ids (List[int]): The sorted ids of the alternative
+            resources.
+        bookings (List[Tuple[int, str, str]]): The resource id, start and end of
+            the time logs, the start and end are formatted as
+            ``YYYY-MM-DD-HH:MM:00`` in UTC.
+        dependencies (List[Tuple[List[int], str]]): The project id and the task
+            ids from the root to the depended task and the dependency target of
+            the dependencies.
+        is_leaf (bool): True if the task doesn't have any children.
+    """
+
+    id: int
+    depth: int
+    priority: int
+    schedule_timing: float
+    schedule_unit: str
+    schedule_model: str
+    allocation_strategy: str
+    persistent_allocation: bool
+    resource_ids: List[int]
+    alternative_resource_ids: List[int]
+    bookings: List[Tuple[int, str, str]]
+    dependencies: List[Tuple[List[int], str]]
+    is_leaf: bool
+
+
+class TaskRowsEmitter(TJPEmitter):
+    """Emits the ``task`` blocks of projects from prefetched rows.
+
+    Args:
+        projects (Sequence[Tuple[int, Sequence[TaskRow]]]): The project ids and
+            the task rows of each project in depth-first order.
+    """
+
+    def __init__(self, projects: Sequence[Tuple[int, Sequence[TaskRow]]]) -> None:
+        self.projects = projects
+
+    @classmethod
+    def from_database(cls, project_ids: Sequence[int]) -> "TaskRowsEmitter":
+        """Create an emitter for the tasks of the given projects.
+
+        The tasks, resources, alternative resources, time logs and dependencies
+        of all the projects are fetched as flat rows with one query each, using
+        only SQL that works on every supported database. The task hierarchies
+        are then assembled in Python. The ancestors of the depended tasks that
+        are in other projects are fetched with one query per hierarchy level.
+
+        The tasks are ordered as the PostgreSQL query of the
+        :class:`.TaskJugglerScheduler` orders them, that is depth first and the
+        siblings by the text of their ids.
+
+        Args:
+            project_ids (Sequence[int]): The ids of the projects.
+
+        Returns:
+            TaskRowsEmitter: The emitter.
+        """
+        from sqlalchemy import select
+
+        from stalker.models.task import (
+            Task,
+            TaskDependency,
+            Task_Alternative_Resources,
+            Task_Resources,
+            TimeLog,
+        )
+
+        project_ids = list(project_ids)
+        if not project_ids:
+            return cls([])
+
+        tasks = Task.__table__
+        connection = DBSession.connection()
+        in_projects = tasks.c.project_id.in_(project_ids)
+
+        task_rows = connection.execute(
+            select(
+                tasks.c.id,
+                tasks.c.parent_id,
+                tasks.c.project_id,
+                tasks.c.priority,
+                tasks.c.schedule_timing,
+                tasks.c.schedule_unit,
+                tasks.c.schedule_model,
+                tasks.c.allocation_strategy,
+                tasks.c.persistent_allocation,
+            ).where(in_projects)
+        ).fetchall()
+
+        def fetch_pairs(table: Any, *columns: Any) -> Dict[int, List[Any]]:
+            """Group the rows of the given table by the task ids.
+
+            Args:
+                table (Any): The table with a task_id column.
+                columns (Any): The columns to fetch.
+
+            Returns:
+                Dict[int, List[Any]]: The rows per task id.
+            """
+            grouped: Dict[int, List[Any]] = {}
+            for row in connection.execute(
+                select(table.c.task_id, *columns)
+                .join(tasks, tasks.c.id == table.c.task_id)
+                .where(in_projects)
+                .order_by(table.c.task_id, *columns[:1])
+            ):
+                grouped.setdefault(row[0], []).append(row[1:])
+            return grouped
+
+        resources = fetch_pairs(Task_Resources, Task_Resources.c.resource_id)
+        alternative_resources = fetch_pairs(
+            Task_Alternative_Resources, Task_Alternative_Resources.c.resource_id
+        )
+        time_logs = TimeLog.__table__
+        bookings = fetch_pairs(
+            time_logs,
+            time_logs.c.id,
+            time_logs.c.resource_id,
+            time_logs.c.start,
+            time_logs.c.end,
+        )
+        task_dependencies = TaskDependency.__table__
+        dependencies = fetch_pairs(
+            task_dependencies,
+            task_dependencies.c.depends_on_id,
+            task_dependencies.c.dependency_target,
+        )
+
+        # id -> (parent_id, project_id) of all the tasks needed for the paths
+        parents = {row[0]: (row[1], row[2]) for row in task_rows}
+        missing = {
+            depends_on_id
+            for rows in dependencies.values()
+            for depends_on_id, _ in rows
+            if depends_on_id not in parents
+        }
+        while missing:
+            for task_id, parent_id, project_id in connection.execute(
+                select(tasks.c.id, tasks.c.parent_id, tasks.c.project_id).where(
+                    tasks.c.id.in_(missing)
+                )
+            ):
+                parents[task_id] = (parent_id, project_id)
+            missing = {
+                parents[task_id][0]
+                for task_id in missing
+                if task_id in parents
+                and parents[task_id][0] is not None
+                and parents[task_id][0] not in parents
+            }
+
+        paths: Dict[int, List[int]] = {}
+
+        def path_of(task_id: int) -> List[int]:
+            """Return the project id and the ids of the tasks down to the task.
+
+            Args:
+                task_id (int): The task id.
+
+            Returns:
+                List[int]: The path of the task.
+            """
+            if task_id not in paths:
+                parent_id, project_id = parents[task_id]
+                parent_path = [project_id] if parent_id is None else path_of(parent_id)
+                paths[task_id] = parent_path + [task_id]
+            return paths[task_id]
+
+        # a single pass over the rows sorted by their parents
+        children: Dict[int, List[Any]] = {}
+        for row in sorted(task_rows, key=lambda r: (r.parent_id or 0, str(r.id))):
+            key = row.parent_id if row.parent_id is not None else -row.project_id
+            children.setdefault(key, []).append(row)
+
+        projects = []
+        for project_id in project_ids:
+            project_rows = []
+            stack = [(row, 1) for row in reversed(children.get(-project_id, []))]
+            while stack:
+                row, depth = stack.pop()
+                task_children = children.get(row.id, [])
+                stack.extend((child, depth + 1) for child in reversed(task_children))
+                project_rows.append(
+                    TaskRow(
+                        id=row.id,
+                        depth=depth,
+                        priority=row.priority,
+                        schedule_timing=row.schedule_timing,
+                        schedule_unit=str(row.schedule_unit),
+                        schedule_model=str(row.schedule_model),
+                        allocation_strategy=row.allocation_strategy,
+                        persistent_allocation=row.persistent_allocation,
+                        resource_ids=[r[0] for r in resources.get(row.id, [])],
+                        alternative_resource_ids=[
+                            r[0] for r in alternative_resources.get(row.id, [])
+                        ],
+                        bookings=[
+                            (
+                                resource_id,
+                                _utc(start, "%Y-%m-%d-%H:%M:00"),
+                                _utc(end, "%Y-%m-%d-%H:%M:00"),
+                            )
+                            for _, resource_id, start, end in bookings.get(row.id, [])
+                        ],
+                        dependencies=[
+                            (path_of(depends_on_id), str(dependency_target))
+                            for depends_on_id, dependency_target in dependencies.get(
+                                row.id, []
+                            )
+                        ],
+                        is_leaf=not task_children,
+                    )
+                )
+            projects.append((project_id, project_rows))
+        return cls(projects)
+
+    def emit(self, writer: TJPWriter) -> None:
+        """Write the TaskJuggler representation to the given writer.
+
+        Args:
+            writer (TJPWriter): The writer.
+        """
+        for project_id, rows in self.projects:
+            writer.line(f'task Project_{project_id} "Project_{project_id}" {{')
+            previous_depth = 0
+            for row in rows:
+                self._close(writer, previous_depth, row.depth)
+                self._emit_row(writer, row)
+                previous_depth = row.depth
+            self._close(writer, previous_depth, 0)
+
+    @staticmethod
+    def _close(writer: TJPWriter, previous_depth: int, depth: int) -> None:
+        """Close the blocks from the previous depth down to the given depth.
+
+        Args:
+            writer (TJPWriter): The writer.
+            previous_depth (int): The depth of the previous task.
+            depth (int): The depth of the next task.
+        """
+        for level in range(previous_depth, depth - 1, -1):
+            writer.line(f"{'  ' * level}}}")
+
+    @staticmethod
+    def _emit_row(writer: TJPWriter, row: TaskRow) -> None:
+        """Write the opening of the task block and the data of the task.
+
+        Args:
+            writer (TJPWriter): The writer.
+            row (TaskRow): The task data.
+        """
+        tab = "  " * row.depth
+        writer.line(f'{tab}task Task_{row.id} "Task_{row.id}" {{')
+        if row.priority != 500:
+            writer.line(f"{tab}  priority {row.priority}")
+        if row.dependencies:
+            writer.line(
+                f"{tab}  depends "
+                + ", ".join(
+                    f"Project_{path[0]}."
+                    + ".".join(f"Task_{task_id}" for task_id in path[1:])
+                    + f" {{{dependency_target}}}"
+                    for path, dependency_target in row.dependencies
+                )
+            )
+        if not (row.is_leaf and row.resource_ids):
+            return
+
+        writer.line(
+            f"{tab}  {row.schedule_model} {row.schedule_timing}{row.schedule_unit}"
+        )
+        alternatives = ""
+        if row.alternative_resource_ids:
+            alternatives = (
+                " { alternative "
+                + ", ".join(
+                    f"User_{resource_id}"
+                    for resource_id in row.alternative_resource_ids
+                )
+                + f" select {row.allocation_strategy}"
+                + (" persistent" if row.persistent_allocation else "")
+                + " }"
+            )
+        writer.line(
+            f"{tab}  allocate "
+            + ", ".join(
+                f"User_{resource_id}{alternatives}" for resource_id in row.resource_ids
+            )
+        )
+        for resource_id, start, end in row.bookings:
+            writer.line(
+                f"{tab}  booking User_{resource_id} {start} - {end} {{ overtime 2 }}"
+            )
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Benchmark Version.absolute_full_path against Version.generate_paths().
+
+Usage::
+
+    python -m tests.benchmarks.generate_paths [version_count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import stalker
+import stalker.db.setup
+from stalker import (
+    FilenameTemplate,
+    Project,
+    Repository,
+    Sequence,
+    Shot,
+    Structure,
+    Task,
+    Version,
+)
+from stalker.config import Config
+from stalker.db.session import DBSession
+from stalker.models.template import invalidate_rendered_paths
+
+version_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+shot_count = max(1, version_count // 20)
+versions_per_task = 5
+
+try:
+    os.environ.pop(Config.env_key)
+except KeyError:
+    # already removed
+    pass
+
+# regenerate the defaults
+stalker.defaults.config_values = stalker.defaults.default_config_values.copy()
+
+database_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+database_file.close()
+stalker.db.setup.setup({"sqlalchemy.url": f"sqlite:///{database_file.name}"})
+stalker.db.setup.init()
+
+repository = Repository(
+    name="Test Repository",
+    code="TR",
+    linux_path="/mnt/T/",
+    windows_path="T:/",
+    macos_path="/Volumes/T/",
+)
+templates = [
+    FilenameTemplate(
+        name=f"{entity_type} Template",
+        target_entity_type=entity_type,
+        path="$REPO{{project.repositories[0].code}}/{{project.code}}/"
+        "{%- for parent_task in parent_tasks -%}"
+        "{{parent_task.nice_name}}/{%- endfor -%}",
+        filename="{{version.nice_name}}"
+        '_r{{"%02d"|format(version.revision_number)}}'
+        '_v{{"%03d"|format(version.version_number)}}',
+    )
+    for entity_type in ["Task", "Shot"]
+]
+project = Project(
+    name="Test Project",
+    code="TP",
+    repositories=[repository],
+    structure=Structure(name="Test Structure", templates=templates),
+)
+sequence = Sequence(name="SEQ001", code="SEQ001", project=project)
+DBSession.add_all([project, sequence])
+DBSession.commit()
+
+benchmark_start = time.time()
+print(f"creating {shot_count * 4 * versions_per_task} Versions")
+for i in range(shot_count):
+    shot = Shot(
+        name=f"SH{i:04d}", code=f"SH{i:04d}", project=project, sequence=sequence
+    )
+    tasks = [Task(name=name, parent=shot) for name in ["Anim", "Light", "Comp"]]
+    DBSession.add_all([shot] + tasks)
+    DBSession.flush()
+    for task in [shot] + tasks:
+        for _ in range(versions_per_task):
+            version = Version(task=task)
+            DBSession.add(version)
+            DBSession.flush()
+DBSession.commit()
+print("data created in: {:0.3f} secs".format(time.time() - benchmark_start))
+
+
+def load_versions():
+    """Return all the versions with a clean session.
+
+    Returns:
+        List[Version]: The Version instances.
+    """
+    DBSession.expunge_all()
+    invalidate_rendered_paths()
+    return Version.query.order_by(Version.id).all()
+
+
+versions = load_versions()
+start = time.time()
+paths = [version.absolute_full_path for version in versions]
+one_by_one = time.time() - start
+print(f"absolute_full_path for {len(versions)} versions: {one_by_one:0.3f} secs")
+
+versions = load_versions()
+start = time.time()
+batch_paths = Version.generate_paths(versions, absolute=True)
+batch = time.time() - start
+print(f"generate_paths for {len(versions)} versions: {batch:0.3f} secs")
+
+assert paths == batch_paths
+print(f"speed up: {one_by_one / batch:0.1f}x")
+
+DBSession.remove()
+os.remove(database_file.name)
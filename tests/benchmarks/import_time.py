@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the interpreter startup time of "import stalker".
+
+Exits with a non-zero exit code if the lazy import mode is over the budget.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# the budget for "import stalker" in lazy import mode, in seconds
+LAZY_IMPORT_BUDGET = 0.1
+RUN_COUNT = 10
+
+
+def measure(code, lazy_import):
+    """Return the median wall time of running the given code in a new interpreter.
+
+    The startup time of a bare interpreter is subtracted.
+
+    Args:
+        code (str): The code to run.
+        lazy_import (bool): Enable the lazy import mode or not.
+
+    Returns:
+        float: The median duration in seconds.
+    """
+    env = dict(os.environ)
+    env["STALKER_LAZY_IMPORT"] = "1" if lazy_import else "0"
+    durations = []
+    for _ in range(RUN_COUNT):
+        start = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", code], env=env)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+baseline = measure("pass", lazy_import=False)
+print("bare interpreter: {:0.3f} sec".format(baseline))
+
+results = {}
+for lazy_import in [False, True]:
+    mode = "lazy" if lazy_import else "eager"
+    for label, code in [
+        ("import stalker", "import stalker"),
+        ("from stalker import Repository", "from stalker import Repository"),
+        ("from stalker import Version", "from stalker import Version"),
+    ]:
+        duration = measure(code, lazy_import) - baseline
+        results[(mode, label)] = duration
+        print("{:5s} {:35s}: {:0.3f} sec".format(mode, label, duration))
+
+lazy_import_duration = results[("lazy", "import stalker")]
+if lazy_import_duration > LAZY_IMPORT_BUDGET:
+    print(
+        "lazy 'import stalker' took {:0.3f} sec, which is over the budget of "
+        "{:0.3f} sec".format(lazy_import_duration, LAZY_IMPORT_BUDGET)
+    )
+    sys.exit(1)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the name, nice name and login normalization.
+
+Compares the previous ``re.sub()`` chains against the precompiled normalizer
+functions for short, Unicode-heavy and long names. The warm cache timings call
+the functions with a small set of names over and over again, like the same
+names used under different parents in a bulk import.
+
+Usage::
+
+    python -m tests.benchmarks.normalize_names [name_count]
+"""
+import random
+import re
+import sys
+import time
+
+from stalker import normalizer
+from stalker.normalizer import format_login, format_name, format_nice_name
+
+name_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+
+def old_format_name(name):
+    """Format the name as it was done before the normalizer module.
+
+    Args:
+        name (str): The name value.
+
+    Returns:
+        str: The formatted name value.
+    """
+    name = name.strip()
+    name = re.sub(r"\s+", " ", name)
+    return name
+
+
+def old_format_nice_name(nice_name):
+    """Format the nice name as it was done before the normalizer module.
+
+    Args:
+        nice_name (str): The nice_name value.
+
+    Returns:
+        str: The formatted nice name value.
+    """
+    nice_name = nice_name.strip()
+    nice_name = re.sub(r"([^a-zA-Z0-9\s_\-@]+)", "", nice_name).strip()
+    nice_name = re.sub(r"(^[^a-zA-Z0-9]+)", "", nice_name)
+    nice_name = re.sub(r"\s+", " ", nice_name)
+    nice_name = re.sub("([ -])+", r"_", nice_name)
+    nice_name = re.sub(r"(_+)", r"_", nice_name)
+    return nice_name
+
+
+def old_format_login(login):
+    """Format the login as it was done before the normalizer module.
+
+    Args:
+        login (str): The login value.
+
+    Returns:
+        str: The formatted login value.
+    """
+    login = login.strip()
+    login = login.replace(" ", "")
+    login = login.lower()
+    login = re.sub("[^\\(a-zA-Z0-9)]+", "", login)
+    login = re.sub("^[0-9]+", "", login)
+    return login
+
+
+random.seed(0)
+ascii_chars = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789  -_"
+unicode_chars = "çğıöşüÇĞİÖŞÜéèàßñ漢字かなカナДжЯ  -_ 　"
+
+
+def random_names(chars, length):
+    """Return random names.
+
+    Args:
+        chars (str): The characters to use.
+        length (int): The length of each name.
+
+    Returns:
+        List[str]: The names.
+    """
+    return [
+        "".join(random.choice(chars) for _ in range(length)) for _ in range(name_count)
+    ]
+
+
+data_sets = {
+    "short ascii": [f"  SH{i:04d} Anim  Task {i % 100} " for i in range(name_count)],
+    "unicode heavy": random_names(ascii_chars + unicode_chars * 2, 32),
+    "long": random_names(ascii_chars + unicode_chars, 512),
+}
+
+functions = [
+    ("name", old_format_name, format_name),
+    ("nice_name", old_format_nice_name, format_nice_name),
+    ("login", old_format_login, format_login),
+]
+
+
+def timeit(function, names):
+    """Return the duration of calling the function with all the names.
+
+    Args:
+        function (Callable): The function to call.
+        names (List[str]): The names.
+
+    Returns:
+        float: The duration in seconds.
+    """
+    start = time.time()
+    for name in names:
+        function(name)
+    return time.time() - start
+
+
+for data_set_name, names in data_sets.items():
+    print(f"\n--- {data_set_name} ({len(names)} names) ---")
+    for function_name, old_function, new_function in functions:
+        assert [old_function(n) for n in names] == [new_function(n) for n in names]
+        old = timeit(old_function, names)
+        normalizer.clear_cache()
+        cold = timeit(new_function, names)
+        repeated_names = names[:1000] * (len(names) // 1000)
+        old_repeated = timeit(old_function, repeated_names)
+        warm = timeit(new_function, repeated_names)
+        print(
+            f"{function_name:>10}: re.sub: {old:0.3f} secs, "
+            f"normalizer (cold cache): {cold:0.3f} secs ({old / cold:0.1f}x), "
+            f"repeated names: re.sub: {old_repeated:0.3f} secs, "
+            f"normalizer (warm cache): {warm:0.3f} secs ({old_repeated / warm:0.1f}x)"
+        )
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the query plans of the hot queries with and without the indexes."""
+import datetime
+import logging
+import os
+import time
+
+import pytz
+from sqlalchemy import text
+from sqlalchemy.orm import close_all_sessions
+
+from sqlalchemy.pool import NullPool
+
+import stalker
+import stalker.db.setup
+from stalker import (
+    Project,
+    Repository,
+    SimpleEntity,
+    StatusList,
+    Task,
+    Ticket,
+    TimeLog,
+    Type,
+    User,
+    Version,
+    log,
+)
+from stalker.config import Config
+from stalker.db.declarative import Base
+from stalker.db.session import DBSession
+
+from tests.utils import create_random_db, drop_db, get_server_details_from_url
+
+log.logging_level = logging.INFO
+logging.getLogger("stalker.models.task").setLevel(logging.INFO)
+
+
+# create a new database for this test only
+database_url = create_random_db()
+
+# update the config
+config = {"sqlalchemy.url": database_url, "sqlalchemy.poolclass": NullPool}
+
+
+try:
+    os.environ.pop(Config.env_key)
+except KeyError:
+    # already removed
+    pass
+
+# regenerate the defaults
+stalker.defaults.config_values = stalker.defaults.default_config_values.copy()
+stalker.defaults["timing_resolution"] = datetime.timedelta(minutes=10)
+
+# init database
+stalker.db.setup.setup(config)
+stalker.db.setup.init()
+
+task_status_list = StatusList.query.filter_by(target_entity_type="Task").first()
+
+test_repository_type = Type(
+    name="Test Repository Type",
+    code="test",
+    target_entity_type="Repository",
+)
+
+test_repository = Repository(
+    name="Test Repository",
+    code="TR",
+    type=test_repository_type,
+    linux_path="/mnt/T/",
+    windows_path="T:/",
+    macos_path="/Volumes/T/",
+)
+
+test_user1 = User(name="User1", login="user1", email="user1@user1.com", password="1234")
+
+test_project1 = Project(
+    name="Test Project1",
+    code="tp1",
+    repositories=[test_repository],
+)
+DBSession.add_all([test_repository_type, test_repository, test_user1, test_project1])
+DBSession.commit()
+
+# create a reasonably big data set, so the planner has a reason to use the
+# indexes
+parent_count = 50
+child_count = 20
+time_log_count = 5
+version_count = 3
+
+benchmark_start = time.time()
+print(f"creating {parent_count * child_count} Tasks")
+start = datetime.datetime(2017, 3, 15, 0, 30, tzinfo=pytz.utc)
+ten_minutes = datetime.timedelta(minutes=10)
+for i in range(parent_count):
+    parent = Task(
+        name=f"Parent Task {i}",
+        project=test_project1,
+        status_list=task_status_list,
+        responsible=[test_user1],
+    )
+    DBSession.add(parent)
+    for j in range(child_count):
+        child = Task(
+            name=f"Child Task {i}-{j}",
+            parent=parent,
+            resources=[test_user1],
+            status_list=task_status_list,
+        )
+        DBSession.add(child)
+        for _ in range(time_log_count):
+            end = start + ten_minutes
+            DBSession.add(
+                TimeLog(task=child, resource=test_user1, start=start, end=end)
+            )
+            start = end
+        for _ in range(version_count):
+            DBSession.add(Version(task=child))
+            DBSession.flush()
+    DBSession.commit()
+    print(f"i: {i}")
+
+benchmark_end = time.time()
+print("data created in: {:0.3f} secs".format(benchmark_end - benchmark_start))
+
+sample_task = Task.query.filter(Task.parent != None).first()  # noqa: E711
+
+queries = {
+    "TimeLogs.task_id": TimeLog.query.filter(TimeLog.task_id == sample_task.id),
+    "TimeLogs.resource_id": TimeLog.query.filter(
+        TimeLog.resource_id == test_user1.id
+    ),
+    "Tasks.parent_id": Task.query.filter(Task.parent_id == sample_task.parent_id),
+    "Tasks.project_id": Task.query.filter(Task.project_id == test_project1.id),
+    "Versions.latest_version": Version.query.filter(Version.task_id == sample_task.id)
+    .filter(Version.revision_number == 1)
+    .order_by(Version.version_number.desc())
+    .limit(1),
+    "Tickets.number": Ticket.query.order_by(Ticket.number.desc()).limit(1),
+    "SimpleEntities.entity_type": SimpleEntity.query.filter(
+        SimpleEntity.entity_type == "Task"
+    ),
+}
+
+
+def explain_all(title):
+    """Print the query plans and timings of all the queries.
+
+    Args:
+        title (str): The title to print before the query plans.
+    """
+    connection = DBSession.connection()
+    connection.execute(text("ANALYZE"))
+    print(f"\n{'=' * 80}\n{title}\n{'=' * 80}")
+    for name, query in queries.items():
+        sql = str(
+            query.statement.compile(
+                dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+            )
+        )
+        plan = connection.execute(text(f"EXPLAIN ANALYZE {sql}")).fetchall()
+        print(f"\n--- {name} ---")
+        for row in plan:
+            print(row[0])
+
+
+indexes = [
+    index
+    for table in Base.metadata.sorted_tables
+    for index in table.indexes
+    if index.name.startswith("ix_")
+]
+
+engine = DBSession.connection().engine
+DBSession.commit()
+for index in indexes:
+    index.drop(engine)
+explain_all("BEFORE: without indexes")
+DBSession.commit()
+
+for index in indexes:
+    index.create(engine)
+explain_all("AFTER: with indexes")
+
+# clean up test database
+DBSession.rollback()
+connection = DBSession.connection()
+engine = connection.engine
+connection.close()
+
+Base.metadata.drop_all(engine, checkfirst=True)
+DBSession.remove()
+
+stalker.defaults["timing_resolution"] = datetime.timedelta(hours=1)
+
+close_all_sessions()
+drop_db(**get_server_details_from_url(database_url))
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the status updates with and without the identity equality.
+
+Usage::
+
+    python -m tests.benchmarks.status_update_equality [parent_count]
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import event
+
+import stalker
+import stalker.db.setup
+from stalker import Project, Repository, StatusList, Task, log
+from stalker.config import Config
+from stalker.db.session import DBSession
+
+log.logging_level = logging.INFO
+logging.getLogger("stalker.models.task").setLevel(logging.INFO)
+
+parent_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+child_count = 10
+
+try:
+    os.environ.pop(Config.env_key)
+except KeyError:
+    # already removed
+    pass
+
+# regenerate the defaults
+stalker.defaults.config_values = stalker.defaults.default_config_values.copy()
+
+database_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+database_file.close()
+stalker.db.setup.setup({"sqlalchemy.url": f"sqlite:///{database_file.name}"})
+stalker.db.setup.init()
+
+task_status_list = StatusList.query.filter_by(target_entity_type="Task").first()
+repository = Repository(
+    name="Test Repository",
+    code="TR",
+    linux_path="/mnt/T/",
+    windows_path="T:/",
+    macos_path="/Volumes/T/",
+)
+project = Project(name="Test Project", code="TP", repositories=[repository])
+DBSession.add(project)
+DBSession.commit()
+
+benchmark_start = time.time()
+print(f"creating {parent_count * child_count} Tasks")
+previous_child = None
+for i in range(parent_count):
+    parent = Task(name=f"Parent Task {i}", project=project)
+    DBSession.add(parent)
+    DBSession.flush()
+    for j in range(child_count):
+        child = Task(name=f"Child Task {j}", parent=parent)
+        DBSession.add(child)
+        DBSession.flush()
+        # every child depends on the previous one
+        if previous_child:
+            child.depends_on = [previous_child]
+        previous_child = child
+    DBSession.commit()
+print("data created in: {:0.3f} secs".format(time.time() - benchmark_start))
+
+statements = []
+
+
+@event.listens_for(DBSession.connection().engine, "before_cursor_execute")
+def count_statements(conn, cursor, statement, parameters, context, executemany):
+    """Count the executed statements."""
+    statements.append(statement)
+
+
+def update_statuses():
+    """Update the statuses of all the leaf tasks with a clean session.
+
+    Returns:
+        Tuple[float, int]: The duration in seconds and the number of statements.
+    """
+    DBSession.expunge_all()
+    leaf_tasks = Task.query.filter(Task.parent_id.isnot(None)).all()
+    last_children = leaf_tasks[-child_count:]
+    DBSession.expire_all()
+    del statements[:]
+    start = time.time()
+    for task in leaf_tasks:
+        task.update_status_with_dependent_statuses()
+        # the same kind of membership checks the status workflow and the
+        # dependency validators do, the children of all the parents share the
+        # same names, so the field comparison goes deep
+        _ = task.status in task.status_list.statuses
+        _ = task in last_children
+    duration = time.time() - start
+    statement_count = len(statements)
+    DBSession.rollback()
+    return duration, statement_count
+
+
+results = {}
+for identity_equality in [False, True]:
+    stalker.defaults["identity_equality"] = identity_equality
+    results[identity_equality] = update_statuses()
+    print(
+        "identity_equality={}: {:0.3f} secs, {} statements".format(
+            identity_equality, *results[identity_equality]
+        )
+    )
+
+print("speed up: {:0.1f}x".format(results[False][0] / results[True][0]))
+
+DBSession.remove()
+os.remove(database_file.name)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the extraction of the task data for the TaskJuggler scheduler.
+
+A project with the given number of tasks, each having a resource and a time log,
+is created in the given database and its tjp representation is created by
+walking the objects (Project.to_tjp) and from the flat rows fetched with the
+portable queries of TaskRowsEmitter.from_database(). For PostgreSQL databases
+the recursive PostgreSQL query of the TaskJugglerScheduler is timed too.
+
+Usage::
+
+    python -m tests.benchmarks.tjp_task_rows [task_count] [database_url]
+"""
+
+import datetime
+import sys
+import time
+
+import pytz
+
+import stalker.db.setup
+from stalker import Project, Repository, Task, TaskJugglerScheduler, TimeLog, User
+from stalker.db.session import DBSession
+from stalker.tjp import TaskRowsEmitter
+
+task_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+database_url = sys.argv[2] if len(sys.argv) > 2 else "sqlite:///:memory:"
+
+stalker.db.setup.setup({"sqlalchemy.url": database_url})
+stalker.db.setup.init()
+
+user = User(name="User1", login="user1", email="user1@users.com", password="1234")
+project = Project(
+    name="Benchmark Project",
+    code="BP",
+    repositories=[Repository(name="Benchmark Repository", code="BR")],
+)
+DBSession.add_all([user, project])
+DBSession.commit()
+
+start_time = time.perf_counter()
+parents = [Task(name=f"Parent{i}", project=project) for i in range(task_count // 10)]
+tasks = [
+    Task(
+        name=f"Task{i}",
+        parent=parents[i % len(parents)],
+        resources=[user],
+        schedule_timing=1,
+        schedule_unit="h",
+    )
+    for i in range(task_count - len(parents))
+]
+DBSession.add_all(parents + tasks)
+DBSession.commit()
+epoch = datetime.datetime(2024, 1, 1, tzinfo=pytz.utc)
+DBSession.add_all(
+    TimeLog(
+        task=task,
+        resource=user,
+        start=epoch + datetime.timedelta(hours=i),
+        end=epoch + datetime.timedelta(hours=i + 1),
+    )
+    for i, task in enumerate(tasks)
+)
+DBSession.commit()
+print(f"data creation   : {time.perf_counter() - start_time:.3f} seconds")
+
+DBSession.expire_all()
+start_time = time.perf_counter()
+project.to_tjp
+print(f"object walk     : {time.perf_counter() - start_time:.3f} seconds")
+
+start_time = time.perf_counter()
+TaskRowsEmitter.from_database([project.id]).render()
+print(f"portable rows   : {time.perf_counter() - start_time:.3f} seconds")
+
+if DBSession.connection().dialect.name == "postgresql":
+    scheduler = TaskJugglerScheduler()
+    start_time = time.perf_counter()
+    TaskRowsEmitter(scheduler._fetch_task_rows_postgresql([project.id])).render()
+    print(f"postgresql rows : {time.perf_counter() - start_time:.3f} seconds")
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the single path and the bulk path translation of Repository.
+
+Usage::
+
+    python -m tests.benchmarks.translate_paths [path_count] [repository_count]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import stalker
+import stalker.db.setup
+from stalker import Repository
+from stalker.config import Config
+from stalker.db.session import DBSession
+
+path_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+repository_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+try:
+    os.environ.pop(Config.env_key)
+except KeyError:
+    # already removed
+    pass
+
+# regenerate the defaults
+stalker.defaults.config_values = stalker.defaults.default_config_values.copy()
+
+database_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+database_file.close()
+stalker.db.setup.setup({"sqlalchemy.url": f"sqlite:///{database_file.name}"})
+stalker.db.setup.init()
+
+repositories = [
+    Repository(
+        name=f"Repository {i}",
+        code=f"R{i}",
+        linux_path=f"/mnt/R{i}/Projects",
+        windows_path=f"R{i}:/Projects",
+        macos_path=f"/Volumes/R{i}/Projects",
+    )
+    for i in range(repository_count)
+]
+DBSession.add_all(repositories)
+DBSession.commit()
+
+random.seed(0)
+roots = [
+    root
+    for repo in repositories
+    for root in [repo.linux_path, repo.windows_path, repo.macos_path]
+]
+paths = [
+    f"{random.choice(roots)}Project{i % 50}/Seq{i % 7}/SH{i % 100:03d}/"
+    f"Comp/Outputs/v{i % 20:03d}/SH{i % 100:03d}.{i % 240:04d}.exr"
+    for i in range(path_count)
+]
+print(f"{len(paths)} paths in {repository_count} repositories")
+
+
+def to_linux_path_one_by_one(path):
+    """Convert the path with the single path API.
+
+    Args:
+        path (str): The path.
+
+    Returns:
+        str: The Linux path.
+    """
+    repo = Repository.find_repo(path)
+    return repo.to_linux_path(path) if repo else path
+
+
+# warm up the repository index
+Repository.find_repo(paths[0])
+
+start = time.time()
+one_by_one = [to_linux_path_one_by_one(path) for path in paths]
+one_by_one_duration = time.time() - start
+print(f"find_repo() + to_linux_path(): {one_by_one_duration:0.3f} secs")
+
+start = time.time()
+bulk = list(Repository.to_linux_paths(paths))
+bulk_duration = time.time() - start
+print(f"to_linux_paths(): {bulk_duration:0.3f} secs")
+assert one_by_one == bulk
+print(f"speed up: {one_by_one_duration / bulk_duration:0.1f}x")
+
+start = time.time()
+one_by_one = [Repository.to_os_independent_path(path) for path in paths]
+one_by_one_duration = time.time() - start
+print(f"to_os_independent_path(): {one_by_one_duration:0.3f} secs")
+
+start = time.time()
+bulk = list(Repository.to_os_independent_paths(paths))
+bulk_duration = time.time() - start
+print(f"to_os_independent_paths(): {bulk_duration:0.3f} secs")
+assert one_by_one == bulk
+print(f"speed up: {one_by_one_duration / bulk_duration:0.1f}x")
+
+DBSession.remove()
+os.remove(database_file.name)
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the working time arithmetic of the WorkingCalendar.
+
+The working seconds of random intervals are calculated by walking the
+intervals minute by minute with WorkingHours.is_working_hour(), with the
+compiled calendar and, if NumPy is installed, with the vectorized variant.
+
+Usage::
+
+    python -m tests.benchmarks.working_calendar [interval_count] [vacation_count]
+"""
+
+import datetime
+import random
+import sys
+import time
+
+import pytz
+
+from stalker import Vacation, WorkingHours
+
+interval_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+vacation_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+random.seed(0)
+epoch = datetime.datetime(2024, 1, 1, tzinfo=pytz.utc)
+vacations = []
+for _ in range(vacation_count):
+    start = epoch + datetime.timedelta(minutes=random.randrange(0, 5 * 525600))
+    end = start + datetime.timedelta(minutes=random.randrange(60, 7 * 1440))
+    vacations.append(Vacation(start=start, end=end))
+intervals = []
+for _ in range(interval_count):
+    start = epoch + datetime.timedelta(minutes=random.randrange(0, 5 * 525600))
+    end = start + datetime.timedelta(minutes=random.randrange(0, 60 * 1440))
+    intervals.append((start, end))
+
+working_hours = WorkingHours()
+
+# walking minute by minute is slow, time a sample of the intervals
+sample = intervals[: max(1, interval_count // 10000)]
+start_time = time.perf_counter()
+for start, end in sample:
+    seconds = 0
+    date = start
+    while date < end:
+        if working_hours.is_working_hour(date):
+            seconds += 60
+        date += datetime.timedelta(minutes=1)
+duration = time.perf_counter() - start_time
+print(
+    f"minute walk      : {duration:.3f} seconds for {len(sample)} intervals "
+    f"({duration / len(sample) * 1e6:.1f} us per interval, without vacations)"
+)
+
+start_time = time.perf_counter()
+calendar = working_hours.compile(vacations)
+print(f"compile          : {time.perf_counter() - start_time:.3f} seconds")
+
+start_time = time.perf_counter()
+result = [calendar.working_seconds_between(start, end) for start, end in intervals]
+duration = time.perf_counter() - start_time
+print(
+    f"compiled calendar: {duration:.3f} seconds for {interval_count} intervals "
+    f"({duration / interval_count * 1e6:.1f} us per interval)"
+)
+
+try:
+    import numpy
+except ImportError:
+    print("vectorized       : skipped, NumPy is not installed")
+else:
+    starts = numpy.array(
+        [start.replace(tzinfo=None) for start, _ in intervals], dtype="datetime64[us]"
+    )
+    ends = numpy.array(
+        [end.replace(tzinfo=None) for _, end in intervals], dtype="datetime64[us]"
+    )
+    start_time = time.perf_counter()
+    vectorized_result = calendar.working_seconds_between_many(starts, ends)
+    duration = time.perf_counter() - start_time
+    assert vectorized_result.tolist() == result
+    print(
+        f"vectorized       : {duration:.3f} seconds for {interval_count} intervals "
+        f"({duration / interval_count * 1e6:.1f} us per interval)"
+    )
@@ -212,6 +212,67 @@ def test___contains___is_working_as_expected(prepare_config_file):
     assert "admin_name" in c
 
 
+def test_register_lazy_loader_calls_the_loader_on_first_use(prepare_config_file):
+    """config.Config.register_lazy_loader() loader is called on first use."""
+    c = config.Config()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        c["daily_working_hours"] = 8
+        c["weekly_working_days"] = 4
+
+    c.register_lazy_loader(["daily_working_hours", "weekly_working_days"], loader)
+    assert calls == []
+    assert c.admin_name == "admin"
+    assert calls == []
+    assert c.daily_working_hours == 8
+    assert calls == [1]
+    assert c["weekly_working_days"] == 4
+    assert calls == [1]
+
+
+def test_register_lazy_loader_keeps_the_values_set_before_the_first_use(
+    prepare_config_file,
+):
+    """config.Config.register_lazy_loader() loader doesn't overwrite set values."""
+    c = config.Config()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        c["daily_working_hours"] = 8
+        c["weekly_working_days"] = 4
+        c["weekly_working_hours"] = 32
+
+    c.register_lazy_loader(
+        ["daily_working_hours", "weekly_working_days", "weekly_working_hours"],
+        loader,
+    )
+    c["daily_working_hours"] = 6
+    del c["weekly_working_hours"]
+    assert calls == []
+    assert c.weekly_working_days == 4
+    assert calls == [1]
+    assert c.daily_working_hours == 6
+    assert "weekly_working_hours" not in c
+
+
+def test_remove_lazy_loader_removes_the_loader(prepare_config_file):
+    """config.Config.remove_lazy_loader() removes the loader without calling it."""
+    c = config.Config()
+    calls = []
+
+    def loader():
+        calls.append(1)
+
+    c.register_lazy_loader(["daily_working_hours", "weekly_working_days"], loader)
+    c.remove_lazy_loader(loader)
+    assert c.daily_working_hours == 9
+    assert c.weekly_working_days == 5
+    assert calls == []
+
+
 def test_update_with_studio_is_working_as_expected(setup_postgresql_db):
     """default values are updated with the Studio if there is a DB and a Studio."""
     # check the defaults are still using them self
@@ -7,6 +7,7 @@ from subprocess import CalledProcessError
 
 import pytest
 
+from sqlalchemy import event
 from sqlalchemy.pool import NullPool
 
 import stalker
@@ -43,6 +44,33 @@ def setup_sqlite3():
     tear_down_db({})
 
 
+@pytest.fixture
+def count_statements():
+    """Count the statements that a callable executes on the DB.
+
+    Returns:
+        Callable: A function that calls the given callable with the given
+            arguments and returns the return value of the callable and the
+            list of the executed statements.
+    """
+
+    def _count_statements(callable_, *args, **kwargs):
+        statements = []
+
+        def listener(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = DBSession.connection().engine
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            result = callable_(*args, **kwargs)
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+        return result, statements
+
+    return _count_statements
+
+
 @pytest.fixture
 def get_data_file(request):
     """Request a specific datafile.
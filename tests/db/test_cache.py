@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""Tests for the stalker.db.cache module."""
+
+import pytest
+
+import stalker
+import stalker.db.setup
+from stalker import (
+    FilenameTemplate,
+    ImageFormat,
+    Project,
+    Repository,
+    Status,
+    StatusList,
+    Structure,
+    Task,
+    Type,
+)
+from stalker.db.cache import (
+    ReferenceCache,
+    invalidate_reference_cache,
+    reference_cache,
+)
+from stalker.db.session import DBSession
+
+
+@pytest.fixture(scope="function")
+def setup_reference_cache_tests(setup_sqlite3):
+    """Set up the tests for the reference data cache with a SQLite3 DB.
+
+    Yields:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_image_format"] = ImageFormat(name="HD", width=1920, height=1080)
+    data["test_template"] = FilenameTemplate(
+        name="Task Template", target_entity_type="Task", path="{{project.code}}"
+    )
+    data["test_structure"] = Structure(
+        name="Test Structure", templates=[data["test_template"]]
+    )
+    data["test_type"] = Type(
+        name="Test Type", code="test", target_entity_type="Project"
+    )
+    DBSession.add_all(
+        [data["test_image_format"], data["test_structure"], data["test_type"]]
+    )
+    DBSession.commit()
+    invalidate_reference_cache()
+    yield data
+    invalidate_reference_cache()
+
+
+@pytest.mark.parametrize("class_", [Task, Project, "Status", None])
+def test_class_is_not_a_reference_data_class(setup_reference_cache_tests, class_):
+    """TypeError is raised if the class is not a reference data class."""
+    with pytest.raises(TypeError) as cm:
+        reference_cache.find(class_, code="WIP")
+
+    assert str(cm.value) == (
+        "class_ should be one of the reference data classes (FilenameTemplate, "
+        "ImageFormat, Repository, Status, StatusList, Structure, Type), "
+        f"not {class_.__class__.__name__}: '{class_}'"
+    )
+
+
+def test_find_returns_the_matching_instance(setup_reference_cache_tests):
+    """find() returns the first instance matching the criteria."""
+    wip = reference_cache.find(Status, code="WIP")
+    assert isinstance(wip, Status)
+    assert wip.name == "Work In Progress"
+    assert reference_cache.find(Status, code="WIP", name="Completed") is None
+
+
+def test_find_returns_none_if_nothing_matches(setup_reference_cache_tests):
+    """find() returns None if there is no matching instance."""
+    assert reference_cache.find(Status, code="NOPE") is None
+
+
+def test_find_matches_any_of_the_items_of_a_list(setup_reference_cache_tests):
+    """find() matches any of the items of a list criterion."""
+    status_list = reference_cache.find(
+        StatusList, target_entity_type=["Entity", "Task"]
+    )
+    assert status_list.target_entity_type == "Task"
+
+
+def test_find_all_returns_all_the_matching_instances(setup_reference_cache_tests):
+    """find_all() returns all the matching instances ordered by their ids."""
+    statuses = reference_cache.find_all(Status, code=("CMPL", "WIP", "NOPE"))
+    assert [status.code for status in statuses] == ["WIP", "CMPL"]
+    assert statuses == sorted(statuses, key=lambda status: status.id)
+
+
+def test_get_returns_the_instance_with_the_given_id(setup_reference_cache_tests):
+    """get() returns the instance with the given id."""
+    data = setup_reference_cache_tests
+    assert reference_cache.get(ImageFormat, data["test_image_format"].id) is (
+        data["test_image_format"]
+    )
+    assert reference_cache.get(ImageFormat, -1) is None
+
+
+def test_instances_are_merged_into_the_current_session(
+    setup_reference_cache_tests,
+):
+    """The returned instances are in the current session."""
+    DBSession.expunge_all()
+    status_list = reference_cache.find(StatusList, target_entity_type="Task")
+    assert status_list in DBSession
+    assert all(status in DBSession for status in status_list.statuses)
+    assert not DBSession.dirty
+    assert not DBSession.new
+
+
+def test_the_instance_in_the_session_is_returned(setup_reference_cache_tests):
+    """The instance already in the session is returned."""
+    data = setup_reference_cache_tests
+    assert data["test_type"].name == "Test Type"
+    assert reference_cache.find(Type, code="test") is data["test_type"]
+
+
+def test_unflushed_changes_are_not_overwritten(setup_reference_cache_tests):
+    """The unflushed changes of the instance in the session are kept."""
+    data = setup_reference_cache_tests
+    reference_cache.find(Type, code="test")
+    with DBSession.no_autoflush:
+        data["test_type"].name = "Changed Type"
+        assert reference_cache.find(Type, code="test").name == "Changed Type"
+
+
+def test_warm_cache_issues_no_queries(setup_reference_cache_tests, count_statements):
+    """The lookups are not issuing any queries when the cache is warm."""
+    reference_cache.find(Status, code="WIP")
+    reference_cache.find(StatusList, target_entity_type="Task")
+    reference_cache.find(Structure, name="Test Structure")
+    DBSession.commit()
+    DBSession.expunge_all()
+
+    def lookup():
+        wip = reference_cache.find(Status, code="WIP")
+        status_list = reference_cache.find(StatusList, target_entity_type="Task")
+        structure = reference_cache.find(Structure, name="Test Structure")
+        return (
+            wip.code,
+            [status.code for status in status_list.statuses],
+            [template.name for template in structure.templates],
+        )
+
+    result, statements = count_statements(lookup)
+    assert len(statements) == 0
+    assert result[0] == "WIP"
+    assert "WIP" in result[1]
+    assert result[2] == ["Task Template"]
+
+
+def test_each_class_is_loaded_with_a_single_query(
+    setup_reference_cache_tests, count_statements
+):
+    """All the instances of a class are loaded with a single query."""
+    _, statements = count_statements(reference_cache.find, Status, code="WIP")
+    assert len(statements) == 1
+    _, statements = count_statements(reference_cache.find, Status, code="CMPL")
+    assert len(statements) == 0
+
+
+def test_inserting_an_instance_invalidates_the_cache(setup_reference_cache_tests):
+    """Inserting a reference data instance clears the cache."""
+    assert reference_cache.find(Repository, code="TR") is None
+    repo = Repository(
+        name="Test Repository",
+        code="TR",
+        linux_path="/mnt/T/",
+        windows_path="T:/",
+        macos_path="/Volumes/T/",
+    )
+    DBSession.add(repo)
+    DBSession.flush()
+    assert reference_cache.find(Repository, code="TR") is repo
+
+
+def test_updating_an_instance_invalidates_the_cache(setup_reference_cache_tests):
+    """Updating a reference data instance clears the cache."""
+    data = setup_reference_cache_tests
+    assert reference_cache.find(Type, code="test") is data["test_type"]
+    data["test_type"].code = "changed"
+    DBSession.commit()
+    DBSession.expunge_all()
+    assert reference_cache.find(Type, code="test") is None
+    assert reference_cache.find(Type, code="changed").name == "Test Type"
+
+
+def test_deleting_an_instance_invalidates_the_cache(setup_reference_cache_tests):
+    """Deleting a reference data instance clears the cache."""
+    data = setup_reference_cache_tests
+    assert reference_cache.find(ImageFormat, name="HD") is not None
+    DBSession.delete(data["test_image_format"])
+    DBSession.commit()
+    assert reference_cache.find(ImageFormat, name="HD") is None
+
+
+def test_rollback_invalidates_the_cache(setup_reference_cache_tests):
+    """Rolling back a transaction clears the cache."""
+    DBSession.add(ImageFormat(name="4K", width=4096, height=2160))
+    DBSession.flush()
+    assert reference_cache.find(ImageFormat, name="4K") is not None
+    DBSession.rollback()
+    assert reference_cache.find(ImageFormat, name="4K") is None
+
+
+def test_invalidate_clears_the_cache(setup_reference_cache_tests, count_statements):
+    """invalidate() clears the cache."""
+    reference_cache.find(Status, code="WIP")
+    reference_cache.invalidate()
+    _, statements = count_statements(reference_cache.find, Status, code="WIP")
+    assert len(statements) == 1
+
+
+def test_cached_instances_expire_after_the_ttl(
+    setup_reference_cache_tests, monkeypatch, count_statements
+):
+    """The cached instances are loaded again after reference_cache_ttl seconds."""
+    stalker.defaults["reference_cache_ttl"] = 10
+    now = [1000.0]
+    monkeypatch.setattr("stalker.db.cache.time.monotonic", lambda: now[0])
+    cache = ReferenceCache()
+    cache.find(Status, code="WIP")
+    now[0] += 5
+    _, statements = count_statements(cache.find, Status, code="WIP")
+    assert len(statements) == 0
+    now[0] += 10
+    _, statements = count_statements(cache.find, Status, code="WIP")
+    assert len(statements) == 1
+
+
+def test_ttl_is_none(setup_reference_cache_tests, monkeypatch, count_statements):
+    """The cached instances never expire if reference_cache_ttl is None."""
+    stalker.defaults["reference_cache_ttl"] = None
+    now = [1000.0]
+    monkeypatch.setattr("stalker.db.cache.time.monotonic", lambda: now[0])
+    cache = ReferenceCache()
+    cache.find(Status, code="WIP")
+    now[0] += 1e9
+    _, statements = count_statements(cache.find, Status, code="WIP")
+    assert len(statements) == 0
+
+
+def test_a_new_database_invalidates_the_cache(setup_reference_cache_tests):
+    """Setting up a new database clears the cache."""
+    assert reference_cache.find(Type, code="test") is not None
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    assert reference_cache.find(Type, code="test") is None
+
+
+def test_default_status_list_is_found_through_the_cache(
+    setup_reference_cache_tests,
+):
+    """StatusMixin finds the default StatusList through the cache."""
+    data = setup_reference_cache_tests
+    project = Project(name="Test Project", code="TP", type=data["test_type"])
+    assert project.status_list is reference_cache.find(
+        StatusList, target_entity_type="Project"
+    )
@@ -6,8 +6,11 @@ import pytest
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 
+import stalker.db.setup
 from stalker import SimpleEntity, Status, StatusList, StatusMixin
+from stalker.db.cache import reference_cache
 from stalker.db.session import DBSession
+from stalker.models import mixins
 
 
 class StatMixClass(SimpleEntity, StatusMixin):
@@ -574,3 +577,130 @@ def test_status_list_is_found_automatically_for_derived_class(
 
     test_obj = StatusListAutoAddDerivedClass()
     assert test_obj.status_list == status_list
+
+
+@pytest.fixture(scope="function")
+def setup_default_status_list_tests(setup_sqlite3):
+    """Set up the tests for the default StatusList cache with a SQLite3 DB.
+
+    Yields:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    mixins.invalidate_default_status_lists()
+    data["test_status1"] = Status(name="Status1", code="STS1")
+    data["test_status2"] = Status(name="Status2", code="STS2")
+    data["test_status_list1"] = StatusList(
+        name="Test Status List 1",
+        target_entity_type="StatusListAutoAddClass",
+        statuses=[data["test_status1"], data["test_status2"]],
+    )
+    DBSession.add(data["test_status_list1"])
+    DBSession.commit()
+    yield data
+    mixins.invalidate_default_status_lists()
+
+
+def test_mro_names_are_computed_once_per_class():
+    """The MRO names of a StatusMixin class are computed once."""
+    names = StatusListAutoAddDerivedClass._mro_names()
+    assert names == frozenset(
+        mro.__name__ for mro in StatusListAutoAddDerivedClass.__mro__
+    )
+    assert StatusListAutoAddDerivedClass._mro_names() is names
+    assert StatusListAutoAddClass._mro_names() is not names
+
+
+def test_default_status_list_is_looked_up_once(
+    setup_default_status_list_tests, monkeypatch, count_statements
+):
+    """The default StatusList is looked up once for many instances."""
+    data = setup_default_status_list_tests
+    lookups = []
+    find = reference_cache.find
+
+    def counting_find(class_, **criteria):
+        lookups.append(class_)
+        return find(class_, **criteria)
+
+    monkeypatch.setattr(reference_cache, "find", counting_find)
+    objects, statements = count_statements(
+        lambda: [
+            StatusListAutoAddDerivedClass(name=f"Test Object {i}") for i in range(1000)
+        ]
+    )
+
+    assert lookups == [StatusList]
+    # the StatusLists and their statuses are loaded once
+    assert len(statements) == 2
+    assert all(obj.status_list is data["test_status_list1"] for obj in objects)
+
+
+def test_default_status_list_cache_is_per_class(setup_default_status_list_tests):
+    """The default StatusLists are cached per class."""
+    data = setup_default_status_list_tests
+    StatusListAutoAddDerivedClass()
+    assert mixins._default_status_list_ids == {
+        StatusListAutoAddDerivedClass: data["test_status_list1"].id
+    }
+    StatusListAutoAddClass()
+    assert mixins._default_status_list_ids == {
+        StatusListAutoAddDerivedClass: data["test_status_list1"].id,
+        StatusListAutoAddClass: data["test_status_list1"].id,
+    }
+
+
+def test_inserting_a_status_list_invalidates_the_cache(
+    setup_default_status_list_tests,
+):
+    """Inserting a StatusList clears the default StatusList cache."""
+    data = setup_default_status_list_tests
+    StatusListAutoAddDerivedClass()
+    assert mixins._default_status_list_ids != {}
+    DBSession.add(
+        StatusList(
+            name="Test Status List 2",
+            target_entity_type="StatusListAutoAddDerivedClass",
+            statuses=[data["test_status1"]],
+        )
+    )
+    DBSession.flush()
+    assert mixins._default_status_list_ids == {}
+
+
+def test_changing_the_target_entity_type_invalidates_the_cache(
+    setup_default_status_list_tests,
+):
+    """Changing the target_entity_type of a StatusList clears the cache."""
+    data = setup_default_status_list_tests
+    StatusListAutoAddClass()
+    assert mixins._default_status_list_ids != {}
+    data["test_status_list1"]._target_entity_type = "StatusListNoAutoAddClass"
+    assert mixins._default_status_list_ids == {}
+    DBSession.commit()
+
+    with pytest.raises(TypeError):
+        StatusListAutoAddClass()
+    assert StatusListNoAutoAddClass().status_list is data["test_status_list1"]
+
+
+def test_deleting_a_status_list_invalidates_the_cache(
+    setup_default_status_list_tests,
+):
+    """Deleting a StatusList clears the default StatusList cache."""
+    data = setup_default_status_list_tests
+    StatusListAutoAddClass()
+    DBSession.delete(data["test_status_list1"])
+    DBSession.commit()
+    with pytest.raises(TypeError):
+        StatusListAutoAddClass()
+
+
+def test_rollback_invalidates_the_cache(setup_default_status_list_tests):
+    """Rolling back a transaction clears the default StatusList cache."""
+    StatusListAutoAddClass()
+    assert mixins._default_status_list_ids != {}
+    DBSession.rollback()
+    assert mixins._default_status_list_ids == {}
@@ -2,6 +2,9 @@
 """Tests for the stalker.models.template.FilenameTemplate class."""
 
 import sys
+
+import jinja2
+
 import pytest
 
 from stalker import (
@@ -16,6 +19,7 @@ from stalker import (
     Version,
 )
 from stalker.db.session import DBSession
+from stalker.models.template import invalidate_rendered_paths
 
 
 @pytest.fixture(scope="function")
@@ -364,3 +368,64 @@ def test__hash__is_working_as_expected(setup_filename_template_tests):
     result = hash(data["filename_template"])
     assert isinstance(result, int)
     assert result == data["filename_template"].__hash__()
+
+
+def test_compile_template_returns_a_jinja2_template():
+    """compile_template() returns a compiled jinja2 template."""
+    template = FilenameTemplate.compile_template("{{project.code}}/Assets")
+    assert isinstance(template, jinja2.Template)
+    assert template.render(project={"code": "TP"}) == "TP/Assets"
+
+
+def test_compile_template_caches_the_compiled_templates():
+    """compile_template() returns the same compiled template for the same source."""
+    template1 = FilenameTemplate.compile_template("{{project.code}}/Shots")
+    template2 = FilenameTemplate.compile_template("{{project.code}}/Shots")
+    template3 = FilenameTemplate.compile_template("{{project.code}}/Sequences")
+    assert template1 is template2
+    assert template1 is not template3
+
+
+def test_compile_template_uses_the_shared_environment():
+    """compile_template() uses the FilenameTemplate.jinja_environment."""
+    template = FilenameTemplate.compile_template("{{project.code}}/Scenes")
+    assert template.environment is FilenameTemplate.jinja_environment
+
+
+def test_render_path_renders_the_path_template(setup_filename_template_tests):
+    """render_path() renders the path template with the given variables."""
+    data = setup_filename_template_tests
+    data["filename_template"].path = "{{project.code}}/{{task.name}}"
+    assert (
+        data["filename_template"].render_path(
+            project={"code": "TP"}, task={"name": "Modeling"}
+        )
+        == "TP/Modeling"
+    )
+
+
+def test_render_filename_renders_the_filename_template(
+    setup_filename_template_tests,
+):
+    """render_filename() renders the filename template with the given variables."""
+    data = setup_filename_template_tests
+    data["filename_template"].filename = '{{task.name}}_v{{"%03d"|format(number)}}'
+    assert (
+        data["filename_template"].render_filename(task={"name": "Modeling"}, number=3)
+        == "Modeling_v003"
+    )
+
+
+def test_invalidate_rendered_paths_increments_the_render_generation():
+    """invalidate_rendered_paths() increments the render_generation."""
+    render_generation = FilenameTemplate.render_generation
+    invalidate_rendered_paths()
+    assert FilenameTemplate.render_generation == render_generation + 1
+
+
+def test_changing_the_path_invalidates_rendered_paths(setup_filename_template_tests):
+    """changing the path attribute invalidates the rendered paths."""
+    data = setup_filename_template_tests
+    render_generation = FilenameTemplate.render_generation
+    data["filename_template"].path = "{{project.code}}"
+    assert FilenameTemplate.render_generation > render_generation
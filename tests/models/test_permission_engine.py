@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Tests for the PermissionEngine class."""
+
+import pytest
+
+import stalker
+import stalker.db.setup
+from stalker import Group, Permission, User
+from stalker.db.session import DBSession
+from stalker.models.auth import (
+    PermissionEngine,
+    can,
+    invalidate_permissions,
+    permission_engine,
+)
+
+
+@pytest.fixture(scope="function")
+def setup_permission_engine_tests(setup_sqlite3):
+    """Set up the tests for the PermissionEngine class with a SQLite3 DB.
+
+    Yields:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    # init() creates all the permissions
+    for name, (access, action, class_name) in {
+        "allow_read_project": ("Allow", "Read", "Project"),
+        "allow_update_project": ("Allow", "Update", "Project"),
+        "deny_update_project": ("Deny", "Update", "Project"),
+        "allow_create_task": ("Allow", "Create", "Task"),
+    }.items():
+        data[name] = Permission.query.filter_by(
+            access=access, action=action, class_name=class_name
+        ).one()
+    data["test_group1"] = Group(
+        name="Group1",
+        permissions=[data["allow_read_project"], data["allow_update_project"]],
+    )
+    data["test_group2"] = Group(name="Group2")
+    data["test_user"] = User(
+        name="User1",
+        login="user1",
+        password="1234",
+        email="user1@test.com",
+        groups=[data["test_group1"]],
+    )
+    DBSession.add_all([data["test_user"], data["test_group2"]])
+    DBSession.commit()
+    invalidate_permissions()
+    yield data
+    invalidate_permissions()
+
+
+def test_user_permissions_are_compiled(setup_permission_engine_tests):
+    """The permissions of the user are compiled into the action bits."""
+    data = setup_permission_engine_tests
+    data["test_user"].permissions.append(data["allow_create_task"])
+    assert permission_engine.compile(data["test_user"]) == {
+        "Project": 0b110,
+        "Task": 0b1,
+    }
+
+
+@pytest.mark.parametrize("user", [None, "user1", 1])
+def test_compile_user_is_not_a_user(setup_permission_engine_tests, user):
+    """TypeError is raised if the user is not a User instance."""
+    with pytest.raises(TypeError) as cm:
+        permission_engine.compile(user)
+
+    assert str(cm.value) == (
+        "user should be a stalker.models.auth.User instance, "
+        f"not {user.__class__.__name__}: '{user}'"
+    )
+
+
+def test_can_with_group_permissions(setup_permission_engine_tests):
+    """can() returns True for the actions allowed to the groups of the user."""
+    data = setup_permission_engine_tests
+    assert can(data["test_user"], "Read", "Project") is True
+    assert can(data["test_user"], "Update", "Project") is True
+    assert can(data["test_user"], "Delete", "Project") is False
+    assert can(data["test_user"], "Read", "Task") is False
+
+
+def test_can_action_is_not_valid(setup_permission_engine_tests):
+    """ValueError is raised if the action is not one of the actions."""
+    data = setup_permission_engine_tests
+    with pytest.raises(ValueError) as cm:
+        can(data["test_user"], "Fly", "Project")
+
+    assert str(cm.value) == (
+        "action should be one of the values of "
+        "['Create', 'Read', 'Update', 'Delete', 'List'] not 'Fly'"
+    )
+
+
+def test_deny_takes_precedence(setup_permission_engine_tests):
+    """A Deny permission of the user wins over an Allow of a group."""
+    data = setup_permission_engine_tests
+    assert can(data["test_user"], "Update", "Project") is True
+    data["test_user"].permissions.append(data["deny_update_project"])
+    assert can(data["test_user"], "Update", "Project") is False
+    assert can(data["test_user"], "Read", "Project") is True
+
+
+def test_cached_permissions_issue_no_queries(
+    setup_permission_engine_tests, count_statements
+):
+    """The compiled permissions are evaluated without any queries."""
+    data = setup_permission_engine_tests
+    user = data["test_user"]
+    can(user, "Read", "Project")
+    DBSession.commit()
+
+    def check():
+        return [can(user, "Read", "Project") for _ in range(1000)]
+
+    result, statements = count_statements(check)
+    assert len(statements) == 0
+    assert all(result)
+
+
+def test_adding_a_group_to_the_user_invalidates(setup_permission_engine_tests):
+    """Adding a group to the user clears the compiled permissions of the user."""
+    data = setup_permission_engine_tests
+    data["test_group2"].permissions.append(data["allow_create_task"])
+    assert can(data["test_user"], "Create", "Task") is False
+    data["test_user"].groups.append(data["test_group2"])
+    assert can(data["test_user"], "Create", "Task") is True
+    data["test_user"].groups.remove(data["test_group2"])
+    assert can(data["test_user"], "Create", "Task") is False
+
+
+def test_adding_the_user_to_a_group_invalidates(setup_permission_engine_tests):
+    """Adding the user to a group clears the compiled permissions of the user."""
+    data = setup_permission_engine_tests
+    data["test_group2"].permissions.append(data["allow_create_task"])
+    assert can(data["test_user"], "Create", "Task") is False
+    data["test_group2"].users.append(data["test_user"])
+    assert can(data["test_user"], "Create", "Task") is True
+    data["test_group1"].users.remove(data["test_user"])
+    assert can(data["test_user"], "Read", "Project") is False
+
+
+def test_changing_the_group_permissions_invalidates(setup_permission_engine_tests):
+    """Changing the permissions of a group clears the compiled permissions."""
+    data = setup_permission_engine_tests
+    assert can(data["test_user"], "Create", "Task") is False
+    data["test_group1"].permissions.append(data["allow_create_task"])
+    assert can(data["test_user"], "Create", "Task") is True
+    data["test_group1"].permissions.remove(data["allow_read_project"])
+    assert can(data["test_user"], "Read", "Project") is False
+
+
+def test_deleting_a_group_invalidates(setup_permission_engine_tests):
+    """Deleting a group clears the compiled permissions."""
+    data = setup_permission_engine_tests
+    assert can(data["test_user"], "Read", "Project") is True
+    DBSession.delete(data["test_group1"])
+    DBSession.commit()
+    assert can(data["test_user"], "Read", "Project") is False
+
+
+def test_rollback_invalidates(setup_permission_engine_tests):
+    """Rolling back a transaction clears the compiled permissions."""
+    data = setup_permission_engine_tests
+    data["test_user"].groups.append(data["test_group2"])
+    data["test_group2"].permissions.append(data["allow_create_task"])
+    DBSession.flush()
+    assert can(data["test_user"], "Create", "Task") is True
+    DBSession.rollback()
+    assert can(data["test_user"], "Create", "Task") is False
+
+
+def test_compiled_permissions_expire_after_the_ttl(
+    setup_permission_engine_tests, monkeypatch
+):
+    """The permissions are compiled again after permission_cache_ttl seconds."""
+    data = setup_permission_engine_tests
+    stalker.defaults["permission_cache_ttl"] = 10
+    now = [1000.0]
+    monkeypatch.setattr("stalker.models.auth.time.monotonic", lambda: now[0])
+    engine = PermissionEngine()
+    compiled = engine.compile(data["test_user"])
+    now[0] += 5
+    assert engine.compile(data["test_user"]) is compiled
+    now[0] += 10
+    assert engine.compile(data["test_user"]) is not compiled
+
+
+def test_transient_users_are_not_cached(setup_permission_engine_tests):
+    """The permissions of the users that are not persisted are not cached."""
+    data = setup_permission_engine_tests
+    user = User(
+        name="User2",
+        login="user2",
+        password="1234",
+        email="user2@test.com",
+        groups=[data["test_group1"]],
+    )
+    engine = PermissionEngine()
+    assert engine.can(user, "Read", "Project") is True
+    assert engine._compiled == {}
@@ -3,11 +3,18 @@
 
 import os
 import sys
+import types
 
 import pytest
 
+import stalker.db.setup
 from stalker import CodeMixin, Repository, Tag, defaults
 from stalker.db.session import DBSession
+from stalker.models.repository import (
+    RepositoryPaths,
+    invalidate_repository_index,
+    repository_index,
+)
 
 from tests.utils import PlatformPatcher
 
@@ -1465,3 +1472,318 @@ def test__hash__is_working_as_expected(setup_repository_db_tests):
     result = hash(data["test_repo"])
     assert isinstance(result, int)
     assert result == data["test_repo"].__hash__()
+
+
+@pytest.fixture(scope="function")
+def setup_repository_index_tests(setup_sqlite3):
+    """Set up the tests for the repository index with a SQLite3 DB.
+
+    Yields:
+        dict: Test data storage.
+    """
+    data = dict()
+    data["patcher"] = PlatformPatcher()
+    data["patcher"].patch("Linux")
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_repo1"] = Repository(
+        name="Test Repo 1",
+        code="TR1",
+        linux_path="/mnt/T/Projects",
+        macos_path="/Volumes/T/Projects",
+        windows_path="T:/Projects",
+    )
+    data["test_repo2"] = Repository(
+        name="Test Repo 2",
+        code="TR2",
+        linux_path="/mnt/S/Projects",
+        macos_path="/Volumes/S/Projects",
+        windows_path="S:/Projects",
+    )
+    DBSession.add_all([data["test_repo1"], data["test_repo2"]])
+    DBSession.commit()
+    yield data
+    data["patcher"].restore()
+
+
+def test_find_repo_uses_the_repository_index(
+    setup_repository_index_tests, count_statements
+):
+    """find_repo() doesn't query all the repositories on every call."""
+    data = setup_repository_index_tests
+    invalidate_repository_index()
+
+    def find_repos():
+        for _ in range(10):
+            assert Repository.find_repo("/mnt/T/Projects/a/b.ma") == data["test_repo1"]
+            assert Repository.find_repo("s:/projects/a/b.ma") == data["test_repo2"]
+            assert Repository.find_repo("/mnt/X/a/b.ma") is None
+
+    _, statements = count_statements(find_repos)
+    # one query to load the index and one to refresh each expired repository
+    assert len(statements) == 3
+
+
+def test_to_os_independent_path_does_not_query_the_db_in_steady_state(
+    setup_repository_index_tests, count_statements
+):
+    """to_os_independent_path() doesn't query the DB once the index is loaded."""
+    assert (
+        Repository.to_os_independent_path("/mnt/T/Projects/a/b.ma")
+        == "$REPOTR1/a/b.ma"
+    )
+
+    def to_os_independent_paths():
+        for _ in range(10):
+            assert (
+                Repository.to_os_independent_path("/Volumes/S/Projects/a/b.ma")
+                == "$REPOTR2/a/b.ma"
+            )
+            assert (
+                Repository.to_os_independent_path("T:/Projects/a/b.ma")
+                == "$REPOTR1/a/b.ma"
+            )
+
+    _, statements = count_statements(to_os_independent_paths)
+    assert statements == []
+
+
+def test_repository_index_is_updated_after_insert(setup_repository_index_tests):
+    """a newly inserted repository is found without reloading the index."""
+    assert Repository.find_repo("/mnt/U/Projects/a/b.ma") is None
+    new_repo = Repository(
+        name="New Repo",
+        code="NR",
+        linux_path="/mnt/U/Projects",
+        macos_path="/Volumes/U/Projects",
+        windows_path="U:/Projects",
+    )
+    DBSession.add(new_repo)
+    DBSession.commit()
+    assert Repository.find_repo("/mnt/U/Projects/a/b.ma") == new_repo
+
+
+def test_repository_index_is_updated_after_update(setup_repository_index_tests):
+    """the repository index is updated when the paths of a repository change."""
+    data = setup_repository_index_tests
+    assert Repository.find_repo("/mnt/T/Projects/a/b.ma") == data["test_repo1"]
+    data["test_repo1"].linux_path = "/mnt/U/Projects"
+    DBSession.commit()
+    assert Repository.find_repo("/mnt/T/Projects/a/b.ma") is None
+    assert Repository.find_repo("/mnt/U/Projects/a/b.ma") == data["test_repo1"]
+
+
+def test_repository_index_is_updated_after_delete(setup_repository_index_tests):
+    """a deleted repository is removed from the repository index."""
+    data = setup_repository_index_tests
+    assert Repository.find_repo("/mnt/T/Projects/a/b.ma") == data["test_repo1"]
+    DBSession.delete(data["test_repo1"])
+    DBSession.commit()
+    assert Repository.find_repo("/mnt/T/Projects/a/b.ma") is None
+
+
+def test_repository_index_is_invalidated_on_rollback(setup_repository_index_tests):
+    """a repository inserted in a rolled back transaction is not found."""
+    assert Repository.find_repo("/mnt/U/Projects/a/b.ma") is None
+    new_repo = Repository(
+        name="New Repo",
+        code="NR",
+        linux_path="/mnt/U/Projects",
+        macos_path="/Volumes/U/Projects",
+        windows_path="U:/Projects",
+    )
+    DBSession.add(new_repo)
+    DBSession.flush()
+    assert repository_index.find("/mnt/U/Projects/a/b.ma").id == new_repo.id
+    DBSession.rollback()
+    assert Repository.find_repo("/mnt/U/Projects/a/b.ma") is None
+
+
+def test_find_repo_returns_the_repo_with_the_longest_root(
+    setup_repository_index_tests,
+):
+    """find_repo() returns the innermost repository for nested repositories."""
+    data = setup_repository_index_tests
+    nested_repo = Repository(
+        name="Nested Repo",
+        code="NR",
+        linux_path="/mnt/T/Projects/Nested",
+        macos_path="/Volumes/T/Projects/Nested",
+        windows_path="T:/Projects/Nested",
+    )
+    DBSession.add(nested_repo)
+    DBSession.commit()
+    assert Repository.find_repo("/mnt/T/Projects/Nested/a.ma") == nested_repo
+    assert Repository.find_repo("t:/projects/nested/a.ma") == nested_repo
+    assert Repository.find_repo("/mnt/T/Projects/Nested") == data["test_repo1"]
+    assert Repository.find_repo("/mnt/T/Projects/Other/a.ma") == data["test_repo1"]
+
+
+def test_find_repo_doesnt_match_partial_directory_names(
+    setup_repository_index_tests,
+):
+    """find_repo() doesn't match a root path with the path of a sibling folder."""
+    assert Repository.find_repo("/mnt/T/ProjectsOld/a/b.ma") is None
+    assert Repository.find_repo("/mnt/T/Projects") is None
+
+
+def test_repository_paths_converts_paths_like_the_repository(
+    setup_repository_index_tests,
+):
+    """RepositoryPaths converts the paths the same way the Repository does."""
+    data = setup_repository_index_tests
+    repo = data["test_repo1"]
+    repo_paths = repository_index.find("/mnt/T/Projects/a/b.ma")
+    assert isinstance(repo_paths, RepositoryPaths)
+    assert repo_paths.id == repo.id
+    assert repo_paths.env_var == repo.env_var
+    for path in ["/mnt/T/Projects/a/b.ma", "T:/Projects/a/b.ma", "/some/path"]:
+        assert repo_paths.to_linux_path(path) == repo.to_linux_path(path)
+        assert repo_paths.to_macos_path(path) == repo.to_macos_path(path)
+        assert repo_paths.to_windows_path(path) == repo.to_windows_path(path)
+        assert repo_paths.to_native_path(path) == repo.to_native_path(path)
+        assert repo_paths.make_relative(path) == repo.make_relative(path)
+        assert repo_paths.is_in_repo(path) == repo.is_in_repo(path)
+
+
+BULK_TEST_PATHS = [
+    "/mnt/T/Projects/Sero/Task1/a.ma",
+    "T:/Projects/Sero/../Sero/Task2/b.ma",
+    "/Volumes/S/Projects//Sero/c.ma",
+    "S:\\Projects\\Sero\\d.ma",
+    "$REPOTR1/Sero/e.ma",
+    "/not/in/a/repo/f.ma",
+]
+
+
+@pytest.mark.parametrize(
+    "method_name, expected",
+    [
+        (
+            "to_linux_paths",
+            [
+                "/mnt/T/Projects/Sero/Task1/a.ma",
+                "/mnt/T/Projects/Sero/Task2/b.ma",
+                "/mnt/S/Projects/Sero/c.ma",
+                "/mnt/S/Projects/Sero/d.ma",
+                "/mnt/T/Projects/Sero/e.ma",
+                "/not/in/a/repo/f.ma",
+            ],
+        ),
+        (
+            "to_windows_paths",
+            [
+                "T:/Projects/Sero/Task1/a.ma",
+                "T:/Projects/Sero/Task2/b.ma",
+                "S:/Projects/Sero/c.ma",
+                "S:/Projects/Sero/d.ma",
+                "T:/Projects/Sero/e.ma",
+                "/not/in/a/repo/f.ma",
+            ],
+        ),
+        (
+            "to_macos_paths",
+            [
+                "/Volumes/T/Projects/Sero/Task1/a.ma",
+                "/Volumes/T/Projects/Sero/Task2/b.ma",
+                "/Volumes/S/Projects/Sero/c.ma",
+                "/Volumes/S/Projects/Sero/d.ma",
+                "/Volumes/T/Projects/Sero/e.ma",
+                "/not/in/a/repo/f.ma",
+            ],
+        ),
+        (
+            "to_native_paths",
+            [
+                "/mnt/T/Projects/Sero/Task1/a.ma",
+                "/mnt/T/Projects/Sero/Task2/b.ma",
+                "/mnt/S/Projects/Sero/c.ma",
+                "/mnt/S/Projects/Sero/d.ma",
+                "/mnt/T/Projects/Sero/e.ma",
+                "/not/in/a/repo/f.ma",
+            ],
+        ),
+        (
+            "make_relative_paths",
+            [
+                "Sero/Task1/a.ma",
+                "Sero/Task2/b.ma",
+                "Sero/c.ma",
+                "Sero/d.ma",
+                "Sero/e.ma",
+                "/not/in/a/repo/f.ma",
+            ],
+        ),
+        (
+            "to_os_independent_paths",
+            [
+                "$REPOTR1/Sero/Task1/a.ma",
+                "$REPOTR1/Sero/Task2/b.ma",
+                "$REPOTR2/Sero/c.ma",
+                "$REPOTR2/Sero/d.ma",
+                "$REPOTR1/Sero/e.ma",
+                "/not/in/a/repo/f.ma",
+            ],
+        ),
+    ],
+)
+def test_bulk_path_translation(
+    setup_repository_index_tests, count_statements, method_name, expected
+):
+    """the bulk path translation methods convert paths in any repository."""
+    # warm up the index
+    Repository.find_repo(BULK_TEST_PATHS[0])
+    result = getattr(Repository, method_name)(path for path in BULK_TEST_PATHS)
+    assert isinstance(result, types.GeneratorType)
+    paths, statements = count_statements(list, result)
+    assert paths == expected
+    assert statements == []
+
+
+@pytest.mark.parametrize(
+    "method_name",
+    ["to_linux_paths", "to_windows_paths", "to_macos_paths", "to_native_paths"],
+)
+def test_bulk_path_translation_matches_the_single_path_methods(
+    setup_repository_index_tests, method_name
+):
+    """the bulk path translation is the same as the single path version."""
+    single_method_name = method_name[:-1]
+    for path in BULK_TEST_PATHS:
+        repo = Repository.find_repo(path)
+        if repo is None:
+            continue
+        expected = getattr(repo, single_method_name)(path)
+        assert list(getattr(Repository, method_name)([path])) == [expected]
+
+
+def test_bulk_path_translation_accepts_numpy_arrays(setup_repository_index_tests):
+    """the bulk path translation methods accept NumPy string arrays."""
+    np = pytest.importorskip("numpy")
+    paths = np.array(BULK_TEST_PATHS[:2])
+    assert list(Repository.to_windows_paths(paths)) == [
+        "T:/Projects/Sero/Task1/a.ma",
+        "T:/Projects/Sero/Task2/b.ma",
+    ]
+
+
+def test_bulk_path_translation_paths_is_a_str(setup_repository_index_tests):
+    """the bulk path translation raises TypeError if paths is a str."""
+    with pytest.raises(TypeError) as cm:
+        Repository.to_linux_paths("/mnt/T/Projects/a.ma")
+
+    assert str(cm.value) == (
+        "paths should be an iterable of file paths, not str: '/mnt/T/Projects/a.ma'"
+    )
+
+
+def test_bulk_path_translation_path_is_not_a_str(setup_repository_index_tests):
+    """the bulk path translation raises TypeError if a path is not a str."""
+    result = Repository.to_linux_paths(["/mnt/T/Projects/a.ma", 1234])
+    assert next(result) == "/mnt/T/Projects/a.ma"
+    with pytest.raises(TypeError) as cm:
+        next(result)
+
+    assert str(cm.value) == (
+        "path should be a string containing a file path, not int: '1234'"
+    )
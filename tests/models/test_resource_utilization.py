@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""Tests for the Studio.resource_utilization() method."""
+
+import datetime
+
+import pytest
+import pytz
+
+import stalker.db.setup
+from stalker import (
+    Project,
+    Repository,
+    Studio,
+    Task,
+    TimeLog,
+    Type,
+    User,
+    Vacation,
+)
+from stalker.db.session import DBSession
+from stalker.models.studio import ResourceUtilization
+
+pytest.importorskip("numpy")
+
+
+def utc(*args):
+    """Return a UTC datetime.
+
+    Args:
+        args (int): The datetime arguments.
+
+    Returns:
+        datetime.datetime: The timezone aware datetime.
+    """
+    return datetime.datetime(*args, tzinfo=pytz.utc)
+
+
+@pytest.fixture(scope="function")
+def setup_resource_utilization_tests(setup_sqlite3):
+    """Set up the tests for the Studio.resource_utilization() with a SQLite3 DB.
+
+    The studio works from 9:00 to 18:00 on the weekdays and the week starts on
+    Monday 2024-01-01.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_users"] = [
+        User(
+            name=f"User{i}",
+            login=f"user{i}",
+            password="1234",
+            email=f"user{i}@test.com",
+        )
+        for i in range(3)
+    ]
+    user1, user2, user3 = data["test_users"]
+    data["test_project"] = Project(
+        name="Test Project",
+        code="TP",
+        repositories=[Repository(name="Test Repository", code="TR")],
+        type=Type(name="Commercial", code="comm", target_entity_type="Project"),
+    )
+    data["test_studio"] = Studio(name="Test Studio")
+    DBSession.add_all(data["test_users"] + [data["test_project"], data["test_studio"]])
+    DBSession.commit()
+
+    data["test_parent"] = Task(name="Parent", project=data["test_project"])
+    data["test_task1"] = Task(
+        name="Task1",
+        project=data["test_project"],
+        parent=data["test_parent"],
+        resources=[user1, user2],
+    )
+    data["test_task2"] = Task(
+        name="Task2", project=data["test_project"], resources=[user2]
+    )
+    DBSession.add_all([data["test_parent"], data["test_task1"], data["test_task2"]])
+    DBSession.commit()
+
+    # Monday 10:00 - Wednesday 12:00
+    data["test_task1"].computed_start = utc(2024, 1, 1, 10)
+    data["test_task1"].computed_end = utc(2024, 1, 3, 12)
+    data["test_task1"].computed_resources = [user1, user2]
+    # Tuesday
+    data["test_task2"].computed_start = utc(2024, 1, 2, 9)
+    data["test_task2"].computed_end = utc(2024, 1, 2, 18)
+    data["test_task2"].computed_resources = [user2]
+    # the container tasks are not counted
+    data["test_parent"].computed_start = utc(2024, 1, 1)
+    data["test_parent"].computed_end = utc(2024, 1, 5)
+    data["test_parent"].computed_resources = [user3]
+
+    DBSession.add_all(
+        [
+            # Monday 22:00 - Tuesday 02:00
+            TimeLog(
+                task=data["test_task1"],
+                resource=user1,
+                start=utc(2024, 1, 1, 22),
+                end=utc(2024, 1, 2, 2),
+            ),
+            # user2 is on vacation on Wednesday
+            Vacation(user=user2, start=utc(2024, 1, 3), end=utc(2024, 1, 4)),
+            # the studio is closed on Friday
+            Vacation(start=utc(2024, 1, 5), end=utc(2024, 1, 6)),
+        ]
+    )
+    DBSession.commit()
+    return data
+
+
+def test_matrices_are_filled_correctly(setup_resource_utilization_tests):
+    """The scheduled, booked and available seconds are calculated correctly."""
+    data = setup_resource_utilization_tests
+    user1, user2, user3 = data["test_users"]
+    result = data["test_studio"].resource_utilization(utc(2024, 1, 1), utc(2024, 1, 8))
+    assert isinstance(result, ResourceUtilization)
+    assert result.scheduled.shape == (len(result.user_ids), 7)
+    assert result.bucket_edges.tolist() == [
+        datetime.datetime(2024, 1, day) for day in range(1, 9)
+    ]
+
+    def hours(matrix, user):
+        return (matrix[result.row(user)] / 3600).tolist()
+
+    assert hours(result.scheduled, user1) == [8, 9, 3, 0, 0, 0, 0]
+    assert hours(result.scheduled, user2) == [8, 18, 0, 0, 0, 0, 0]
+    assert hours(result.scheduled, user3) == [0, 0, 0, 0, 0, 0, 0]
+    assert hours(result.booked, user1) == [2, 2, 0, 0, 0, 0, 0]
+    assert hours(result.booked, user2) == [0, 0, 0, 0, 0, 0, 0]
+    assert hours(result.available, user1) == [9, 9, 9, 9, 0, 0, 0]
+    assert hours(result.available, user2) == [9, 9, 0, 9, 0, 0, 0]
+
+
+def test_last_bucket_is_shorter(setup_resource_utilization_tests):
+    """The last bucket ends at the end of the range."""
+    data = setup_resource_utilization_tests
+    user1 = data["test_users"][0]
+    result = data["test_studio"].resource_utilization(
+        utc(2024, 1, 1), utc(2024, 1, 2, 12), resolution=datetime.timedelta(days=1)
+    )
+    assert result.bucket_edges.tolist() == [
+        datetime.datetime(2024, 1, 1),
+        datetime.datetime(2024, 1, 2),
+        datetime.datetime(2024, 1, 2, 12),
+    ]
+    assert (result.available[result.row(user1)] / 3600).tolist() == [9, 3]
+    assert (result.scheduled[result.row(user1)] / 3600).tolist() == [8, 3]
+
+
+def test_users_argument_limits_the_rows(setup_resource_utilization_tests):
+    """Only the given users are included."""
+    data = setup_resource_utilization_tests
+    user1, user2, _ = data["test_users"]
+    result = data["test_studio"].resource_utilization(
+        utc(2024, 1, 1), utc(2024, 1, 8), users=[user2, user1]
+    )
+    assert result.user_ids == [user2.id, user1.id]
+    assert result.scheduled.shape == (2, 7)
+    assert result.scheduled[0].sum() == 26 * 3600
+
+
+def test_number_of_queries_does_not_depend_on_the_data(
+    setup_resource_utilization_tests, count_statements
+):
+    """The number of the queries is the same for more users and tasks."""
+    data = setup_resource_utilization_tests
+    studio = data["test_studio"]
+
+    def count_queries():
+        _, statements = count_statements(
+            studio.resource_utilization, utc(2024, 1, 1), utc(2024, 1, 8)
+        )
+        return len(statements)
+
+    DBSession.expire_all()
+    count = count_queries()
+
+    users = [
+        User(
+            name=f"New User{i}",
+            login=f"new_user{i}",
+            password="1234",
+            email=f"new_user{i}@test.com",
+        )
+        for i in range(10)
+    ]
+    tasks = [
+        Task(name=f"New Task{i}", project=data["test_project"], resources=[user])
+        for i, user in enumerate(users)
+    ]
+    DBSession.add_all(tasks)
+    DBSession.commit()
+    for task in tasks:
+        task.computed_start = utc(2024, 1, 2, 9)
+        task.computed_end = utc(2024, 1, 4, 18)
+        task.computed_resources = task.resources
+        DBSession.add(
+            Vacation(user=task.resources[0], start=utc(2024, 1, 3), end=utc(2024, 1, 4))
+        )
+    DBSession.commit()
+    DBSession.expire_all()
+    assert count_queries() == count
+
+
+@pytest.mark.parametrize(
+    "kwargs,error",
+    [
+        (
+            {"start": "2024-01-01"},
+            "Studio.resource_utilization() start should be a datetime.datetime "
+            "instance, not str: '2024-01-01'",
+        ),
+        (
+            {"end": None},
+            "Studio.resource_utilization() end should be a datetime.datetime "
+            "instance, not NoneType: 'None'",
+        ),
+        (
+            {"resolution": 3600},
+            "Studio.resource_utilization() resolution should be a "
+            "datetime.timedelta instance, not int: '3600'",
+        ),
+        (
+            {"users": "user1"},
+            "Studio.resource_utilization() users should be a list of "
+            "stalker.models.auth.User instances, not str: 'user1'",
+        ),
+    ],
+)
+def test_arguments_of_wrong_type(setup_resource_utilization_tests, kwargs, error):
+    """TypeError is raised if the arguments are of the wrong type."""
+    data = setup_resource_utilization_tests
+    arguments = {"start": utc(2024, 1, 1), "end": utc(2024, 1, 8)}
+    arguments.update(kwargs)
+    with pytest.raises(TypeError) as cm:
+        data["test_studio"].resource_utilization(**arguments)
+
+    assert str(cm.value) == error
+
+
+def test_end_is_not_after_start(setup_resource_utilization_tests):
+    """ValueError is raised if the end is not after the start."""
+    data = setup_resource_utilization_tests
+    with pytest.raises(ValueError) as cm:
+        data["test_studio"].resource_utilization(utc(2024, 1, 8), utc(2024, 1, 1))
+
+    assert str(cm.value) == (
+        "Studio.resource_utilization() end should be after start, "
+        "not 2024-01-01 00:00:00+00:00 <= 2024-01-08 00:00:00+00:00"
+    )
+
+
+def test_resolution_is_not_positive(setup_resource_utilization_tests):
+    """ValueError is raised if the resolution is not positive."""
+    data = setup_resource_utilization_tests
+    with pytest.raises(ValueError) as cm:
+        data["test_studio"].resource_utilization(
+            utc(2024, 1, 1), utc(2024, 1, 8), datetime.timedelta(0)
+        )
+
+    assert str(cm.value) == (
+        "Studio.resource_utilization() resolution should be positive, not 0:00:00"
+    )
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""Tests for querying the review sets."""
+
+import datetime
+
+import pytest
+import pytz
+import sqlalchemy as sa
+
+import stalker.db.setup
+from stalker import (
+    Project,
+    Repository,
+    Review,
+    Status,
+    Task,
+    User,
+)
+from stalker.db.session import DBSession
+from stalker.models.review import ReviewSetState
+
+
+@pytest.fixture(scope="function")
+def setup_review_set_tests(setup_sqlite3):
+    """Set up the tests for the review sets with a SQLite3 DB.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["users"] = [
+        User(
+            name=f"User{i}",
+            login=f"user{i}",
+            email=f"user{i}@test.com",
+            password="1234",
+        )
+        for i in range(3)
+    ]
+    data["project"] = Project(
+        name="Test Project",
+        code="TP",
+        repositories=[Repository(name="Test Repository", code="TR")],
+    )
+    data["task"] = Task(
+        name="Task1",
+        project=data["project"],
+        resources=[data["users"][0]],
+        responsible=data["users"],
+    )
+    DBSession.add_all(data["users"] + [data["project"], data["task"]])
+    DBSession.commit()
+
+    now = datetime.datetime(2024, 1, 1, 10, tzinfo=pytz.utc)
+    time_log = data["task"].create_time_log(
+        resource=data["users"][0], start=now, end=now + datetime.timedelta(hours=1)
+    )
+    DBSession.add(time_log)
+    data["task"].status = Status.query.filter_by(code="WIP").first()
+    data["reviews"] = data["task"].request_review()
+    DBSession.add_all(data["reviews"])
+    DBSession.commit()
+    DBSession.expire_all()
+    return data
+
+
+def test_get_review_set(setup_review_set_tests):
+    """The reviews with the given review number are queried."""
+    data = setup_review_set_tests
+    assert Review.get_review_set(data["task"], 1) == data["reviews"]
+    assert Review.get_review_set(data["task"], 2) == []
+
+
+def test_review_set_is_queried_without_loading_the_reviews(setup_review_set_tests):
+    """The review set is queried if the reviews of the task are not loaded."""
+    data = setup_review_set_tests
+    task = data["task"]
+    assert task.review_set(1) == data["reviews"]
+    assert data["reviews"][0].review_set == data["reviews"]
+    assert "reviews" not in sa.inspect(task).dict
+
+
+def test_review_set_uses_the_loaded_reviews(setup_review_set_tests, count_statements):
+    """The loaded reviews of the task are filtered without any query."""
+    data = setup_review_set_tests
+    task = data["task"]
+    assert len(task.reviews) == 3
+    review_set, statements = count_statements(task.review_set, 1)
+    assert review_set == data["reviews"]
+    assert len(statements) == 0
+
+
+def test_review_set_includes_the_new_reviews(setup_review_set_tests):
+    """The new reviews that are not flushed yet are in the review set."""
+    data = setup_review_set_tests
+    task = data["task"]
+    review = Review(task=task, reviewer=data["users"][0])
+    DBSession.add(review)
+    assert review.review_number == 1
+    assert task.review_set(1) == data["reviews"] + [review]
+
+
+def test_get_review_set_state(setup_review_set_tests):
+    """The statuses of the review set are aggregated."""
+    data = setup_review_set_tests
+    assert Review.get_review_set_state(data["task"], 1) == ReviewSetState(3, 3, 0)
+    assert Review.get_review_set_state(data["task"], 2) == ReviewSetState(0, 0, 0)
+
+    review1, review2, _ = data["reviews"]
+    review1.approve()
+    DBSession.commit()
+    # the unflushed status changes are considered too
+    review2.request_revision(schedule_timing=2)
+    state = Review.get_review_set_state(data["task"], 1)
+    assert state == ReviewSetState(3, 1, 1)
+    assert state.is_finalized is False
+    assert state.requests_revision is True
+
+
+def test_is_finalized_runs_a_single_query(setup_review_set_tests, count_statements):
+    """Review.is_finalized() runs a single query for any number of reviews."""
+    data = setup_review_set_tests
+    review = data["reviews"][0]
+    # load the expired attributes
+    assert review.task.name == "Task1"
+    assert review.review_number == 1
+
+    is_finalized, statements = count_statements(review.is_finalized)
+    assert is_finalized is False
+    assert len(statements) == 1
+    assert "reviews" not in sa.inspect(data["task"]).dict
+
+
+def test_finalize_review_set_with_a_revision_request(setup_review_set_tests):
+    """The task is revised when the last review of the set is finalized."""
+    data = setup_review_set_tests
+    task = data["task"]
+    review1, review2, review3 = data["reviews"]
+    review1.approve()
+    DBSession.commit()
+    review2.request_revision(schedule_timing=2)
+    DBSession.commit()
+    assert task.status.code == "PREV"
+    assert task.review_number == 0
+
+    review3.approve()
+    DBSession.commit()
+    assert task.status.code == "HREV"
+    assert task.review_number == 1
+    # 1 hour logged and 2 hours requested
+    assert task.schedule_seconds == 3 * 3600
+
+
+def test_finalize_review_set_with_approvals(setup_review_set_tests):
+    """The task is completed when all the reviews of the set are approvals."""
+    data = setup_review_set_tests
+    task = data["task"]
+    for review in data["reviews"]:
+        review.approve()
+        DBSession.commit()
+    assert task.status.code == "CMPL"
+    assert task.review_number == 1
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+"""Tests for the ScheduleSnapshot class."""
+
+import datetime
+
+import pytest
+import pytz
+import sqlalchemy as sa
+
+import stalker
+import stalker.db.setup
+from stalker import (
+    Project,
+    Repository,
+    ScheduleSnapshot,
+    Task,
+    TaskJugglerScheduler,
+    User,
+)
+from stalker.db.session import DBSession
+from stalker.models.schedulers import ScheduleChange, ScheduleSnapshotEntry
+
+
+def utc(*args):
+    """Return a UTC datetime.
+
+    Args:
+        args (int): The datetime arguments.
+
+    Returns:
+        datetime.datetime: The timezone aware datetime.
+    """
+    return datetime.datetime(*args, tzinfo=pytz.utc)
+
+
+@pytest.fixture(scope="function")
+def setup_schedule_snapshot_tests(setup_sqlite3):
+    """Set up the tests for the ScheduleSnapshot class with a SQLite3 DB.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_user1"] = User(
+        name="User1", login="user1", email="user1@users.com", password="1234"
+    )
+    data["test_user2"] = User(
+        name="User2", login="user2", email="user2@users.com", password="1234"
+    )
+    data["test_project"] = Project(
+        name="Test Project",
+        code="tp",
+        repositories=[Repository(name="Test Repository", code="TR")],
+    )
+    data["test_task1"] = Task(
+        name="Task1", project=data["test_project"], resources=[data["test_user1"]]
+    )
+    data["test_task2"] = Task(
+        name="Task2", project=data["test_project"], resources=[data["test_user2"]]
+    )
+    DBSession.add_all([data["test_task1"], data["test_task2"]])
+    DBSession.commit()
+    return data
+
+
+def test_record_stores_the_entries(setup_schedule_snapshot_tests):
+    """record() stores the entries of the snapshot."""
+    snapshot = ScheduleSnapshot.record(
+        [
+            (12, utc(2024, 1, 2, 9), utc(2024, 1, 2, 18), [5, 3]),
+            (10, utc(2024, 1, 1, 9), utc(2024, 1, 1, 18), []),
+        ]
+    )
+    assert isinstance(snapshot.id, int)
+    assert snapshot.entries() == [
+        ScheduleSnapshotEntry(10, utc(2024, 1, 1, 9), utc(2024, 1, 1, 18), []),
+        ScheduleSnapshotEntry(12, utc(2024, 1, 2, 9), utc(2024, 1, 2, 18), [3, 5]),
+    ]
+
+
+def test_record_uses_a_single_insert_for_the_entries(
+    setup_schedule_snapshot_tests, count_statements
+):
+    """The entries are inserted with a single statement."""
+    entries = [(i, utc(2024, 1, 1, 9), utc(2024, 1, 1, 18), [1, 2]) for i in range(100)]
+    _, statements = count_statements(ScheduleSnapshot.record, entries)
+    # one for the snapshot and one for the entries
+    assert len(statements) == 2
+
+
+def test_date_created_defaults_to_now(setup_schedule_snapshot_tests):
+    """The date_created is the current date if skipped."""
+    before = datetime.datetime.now(pytz.utc)
+    snapshot = ScheduleSnapshot()
+    assert before <= snapshot.date_created <= datetime.datetime.now(pytz.utc)
+
+
+def test_date_created_is_not_a_datetime(setup_schedule_snapshot_tests):
+    """TypeError is raised if the date_created is not a datetime."""
+    with pytest.raises(TypeError) as cm:
+        ScheduleSnapshot(date_created="2024-01-01")
+
+    assert str(cm.value) == (
+        "ScheduleSnapshot.date_created should be a datetime.datetime instance, "
+        "not str: '2024-01-01'"
+    )
+
+
+def test_latest(setup_schedule_snapshot_tests):
+    """latest() returns the latest snapshot created at or before the date."""
+    assert ScheduleSnapshot.latest() is None
+    snapshot1 = ScheduleSnapshot.record([], date_created=utc(2024, 1, 1))
+    snapshot2 = ScheduleSnapshot.record([], date_created=utc(2024, 1, 2))
+    assert ScheduleSnapshot.latest() is snapshot2
+    assert ScheduleSnapshot.latest(before=utc(2024, 1, 1, 12)) is snapshot1
+    assert ScheduleSnapshot.latest(before=utc(2024, 1, 2)) is snapshot2
+    assert ScheduleSnapshot.latest(before=utc(2023, 12, 31)) is None
+
+
+def test_diff(setup_schedule_snapshot_tests, count_statements):
+    """diff() returns the changed, removed and added tasks with a single query."""
+    old = ScheduleSnapshot.record(
+        [
+            (1, utc(2024, 1, 1, 9), utc(2024, 1, 1, 18), [1]),
+            (2, utc(2024, 1, 2, 9), utc(2024, 1, 2, 18), [1]),
+            (3, utc(2024, 1, 3, 9), utc(2024, 1, 3, 18), [1, 2]),
+            (4, utc(2024, 1, 4, 9), utc(2024, 1, 4, 18), [2]),
+        ]
+    )
+    new = ScheduleSnapshot.record(
+        [
+            (1, utc(2024, 1, 1, 9), utc(2024, 1, 1, 18), [1]),
+            (2, utc(2024, 1, 2, 9), utc(2024, 1, 3, 18), [1]),
+            (3, utc(2024, 1, 3, 9), utc(2024, 1, 3, 18), [2]),
+            (5, utc(2024, 1, 5, 9), utc(2024, 1, 5, 18), [2]),
+        ]
+    )
+    changes, statements = count_statements(old.diff, new)
+    assert len(statements) == 1
+    assert changes == [
+        ScheduleChange(
+            2,
+            utc(2024, 1, 2, 9),
+            utc(2024, 1, 2, 18),
+            [1],
+            utc(2024, 1, 2, 9),
+            utc(2024, 1, 3, 18),
+            [1],
+        ),
+        ScheduleChange(
+            3,
+            utc(2024, 1, 3, 9),
+            utc(2024, 1, 3, 18),
+            [1, 2],
+            utc(2024, 1, 3, 9),
+            utc(2024, 1, 3, 18),
+            [2],
+        ),
+        ScheduleChange(
+            4, utc(2024, 1, 4, 9), utc(2024, 1, 4, 18), [2], None, None, None
+        ),
+        ScheduleChange(
+            5, None, None, None, utc(2024, 1, 5, 9), utc(2024, 1, 5, 18), [2]
+        ),
+    ]
+    assert [change.kind for change in changes] == [
+        "changed",
+        "changed",
+        "removed",
+        "added",
+    ]
+    assert new.diff(new) == []
+
+
+@pytest.mark.parametrize("snapshot", [None, 1, "snapshot"])
+def test_diff_snapshot_is_not_a_snapshot(setup_schedule_snapshot_tests, snapshot):
+    """TypeError is raised if the snapshot is not a ScheduleSnapshot instance."""
+    old = ScheduleSnapshot.record([])
+    with pytest.raises(TypeError) as cm:
+        old.diff(snapshot)
+
+    assert str(cm.value) == (
+        "ScheduleSnapshot.diff() snapshot should be a "
+        "stalker.models.schedulers.ScheduleSnapshot instance, "
+        f"not {snapshot.__class__.__name__}: '{snapshot}'"
+    )
+
+
+def test_prune_keep(setup_schedule_snapshot_tests):
+    """prune() keeps the latest snapshots."""
+    snapshots = [
+        ScheduleSnapshot.record(
+            [(1, utc(2024, 1, 1, 9), utc(2024, 1, 1, 18), [1])],
+            date_created=utc(2024, 1, day),
+        )
+        for day in range(1, 6)
+    ]
+    assert ScheduleSnapshot.prune(keep=2) == 3
+    assert [snapshot.id for snapshot in DBSession.query(ScheduleSnapshot)] == [
+        snapshots[3].id,
+        snapshots[4].id,
+    ]
+    assert DBSession.connection().execute(
+        sa.text('select distinct snapshot_id from "Schedule_Snapshot_Entries"')
+    ).scalars().all() == [snapshots[3].id, snapshots[4].id]
+
+
+def test_prune_older_than(setup_schedule_snapshot_tests):
+    """prune() deletes the snapshots created before the given date."""
+    for day in range(1, 6):
+        ScheduleSnapshot.record([], date_created=utc(2024, 1, day))
+    assert ScheduleSnapshot.prune(older_than=utc(2024, 1, 4)) == 3
+    assert DBSession.query(ScheduleSnapshot).count() == 2
+    assert ScheduleSnapshot.prune() == 0
+    assert DBSession.query(ScheduleSnapshot).count() == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs,error_type,error",
+    [
+        (
+            {"keep": "2"},
+            TypeError,
+            "ScheduleSnapshot.prune() keep should be an int, not str: '2'",
+        ),
+        (
+            {"keep": -1},
+            ValueError,
+            "ScheduleSnapshot.prune() keep should be a non-negative number, not -1",
+        ),
+        (
+            {"older_than": 1},
+            TypeError,
+            "ScheduleSnapshot.prune() older_than should be a datetime.datetime "
+            "instance, not int: '1'",
+        ),
+    ],
+)
+def test_prune_arguments_are_not_valid(
+    setup_schedule_snapshot_tests, kwargs, error_type, error
+):
+    """prune() raises errors for invalid arguments."""
+    with pytest.raises(error_type) as cm:
+        ScheduleSnapshot.prune(**kwargs)
+
+    assert str(cm.value) == error
+
+
+def write_csv_file(tmp_path, data, compute_resources):
+    """Write a TaskJuggler report of the test tasks.
+
+    Args:
+        tmp_path (pathlib.Path): The temp directory.
+        data (dict): The test data.
+        compute_resources (bool): The compute_resources of the scheduler.
+
+    Returns:
+        TaskJugglerScheduler: A scheduler reading the report.
+    """
+    project = data["test_project"]
+    user1 = data["test_user1"]
+    user2 = data["test_user2"]
+    csv_file = tmp_path / "report.csv"
+    csv_file.write_text(
+        '"Id";"Start";"End";"Resources"\n'
+        f'"Project_{project.id}";"2024-01-01-09:00";"2024-01-02-18:00";""\n'
+        f'"Project_{project.id}.Task_{data["test_task1"].id}";'
+        f'"2024-01-01-09:00";"2024-01-01-18:00";"User1 (User_{user1.id})"\n'
+        f'"Project_{project.id}.Task_{data["test_task2"].id}";'
+        f'"2024-01-02-09:00";"2024-01-02-18:00";'
+        f'"User1 (User_{user1.id}), User2 (User_{user2.id})"\n'
+    )
+    scheduler = TaskJugglerScheduler(compute_resources=compute_resources)
+    scheduler.csv_file_full_path = str(csv_file)
+    return scheduler
+
+
+def test_parsing_the_results_records_a_snapshot(
+    setup_schedule_snapshot_tests, tmp_path
+):
+    """A snapshot of the tasks is recorded when the results are parsed."""
+    data = setup_schedule_snapshot_tests
+    user1 = data["test_user1"]
+    user2 = data["test_user2"]
+    write_csv_file(tmp_path, data, compute_resources=True)._parse_csv_file()
+    snapshot = ScheduleSnapshot.latest()
+    assert snapshot.entries() == [
+        ScheduleSnapshotEntry(
+            data["test_task1"].id,
+            utc(2024, 1, 1, 9),
+            utc(2024, 1, 1, 18),
+            [user1.id],
+        ),
+        ScheduleSnapshotEntry(
+            data["test_task2"].id,
+            utc(2024, 1, 2, 9),
+            utc(2024, 1, 2, 18),
+            sorted([user1.id, user2.id]),
+        ),
+    ]
+
+
+def test_snapshot_uses_the_stored_computed_resources(
+    setup_schedule_snapshot_tests, tmp_path
+):
+    """The stored computed resources are used if they are not computed."""
+    data = setup_schedule_snapshot_tests
+    user2 = data["test_user2"]
+    data["test_task1"].computed_resources = [user2]
+    DBSession.commit()
+    write_csv_file(tmp_path, data, compute_resources=False)._parse_csv_file()
+    entries = ScheduleSnapshot.latest().entries()
+    assert [entry.resource_ids for entry in entries] == [[user2.id], [user2.id]]
+
+
+def test_schedule_snapshots_can_be_disabled(setup_schedule_snapshot_tests, tmp_path):
+    """No snapshot is recorded if the schedule_snapshots setting is False."""
+    data = setup_schedule_snapshot_tests
+    stalker.defaults["schedule_snapshots"] = False
+    write_csv_file(tmp_path, data, compute_resources=True)._parse_csv_file()
+    assert ScheduleSnapshot.latest() is None
+
+
+def test_old_snapshots_are_pruned(setup_schedule_snapshot_tests, tmp_path):
+    """The snapshots beyond the schedule_snapshot_retention are deleted."""
+    data = setup_schedule_snapshot_tests
+    stalker.defaults["schedule_snapshot_retention"] = 2
+    scheduler = write_csv_file(tmp_path, data, compute_resources=True)
+    for _ in range(4):
+        scheduler._parse_csv_file()
+    assert DBSession.query(ScheduleSnapshot).count() == 2
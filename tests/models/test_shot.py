@@ -4,6 +4,10 @@
 import sys
 import pytest
 
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+
+import stalker.db.setup
 from stalker import (
     Asset,
     Entity,
@@ -1584,3 +1588,188 @@ def test_shots_can_use_task_status_list():
         responsible=[test_user1],
     )
     assert test_shot1.status_list == task_status_list
+
+
+@pytest.fixture(scope="function")
+def setup_shot_code_tests(setup_sqlite3):
+    """Set up the tests for the Shot code availability with a SQLite3 DB."""
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_repo"] = Repository(
+        name="Test Repository",
+        code="TR",
+        linux_path="/mnt/T/",
+        windows_path="T:/",
+        macos_path="/Volumes/T/",
+    )
+    data["test_project1"] = Project(
+        name="Test Project1", code="tp1", repositories=[data["test_repo"]]
+    )
+    data["test_project2"] = Project(
+        name="Test Project2", code="tp2", repositories=[data["test_repo"]]
+    )
+    data["test_sequence"] = Sequence(
+        name="Test Sequence", code="SEQ1", project=data["test_project1"]
+    )
+    DBSession.add_all(
+        [data["test_project1"], data["test_project2"], data["test_sequence"]]
+    )
+    DBSession.commit()
+    data["test_shot1"] = Shot(code="SH001", project=data["test_project1"])
+    data["test_shot2"] = Shot(code="SH002", project=data["test_project1"])
+    data["test_shot3"] = Shot(code="SH003", project=data["test_project2"])
+    DBSession.add_all([data["test_shot1"], data["test_shot2"], data["test_shot3"]])
+    DBSession.commit()
+    return data
+
+
+def test_shot_project_id_is_stored_in_the_shots_table(setup_shot_code_tests):
+    """project_id of the Shot is also stored in the Shots table."""
+    data = setup_shot_code_tests
+    assert data["test_shot1"].shot_project_id == data["test_project1"].id
+    assert data["test_shot3"].shot_project_id == data["test_project2"].id
+
+
+def test_shot_code_is_unique_per_project_in_the_db(setup_shot_code_tests):
+    """the Shots table doesn't allow the same code twice in the same project."""
+    data = setup_shot_code_tests
+    shot = Shot(code="SH004", project=data["test_project1"])
+    DBSession.add(shot)
+    DBSession.commit()
+    with pytest.raises(IntegrityError):
+        DBSession.execute(
+            sa.update(Shot.__table__)
+            .where(Shot.__table__.c.id == shot.id)
+            .values(code="SH001")
+        )
+    DBSession.rollback()
+
+
+def test_check_codes_availability_is_working_as_expected(setup_shot_code_tests):
+    """check_codes_availability() returns the availability of all the codes."""
+    data = setup_shot_code_tests
+    result = Shot.check_codes_availability(
+        ["SH001", "SH003", "SH004", "SH002"], data["test_project1"]
+    )
+    assert result == {
+        "SH001": False,
+        "SH002": False,
+        "SH003": True,
+        "SH004": True,
+    }
+
+
+def test_check_codes_availability_uses_a_single_query(
+    setup_shot_code_tests, count_statements
+):
+    """check_codes_availability() checks all the codes with a single query."""
+    data = setup_shot_code_tests
+    # load the expired project
+    assert data["test_project1"].id is not None
+    result, statements = count_statements(
+        Shot.check_codes_availability,
+        [f"SH{i:03d}" for i in range(1000)],
+        data["test_project1"],
+    )
+    assert len(statements) == 1
+    assert result["SH001"] is False
+    assert result["SH003"] is True
+    assert sum(result.values()) == 998
+
+
+def test_check_codes_availability_codes_is_empty(setup_shot_code_tests):
+    """check_codes_availability() returns an empty dict if codes is empty."""
+    data = setup_shot_code_tests
+    assert Shot.check_codes_availability([], data["test_project1"]) == {}
+
+
+def test_check_codes_availability_code_is_not_a_str(setup_shot_code_tests):
+    """check_codes_availability() raises TypeError if any code is not a str."""
+    data = setup_shot_code_tests
+    with pytest.raises(TypeError) as cm:
+        Shot.check_codes_availability(["SH001", 1234], data["test_project1"])
+
+    assert str(cm.value) == (
+        "code should be a string containing a shot code, not int: '1234'"
+    )
+
+
+def test_check_codes_availability_project_is_not_a_project_instance(
+    setup_shot_code_tests,
+):
+    """check_codes_availability() raises TypeError if project is not a Project."""
+    with pytest.raises(TypeError) as cm:
+        Shot.check_codes_availability(["SH001"], 1234)
+
+    assert str(cm.value) == "project should be a Project instance, not int: '1234'"
+
+
+def test_create_shots_is_working_as_expected(setup_shot_code_tests):
+    """create_shots() creates the Shots with the common and per shot arguments."""
+    data = setup_shot_code_tests
+    shots = Shot.create_shots(
+        data["test_project1"],
+        [
+            {"code": "SH010", "cut_in": 1, "cut_out": 10},
+            {"code": "SH020", "cut_in": 11, "cut_out": 30},
+        ],
+        sequence=data["test_sequence"],
+    )
+    DBSession.add_all(shots)
+    DBSession.commit()
+    assert [shot.code for shot in shots] == ["SH010", "SH020"]
+    assert [shot.cut_duration for shot in shots] == [10, 20]
+    assert all(shot.project == data["test_project1"] for shot in shots)
+    assert all(shot.sequence == data["test_sequence"] for shot in shots)
+    assert all(shot.shot_project_id == data["test_project1"].id for shot in shots)
+
+
+def test_create_shots_uses_a_single_query_for_the_codes(
+    setup_shot_code_tests, count_statements
+):
+    """create_shots() doesn't check the codes of each Shot one by one."""
+    data = setup_shot_code_tests
+    shots, statements = count_statements(
+        Shot.create_shots,
+        data["test_project1"],
+        [{"code": f"SH{i:04d}"} for i in range(100)],
+    )
+    assert len(shots) == 100
+    assert len([s for s in statements if '"Shots".code' in s]) == 1
+
+
+def test_create_shots_code_is_already_taken(setup_shot_code_tests):
+    """create_shots() raises ValueError if a code is already taken."""
+    data = setup_shot_code_tests
+    with pytest.raises(ValueError) as cm:
+        Shot.create_shots(
+            data["test_project1"],
+            [{"code": "SH002"}, {"code": "SH010"}, {"code": "SH001"}],
+        )
+
+    assert str(cm.value) == "There are Shots with the same codes: SH001, SH002"
+
+
+def test_create_shots_code_is_used_more_than_once(setup_shot_code_tests):
+    """create_shots() raises ValueError if the same code is used more than once."""
+    data = setup_shot_code_tests
+    with pytest.raises(ValueError) as cm:
+        Shot.create_shots(
+            data["test_project1"],
+            [{"code": "SH010"}, {"code": "SH020"}, {"code": "SH010"}],
+        )
+
+    assert str(cm.value) == "The same code is used for more than one Shot: SH010"
+
+
+def test_create_shots_doesnt_affect_the_later_shots(setup_shot_code_tests):
+    """Shots created after create_shots() check their codes again."""
+    data = setup_shot_code_tests
+    shots = Shot.create_shots(data["test_project1"], [{"code": "SH010"}])
+    DBSession.add_all(shots)
+    DBSession.commit()
+    with pytest.raises(ValueError) as cm:
+        Shot(code="SH010", project=data["test_project1"])
+
+    assert str(cm.value) == "There is a Shot with the same code: SH010"
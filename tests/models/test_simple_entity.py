@@ -908,3 +908,94 @@ def test_generic_data_attr_can_hold_a_wide_variety_of_object_types(
     assert test_repo in new_simple_entity_db.generic_data
     assert test_department in new_simple_entity_db.generic_data
     assert test_user in new_simple_entity_db.generic_data
+
+
+@pytest.fixture(scope="function")
+def setup_identity_equality_tests(setup_sqlite3):
+    """Set up the tests for the identity_equality config value."""
+    import stalker.db.setup
+
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    stalker.defaults["identity_equality"] = True
+    data["test_type1"] = Type(name="Test Type", code="tt1", target_entity_type="Task")
+    data["test_type2"] = Type(name="Test Type", code="tt2", target_entity_type="Task")
+    DBSession.add_all([data["test_type1"], data["test_type2"]])
+    DBSession.commit()
+    yield data
+    stalker.defaults["identity_equality"] = False
+
+
+def test_identity_equality_is_false_by_default():
+    """identity_equality config value is False by default."""
+    assert stalker.defaults.default_config_values["identity_equality"] is False
+
+
+def test_identity_equality_compares_persisted_instances_by_primary_key(
+    setup_identity_equality_tests,
+):
+    """persisted instances with same attributes are not equal in identity mode."""
+    data = setup_identity_equality_tests
+    assert data["test_type1"] == data["test_type1"]
+    assert data["test_type1"] != data["test_type2"]
+
+    stalker.defaults["identity_equality"] = False
+    assert data["test_type1"] == data["test_type2"]
+
+
+def test_identity_equality_compares_the_same_row_as_equal(
+    setup_identity_equality_tests,
+):
+    """instances of the same row are equal even if their attributes differ."""
+    data = setup_identity_equality_tests
+    type1_id = data["test_type1"].id
+    DBSession.expunge(data["test_type1"])
+    type1 = DBSession.get(Type, type1_id)
+    assert type1 is not data["test_type1"]
+    type1.name = "Renamed Type"
+    assert type1 == data["test_type1"]
+
+
+def test_identity_equality_does_not_load_any_attribute(
+    setup_identity_equality_tests,
+):
+    """persisted instances are compared without loading expired attributes."""
+    data = setup_identity_equality_tests
+    DBSession.expire_all()
+    assert data["test_type1"] != data["test_type2"]
+    assert "name" not in data["test_type1"].__dict__
+    assert "name" not in data["test_type2"].__dict__
+
+
+def test_identity_equality_persisted_and_transient_instances_are_not_equal(
+    setup_identity_equality_tests,
+):
+    """a persisted instance is not equal to a transient one in identity mode."""
+    data = setup_identity_equality_tests
+    new_type = Type(name="Test Type", code="tt1", target_entity_type="Task")
+    assert data["test_type1"] != new_type
+    assert new_type != data["test_type1"]
+
+
+def test_identity_equality_compares_transient_instances_by_attributes(
+    setup_identity_equality_tests,
+):
+    """transient instances are still compared by their attributes."""
+    new_type1 = Type(name="Test Type", code="tt1", target_entity_type="Task")
+    new_type2 = Type(name="Test Type", code="tt1", target_entity_type="Task")
+    new_type3 = Type(name="Test Type 3", code="tt3", target_entity_type="Task")
+    assert new_type1 == new_type2
+    assert new_type1 != new_type3
+
+
+def test_identity_equality_status_can_still_be_compared_with_str(
+    setup_identity_equality_tests,
+):
+    """Status instances can still be compared with str in identity mode."""
+    from stalker import Status
+
+    status_wip = Status.query.filter_by(code="WIP").first()
+    assert status_wip == "WIP"
+    assert status_wip == "Work In Progress"
+    assert status_wip in Status.query.filter_by(code="WIP").all()
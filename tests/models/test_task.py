@@ -4369,6 +4369,33 @@ def test_path_attr_is_the_rendered_vers_of_the_related_filename_template_in_the_
     data["test_project1"].structure = None
 
 
+def test_path_attr_is_memoized(setup_task_tests, monkeypatch):
+    """path attr is not rendered again if nothing naming related is changed."""
+    data = setup_task_tests
+    new_task = Task(**data["kwargs"])
+    ft = FilenameTemplate(
+        name="Task Filename Template",
+        target_entity_type="Task",
+        path="{{project.code}}/{%- for parent_task in parent_tasks -%}"
+        "{{parent_task.nice_name}}/{%- endfor -%}",
+    )
+    data["test_project1"].structure = Structure(
+        name="Movie Project Structure", templates=[ft]
+    )
+    assert new_task.path == "tp1/Modeling"
+
+    def patched_render_path(self, **kwargs):
+        raise AssertionError("path is rendered again")
+
+    monkeypatch.setattr(FilenameTemplate, "render_path", patched_render_path)
+    assert new_task.path == "tp1/Modeling"
+    monkeypatch.undo()
+
+    new_task.name = "Rigging"
+    assert new_task.path == "tp1/Rigging"
+    data["test_project1"].structure = None
+
+
 def test_absolute_path_attr_is_read_only(setup_task_tests):
     """absolute_path is read only."""
     data = setup_task_tests
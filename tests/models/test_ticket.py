@@ -6,6 +6,10 @@ import sys
 
 import pytest
 
+import sqlalchemy as sa
+from sqlalchemy.exc import IntegrityError
+
+import stalker.db.setup
 from stalker import log
 from stalker import Asset
 from stalker import Note
@@ -20,6 +24,7 @@ from stalker import User
 from stalker import Version
 from stalker.db.session import DBSession
 from stalker.exceptions import CircularDependencyError
+from stalker.models.ticket import Ticket_Counters, allocate_ticket_numbers
 
 logger = logging.getLogger("stalker.models.ticket")
 logger.setLevel(log.logging_level)
@@ -842,3 +847,131 @@ def test__eq__of_two_tickets_false_case(setup_ticket_tests):
 def test_max_number_returns_0():
     """_maximum_number() returns 0 when there is no DB connection."""
     assert Ticket._maximum_number() == 0
+
+
+@pytest.fixture(scope="function")
+def setup_ticket_number_tests(setup_sqlite3):
+    """Set up the tests for the Ticket number allocation with a SQLite3 DB."""
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_repo"] = Repository(name="Test Repo", code="TR")
+    data["test_project"] = Project(
+        name="Test Project 1",
+        code="TEST_PROJECT_1",
+        repositories=[data["test_repo"]],
+    )
+    DBSession.add(data["test_project"])
+    DBSession.commit()
+    return data
+
+
+def test_number_is_allocated_from_the_counter_table(setup_ticket_number_tests):
+    """number is allocated from the Ticket_Counters table with SQLite3."""
+    data = setup_ticket_number_tests
+    ticket1 = Ticket(project=data["test_project"])
+    DBSession.add(ticket1)
+    DBSession.commit()
+    ticket2 = Ticket(project=data["test_project"])
+    DBSession.add(ticket2)
+    DBSession.commit()
+    assert ticket1.number == 1
+    assert ticket2.number == 2
+    assert ticket2.name == "Ticket #2"
+    assert DBSession.scalar(sa.select(Ticket_Counters.c.number)) == 2
+
+
+def test_number_is_not_reused_for_unsaved_tickets(setup_ticket_number_tests):
+    """number of a Ticket that is not added to the session is not reused."""
+    data = setup_ticket_number_tests
+    ticket1 = Ticket(project=data["test_project"])
+    _ = Ticket(project=data["test_project"])
+    ticket3 = Ticket(project=data["test_project"])
+    DBSession.add_all([ticket1, ticket3])
+    DBSession.commit()
+    assert ticket1.number == 1
+    assert ticket3.number == 3
+
+
+def test_number_counter_continues_from_the_maximum_number(
+    setup_ticket_number_tests,
+):
+    """the counter is initialized from the maximum ticket number."""
+    data = setup_ticket_number_tests
+    ticket1 = Ticket(project=data["test_project"])
+    DBSession.add(ticket1)
+    DBSession.commit()
+    # simulate a database with tickets but without the counter row
+    DBSession.execute(sa.delete(Ticket_Counters))
+    DBSession.execute(
+        sa.update(Ticket.__table__)
+        .where(Ticket.__table__.c.id == ticket1.id)
+        .values(number=10)
+    )
+    DBSession.commit()
+    ticket2 = Ticket(project=data["test_project"])
+    assert ticket2.number == 11
+
+
+def test_number_is_unique_in_the_db(setup_ticket_number_tests):
+    """two Tickets cannot have the same number in the database."""
+    data = setup_ticket_number_tests
+    ticket1 = Ticket(project=data["test_project"])
+    ticket2 = Ticket(project=data["test_project"])
+    DBSession.add_all([ticket1, ticket2])
+    DBSession.commit()
+    with pytest.raises(IntegrityError):
+        DBSession.execute(
+            sa.update(Ticket.__table__)
+            .where(Ticket.__table__.c.id == ticket2.id)
+            .values(number=ticket1.number)
+        )
+    DBSession.rollback()
+
+
+def test_allocate_ticket_numbers_reserves_a_block(setup_ticket_number_tests):
+    """allocate_ticket_numbers() reserves the given number of numbers."""
+    connection = DBSession.connection()
+    assert allocate_ticket_numbers(connection) == [1]
+    assert allocate_ticket_numbers(connection, 5) == [2, 3, 4, 5, 6]
+    assert allocate_ticket_numbers(connection) == [7]
+
+
+def test_create_tickets_is_working_as_expected(setup_ticket_number_tests):
+    """create_tickets() creates the Tickets with consecutive numbers."""
+    data = setup_ticket_number_tests
+    tickets = Ticket.create_tickets(
+        [
+            {"summary": "Missing frames", "priority": "MAJOR"},
+            {"summary": "Wrong frame rate"},
+            {"summary": "Flickering"},
+        ],
+        project=data["test_project"],
+    )
+    DBSession.add_all(tickets)
+    DBSession.commit()
+    assert [t.number for t in tickets] == [1, 2, 3]
+    assert [t.name for t in tickets] == ["Ticket #1", "Ticket #2", "Ticket #3"]
+    assert [t.priority for t in tickets] == ["MAJOR", "TRIVIAL", "TRIVIAL"]
+    assert all(t.project == data["test_project"] for t in tickets)
+
+    ticket = Ticket(project=data["test_project"])
+    assert ticket.number == 4
+
+
+def test_create_tickets_reserves_the_numbers_in_one_round_trip(
+    setup_ticket_number_tests, count_statements
+):
+    """create_tickets() reserves all the numbers in a single statement."""
+    data = setup_ticket_number_tests
+    tickets, statements = count_statements(
+        Ticket.create_tickets, [{} for _ in range(100)], project=data["test_project"]
+    )
+    assert len(tickets) == 100
+    assert len([s for s in statements if "Ticket_Counters" in s]) == 1
+    assert [t.number for t in tickets] == list(range(1, 101))
+
+
+def test_create_tickets_with_no_tickets(setup_ticket_number_tests):
+    """create_tickets() returns an empty list if no tickets are given."""
+    assert Ticket.create_tickets([]) == []
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""Tests for counting the Tickets without loading them."""
+
+import pytest
+
+import stalker.db.setup
+from stalker import (
+    Project,
+    Repository,
+    Status,
+    Task,
+    Ticket,
+    User,
+)
+from stalker.db.session import DBSession
+
+
+@pytest.fixture(scope="function")
+def setup_ticket_count_tests(setup_sqlite3):
+    """Set up the tests for counting the Tickets with a SQLite3 DB.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_user1"] = User(
+        name="User1", login="user1", email="user1@test.com", password="1234"
+    )
+    data["test_user2"] = User(
+        name="User2", login="user2", email="user2@test.com", password="1234"
+    )
+    data["test_project1"] = Project(
+        name="Test Project 1",
+        code="TP1",
+        repositories=[Repository(name="Test Repository", code="TR")],
+    )
+    data["test_project2"] = Project(
+        name="Test Project 2",
+        code="TP2",
+        repositories=data["test_project1"].repositories,
+    )
+    DBSession.add_all(
+        [
+            data["test_user1"],
+            data["test_user2"],
+            data["test_project1"],
+            data["test_project2"],
+        ]
+    )
+    DBSession.commit()
+
+    data["test_task1"] = Task(name="Task1", project=data["test_project1"])
+    data["test_task2"] = Task(name="Task2", project=data["test_project1"])
+    data["test_task3"] = Task(name="Task3", project=data["test_project2"])
+    DBSession.add_all([data["test_task1"], data["test_task2"], data["test_task3"]])
+    DBSession.commit()
+
+    task1, task2, task3 = data["test_task1"], data["test_task2"], data["test_task3"]
+    data["test_tickets"] = Ticket.create_tickets(
+        [
+            {"project": data["test_project1"], "links": [task1]},
+            {"project": data["test_project1"], "links": [task1, task2]},
+            {"project": data["test_project1"], "links": [task2]},
+            {"project": data["test_project1"]},
+            {"project": data["test_project2"], "links": [task3]},
+        ]
+    )
+    DBSession.add_all(data["test_tickets"])
+    DBSession.commit()
+
+    ticket1, ticket2, ticket3, ticket4, ticket5 = data["test_tickets"]
+    ticket1.reassign(data["test_user1"], data["test_user1"])
+    ticket2.reassign(data["test_user1"], data["test_user1"])
+    ticket3.resolve(data["test_user1"], "fixed")
+    ticket5.accept(data["test_user2"])
+    DBSession.commit()
+
+    for name in ["New", "Accepted", "Assigned", "Closed"]:
+        data[name] = Status.query.filter_by(name=name).first()
+    return data
+
+
+def test_count_tickets(setup_ticket_count_tests):
+    """The Tickets are counted with the given filters."""
+    data = setup_ticket_count_tests
+    assert Ticket.count_tickets() == 5
+    assert Ticket.count_tickets(open_only=True) == 4
+    assert Ticket.count_tickets(project=data["test_project1"]) == 4
+    assert Ticket.count_tickets(open_only=True, owner=data["test_user1"]) == 2
+    # a ticket linked to more than one of the tasks is counted once
+    assert Ticket.count_tickets(tasks=[data["test_task1"], data["test_task2"]]) == 3
+    assert Ticket.count_tickets(tasks=[]) == 0
+
+
+def test_count_tickets_by_status(setup_ticket_count_tests):
+    """The Tickets are counted by status by default."""
+    data = setup_ticket_count_tests
+    assert Ticket.count_tickets_by() == {
+        data["New"].id: 1,
+        data["Assigned"].id: 2,
+        data["Accepted"].id: 1,
+        data["Closed"].id: 1,
+    }
+    assert Ticket.count_tickets_by(project=data["test_project2"]) == {
+        data["Accepted"].id: 1,
+    }
+
+
+def test_count_tickets_by_task(setup_ticket_count_tests):
+    """The open Tickets of many Tasks are counted at once."""
+    data = setup_ticket_count_tests
+    task1, task2, task3 = data["test_task1"], data["test_task2"], data["test_task3"]
+    assert Ticket.count_tickets_by("task") == {task1.id: 2, task2.id: 2, task3.id: 1}
+    assert Ticket.count_tickets_by("task", open_only=True, tasks=[task1, task2]) == {
+        task1.id: 2,
+        task2.id: 1,
+    }
+
+
+def test_count_tickets_by_many_keys(setup_ticket_count_tests):
+    """The Tickets are counted by the tuple of the keys."""
+    data = setup_ticket_count_tests
+    project1, project2 = data["test_project1"], data["test_project2"]
+    user1, user2 = data["test_user1"], data["test_user2"]
+    assert Ticket.count_tickets_by(["project", "owner"], open_only=True) == {
+        (project1.id, user1.id): 2,
+        (project1.id, None): 1,
+        (project2.id, user2.id): 1,
+    }
+
+
+def test_count_tickets_by_runs_a_single_query(
+    setup_ticket_count_tests, count_statements
+):
+    """The Tickets are counted with a single query for any number of Tasks."""
+    data = setup_ticket_count_tests
+    tasks = [data["test_task1"], data["test_task2"], data["test_task3"]]
+    # load the expired tasks
+    assert all(task.id for task in tasks)
+    _, statements = count_statements(
+        Ticket.count_tickets_by, ["task", "status"], open_only=True, tasks=tasks
+    )
+    assert len(statements) == 1
+    assert "GROUP BY" in statements[0]
+
+
+def test_open_ticket_count_properties(setup_ticket_count_tests):
+    """The open ticket count properties are the lengths of the open tickets."""
+    data = setup_ticket_count_tests
+    for entity in [
+        data["test_project1"],
+        data["test_project2"],
+        data["test_task1"],
+        data["test_task2"],
+        data["test_user1"],
+        data["test_user2"],
+    ]:
+        assert entity.open_ticket_count == len(entity.open_tickets)
+    assert data["test_task2"].ticket_count == len(data["test_task2"].tickets) == 2
+
+
+def test_count_tickets_by_group_by_is_not_a_str(setup_ticket_count_tests):
+    """TypeError is raised if the group_by is not a str or a list."""
+    with pytest.raises(TypeError) as cm:
+        Ticket.count_tickets_by(1)
+
+    assert str(cm.value) == (
+        "Ticket.count_tickets_by() group_by should be a str or a list of str, "
+        "not int: '1'"
+    )
+
+
+def test_count_tickets_by_group_by_is_not_available(setup_ticket_count_tests):
+    """ValueError is raised if the group_by is not one of the available keys."""
+    with pytest.raises(ValueError) as cm:
+        Ticket.count_tickets_by(["project", "priority"])
+
+    assert str(cm.value) == (
+        "Ticket.count_tickets_by() group_by should be one of "
+        "['owner', 'project', 'status', 'task'], not 'priority'"
+    )
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""Tests for the TicketWorkflow class and the Ticket.apply_action() method."""
+
+import copy
+
+import pytest
+import sqlalchemy as sa
+
+import stalker.db.setup
+from stalker import (
+    Project,
+    Repository,
+    Status,
+    StatusList,
+    Ticket,
+    User,
+    defaults,
+)
+from stalker.db.session import DBSession
+from stalker.models.ticket import TicketLog, ticket_workflow
+
+
+@pytest.fixture(scope="function")
+def setup_ticket_workflow_tests(setup_sqlite3):
+    """Set up the tests for the TicketWorkflow class with a SQLite3 DB.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_user1"] = User(
+        name="User1", login="user1", email="user1@test.com", password="1234"
+    )
+    data["test_user2"] = User(
+        name="User2", login="user2", email="user2@test.com", password="1234"
+    )
+    data["test_project"] = Project(
+        name="Test Project",
+        code="TP",
+        repositories=[Repository(name="Test Repository", code="TR")],
+    )
+    DBSession.add_all([data["test_user1"], data["test_user2"], data["test_project"]])
+    DBSession.commit()
+
+    data["test_tickets"] = Ticket.create_tickets(
+        [{"summary": f"Ticket {i}"} for i in range(5)],
+        project=data["test_project"],
+    )
+    DBSession.add_all(data["test_tickets"])
+    DBSession.commit()
+
+    data["status_list"] = data["test_tickets"][0].status_list
+    for name in ["New", "Accepted", "Assigned", "Reopened", "Closed"]:
+        data[name] = Status.query.filter_by(name=name).first()
+    return data
+
+
+def test_transitions_are_compiled_to_status_ids(setup_ticket_workflow_tests):
+    """The transitions are mapped from status ids to status ids and handler names."""
+    data = setup_ticket_workflow_tests
+    transitions = ticket_workflow.transitions(data["status_list"])
+    assert transitions[(data["New"].id, "resolve")] == (
+        data["Closed"].id,
+        "set_resolution",
+    )
+    assert transitions[(data["Assigned"].id, "accept")] == (
+        data["Accepted"].id,
+        "set_owner",
+    )
+    assert transitions[(data["Closed"].id, "reopen")] == (
+        data["Reopened"].id,
+        "del_resolution",
+    )
+    assert (data["Closed"].id, "resolve") not in transitions
+    assert len(transitions) == 13
+
+
+def test_transitions_are_cached(setup_ticket_workflow_tests):
+    """The transition table is compiled once per StatusList."""
+    data = setup_ticket_workflow_tests
+    transitions = ticket_workflow.transitions(data["status_list"])
+    assert ticket_workflow.transitions(data["status_list"]) is transitions
+
+    ticket_workflow.invalidate()
+    assert ticket_workflow.transitions(data["status_list"]) is not transitions
+
+
+def test_transitions_are_compiled_again_for_a_new_workflow(
+    setup_ticket_workflow_tests,
+):
+    """The transition table is compiled again if the workflow is replaced."""
+    data = setup_ticket_workflow_tests
+    assert (data["Closed"].id, "resolve") not in ticket_workflow.transitions(
+        data["status_list"]
+    )
+    workflow = copy.deepcopy(defaults.ticket_workflow)
+    workflow["resolve"]["Closed"] = {"new_status": "Closed", "action": "set_resolution"}
+    defaults["ticket_workflow"] = workflow
+    assert ticket_workflow.transitions(data["status_list"])[
+        (data["Closed"].id, "resolve")
+    ] == (data["Closed"].id, "set_resolution")
+
+
+def test_transitions_are_cleared_when_the_statuses_are_changed(
+    setup_ticket_workflow_tests,
+):
+    """The transition table is compiled again if the statuses are changed."""
+    data = setup_ticket_workflow_tests
+    assert (data["Closed"].id, "reopen") in ticket_workflow.transitions(
+        data["status_list"]
+    )
+    data["status_list"].statuses.remove(data["Closed"])
+    transitions = ticket_workflow.transitions(data["status_list"])
+    assert (data["Closed"].id, "reopen") not in transitions
+    # the transitions to the removed status are skipped too
+    assert (data["New"].id, "resolve") not in transitions
+    assert (data["New"].id, "accept") in transitions
+
+
+def test_transitions_are_cleared_when_a_status_code_is_changed(
+    setup_ticket_workflow_tests,
+):
+    """The transition table is compiled again if the code of a Status changes."""
+    data = setup_ticket_workflow_tests
+    transitions = ticket_workflow.transitions(data["status_list"])
+    data["Closed"].code = "CLOSED"
+    assert ticket_workflow.transitions(data["status_list"]) is not transitions
+
+
+def test_action_without_a_db(setup_sqlite3):
+    """The Ticket actions work with the statuses that are not flushed yet."""
+    statuses = [
+        Status(name=name, code=code)
+        for name, code in [
+            ("New", "NEW"),
+            ("Accepted", "ACP"),
+            ("Assigned", "ASG"),
+            ("Reopened", "ROP"),
+            ("Closed", "CLS"),
+        ]
+    ]
+    status_list = StatusList(
+        name="Ticket Statuses", statuses=statuses, target_entity_type="Ticket"
+    )
+    project = Project(
+        name="Test Project",
+        code="TP",
+        repositories=[Repository(name="Test Repository", code="TR")],
+        status_list=StatusList(
+            name="Project Statuses",
+            statuses=[Status(name="Work In Progress", code="WIP")],
+            target_entity_type="Project",
+        ),
+    )
+    ticket = Ticket(project=project, status_list=status_list)
+    assert ticket_workflow.transitions(status_list) is None
+
+    ticket_log = ticket.resolve(None, "fixed")
+    assert ticket.status.code == "CLS"
+    assert ticket.resolution == "fixed"
+    assert ticket_log.from_status.code == "NEW"
+    assert ticket_log.to_status.code == "CLS"
+    assert ticket.resolve(None, "fixed") is None
+    assert ticket.reopen(None).to_status.code == "ROP"
+
+
+def test_action_uses_the_compiled_workflow(setup_ticket_workflow_tests):
+    """The Ticket actions change the status and create a TicketLog."""
+    data = setup_ticket_workflow_tests
+    ticket = data["test_tickets"][0]
+    ticket_log = ticket.resolve(data["test_user1"], "fixed")
+    assert ticket.status == data["Closed"]
+    assert ticket.resolution == "fixed"
+    assert ticket_log.from_status == data["New"]
+    assert ticket_log.to_status == data["Closed"]
+    assert ticket.logs == [ticket_log]
+
+    # not available for a closed ticket
+    assert ticket.resolve(data["test_user1"], "fixed") is None
+    assert ticket.reopen(data["test_user1"]).to_status == data["Reopened"]
+    assert ticket.resolution == ""
+
+
+def test_apply_action_updates_the_tickets(setup_ticket_workflow_tests):
+    """The status, the resolution and the logs of the Tickets are updated."""
+    data = setup_ticket_workflow_tests
+    tickets = data["test_tickets"]
+    result = Ticket.apply_action(tickets, "resolve", data["test_user1"], "fixed")
+    DBSession.commit()
+    assert result == tickets
+    for ticket in tickets:
+        assert ticket.status == data["Closed"]
+        assert ticket.resolution == "fixed"
+        assert len(ticket.logs) == 1
+        ticket_log = ticket.logs[0]
+        assert isinstance(ticket_log, TicketLog)
+        assert ticket_log.from_status == data["New"]
+        assert ticket_log.to_status == data["Closed"]
+        assert ticket_log.action == "resolve"
+        assert ticket_log.created_by == data["test_user1"]
+        assert ticket_log.name.startswith("TicketLog_")
+        assert ticket_log.date_created is not None
+
+
+def test_apply_action_sets_the_owner(setup_ticket_workflow_tests):
+    """The reassign action sets the owner of the Tickets."""
+    data = setup_ticket_workflow_tests
+    tickets = data["test_tickets"][:2]
+    Ticket.apply_action(tickets, "reassign", data["test_user1"], data["test_user2"])
+    DBSession.commit()
+    for ticket in tickets:
+        assert ticket.status == data["Assigned"]
+        assert ticket.owner == data["test_user2"]
+    assert data["test_tickets"][2].owner is None
+
+
+def test_apply_action_skips_unavailable_transitions(setup_ticket_workflow_tests):
+    """The Tickets that the action is not available for are skipped."""
+    data = setup_ticket_workflow_tests
+    tickets = data["test_tickets"]
+    tickets[0].resolve(data["test_user1"], "fixed")
+    DBSession.commit()
+
+    result = Ticket.apply_action(tickets, "reopen", data["test_user2"])
+    DBSession.commit()
+    assert result == [tickets[0]]
+    assert tickets[0].status == data["Reopened"]
+    assert tickets[0].resolution == ""
+    assert [log.action for log in tickets[0].logs] == ["resolve", "reopen"]
+    for ticket in tickets[1:]:
+        assert ticket.status == data["New"]
+        assert ticket.logs == []
+
+
+def test_apply_action_updates_once_per_transition(
+    setup_ticket_workflow_tests, count_statements
+):
+    """The Tickets are updated with a single statement per transition."""
+    data = setup_ticket_workflow_tests
+    tickets = data["test_tickets"]
+    tickets[0].accept(data["test_user1"])
+    DBSession.commit()
+
+    _, statements = count_statements(
+        Ticket.apply_action, tickets, "resolve", data["test_user1"], "fixed"
+    )
+    assert len([s for s in statements if s.startswith("UPDATE")]) == 1
+    DBSession.commit()
+
+    more_tickets = Ticket.create_tickets(
+        [{"summary": f"New Ticket {i}"} for i in range(20)],
+        project=data["test_project"],
+    )
+    DBSession.add_all(more_tickets)
+    DBSession.commit()
+    more_tickets[0].accept(data["test_user1"])
+    DBSession.commit()
+    _, statements = count_statements(
+        Ticket.apply_action, more_tickets, "resolve", data["test_user1"], "fixed"
+    )
+    assert len([s for s in statements if s.startswith("UPDATE")]) == 1
+    DBSession.commit()
+    assert TicketLog.query.filter_by(action="resolve").count() == 25
+
+
+def test_apply_action_with_a_custom_handler(setup_ticket_workflow_tests):
+    """The Tickets with a custom handler are updated through the instances."""
+    data = setup_ticket_workflow_tests
+    tickets = data["test_tickets"][:2]
+    workflow = copy.deepcopy(defaults.ticket_workflow)
+    workflow["resolve"]["New"]["action"] = "set_summary"
+    defaults["ticket_workflow"] = workflow
+
+    def set_summary(self, summary):
+        self.summary = summary
+
+    Ticket.set_summary = set_summary
+    try:
+        result = Ticket.apply_action(tickets, "resolve", data["test_user1"], "done")
+        DBSession.commit()
+    finally:
+        del Ticket.set_summary
+
+    assert result == tickets
+    for ticket in tickets:
+        assert ticket.status == data["Closed"]
+        assert ticket.summary == "done"
+        assert len(ticket.logs) == 1
+
+
+def test_apply_action_uses_the_overridden_handlers(
+    setup_ticket_workflow_tests, monkeypatch
+):
+    """The handlers are looked up by name so the overrides are respected."""
+    data = setup_ticket_workflow_tests
+    ticket1, ticket2 = data["test_tickets"][:2]
+    # compile the transitions before the handler is overridden
+    assert ticket_workflow.transitions(data["status_list"])
+
+    def set_resolution(self, resolution):
+        self.resolution = resolution.upper()
+
+    monkeypatch.setattr(Ticket, "set_resolution", set_resolution)
+    ticket1.resolve(data["test_user1"], "fixed")
+    Ticket.apply_action([ticket2], "resolve", data["test_user1"], "fixed")
+    DBSession.commit()
+    assert ticket1.resolution == "FIXED"
+    assert ticket2.resolution == "FIXED"
+
+
+def test_apply_action_logs_match_the_instance_logs(setup_ticket_workflow_tests):
+    """The bulk created TicketLogs have the same columns as the instance ones."""
+    data = setup_ticket_workflow_tests
+    ticket1, ticket2 = data["test_tickets"][:2]
+    DBSession.add(ticket1.resolve(data["test_user1"], "fixed"))
+    Ticket.apply_action([ticket2], "resolve", data["test_user1"], "fixed")
+    DBSession.commit()
+
+    columns = [
+        "description",
+        "generic_text",
+        "created_by_id",
+        "updated_by_id",
+        "entity_type",
+    ]
+    rows = DBSession.execute(
+        sa.select(*[getattr(TicketLog, column) for column in columns])
+        .where(TicketLog.ticket_id.in_([ticket1.id, ticket2.id]))
+        .order_by(TicketLog.ticket_id)
+    ).all()
+    assert len(rows) == 2
+    assert rows[0] == rows[1]
+    assert rows[0].updated_by_id == data["test_user1"].id
+
+
+def test_apply_action_with_no_tickets(setup_ticket_workflow_tests):
+    """An empty list is returned if there are no Tickets."""
+    assert Ticket.apply_action([], "resolve") == []
+
+
+def test_apply_action_tickets_of_wrong_type(setup_ticket_workflow_tests):
+    """TypeError is raised if the tickets are not all Ticket instances."""
+    data = setup_ticket_workflow_tests
+    with pytest.raises(TypeError) as cm:
+        Ticket.apply_action([data["test_tickets"][0], "ticket"], "resolve")
+
+    assert str(cm.value) == (
+        "Ticket.apply_action() tickets should be a list of "
+        "stalker.models.ticket.Ticket instances, not str: 'ticket'"
+    )
+
+
+def test_apply_action_unknown_action(setup_ticket_workflow_tests):
+    """ValueError is raised if the action is not in the workflow."""
+    data = setup_ticket_workflow_tests
+    with pytest.raises(ValueError) as cm:
+        Ticket.apply_action(data["test_tickets"], "close")
+
+    assert str(cm.value) == (
+        "Ticket.apply_action() action should be one of "
+        "['accept', 'reassign', 'reopen', 'resolve'], not 'close'"
+    )
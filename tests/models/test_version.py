@@ -5,6 +5,7 @@ from pathlib import Path
 import sys
 
 import pytest
+import sqlalchemy as sa
 
 from stalker import (
     Asset,
@@ -26,9 +27,11 @@ from stalker import (
     defaults,
     log,
 )
+import stalker.db.setup
 from stalker.db.session import DBSession
 from stalker.exceptions import CircularDependencyError
 from stalker.models.entity import Entity
+from stalker.models.version import Version_Counters, allocate_version_number
 
 from tests.utils import PlatformPatcher
 
@@ -803,7 +806,7 @@ def test_parent_attribute_will_not_allow_deeper_circular_dependencies(
 
     assert (
         str(cm.value) == "<tp_SH001_FX_Main_v001 (Version)> (Version) and "
-        "<tp_SH001_FX_Main_v002 (Version)> (Version) are in a "
+        "<tp_SH001_FX_Main_v003 (Version)> (Version) are in a "
         'circular dependency in their "children" attribute'
     )
 
@@ -2130,6 +2133,82 @@ def test_version_number_without_a_db(setup_version_tests):
     assert v3.version_number == 3
 
 
+@pytest.fixture(scope="function")
+def setup_version_path_tests(setup_version_tests):
+    """Set up the tests for the memoized paths of the Version class."""
+    data = setup_version_tests
+    data["test_filename_template"] = FilenameTemplate(
+        name="Task Filename Template",
+        target_entity_type="Task",
+        path="{{project.code}}/{%- for parent_task in parent_tasks -%}"
+        "{{parent_task.nice_name}}/{%- endfor -%}",
+        filename="{{version.nice_name}}"
+        '_r{{"%02d"|format(version.revision_number)}}'
+        '_v{{"%03d"|format(version.version_number)}}',
+    )
+    data["test_structure"].templates.append(data["test_filename_template"])
+    return data
+
+
+def test_generate_path_is_memoized(setup_version_path_tests, monkeypatch):
+    """generate_path() doesn't render the path again if nothing is changed."""
+    data = setup_version_path_tests
+    v = data["test_version"]
+    assert v.generate_path() == Path("tp/SH001/Task1/SH001_Task1_r01_v001")
+
+    def patched_render_path(self):
+        raise AssertionError("path is rendered again")
+
+    monkeypatch.setattr(Version, "_render_path", patched_render_path)
+    assert v.generate_path() == Path("tp/SH001/Task1/SH001_Task1_r01_v001")
+    assert v.generate_path(".ma") == Path("tp/SH001/Task1/SH001_Task1_r01_v001.ma")
+    assert v.filename == "SH001_Task1_r01_v001"
+
+
+def test_generate_path_is_rendered_again_if_version_number_changes(
+    setup_version_path_tests,
+):
+    """generate_path() renders the path again if the version_number changes."""
+    data = setup_version_path_tests
+    v = data["test_version"]
+    assert v.filename == "SH001_Task1_r01_v001"
+    v.version_number = 12
+    assert v.filename == "SH001_Task1_r01_v012"
+
+
+def test_generate_path_is_rendered_again_if_task_name_changes(
+    setup_version_path_tests,
+):
+    """generate_path() renders the path again if the name of the task changes."""
+    data = setup_version_path_tests
+    v = data["test_version"]
+    assert v.filename == "SH001_Task1_r01_v001"
+    data["test_task1"].name = "Comp"
+    assert v.generate_path() == Path("tp/SH001/Comp/SH001_Comp_r01_v001")
+
+
+def test_generate_path_is_rendered_again_if_shot_name_changes(
+    setup_version_path_tests,
+):
+    """generate_path() renders the path again if the name of the shot changes."""
+    data = setup_version_path_tests
+    v = data["test_version"]
+    assert v.filename == "SH001_Task1_r01_v001"
+    data["test_shot1"].name = "SH002"
+    assert v.filename == "SH002_Task1_r01_v001"
+
+
+def test_generate_path_is_rendered_again_if_template_changes(
+    setup_version_path_tests,
+):
+    """generate_path() renders the path again if the FilenameTemplate changes."""
+    data = setup_version_path_tests
+    v = data["test_version"]
+    assert v.filename == "SH001_Task1_r01_v001"
+    data["test_filename_template"].filename = "{{version.nice_name}}"
+    assert v.filename == "SH001_Task1"
+
+
 def test_latest_version_without_a_db(setup_version_tests):
     """latest_version without a db returns self."""
     data = setup_version_tests
@@ -2202,3 +2281,212 @@ def test_variant_name_attr_does_not_exist(setup_version_tests):
     """Version.variant_name does not exist anymore."""
     data = setup_version_tests
     assert hasattr(data["test_version"], "variant_name") is False
+
+
+@pytest.fixture(scope="function")
+def setup_version_counter_tests(setup_sqlite3):
+    """Set up the tests for the version number allocation with a SQLite3 DB."""
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_repo"] = Repository(
+        name="Test Repository",
+        code="TR",
+        linux_path="/mnt/T/",
+        windows_path="T:/",
+        macos_path="/Volumes/T/",
+    )
+    data["test_project"] = Project(
+        name="Test Project",
+        code="tp",
+        repositories=[data["test_repo"]],
+    )
+    data["test_task"] = Task(name="Test Task", project=data["test_project"])
+    DBSession.add_all([data["test_repo"], data["test_project"], data["test_task"]])
+    DBSession.commit()
+    return data
+
+
+def test_version_number_is_allocated_from_the_counter_table(
+    setup_version_counter_tests,
+):
+    """version_number is stored in the Version_Counters table."""
+    data = setup_version_counter_tests
+    v1 = Version(task=data["test_task"])
+    DBSession.add(v1)
+    DBSession.commit()
+    v2 = Version(task=data["test_task"])
+    DBSession.add(v2)
+    DBSession.commit()
+    assert v1.version_number == 1
+    assert v2.version_number == 2
+    counters = DBSession.execute(
+        sa.select(
+            Version_Counters.c.task_id,
+            Version_Counters.c.revision_number,
+            Version_Counters.c.version_number,
+        )
+    ).all()
+    assert counters == [(data["test_task"].id, 1, 2)]
+
+
+def test_version_number_is_reallocated_on_conflict(setup_version_counter_tests):
+    """version_number is reallocated if it is already taken."""
+    data = setup_version_counter_tests
+    # simulate two concurrent processes picking the same number
+    v1 = Version(task=data["test_task"])
+    v2 = Version(task=data["test_task"])
+    v2.version_number = 1
+    assert v1.version_number == 1
+    assert v2.version_number == 1
+    DBSession.add(v1)
+    DBSession.commit()
+    DBSession.add(v2)
+    DBSession.commit()
+    assert v2.version_number == 2
+
+    # simulate a stale in memory number
+    v3 = Version(task=data["test_task"])
+    assert v3.version_number == 3
+    DBSession.execute(sa.update(Version_Counters).values(version_number=5))
+    DBSession.add(v3)
+    DBSession.commit()
+    assert v3.version_number == 6
+    assert (
+        DBSession.execute(
+            sa.select(Version.version_number).where(Version.id == v3.id)
+        ).scalar_one()
+        == 6
+    )
+
+
+def test_version_number_is_allocated_per_revision_number(
+    setup_version_counter_tests,
+):
+    """version_number is allocated per task and revision number."""
+    data = setup_version_counter_tests
+    v1 = Version(task=data["test_task"])
+    DBSession.add(v1)
+    DBSession.commit()
+    v2 = Version(task=data["test_task"], revision_number=2)
+    DBSession.add(v2)
+    DBSession.commit()
+    assert v1.version_number == 1
+    assert v2.version_number == 1
+
+
+def test_version_number_higher_than_the_counter_is_kept(
+    setup_version_counter_tests,
+):
+    """a version_number higher than the counter is kept as is."""
+    data = setup_version_counter_tests
+    v1 = Version(task=data["test_task"])
+    v1.version_number = 10
+    DBSession.add(v1)
+    DBSession.commit()
+    assert v1.version_number == 10
+    v2 = Version(task=data["test_task"])
+    DBSession.add(v2)
+    DBSession.commit()
+    assert v2.version_number == 11
+
+
+def test_allocate_version_number_returns_the_given_number_for_other_dialects(
+    setup_version_counter_tests, monkeypatch
+):
+    """allocate_version_number() returns the given number on other dialects."""
+    connection = DBSession.connection()
+    monkeypatch.setattr(connection.dialect, "name", "mysql")
+    assert allocate_version_number(connection, 1, 1, 5) == 5
+
+
+@pytest.fixture(scope="function")
+def setup_generate_paths_tests(setup_version_counter_tests):
+    """Set up the tests for the Version.generate_paths() method."""
+    data = setup_version_counter_tests
+    templates = [
+        FilenameTemplate(
+            name=f"{entity_type} Filename Template",
+            target_entity_type=entity_type,
+            path="$REPO{{project.repositories[0].id}}/{{project.code}}/"
+            "{%- for parent_task in parent_tasks -%}"
+            "{{parent_task.nice_name}}/{%- endfor -%}",
+            filename="{{version.nice_name}}"
+            '_v{{"%03d"|format(version.version_number)}}',
+        )
+        for entity_type in ["Task", "Shot"]
+    ]
+    data["test_project"].structure = Structure(
+        name="Test Project Structure", templates=templates
+    )
+    sequence = Sequence(name="SEQ1", code="SEQ1", project=data["test_project"])
+    shots = [
+        Shot(
+            name=f"SH{i:03d}",
+            code=f"SH{i:03d}",
+            project=data["test_project"],
+            sequence=sequence,
+        )
+        for i in range(3)
+    ]
+    comps = [Task(name="Comp", parent=shot) for shot in shots]
+    DBSession.add_all([sequence] + shots + comps)
+    DBSession.commit()
+
+    versions = []
+    for shot, comp in zip(shots, comps):
+        for task in [comp, comp, shot]:
+            version = Version(task=task)
+            DBSession.add(version)
+            DBSession.commit()
+            versions.append(version)
+    versions.append(Version(task=data["test_task"]))
+    DBSession.add_all(versions)
+    DBSession.commit()
+    data["version_ids"] = [v.id for v in versions]
+    data["expected_paths"] = [v.generate_path() for v in versions]
+    return data
+
+
+def test_generate_paths_returns_the_paths_of_the_versions(
+    setup_generate_paths_tests,
+):
+    """generate_paths() returns the same paths with generate_path()."""
+    data = setup_generate_paths_tests
+    versions = [DBSession.get(Version, i) for i in data["version_ids"]]
+    assert Version.generate_paths(versions) == data["expected_paths"]
+    assert Version.generate_paths(versions, extension=".ma") == [
+        p.with_suffix(".ma") for p in data["expected_paths"]
+    ]
+
+
+def test_generate_paths_with_absolute_is_true(setup_generate_paths_tests):
+    """generate_paths() returns the absolute full paths if absolute is True."""
+    data = setup_generate_paths_tests
+    versions = [DBSession.get(Version, i) for i in data["version_ids"]]
+    assert Version.generate_paths(versions, absolute=True) == [
+        v.absolute_full_path for v in versions
+    ]
+
+
+def test_generate_paths_extension_is_not_a_str(setup_generate_paths_tests):
+    """generate_paths() raises TypeError if the extension is not a str."""
+    with pytest.raises(TypeError) as cm:
+        Version.generate_paths([], extension=123)
+
+    assert str(cm.value) == "extension should be a str, not int: '123'"
+
+
+def test_generate_paths_uses_a_fixed_number_of_queries(
+    setup_generate_paths_tests, count_statements
+):
+    """generate_paths() doesn't lazy load the related data one by one."""
+    data = setup_generate_paths_tests
+    DBSession.expunge_all()
+    versions = Version.query.filter(Version.id.in_(data["version_ids"])).all()
+    versions.sort(key=lambda v: data["version_ids"].index(v.id))
+
+    paths, statements = count_statements(Version.generate_paths, versions)
+    assert paths == data["expected_paths"]
+    # tasks level by level, projects, repositories, structures, templates, types
+    assert len(statements) <= 8
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+"""Tests for the WorkingCalendar class."""
+
+import datetime
+
+import pytest
+import pytz
+
+import stalker.db.setup
+from stalker import Studio, User, Vacation, WorkingHours, defaults
+from stalker.db.session import DBSession
+from stalker.models.studio import WorkingCalendar
+
+
+def utc(*args):
+    """Return a UTC datetime.
+
+    Args:
+        args (int): The datetime arguments.
+
+    Returns:
+        datetime.datetime: The timezone aware datetime.
+    """
+    return datetime.datetime(*args, tzinfo=pytz.utc)
+
+
+@pytest.fixture(scope="function")
+def setup_working_calendar_tests():
+    """Set up the tests for the WorkingCalendar class.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    data["working_hours"] = WorkingHours(
+        working_hours={
+            "mon": [[540, 720], [780, 1080]],  # 9:00 - 12:00, 13:00 - 18:00
+            "tue": [[540, 720], [780, 1080]],
+            "wed": [[540, 720], [780, 1080]],
+            "thu": [[540, 720], [780, 1080]],
+            "fri": [[540, 720], [780, 1080]],
+            "sat": [],
+            "sun": [],
+        }
+    )
+    # Wednesday 2013-04-10 is off
+    data["vacation"] = Vacation(start=utc(2013, 4, 10), end=utc(2013, 4, 11))
+    data["calendar"] = WorkingCalendar(data["working_hours"], [data["vacation"]])
+    return data
+
+
+def test_working_hours_is_not_a_working_hours_instance():
+    """TypeError is raised if the working_hours is not a WorkingHours instance."""
+    with pytest.raises(TypeError) as cm:
+        WorkingCalendar({"mon": [[540, 1080]]})
+
+    assert str(cm.value) == (
+        "WorkingCalendar.working_hours should be a "
+        "stalker.models.studio.WorkingHours instance, not dict: "
+        "'{'mon': [[540, 1080]]}'"
+    )
+
+
+def test_vacations_is_not_a_list_of_vacations(setup_working_calendar_tests):
+    """TypeError is raised if the vacations contain non Vacation instances."""
+    data = setup_working_calendar_tests
+    with pytest.raises(TypeError) as cm:
+        WorkingCalendar(data["working_hours"], ["not a vacation"])
+
+    assert str(cm.value) == (
+        "WorkingCalendar.vacations should be a list of "
+        "stalker.models.studio.Vacation instances, not str: 'not a vacation'"
+    )
+
+
+def test_weekly_working_seconds(setup_working_calendar_tests):
+    """weekly_working_seconds is the total working seconds of a week."""
+    data = setup_working_calendar_tests
+    assert data["calendar"].weekly_working_seconds == 5 * 8 * 3600
+
+
+def test_overlapping_working_hours_are_merged():
+    """The overlapping working hours are merged."""
+    wh = WorkingHours(working_hours={"mon": [[540, 720], [600, 1080], [1080, 1200]]})
+    calendar = WorkingCalendar(wh)
+    assert calendar.starts[0] == 540 * 60
+    assert calendar.ends[0] == 1200 * 60
+
+
+@pytest.mark.parametrize(
+    "date,expected",
+    [
+        (utc(2013, 4, 8, 9, 0), True),
+        (utc(2013, 4, 8, 12, 30), False),
+        (utc(2013, 4, 8, 17, 59, 59), True),
+        (utc(2013, 4, 8, 18, 0), False),
+        (utc(2013, 4, 10, 10, 0), False),  # vacation
+        (utc(2013, 4, 13, 10, 0), False),  # saturday
+        (datetime.datetime(2013, 4, 8, 10, 0), True),  # naive
+    ],
+)
+def test_is_working_hour(setup_working_calendar_tests, date, expected):
+    """is_working_hour() respects the working hours and vacations."""
+    data = setup_working_calendar_tests
+    assert data["calendar"].is_working_hour(date) is expected
+
+
+def test_is_working_hour_date_is_not_a_datetime(setup_working_calendar_tests):
+    """TypeError is raised if the date is not a datetime."""
+    data = setup_working_calendar_tests
+    with pytest.raises(TypeError) as cm:
+        data["calendar"].is_working_hour("2013-04-08")
+
+    assert str(cm.value) == (
+        "WorkingCalendar: date should be a datetime.datetime instance, "
+        "not str: '2013-04-08'"
+    )
+
+
+@pytest.mark.parametrize(
+    "start,end,expected",
+    [
+        (utc(2013, 4, 8, 10, 0), utc(2013, 4, 8, 14, 0), 3 * 3600),
+        (utc(2013, 4, 8, 0, 0), utc(2013, 4, 9, 0, 0), 8 * 3600),
+        # the vacation on wednesday is skipped
+        (utc(2013, 4, 8), utc(2013, 4, 15), 4 * 8 * 3600),
+        (utc(2013, 4, 10, 10, 0), utc(2013, 4, 10, 16, 0), 0),
+        # the weeks after the vacation
+        (utc(2013, 4, 15), utc(2014, 4, 14), 52 * 5 * 8 * 3600),
+        # end before start
+        (utc(2013, 4, 8, 14, 0), utc(2013, 4, 8, 10, 0), -3 * 3600),
+    ],
+)
+def test_working_seconds_between(setup_working_calendar_tests, start, end, expected):
+    """working_seconds_between() returns the working seconds in between."""
+    data = setup_working_calendar_tests
+    assert data["calendar"].working_seconds_between(start, end) == expected
+
+
+@pytest.mark.parametrize(
+    "start,seconds,expected",
+    [
+        (utc(2013, 4, 8, 10, 0), 0, utc(2013, 4, 8, 10, 0)),
+        (utc(2013, 4, 8, 10, 0), 3 * 3600, utc(2013, 4, 8, 14, 0)),
+        (utc(2013, 4, 8, 10, 0), 2 * 3600, utc(2013, 4, 8, 12, 0)),
+        (utc(2013, 4, 8, 20, 0), 3600, utc(2013, 4, 9, 10, 0)),
+        # the vacation on wednesday is skipped
+        (utc(2013, 4, 9, 17, 0), 2 * 3600, utc(2013, 4, 11, 10, 0)),
+        # the weekend is skipped
+        (utc(2013, 4, 12, 17, 0), 2 * 3600, utc(2013, 4, 15, 10, 0)),
+        (utc(2013, 4, 15), 52 * 5 * 8 * 3600, utc(2014, 4, 11, 18, 0)),
+    ],
+)
+def test_add_working_seconds(setup_working_calendar_tests, start, seconds, expected):
+    """add_working_seconds() returns the moment after the working seconds."""
+    data = setup_working_calendar_tests
+    assert data["calendar"].add_working_seconds(start, seconds) == expected
+
+
+def test_add_working_seconds_keeps_the_timezone(setup_working_calendar_tests):
+    """add_working_seconds() returns the moment in the timezone of the start."""
+    data = setup_working_calendar_tests
+    timezone = pytz.timezone("Europe/Istanbul")
+    start = utc(2013, 4, 8, 10, 0).astimezone(timezone)
+    result = data["calendar"].add_working_seconds(start, 3600)
+    assert result.tzinfo.zone == "Europe/Istanbul"
+    assert result == utc(2013, 4, 8, 11, 0)
+
+
+def test_add_working_seconds_seconds_is_not_a_number(setup_working_calendar_tests):
+    """TypeError is raised if the seconds is not an int or float."""
+    data = setup_working_calendar_tests
+    with pytest.raises(TypeError) as cm:
+        data["calendar"].add_working_seconds(utc(2013, 4, 8), "10")
+
+    assert str(cm.value) == (
+        "WorkingCalendar: seconds should be an int or float, not str: '10'"
+    )
+
+
+def test_add_working_seconds_seconds_is_negative(setup_working_calendar_tests):
+    """ValueError is raised if the seconds is negative."""
+    data = setup_working_calendar_tests
+    with pytest.raises(ValueError) as cm:
+        data["calendar"].add_working_seconds(utc(2013, 4, 8), -10)
+
+    assert str(cm.value) == (
+        "WorkingCalendar: seconds should be a non-negative number, not -10"
+    )
+
+
+def test_add_working_seconds_without_working_hours():
+    """ValueError is raised if there are no working hours."""
+    wh = WorkingHours(working_hours={day: [] for day in defaults.day_order})
+    calendar = WorkingCalendar(wh)
+    assert calendar.working_seconds_between(utc(2013, 4, 8), utc(2014, 4, 8)) == 0
+    with pytest.raises(ValueError) as cm:
+        calendar.add_working_seconds(utc(2013, 4, 8), 10)
+
+    assert str(cm.value) == (
+        "WorkingCalendar: there are no working hours to add 10 working seconds to"
+    )
+
+
+def test_split_in_to_working_hours(setup_working_calendar_tests):
+    """split_in_to_working_hours() returns the working ranges in between."""
+    data = setup_working_calendar_tests
+    assert data["calendar"].split_in_to_working_hours(
+        utc(2013, 4, 9, 15, 0), utc(2013, 4, 11, 10, 0)
+    ) == [
+        (utc(2013, 4, 9, 15, 0), utc(2013, 4, 9, 18, 0)),
+        (utc(2013, 4, 11, 9, 0), utc(2013, 4, 11, 10, 0)),
+    ]
+
+
+def test_split_in_to_working_hours_cuts_out_partial_vacations(
+    setup_working_calendar_tests,
+):
+    """split_in_to_working_hours() cuts the vacations out of the ranges."""
+    data = setup_working_calendar_tests
+    calendar = WorkingCalendar(
+        data["working_hours"],
+        [Vacation(start=utc(2013, 4, 8, 10, 0), end=utc(2013, 4, 8, 11, 0))],
+    )
+    assert calendar.split_in_to_working_hours(
+        utc(2013, 4, 8), utc(2013, 4, 8, 14, 0)
+    ) == [
+        (utc(2013, 4, 8, 9, 0), utc(2013, 4, 8, 10, 0)),
+        (utc(2013, 4, 8, 11, 0), utc(2013, 4, 8, 12, 0)),
+        (utc(2013, 4, 8, 13, 0), utc(2013, 4, 8, 14, 0)),
+    ]
+
+
+def test_split_in_to_working_hours_end_before_start(setup_working_calendar_tests):
+    """split_in_to_working_hours() returns an empty list if end is before start."""
+    data = setup_working_calendar_tests
+    assert (
+        data["calendar"].split_in_to_working_hours(utc(2013, 4, 9), utc(2013, 4, 8))
+        == []
+    )
+
+
+def test_split_and_working_seconds_are_consistent(setup_working_calendar_tests):
+    """The split ranges add up to the working seconds in between."""
+    data = setup_working_calendar_tests
+    start = utc(2013, 4, 3, 11, 17)
+    end = utc(2013, 6, 2, 16, 41)
+    ranges = data["calendar"].split_in_to_working_hours(start, end)
+    assert sum(
+        (range_end - range_start).total_seconds() for range_start, range_end in ranges
+    ) == data["calendar"].working_seconds_between(start, end)
+
+
+def test_working_seconds_between_many(setup_working_calendar_tests):
+    """working_seconds_between_many() is the vectorized working_seconds_between."""
+    numpy = pytest.importorskip("numpy")
+    data = setup_working_calendar_tests
+    calendar = data["calendar"]
+    starts = [utc(2013, 4, 8, 10, 0), utc(2013, 4, 8), utc(2013, 4, 10, 10, 0)]
+    ends = [utc(2013, 4, 8, 14, 0), utc(2013, 4, 15), utc(2013, 6, 1)]
+    expected = [
+        calendar.working_seconds_between(start, end) for start, end in zip(starts, ends)
+    ]
+    assert calendar.working_seconds_between_many(starts, ends).tolist() == expected
+
+    # datetime64 arrays
+    starts = numpy.array(
+        [start.replace(tzinfo=None) for start in starts], dtype="datetime64[s]"
+    )
+    assert calendar.working_seconds_between_many(starts, ends).tolist() == expected
+
+
+def test_add_working_seconds_many(setup_working_calendar_tests):
+    """add_working_seconds_many() is the vectorized add_working_seconds."""
+    pytest.importorskip("numpy")
+    data = setup_working_calendar_tests
+    calendar = data["calendar"]
+    starts = [utc(2013, 4, 8, 10, 0), utc(2013, 4, 9, 17, 0), utc(2013, 4, 12, 17, 0)]
+    seconds = [0, 2 * 3600, 100 * 3600]
+    expected = [
+        calendar.add_working_seconds(start, seconds_)
+        .astimezone(pytz.utc)
+        .replace(tzinfo=None)
+        for start, seconds_ in zip(starts, seconds)
+    ]
+    assert calendar.add_working_seconds_many(starts, seconds).tolist() == expected
+
+
+def test_add_working_seconds_many_seconds_is_negative(setup_working_calendar_tests):
+    """ValueError is raised if any of the seconds is negative."""
+    pytest.importorskip("numpy")
+    data = setup_working_calendar_tests
+    with pytest.raises(ValueError) as cm:
+        data["calendar"].add_working_seconds_many([utc(2013, 4, 8)], [-1])
+
+    assert str(cm.value) == ("WorkingCalendar: seconds should be non-negative numbers")
+
+
+@pytest.fixture(scope="function")
+def setup_studio_working_calendar_tests(setup_sqlite3):
+    """Set up the tests for the Studio.working_calendar() with a SQLite3 DB.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_user"] = User(
+        name="User1", login="user1", password="1234", email="user1@test.com"
+    )
+    data["test_studio"] = Studio(name="Test Studio")
+    DBSession.add_all(
+        [
+            data["test_user"],
+            data["test_studio"],
+            # studio vacation on Wednesday
+            Vacation(start=utc(2013, 4, 10), end=utc(2013, 4, 11)),
+            # user vacation on Thursday
+            Vacation(
+                user=data["test_user"], start=utc(2013, 4, 11), end=utc(2013, 4, 12)
+            ),
+        ]
+    )
+    DBSession.commit()
+    return data
+
+
+def test_studio_working_calendar(setup_studio_working_calendar_tests):
+    """Studio.working_calendar() respects the studio and user vacations."""
+    data = setup_studio_working_calendar_tests
+    studio = data["test_studio"]
+    daily = studio.working_hours.compile().weekly_working_seconds // 5
+    start = utc(2013, 4, 8)
+    end = utc(2013, 4, 15)
+    assert studio.working_calendar().working_seconds_between(start, end) == 4 * daily
+    assert (
+        studio.working_calendar(data["test_user"]).working_seconds_between(start, end)
+        == 3 * daily
+    )
+
+
+def test_studio_working_calendar_user_is_not_a_user(
+    setup_studio_working_calendar_tests,
+):
+    """TypeError is raised if the user is not a User instance."""
+    data = setup_studio_working_calendar_tests
+    with pytest.raises(TypeError) as cm:
+        data["test_studio"].working_calendar("user1")
+
+    assert str(cm.value) == (
+        "Studio.working_calendar() user should be a "
+        "stalker.models.auth.User instance, not str: 'user1'"
+    )
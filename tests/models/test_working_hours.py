@@ -377,6 +377,21 @@ def test_is_working_hour_is_working_as_expected():
     assert wh.is_working_hour(check_date) is False
 
 
+def test_is_working_hour_checks_the_local_time():
+    """is_working_hour checks the wall-clock time of non UTC datetimes."""
+    wh = WorkingHours()
+    wh["mon"] = [[540, 1080]]
+    tz = pytz.timezone("Europe/Istanbul")
+
+    # monday 10:00 local, 07:00 UTC
+    check_date = tz.localize(datetime.datetime(2013, 4, 8, 10, 0))
+    assert wh.is_working_hour(check_date) is True
+
+    # monday 19:30 local, 16:30 UTC
+    check_date = tz.localize(datetime.datetime(2013, 4, 8, 19, 30))
+    assert wh.is_working_hour(check_date) is False
+
+
 def test_day_numbers_are_correct():
     """day numbers are correct."""
     wh = WorkingHours()
@@ -682,10 +697,56 @@ def test_daily_working_hours_attribute_is_set_to_a_number_bigger_than_24():
     )
 
 
-def test_split_in_to_working_hours_is_not_implemented_yet():
-    """NotimplementedError is raised if the split_in_to_working_hours() is called."""
-    with pytest.raises(NotImplementedError):
-        wh = WorkingHours()
-        start = datetime.datetime.now(pytz.utc)
-        end = start + datetime.timedelta(days=10)
-        wh.split_in_to_working_hours(start, end)
+def test_split_in_to_working_hours_is_working_as_expected():
+    """split_in_to_working_hours() returns the working hour ranges."""
+    wh = WorkingHours()
+    wh["mon"] = [[540, 720], [780, 1080]]
+    wh["tue"] = [[540, 1080]]
+    start = datetime.datetime(2013, 4, 8, 10, 0, tzinfo=pytz.utc)
+    end = datetime.datetime(2013, 4, 9, 12, 0, tzinfo=pytz.utc)
+    assert wh.split_in_to_working_hours(start, end) == [
+        (
+            datetime.datetime(2013, 4, 8, 10, 0, tzinfo=pytz.utc),
+            datetime.datetime(2013, 4, 8, 12, 0, tzinfo=pytz.utc),
+        ),
+        (
+            datetime.datetime(2013, 4, 8, 13, 0, tzinfo=pytz.utc),
+            datetime.datetime(2013, 4, 8, 18, 0, tzinfo=pytz.utc),
+        ),
+        (
+            datetime.datetime(2013, 4, 9, 9, 0, tzinfo=pytz.utc),
+            datetime.datetime(2013, 4, 9, 12, 0, tzinfo=pytz.utc),
+        ),
+    ]
+
+
+def test_working_seconds_between_is_working_as_expected():
+    """working_seconds_between() returns the working seconds in between."""
+    wh = WorkingHours()
+    wh["mon"] = [[540, 720], [780, 1080]]
+    start = datetime.datetime(2013, 4, 8, 10, 0, tzinfo=pytz.utc)
+    end = datetime.datetime(2013, 4, 8, 14, 0, tzinfo=pytz.utc)
+    assert wh.working_seconds_between(start, end) == 3 * 3600
+
+
+def test_add_working_seconds_is_working_as_expected():
+    """add_working_seconds() skips the non-working hours."""
+    wh = WorkingHours()
+    wh["mon"] = [[540, 720], [780, 1080]]
+    start = datetime.datetime(2013, 4, 8, 10, 0, tzinfo=pytz.utc)
+    assert wh.add_working_seconds(start, 3 * 3600) == datetime.datetime(
+        2013, 4, 8, 14, 0, tzinfo=pytz.utc
+    )
+
+
+def test_compile_caches_the_calendar_until_working_hours_change():
+    """compile() returns the same calendar until the working hours change."""
+    wh = WorkingHours()
+    calendar = wh.compile()
+    assert wh.compile() is calendar
+    wh["sat"] = [[540, 720]]
+    new_calendar = wh.compile()
+    assert new_calendar is not calendar
+    assert new_calendar.weekly_working_seconds == (
+        calendar.weekly_working_seconds + 3 * 3600
+    )
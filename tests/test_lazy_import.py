@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""Tests for the lazy import mode of the stalker package."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import stalker
+
+
+def run_python(code, lazy_import):
+    """Run the given code in a new Python interpreter.
+
+    Args:
+        code (str): The Python code to run.
+        lazy_import (bool): Enable lazy import mode or not.
+
+    Returns:
+        str: The stripped stdout of the process.
+    """
+    env = dict(os.environ)
+    env["STALKER_LAZY_IMPORT"] = "1" if lazy_import else "0"
+    env.pop("STALKER_PATH", None)
+    return subprocess.check_output(
+        [sys.executable, "-c", code], env=env, universal_newlines=True
+    ).strip()
+
+
+IMPORTED_MODELS = (
+    "import sys; "
+    "print(len([m for m in sys.modules if m.startswith('stalker.models.')]))"
+)
+
+
+def test_eager_import_imports_all_the_models():
+    """import stalker imports all the model modules by default."""
+    output = run_python(f"import stalker; {IMPORTED_MODELS}", lazy_import=False)
+    assert int(output) > 20
+
+
+def test_lazy_import_does_not_import_any_models():
+    """import stalker in lazy import mode doesn't import any model modules."""
+    output = run_python(
+        f"import stalker; {IMPORTED_MODELS}; print('sqlalchemy' in sys.modules)",
+        lazy_import=True,
+    )
+    assert output.split() == ["0", "False"]
+
+
+def test_lazy_import_imports_the_accessed_class_only():
+    """stalker.<ClassName> in lazy import mode imports only the related modules."""
+    output = run_python(
+        "import sys; "
+        "from stalker import Repository; "
+        "print(Repository.__module__); "
+        "print('stalker.models.task' in sys.modules)",
+        lazy_import=True,
+    )
+    assert output.split() == ["stalker.models.repository", "False"]
+
+
+def test_lazy_import_configures_all_the_mappers_on_first_use():
+    """Mappers are configured with all the classes on first use in lazy mode."""
+    output = run_python(
+        "import stalker.db.setup; "
+        "from stalker import Repository; "
+        "stalker.db.setup.setup({'sqlalchemy.url': 'sqlite://'}); "
+        "stalker.db.setup.init(); "
+        "repo = Repository(name='R', code='R', linux_path='/mnt/R'); "
+        "print(repo.to_linux_path('/mnt/R/a')); "
+        "print(stalker.Task.query.count())",
+        lazy_import=True,
+    )
+    assert output.split() == ["/mnt/R/a", "0"]
+
+
+def test_lazy_import_makes_sub_packages_available():
+    """Sub packages are available as attributes in lazy import mode."""
+    output = run_python(
+        "import stalker; print(stalker.db.__name__)", lazy_import=True
+    )
+    assert output == "stalker.db"
+
+
+def test___getattr___raises_attribute_error_for_unknown_names():
+    """stalker.__getattr__() raises AttributeError for unknown names."""
+    with pytest.raises(AttributeError) as cm:
+        stalker.__getattr__("NotAStalkerClass")
+
+    assert str(cm.value) == "module 'stalker' has no attribute 'NotAStalkerClass'"
+
+
+def test___dir___lists_all_the_classes():
+    """stalker.__dir__() lists all the classes."""
+    assert set(stalker.__all__).issubset(dir(stalker))
+
+
+def test_all_public_names_are_lazy_importable():
+    """All the names in stalker.__all__ can be imported lazily."""
+    for name in stalker.__all__:
+        module = stalker._lazy_imports[name]
+        assert getattr(sys.modules[module], name) is getattr(stalker, name)
@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+"""Tests for the loaders module."""
+
+import datetime
+
+import pytest
+import pytz
+
+import stalker.db.setup
+from stalker import (
+    File,
+    Project,
+    Repository,
+    Review,
+    Shot,
+    Task,
+    TimeLog,
+    User,
+    Version,
+    loaders,
+)
+from stalker.db.session import DBSession
+
+
+@pytest.fixture(scope="function")
+def setup_loader_tests(setup_sqlite3):
+    """Set up the tests for the loaders with a SQLite3 DB.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_repo"] = Repository(
+        name="Test Repository",
+        code="TR",
+        linux_path="/mnt/T/",
+        windows_path="T:/",
+        macos_path="/Volumes/T/",
+    )
+    data["test_user1"] = User(
+        name="User1", login="user1", email="user1@users.com", password="1234"
+    )
+    data["test_user2"] = User(
+        name="User2", login="user2", email="user2@users.com", password="1234"
+    )
+    data["test_project1"] = Project(
+        name="Test Project1", code="tp1", repositories=[data["test_repo"]]
+    )
+    data["test_project2"] = Project(
+        name="Test Project2", code="tp2", repositories=[data["test_repo"]]
+    )
+    DBSession.add_all(
+        [
+            data["test_user1"],
+            data["test_user2"],
+            data["test_project1"],
+            data["test_project2"],
+        ]
+    )
+    DBSession.commit()
+    data["test_project1_id"] = data["test_project1"].id
+    data["test_project2_id"] = data["test_project2"].id
+    data["test_user_ids"] = [data["test_user1"].id, data["test_user2"].id]
+    return data
+
+
+def create_task_tree(data, root_count=2, child_count=2, leaf_count=2):
+    """Create a three level task hierarchy in the first test project.
+
+    Every leaf task depends on the previous one.
+
+    Args:
+        data (dict): The test data.
+        root_count (int): The number of the root tasks.
+        child_count (int): The number of the children of each root task.
+        leaf_count (int): The number of the children of each child task.
+
+    Returns:
+        List[Task]: The leaf tasks.
+    """
+    project = DBSession.get(Project, data["test_project1_id"])
+    users = [DBSession.get(User, user_id) for user_id in data["test_user_ids"]]
+    leaves = []
+    for i in range(root_count):
+        root = Task(name=f"Root {i}", project=project)
+        DBSession.add(root)
+        for j in range(child_count):
+            child = Task(name=f"Child {i}-{j}", parent=root)
+            DBSession.add(child)
+            for k in range(leaf_count):
+                leaf = Task(
+                    name=f"Leaf {i}-{j}-{k}",
+                    parent=child,
+                    resources=users,
+                )
+                if leaves:
+                    leaf.depends_on = [leaves[-1]]
+                DBSession.add(leaf)
+                leaves.append(leaf)
+    DBSession.commit()
+    return leaves
+
+
+def walk_task_tree(tasks):
+    """Access all the preloaded relationships of the given tasks recursively.
+
+    Args:
+        tasks (List[Task]): The tasks to walk.
+
+    Returns:
+        List[str]: The names of the visited tasks.
+    """
+    names = []
+    for task in tasks:
+        names.append(task.name)
+        _ = task.status.code
+        _ = [status.code for status in task.status_list.statuses]
+        _ = [resource.login for resource in task.resources]
+        _ = [dependency.name for dependency in task.depends_on]
+        names.extend(walk_task_tree(task.children))
+    return names
+
+
+@pytest.mark.parametrize("depth", ["2", 2.0, None, True])
+def test_task_tree_depth_is_not_an_int(depth):
+    """task_tree() raises TypeError if the depth is not an int."""
+    with pytest.raises(TypeError) as cm:
+        loaders.task_tree(depth)
+
+    assert str(cm.value) == (
+        f"depth should be an int, not {depth.__class__.__name__}: '{depth}'"
+    )
+
+
+def test_task_tree_depth_is_negative():
+    """task_tree() raises ValueError if the depth is a negative number."""
+    with pytest.raises(ValueError) as cm:
+        loaders.task_tree(-1)
+
+    assert str(cm.value) == "depth should be a non-negative number, not -1"
+
+
+def test_task_tree_options_grow_with_depth():
+    """task_tree() returns the same set of options for each level."""
+    assert len(loaders.task_tree(2)) == 3 * len(loaders.task_tree(0))
+
+
+def test_task_tree_loads_the_hierarchy_up_front(setup_loader_tests, count_statements):
+    """task_tree() loads the children and their relationships up front."""
+    data = setup_loader_tests
+    create_task_tree(data)
+    project_id = data["test_project1_id"]
+    DBSession.expunge_all()
+
+    root_tasks, _ = count_statements(
+        lambda: Task.query.filter(Task.project_id == project_id)
+        .filter(Task.parent_id == None)  # noqa: E711
+        .options(*loaders.task_tree(3))
+        .all()
+    )
+    names, statements = count_statements(walk_task_tree, root_tasks)
+    assert len(statements) == 0
+    assert len(names) == 14
+
+
+def test_task_tree_query_count_does_not_depend_on_the_task_count(
+    setup_loader_tests, count_statements
+):
+    """task_tree() loads the hierarchy in a fixed number of queries."""
+    data = setup_loader_tests
+    project_id = data["test_project1_id"]
+
+    def load():
+        DBSession.expunge_all()
+        root_tasks = (
+            Task.query.filter(Task.project_id == project_id)
+            .filter(Task.parent_id == None)  # noqa: E711
+            .options(*loaders.task_tree(3))
+            .all()
+        )
+        return walk_task_tree(root_tasks)
+
+    create_task_tree(data, root_count=1, child_count=1, leaf_count=2)
+    names, small_statements = count_statements(load)
+    assert len(names) == 4
+
+    create_task_tree(data, root_count=3, child_count=3, leaf_count=3)
+    names, big_statements = count_statements(load)
+    assert len(names) == 4 + 39
+    assert len(small_statements) == len(big_statements)
+
+
+def test_timesheet_loads_the_tasks_and_resources(setup_loader_tests, count_statements):
+    """timesheet() loads the tasks and resources of the TimeLogs up front."""
+    data = setup_loader_tests
+    leaves = create_task_tree(data, root_count=1, child_count=1, leaf_count=1)
+    start = datetime.datetime(2024, 1, 1, 10, tzinfo=pytz.utc)
+    for i in range(3):
+        DBSession.add(
+            TimeLog(
+                task=leaves[0],
+                resource=data["test_user1"],
+                start=start + datetime.timedelta(hours=i),
+                end=start + datetime.timedelta(hours=i + 1),
+            )
+        )
+    DBSession.commit()
+    DBSession.expunge_all()
+
+    time_logs, statements = count_statements(
+        lambda: TimeLog.query.options(*loaders.timesheet()).all()
+    )
+    assert len(statements) == 1
+    _, statements = count_statements(
+        lambda: [
+            (time_log.task.name, time_log.task.status.code, time_log.resource.login)
+            for time_log in time_logs
+        ]
+    )
+    assert len(statements) == 0
+
+
+def test_review_page_loads_the_review_details(setup_loader_tests, count_statements):
+    """review_page() loads the details of the Reviews up front."""
+    data = setup_loader_tests
+    leaves = create_task_tree(data, root_count=1, child_count=1, leaf_count=1)
+    version = Version(task=leaves[0])
+    version.files.append(File(name="Test File", full_path="/mnt/T/tp1/test.ma"))
+    review = Review(task=leaves[0], version=version, reviewer=data["test_user2"])
+    DBSession.add_all([version, review])
+    DBSession.commit()
+    DBSession.expunge_all()
+
+    reviews, _ = count_statements(
+        lambda: Review.query.options(*loaders.review_page()).all()
+    )
+    result, statements = count_statements(
+        lambda: [
+            (
+                review.status.code,
+                review.task.name,
+                review.task.status.code,
+                review.reviewer.login,
+                [file.name for file in review.version.files],
+            )
+            for review in reviews
+        ]
+    )
+    assert len(statements) == 0
+    assert result == [("NEW", "Leaf 0-0-0", "RTS", "user2", ["Test File"])]
+
+
+def test_load_task_tree_project_is_not_a_project(setup_loader_tests):
+    """load_task_tree() raises TypeError if the project is not a Project."""
+    with pytest.raises(TypeError) as cm:
+        loaders.load_task_tree("not a project")
+
+    assert str(cm.value) == (
+        "project should be a stalker.models.project.Project instance, "
+        "not str: 'not a project'"
+    )
+
+
+def test_load_task_tree_returns_the_root_tasks(setup_loader_tests):
+    """load_task_tree() returns the root tasks of the project."""
+    data = setup_loader_tests
+    create_task_tree(data, root_count=3)
+    DBSession.expunge_all()
+    project = DBSession.get(Project, data["test_project1_id"])
+
+    root_tasks = loaders.load_task_tree(project)
+    assert [task.name for task in root_tasks] == ["Root 0", "Root 1", "Root 2"]
+    assert all(task.parent is None for task in root_tasks)
+
+
+def test_load_task_tree_project_without_tasks(setup_loader_tests):
+    """load_task_tree() returns an empty list for a project without tasks."""
+    data = setup_loader_tests
+    assert loaders.load_task_tree(data["test_project2"]) == []
+
+
+def test_load_task_tree_walking_the_tree_issues_no_queries(
+    setup_loader_tests, count_statements
+):
+    """Walking the tree returned by load_task_tree() issues no queries."""
+    data = setup_loader_tests
+    create_task_tree(data)
+    DBSession.expunge_all()
+    project = DBSession.get(Project, data["test_project1_id"])
+    root_tasks = loaders.load_task_tree(project)
+
+    def walk():
+        names = walk_task_tree(root_tasks)
+        for root in root_tasks:
+            for child in root.children:
+                assert child.parent is root
+                assert child.project is project
+                for leaf in child.children:
+                    assert leaf.parent is child
+                    _ = [task.name for task in leaf.dependent_of]
+        return names
+
+    names, statements = count_statements(walk)
+    assert len(statements) == 0
+    assert names == [
+        "Root 0",
+        "Child 0-0",
+        "Leaf 0-0-0",
+        "Leaf 0-0-1",
+        "Child 0-1",
+        "Leaf 0-1-0",
+        "Leaf 0-1-1",
+        "Root 1",
+        "Child 1-0",
+        "Leaf 1-0-0",
+        "Leaf 1-0-1",
+        "Child 1-1",
+        "Leaf 1-1-0",
+        "Leaf 1-1-1",
+    ]
+
+
+def test_load_task_tree_resolves_the_dependencies(setup_loader_tests):
+    """load_task_tree() fills the dependencies with the loaded tasks."""
+    data = setup_loader_tests
+    create_task_tree(data, root_count=1, child_count=1)
+    DBSession.expunge_all()
+    project = DBSession.get(Project, data["test_project1_id"])
+
+    root_tasks = loaders.load_task_tree(project)
+    leaf1, leaf2 = root_tasks[0].children[0].children
+    assert leaf1.depends_on == []
+    assert leaf2.depends_on == [leaf1]
+    assert leaf1.dependent_of == [leaf2]
+    assert sorted(user.login for user in leaf1.resources) == ["user1", "user2"]
+
+
+def test_load_task_tree_query_count_does_not_depend_on_the_task_count(
+    setup_loader_tests, count_statements
+):
+    """load_task_tree() loads any hierarchy in a fixed number of queries."""
+    data = setup_loader_tests
+    project_id = data["test_project1_id"]
+
+    def load():
+        DBSession.expunge_all()
+        project = DBSession.get(Project, project_id)
+        return len(count_statements(loaders.load_task_tree, project)[1])
+
+    create_task_tree(data, root_count=1, child_count=1, leaf_count=1)
+    small_count = load()
+    create_task_tree(data, root_count=4, child_count=4, leaf_count=4)
+    big_count = load()
+    assert small_count == big_count
+    assert big_count <= 6
+
+
+def test_load_task_tree_loads_the_derived_classes(setup_loader_tests, count_statements):
+    """load_task_tree() loads the columns of the derived classes."""
+    data = setup_loader_tests
+    root = Task(name="Shots", project=data["test_project1"])
+    shot = Shot(code="SH001", parent=root)
+    DBSession.add_all([root, shot])
+    DBSession.commit()
+    DBSession.expunge_all()
+    project = DBSession.get(Project, data["test_project1_id"])
+
+    root_tasks = loaders.load_task_tree(project)
+    codes, statements = count_statements(
+        lambda: [task.code for task in root_tasks[0].children]
+    )
+    assert len(statements) == 0
+    assert codes == ["SH001"]
+
+
+def test_load_task_tree_dependencies_to_other_projects(
+    setup_loader_tests, count_statements
+):
+    """load_task_tree() resolves the dependencies to other project tasks."""
+    data = setup_loader_tests
+    other_task = Task(name="Other Task", project=data["test_project2"])
+    task = Task(name="Task", project=data["test_project1"], depends_on=[other_task])
+    DBSession.add_all([other_task, task])
+    DBSession.commit()
+    DBSession.expunge_all()
+    project = DBSession.get(Project, data["test_project1_id"])
+
+    root_tasks = loaders.load_task_tree(project)
+    names, statements = count_statements(
+        lambda: [dependency.name for dependency in root_tasks[0].depends_on]
+    )
+    assert len(statements) == 0
+    assert names == ["Other Task"]
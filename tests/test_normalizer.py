@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Tests for the normalizer module."""
+import pytest
+
+from stalker import normalizer
+from stalker.normalizer import format_login, format_name, format_nice_name
+
+
+@pytest.fixture(scope="function")
+def clear_normalizer_cache():
+    """Clear the normalizer caches before and after the test.
+
+    Yields:
+        None: Nothing.
+    """
+    normalizer.clear_cache()
+    yield
+    normalizer.clear_cache()
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("Test Name", "Test Name"),
+        ("  Test   Name  ", "Test Name"),
+        ("\tTest\n\nName\r\n", "Test Name"),
+        ("Test  Name", "Test Name"),
+        ("Tëst Ñame 漢字", "Tëst Ñame 漢字"),
+        ("", ""),
+        ("   ", ""),
+    ],
+)
+def test_format_name(name, expected):
+    """format_name() strips the name and collapses the white spaces."""
+    assert format_name(name) == expected
+
+
+@pytest.mark.parametrize(
+    "nice_name, expected",
+    [
+        ("Test Name", "Test_Name"),
+        ("  Test   Name  ", "Test_Name"),
+        ("Test - _ - Name", "Test_Name"),
+        ("Test--Name__", "Test_Name_"),
+        ("_-@ 1Test Name", "1Test_Name"),
+        ("Test@Name", "Test@Name"),
+        ("Test!#$Name(v1).ma", "TestNamev1ma"),
+        ("Tëst Ñame", "Tst_ame"),
+        ("漢字 Test", "Test"),
+        ("Test  Name", "Test_Name"),
+        ("Test Name 漢字", "Test_Name"),
+        ("", ""),
+        ("!!!", ""),
+    ],
+)
+def test_format_nice_name(nice_name, expected):
+    """format_nice_name() formats the nice name."""
+    assert format_nice_name(nice_name) == expected
+
+
+@pytest.mark.parametrize(
+    "login, expected",
+    [
+        ("testuser", "testuser"),
+        ("  Test User  ", "testuser"),
+        ("1234test", "test"),
+        ("12_34test5", "test5"),
+        ("test.user@mail", "testusermail"),
+        ("(test)user", "(test)user"),
+        ("Tëst Üser", "tstser"),
+        ("漢字test", "test"),
+        ("", ""),
+    ],
+)
+def test_format_login(login, expected):
+    """format_login() formats the login."""
+    assert format_login(login) == expected
+
+
+def test_format_functions_are_caching_the_results(clear_normalizer_cache):
+    """the format functions are caching the results."""
+    for _ in range(3):
+        format_name("Test Name")
+        format_nice_name("Test Name")
+        format_login("Test Name")
+
+    for function in [format_name, format_nice_name, format_login]:
+        cache_info = function.cache_info()
+        assert cache_info.hits == 2
+        assert cache_info.misses == 1
+
+
+def test_clear_cache_clears_all_caches(clear_normalizer_cache):
+    """clear_cache() clears the caches of all the format functions."""
+    format_name("Test Name")
+    format_nice_name("Test Name")
+    format_login("Test Name")
+    normalizer.clear_cache()
+    for function in [format_name, format_nice_name, format_login]:
+        assert function.cache_info().currsize == 0
@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+"""Tests for the stalker.tjp module."""
+
+import datetime
+import io
+
+import pytest
+import pytz
+
+import stalker.db.setup
+from stalker import Project, Repository, Task, TimeLog, User, Vacation
+from stalker.db.session import DBSession
+from stalker.models.studio import WorkingHours
+from stalker.tjp import (
+    ProjectEmitter,
+    ResourcesEmitter,
+    TJPEmitter,
+    TJPWriter,
+    TaskRow,
+    TaskRowsEmitter,
+    WorkingHoursEmitter,
+)
+
+
+def utc(*args):
+    """Return a UTC datetime.
+
+    Args:
+        args (int): The datetime arguments.
+
+    Returns:
+        datetime.datetime: The timezone aware datetime.
+    """
+    return datetime.datetime(*args, tzinfo=pytz.utc)
+
+
+@pytest.fixture(scope="function")
+def setup_tjp_tests(setup_sqlite3):
+    """Set up the tests for the tjp emitters with a SQLite3 DB.
+
+    Returns:
+        dict: Test data.
+    """
+    data = dict()
+    stalker.db.setup.setup({"sqlalchemy.url": "sqlite:///:memory:"})
+    stalker.db.setup.init()
+    data["test_user1"] = User(
+        name="User1", login="user1", email="user1@users.com", password="1234"
+    )
+    data["test_user2"] = User(
+        name="User2", login="user2", email="user2@users.com", password="1234"
+    )
+    data["test_project"] = Project(
+        name="Test Project",
+        code="tp",
+        repositories=[Repository(name="Test Repository", code="TR")],
+    )
+    DBSession.add_all([data["test_user1"], data["test_user2"], data["test_project"]])
+    DBSession.commit()
+    return data
+
+
+class CountingStream(io.StringIO):
+    """A StringIO counting the write calls."""
+
+    def __init__(self) -> None:
+        super(CountingStream, self).__init__()
+        self.write_count = 0
+
+    def write(self, text: str) -> int:
+        """Write the text and count the call.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            int: The number of the written characters.
+        """
+        self.write_count += 1
+        return super(CountingStream, self).write(text)
+
+
+@pytest.mark.parametrize("stream", [None, "stream", io.BytesIO()])
+def test_writer_stream_is_not_a_text_stream(stream):
+    """TypeError is raised if the stream is not an io.TextIOBase instance."""
+    with pytest.raises(TypeError) as cm:
+        TJPWriter(stream)
+
+    assert str(cm.value) == (
+        "TJPWriter.stream should be an io.TextIOBase instance, "
+        f"not {stream.__class__.__name__}: '{stream}'"
+    )
+
+
+def test_writer_buffers_the_written_text():
+    """The text is written to the stream in chunks of the buffer size."""
+    stream = CountingStream()
+    writer = TJPWriter(stream, buffer_size=10)
+    writer.write("abcd")
+    writer.line("efg")
+    assert stream.getvalue() == ""
+    writer.line("hi")
+    assert stream.getvalue() == "abcdefg\nhi\n"
+    assert stream.write_count == 1
+    writer.write("jk")
+    writer.flush()
+    assert stream.getvalue() == "abcdefg\nhi\njk"
+    assert stream.write_count == 2
+
+
+def test_writer_is_flushed_when_the_context_exits():
+    """The buffered text is written when the context of the writer exits."""
+    stream = io.StringIO()
+    with TJPWriter(stream) as writer:
+        writer.line("task")
+        assert stream.getvalue() == ""
+    assert stream.getvalue() == "task\n"
+
+
+def test_emitter_emit_is_not_implemented():
+    """TJPEmitter.emit() raises NotImplementedError."""
+    with pytest.raises(NotImplementedError):
+        TJPEmitter().render()
+
+
+def test_working_hours_emitter():
+    """WorkingHoursEmitter writes the working hours of each day."""
+    working_hours = WorkingHours()
+    working_hours["mon"] = [[540, 720], [780, 1080]]
+    stream = io.StringIO()
+    with TJPWriter(stream) as writer:
+        WorkingHoursEmitter(working_hours, "  ").emit(writer)
+    assert stream.getvalue() == (
+        "  workinghours mon 09:00 - 12:00, 13:00 - 18:00\n"
+        "  workinghours tue 09:00 - 18:00\n"
+        "  workinghours wed 09:00 - 18:00\n"
+        "  workinghours thu 09:00 - 18:00\n"
+        "  workinghours fri 09:00 - 18:00\n"
+        "  workinghours sat off\n"
+        "  workinghours sun off\n"
+    )
+    assert working_hours.to_tjp == stream.getvalue().replace("  ", "").rstrip("\n")
+
+
+def test_resources_emitter_with_rows():
+    """ResourcesEmitter writes the users and vacations of the given rows."""
+    emitter = ResourcesEmitter(
+        [(3, 1.0), (5, 0.5)],
+        [
+            (5, utc(2024, 1, 1), utc(2024, 1, 2)),
+            (None, utc(2024, 1, 5), utc(2024, 1, 6)),
+        ],
+    )
+    assert emitter.render() == (
+        'resource resources "Resources" {\n'
+        "vacation 2024-01-05-00:00:00 - 2024-01-06-00:00:00\n"
+        'resource User_3 "User_3" {\n'
+        "    efficiency 1.0\n"
+        "}\n"
+        'resource User_5 "User_5" {\n'
+        "    efficiency 0.5\n"
+        "    vacation 2024-01-01-00:00:00 - 2024-01-02-00:00:00\n"
+        "}\n"
+        "}"
+    )
+
+
+def test_resources_emitter_from_database(setup_tjp_tests, count_statements):
+    """ResourcesEmitter.from_database() fetches the data with two queries."""
+    data = setup_tjp_tests
+    user1 = data["test_user1"]
+    DBSession.add_all(
+        [
+            Vacation(user=user1, start=utc(2024, 1, 1), end=utc(2024, 1, 2)),
+            Vacation(start=utc(2024, 1, 5), end=utc(2024, 1, 6)),
+        ]
+    )
+    DBSession.commit()
+    emitter, statements = count_statements(ResourcesEmitter.from_database)
+    assert len(statements) == 2
+    result = emitter.render()
+    assert result.startswith(
+        'resource resources "Resources" {\n'
+        "vacation 2024-01-05-00:00:00 - 2024-01-06-00:00:00\n"
+    )
+    assert user1.to_tjp in result
+    assert data["test_user2"].to_tjp in result
+
+
+def test_task_rows_emitter():
+    """TaskRowsEmitter writes the task hierarchy of the given rows."""
+
+    def row(task_id, depth, **kwargs):
+        values = dict(
+            id=task_id,
+            depth=depth,
+            priority=500,
+            schedule_timing=10.0,
+            schedule_unit="h",
+            schedule_model="effort",
+            allocation_strategy="minallocated",
+            persistent_allocation=True,
+            resource_ids=[],
+            alternative_resource_ids=[],
+            bookings=[],
+            dependencies=[],
+            is_leaf=True,
+        )
+        values.update(kwargs)
+        return TaskRow(**values)
+
+    emitter = TaskRowsEmitter(
+        [
+            (
+                1,
+                [
+                    row(10, 1, is_leaf=False, resource_ids=[3]),
+                    row(
+                        11,
+                        2,
+                        priority=800,
+                        resource_ids=[3, 4],
+                        alternative_resource_ids=[5],
+                        bookings=[(3, "2024-01-01-09:00:00", "2024-01-01-10:00:00")],
+                    ),
+                    row(12, 1, dependencies=[([1, 10, 11], "onend")]),
+                ],
+            ),
+            (2, []),
+        ]
+    )
+    assert emitter.render() == (
+        'task Project_1 "Project_1" {\n'
+        '  task Task_10 "Task_10" {\n'
+        '    task Task_11 "Task_11" {\n'
+        "      priority 800\n"
+        "      effort 10.0h\n"
+        "      allocate User_3 { alternative User_5 select minallocated persistent }, "
+        "User_4 { alternative User_5 select minallocated persistent }\n"
+        "      booking User_3 2024-01-01-09:00:00 - 2024-01-01-10:00:00 "
+        "{ overtime 2 }\n"
+        "    }\n"
+        "  }\n"
+        '  task Task_12 "Task_12" {\n'
+        "    depends Project_1.Task_10.Task_11 {onend}\n"
+        "  }\n"
+        "}\n"
+        'task Project_2 "Project_2" {\n'
+        "}"
+    )
+
+
+def test_project_emitter_output(setup_tjp_tests):
+    """ProjectEmitter writes the same output as the task emitters."""
+    data = setup_tjp_tests
+    project = data["test_project"]
+    user1 = data["test_user1"]
+    parent = Task(name="Parent", project=project)
+    child = Task(
+        name="Child",
+        parent=parent,
+        resources=[user1],
+        alternative_resources=[data["test_user2"]],
+        schedule_timing=2,
+        schedule_unit="h",
+    )
+    other = Task(name="Other", project=project, depends_on=[child])
+    DBSession.add_all([parent, child, other])
+    DBSession.commit()
+    DBSession.add(
+        TimeLog(
+            task=child,
+            resource=user1,
+            start=utc(2024, 1, 1, 9),
+            end=utc(2024, 1, 1, 10),
+        )
+    )
+    DBSession.commit()
+    expected = "\n".join(
+        [f'task {project.tjp_id} "{project.tjp_id}" {{']
+        + [f"    {line}" for line in parent.to_tjp.split("\n")]
+        + [f"    {line}" for line in other.to_tjp.split("\n")]
+        + ["}"]
+    )
+    DBSession.expire_all()
+    assert ProjectEmitter(project).render() == expected
+    assert project.to_tjp == expected
+
+
+def test_project_emitter_query_count(setup_tjp_tests, count_statements):
+    """The number of queries of ProjectEmitter doesn't depend on the tasks."""
+    data = setup_tjp_tests
+    project = data["test_project"]
+    user1 = data["test_user1"]
+
+    def add_tasks(count, day):
+        parent = Task(name=f"Parent{count}", project=project)
+        tasks = [
+            Task(
+                name=f"Task{i}",
+                parent=parent,
+                resources=[user1],
+                schedule_timing=1,
+                schedule_unit="h",
+            )
+            for i in range(count)
+        ]
+        DBSession.add_all(tasks)
+        DBSession.commit()
+        DBSession.add_all(
+            TimeLog(
+                task=task,
+                resource=user1,
+                start=utc(2024, 1, day, i),
+                end=utc(2024, 1, day, i + 1),
+            )
+            for i, task in enumerate(tasks)
+        )
+        DBSession.commit()
+        DBSession.expire_all()
+
+    add_tasks(2, 1)
+    _, statements = count_statements(ProjectEmitter(project).render)
+    add_tasks(10, 2)
+    result, new_statements = count_statements(ProjectEmitter(project).render)
+    assert len(new_statements) == len(statements)
+    assert result.count("booking User_") == 12
+
+
+def test_task_rows_from_database(setup_tjp_tests):
+    """TaskRowsEmitter.from_database() assembles the task hierarchy."""
+    data = setup_tjp_tests
+    project = data["test_project"]
+    user1 = data["test_user1"]
+    user2 = data["test_user2"]
+    parent = Task(name="Parent", project=project)
+    child = Task(
+        name="Child",
+        parent=parent,
+        resources=[user2, user1],
+        alternative_resources=[user2],
+        schedule_timing=2,
+        schedule_unit="h",
+        priority=800,
+    )
+    other = Task(name="Other", project=project, depends_on=[child])
+    DBSession.add_all([parent, child, other])
+    DBSession.commit()
+    DBSession.add(
+        TimeLog(
+            task=child,
+            resource=user1,
+            start=utc(2024, 1, 1, 9),
+            end=utc(2024, 1, 1, 10),
+        )
+    )
+    DBSession.commit()
+
+    emitter = TaskRowsEmitter.from_database([project.id])
+    assert [project_id for project_id, _ in emitter.projects] == [project.id]
+    rows = emitter.projects[0][1]
+    assert [(row.id, row.depth, row.is_leaf) for row in rows] == [
+        (parent.id, 1, False),
+        (child.id, 2, True),
+        (other.id, 1, True),
+    ]
+    row = rows[1]
+    assert row.priority == 800
+    assert row.schedule_model == "effort"
+    assert f"{row.schedule_timing}{row.schedule_unit}" == "2.0h"
+    assert row.resource_ids == sorted([user1.id, user2.id])
+    assert row.alternative_resource_ids == [user2.id]
+    assert row.bookings == [(user1.id, "2024-01-01-09:00:00", "2024-01-01-10:00:00")]
+    assert rows[2].dependencies == [([project.id, parent.id, child.id], "onend")]
+
+
+def test_task_rows_from_database_siblings_are_ordered_by_id_text(setup_tjp_tests):
+    """The siblings are ordered by the text of their ids."""
+    data = setup_tjp_tests
+    project = data["test_project"]
+    tasks = [Task(name=f"Task{i}", project=project) for i in range(12)]
+    DBSession.add_all(tasks)
+    DBSession.commit()
+    rows = TaskRowsEmitter.from_database([project.id]).projects[0][1]
+    assert [row.id for row in rows] == sorted(
+        (task.id for task in tasks), key=lambda task_id: str(task_id)
+    )
+
+
+def test_task_rows_from_database_dependency_to_another_project(setup_tjp_tests):
+    """The path of a depended task in another project is fetched."""
+    data = setup_tjp_tests
+    project = data["test_project"]
+    other_project = Project(
+        name="Other Project", code="op", repositories=project.repositories
+    )
+    parent = Task(name="Parent", project=other_project)
+    middle = Task(name="Middle", parent=parent)
+    depended = Task(name="Depended", parent=middle)
+    task = Task(name="Task", project=project, depends_on=[depended])
+    DBSession.add_all([other_project, parent, middle, depended, task])
+    DBSession.commit()
+    emitter = TaskRowsEmitter.from_database([project.id])
+    assert emitter.projects[0][1][0].dependencies == [
+        ([other_project.id, parent.id, middle.id, depended.id], "onend")
+    ]
+    assert (
+        f"depends Project_{other_project.id}.Task_{parent.id}.Task_{middle.id}"
+        f".Task_{depended.id} {{onend}}"
+    ) in emitter.render()
+
+
+def test_task_rows_from_database_query_count(setup_tjp_tests, count_statements):
+    """The number of queries doesn't depend on the number of the tasks."""
+    data = setup_tjp_tests
+    project = data["test_project"]
+    user1 = data["test_user1"]
+    _, statements = count_statements(TaskRowsEmitter.from_database, [project.id])
+    parents = [Task(name=f"Parent{i}", project=project) for i in range(5)]
+    DBSession.add_all(
+        Task(name=f"Task{i}", parent=parents[i % 5], resources=[user1])
+        for i in range(20)
+    )
+    DBSession.commit()
+    emitter, new_statements = count_statements(
+        TaskRowsEmitter.from_database, [project.id]
+    )
+    assert len(new_statements) == len(statements)
+    assert len(emitter.projects[0][1]) == 25
+
+
+def test_task_rows_from_database_without_projects(setup_tjp_tests, count_statements):
+    """No queries are issued if there are no projects."""
+    emitter, statements = count_statements(TaskRowsEmitter.from_database, [])
+    assert len(statements) == 0
+    assert emitter.render() == ""